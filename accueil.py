@@ -1,26 +1,14 @@
 import streamlit as st
 import pandas as pd
 import os
+import instrumentation
+import theme
 
 # =======================
 # Fonction KPI
 # =======================
 def kpi_card(title, value, color):
-    st.markdown(f"""
-        <div style="
-            background: linear-gradient(135deg, {color} 0%, #ffffff20 100%);
-            padding: 20px;
-            border-radius: 16px;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.15);
-            text-align: center;
-            color: white;
-            transition: transform 0.2s, box-shadow 0.2s;
-        " onmouseover="this.style.transform='scale(1.05)';this.style.boxShadow='0 8px 25px rgba(0,0,0,0.25)';" 
-          onmouseout="this.style.transform='scale(1)';this.style.boxShadow='0 4px 20px rgba(0,0,0,0.15)';">
-            <div style="font-size: 18px; font-weight: 500; margin-bottom: 5px;">{title}</div>
-            <div style="font-size: 32px; font-weight: bold;">{value}</div>
-        </div>
-    """, unsafe_allow_html=True)
+    theme.carte(value, titre=title, fond=f"linear-gradient(135deg, {color} 0%, #ffffff20 100%)", classe="carte-accueil")
 
 
 # =======================
@@ -30,20 +18,21 @@ def show(tables):
     st.title("⚽ Football DB – Tableau de bord (mode CSV)")
     st.markdown("Bienvenue dans ton application de gestion et d’analyse des matchs à partir de fichiers CSV 🏟️")
 
-    df_matchs = tables["all_matchs_football"]
-    df_pronos = tables["all_pronostics"]
+    instrumentation.etape("chargement.tables")
+    # Comptages et filtres exécutés par le stockage des tables : seuls les participants sont lus en entier
     df_participants = tables["participants"]
-    df_archives = tables["archives"]
 
     # =======================
     # KPI GLOBAUX
     # =======================
+    instrumentation.etape("rendu.kpi_globaux")
     st.subheader("🌍 Statistiques globales")
+    theme.injecter_css("cartes")
 
-    nb_matchs = len(df_matchs)
-    nb_pronos = len(df_pronos)
+    nb_matchs = tables.compter("all_matchs_football")
+    nb_pronos = tables.compter("pronostics")
     nb_participants = df_participants["id"].nunique() if "id" in df_participants.columns else len(df_participants)
-    nb_archives = len(df_archives)
+    nb_archives = tables.compter("archives")
 
     col1, col2, col3, col4 = st.columns(4, gap="large")
     with col1:
@@ -60,25 +49,26 @@ def show(tables):
     # =======================
     # KPI PAR SAISON
     # =======================
+    instrumentation.etape("rendu.stats_saison")
     st.subheader("📆 Statistiques par saison")
 
-    if "saison" not in df_matchs.columns:
+    if "saison" not in tables.colonnes("all_matchs_football"):
         st.error("❌ La colonne 'saison' est manquante dans all_matchs_football.csv.")
         return
 
-    saisons = sorted(df_matchs["saison"].dropna().unique(), reverse=True)
+    saisons = sorted(tables.valeurs("all_matchs_football", "saison"), reverse=True)
     if saisons:
         saison_sel = st.selectbox("Sélectionner une saison :", saisons)
 
-        df_matchs_saison = df_matchs[df_matchs["saison"] == saison_sel]
-        df_pronos_saison = df_pronos[df_pronos["saison"] == saison_sel]
+        # La saison d'un pronostic se déduit de son match_id
+        store_pronos_saison = tables.store_pronostics(saison=saison_sel)
 
-        nb_matchs_saison = len(df_matchs_saison)
-        nb_pronos_saison = len(df_pronos_saison)
+        nb_matchs_saison = tables.compter("all_matchs_football", saison=saison_sel)
+        nb_pronos_saison = len(store_pronos_saison)
 
         # Participants actifs
-        if "participant_id" in df_pronos.columns and "pseudo" in df_participants.columns:
-            participants_saison = df_pronos_saison["participant_id"].unique()
+        if "pseudo" in df_participants.columns:
+            participants_saison = store_pronos_saison.index.get_level_values("participant_id").unique()
             noms_participants = df_participants[df_participants["id"].isin(participants_saison)]["pseudo"].sort_values().tolist()
         else:
             noms_participants = []
@@ -97,10 +87,8 @@ def show(tables):
             st.markdown(f"### 👤 Liste des participants actifs ({saison_sel})")
             df_participants_actifs = pd.DataFrame({"Pseudo": noms_participants})
             st.dataframe(
-                df_participants_actifs.style.set_properties(**{
-                    'text-align': 'center',
-                    'white-space': 'nowrap'
-                }),
+                df_participants_actifs,
+                column_config={"Pseudo": st.column_config.Column(alignment="center")},
                 use_container_width=True,
                 hide_index=True,
                 height=min(40 * len(df_participants_actifs), 400)
@@ -115,5 +103,6 @@ def show(tables):
     # =======================
     # Aperçu du fichier matchs
     # =======================
+    instrumentation.etape("rendu.apercu_matchs")
     st.subheader("📋 Aperçu des matchs")
-    st.dataframe(df_matchs.head(10), use_container_width=True, hide_index=True)
+    st.dataframe(tables.apercu("all_matchs_football", 10), use_container_width=True, hide_index=True)
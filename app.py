@@ -1,24 +1,26 @@
-import streamlit as st
 import pandas as pd
-import accueil as page0
-import expert_canape as page1
-import championnat as page2
-import competitions_europeennes as page3
-import coupes_nationales as page4
-import os
+import streamlit as st
+import demarrage
+import donnees
+import instrumentation
+
+# Copy-on-write : les sous-ensembles filtrés par les pages ne peuvent jamais modifier
+# les tables de base partagées (comportement par défaut à partir de pandas 3)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
 
 st.set_page_config(page_title="Football DB", page_icon="⚽", layout="wide")
 
 # ---------------- Chargement CSV ---------------- #
-def load_csv_tables(folder="csv"):
-    tables = {}
-    for file in os.listdir(folder):
-        if file.endswith(".csv"):
-            table_name = file.replace(".csv", "")
-            tables[table_name] = pd.read_csv(os.path.join(folder, file))
-    return tables
+@st.cache_resource(max_entries=1)
+def charger_tables(version):
+    # Dictionnaire paresseux partagé par toutes les sessions : chaque table est chargée
+    # une seule fois par version des données, au premier accès d'une page. Une ingestion
+    # (ingestion.py) change la version : les tables sont rechargées, et seuls les caches
+    # des saisons touchées sont invalidés (version_saison)
+    return donnees.charger_tables()
 
-tables = load_csv_tables()
+tables = charger_tables(donnees.version_fichiers())
 
 # ---------------- Navigation ---------------- #
 if "page" not in st.session_state:
@@ -34,14 +36,24 @@ st.sidebar.button("🌍 Compétitions Européennes", on_click=navigate_to, args=
 st.sidebar.button("🏆 Coupes Nationales", on_click=navigate_to, args=("Coupes Nationales",))
 
 # ---------------- Affichage des pages ---------------- #
-if st.session_state.page == "Accueil":
-    page0.show(tables)
-elif st.session_state.page == "Expert Canapé":
-    page1.show(tables)
-elif st.session_state.page == "Championnat":
-    page2.show(tables)
-elif st.session_state.page == "Compétitions Européennes":
-    page3.show(tables)
-elif st.session_state.page == "Coupes Nationales":
-    page4.show(tables)  
+# Chaque module de page n'est importé qu'à sa première ouverture
+PAGES = {
+    "Accueil": "accueil",
+    "Expert Canapé": "expert_canape",
+    "Championnat": "championnat",
+    "Compétitions Européennes": "competitions_europeennes",
+    "Coupes Nationales": "coupes_nationales",
+}
+
+if st.session_state.page in PAGES:
+    instrumentation.debut_execution(st.session_state.page)
+    with instrumentation.span("page", page=st.session_state.page):
+        with instrumentation.span("import"):
+            page = demarrage.importer_page(PAGES[st.session_state.page])
+        page.show(tables)
+    spans = instrumentation.fin_execution()
+
+    # ---------------- Panneau de debug (?debug=1) ---------------- #
+    if st.query_params.get("debug") == "1":
+        instrumentation.panneau(spans)
 
@@ -0,0 +1,134 @@
+import glob
+import hashlib
+import json
+import os
+import pandas as pd
+
+# ---------------- Table "archives" (vue matérialisée) ---------------- #
+# Construite à partir de all_matchs_football avec les noms de colonnes canoniques,
+# enrichie des statistiques de match (<dossier des CSV>/stats_matchs/*.csv) quand elles existent,
+# puis persistée par saison dans le cache colonne (parquet), un cache par dossier de données.
+
+DOSSIER_STATS = "stats_matchs"
+DOSSIER_CACHE = os.path.join("cache", "archives")
+FICHIER_MANIFESTE = "manifeste.json"
+
+COLONNES_MATCH = [
+    "match_id", "saison", "code_saison", "competition", "date", "journee",
+    "equipe_domicile_id", "equipe_domicile_nom", "equipe_exterieure_id", "equipe_exterieure_nom",
+    "score_domicile", "score_exterieur"
+]
+
+COLONNES_STATS = [
+    "tirs_domicile", "tirs_exterieur",
+    "tirs_cadres_domicile", "tirs_cadres_exterieur",
+    "corners_domicile", "corners_exterieur",
+    "fautes_domicile", "fautes_exterieur",
+    "cartons_jaune_domicile", "cartons_jaune_exterieur",
+    "cartons_rouges_domicile", "cartons_rouges_exterieur"
+]
+
+
+def dossier_cache(dossier="csv"):
+    """Cache des archives d'un dossier de données : deux jeux de CSV ne partagent jamais leurs partitions."""
+    empreinte = hashlib.sha1(os.path.realpath(dossier).encode()).hexdigest()[:8]
+    return os.path.join(DOSSIER_CACHE, f"{os.path.basename(os.path.normpath(dossier))}-{empreinte}")
+
+
+def charger_stats_matchs(dossier="csv"):
+    """Concatène les fichiers optionnels de statistiques de match (une ligne par match_id)."""
+    fichiers = sorted(glob.glob(os.path.join(dossier, DOSSIER_STATS, "*.csv")))
+    if not fichiers:
+        return pd.DataFrame(columns=["match_id"] + COLONNES_STATS)
+
+    stats = pd.concat([pd.read_csv(f) for f in fichiers], ignore_index=True)
+    colonnes = ["match_id"] + [c for c in COLONNES_STATS if c in stats.columns]
+    # En cas de doublon, le fichier le plus récent (ordre alphabétique) l'emporte
+    return stats[colonnes].drop_duplicates(subset="match_id", keep="last")
+
+
+def _empreinte(df_matchs_saison, df_stats_saison):
+    """Empreinte du contenu source d'une saison : change dès qu'un match ou une stat change."""
+    h = pd.util.hash_pandas_object(df_matchs_saison.astype(str), index=False).sum()
+    h += pd.util.hash_pandas_object(df_stats_saison.astype(str), index=False).sum()
+    return str(int(h) % (2 ** 63))
+
+
+def construire_archives_saison(df_matchs_saison, df_stats):
+    """Archives d'une saison : matchs + statistiques (colonnes absentes laissées vides)."""
+    archives = df_matchs_saison[[c for c in COLONNES_MATCH if c in df_matchs_saison.columns]]
+    archives = archives.merge(df_stats, on="match_id", how="left")
+    for col in COLONNES_STATS:
+        if col not in archives.columns:
+            archives[col] = pd.NA
+        archives[col] = archives[col].astype("Int16")
+    return archives.reset_index(drop=True)
+
+
+def _nom_partition(saison):
+    return f"{str(saison).replace('/', '-')}.parquet"
+
+
+def materialiser_archives(df_matchs, dossier="csv", cache=None):
+    """Construit (ou relit) la table archives des matchs du dossier de données `dossier`.
+
+    Le cache (dossier_cache(dossier) par défaut) est partitionné par saison : seules les saisons
+    nouvelles ou dont les matchs / statistiques ont changé sont reconstruites, les autres sont
+    relues du parquet.
+    """
+    df_stats = charger_stats_matchs(dossier)
+    cache = cache or dossier_cache(dossier)
+
+    chemin_manifeste = os.path.join(cache, FICHIER_MANIFESTE)
+    try:
+        with open(chemin_manifeste, encoding="utf-8") as f:
+            manifeste = json.load(f)
+    except (OSError, ValueError):
+        manifeste = {}
+
+    try:
+        os.makedirs(cache, exist_ok=True)
+        persister = True
+    except OSError:
+        persister = False
+
+    partitions = []
+    nouveau_manifeste = {}
+    for saison, df_saison in df_matchs.groupby("saison", observed=True, sort=True):
+        stats_saison = df_stats[df_stats["match_id"].isin(df_saison["match_id"])]
+        empreinte = _empreinte(df_saison, stats_saison)
+        chemin = os.path.join(cache, _nom_partition(saison))
+
+        archives_saison = None
+        if manifeste.get(str(saison)) == empreinte and os.path.exists(chemin):
+            try:
+                archives_saison = pd.read_parquet(chemin)
+            except (ImportError, OSError, ValueError):
+                archives_saison = None
+
+        if archives_saison is None:
+            archives_saison = construire_archives_saison(df_saison, stats_saison)
+            if persister:
+                # Fichier temporaire puis renommage : une lecture concurrente ne voit jamais un parquet partiel
+                try:
+                    archives_saison.to_parquet(chemin + ".tmp", index=False)
+                    os.replace(chemin + ".tmp", chemin)
+                except (ImportError, OSError, ValueError):
+                    persister = False
+
+        nouveau_manifeste[str(saison)] = empreinte
+        partitions.append(archives_saison)
+
+    if persister:
+        # Les saisons disparues de la source sont retirées du cache
+        for saison in set(manifeste) - set(nouveau_manifeste):
+            chemin = os.path.join(cache, _nom_partition(saison))
+            if os.path.exists(chemin):
+                os.remove(chemin)
+        with open(chemin_manifeste + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(nouveau_manifeste, f, indent=1, ensure_ascii=False)
+        os.replace(chemin_manifeste + ".tmp", chemin_manifeste)
+
+    if not partitions:
+        return construire_archives_saison(df_matchs.iloc[0:0], df_stats.iloc[0:0])
+    return pd.concat(partitions, ignore_index=True)
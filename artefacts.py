@@ -0,0 +1,214 @@
+import functools
+import json
+import os
+import pandas as pd
+
+# ---------------- Artefacts précalculés ---------------- #
+# Résultats des calculs lourds (classements Expert Canapé, historiques des participants,
+# classements de championnat par journée, groupes européens, tableaux à élimination directe),
+# produits hors de l'application par precalculs.py et stockés en parquet : une partition par
+# famille et par saison, toutes les clés (compétition, journée, groupe...) d'une saison dans
+# le même fichier.
+#
+# Le manifeste enregistre, saison par saison, la version des données sur laquelle les artefacts
+# ont été calculés (donnees.TablesLectureSeule.version_saison) : une page ne les sert que pour
+# cette version, sinon elle recalcule. Une ingestion ne périme donc que les saisons touchées,
+# et precalculs.py ne recalcule qu'elles.
+
+DOSSIER_PRECALCULS = os.path.join("cache", "precalculs")
+FICHIER_MANIFESTE = "manifeste.json"
+# Changer le format (colonnes, clés) invalide les artefacts déjà écrits
+FORMAT = 3
+# Partition des artefacts qui couvrent toutes les saisons (palmarès)
+TOUTES_SAISONS = "toutes"
+COLONNE_CLE = "_cle"
+COLONNE_INDEX = "_index"
+
+
+def cle(*parties):
+    """Clé d'un artefact dans sa partition ; les journées sont écrites en entier (12 et 12.0 → « 12 »)."""
+    return "|".join(str(int(p)) if isinstance(p, float) and p.is_integer() else str(p) for p in parties)
+
+
+def _nom_partition(saison):
+    return f"{str(saison).replace('/', '-')}.parquet"
+
+
+# ---------------- Écriture ---------------- #
+def ecrire(artefacts, versions, dossier=DOSSIER_PRECALCULS, precedent=None):
+    """Écrit les artefacts {famille: {(saison, clé): (DataFrame, infos)}} et leur manifeste.
+
+    `versions` : {saison: version des données} des saisons calculées. Les saisons absentes de
+    `versions` sont reprises du manifeste `precedent` (calcul incrémental), les autres remplacées.
+    Les types de chaque DataFrame sont notés dans le manifeste : la concaténation d'une
+    partition peut promouvoir une colonne (int64 → float64), la lecture les rétablit.
+    Renvoie le manifeste, None si le parquet n'est pas disponible.
+    """
+    versions = {str(saison): version for saison, version in versions.items()}
+    manifeste = {"format": FORMAT, "saisons": {}, "familles": {}}
+    if precedent is not None and precedent.get("format") == FORMAT:
+        manifeste["saisons"] = {s: v for s, v in precedent["saisons"].items() if s not in versions}
+        for famille, partitions in precedent["familles"].items():
+            manifeste["familles"][famille] = {s: p for s, p in partitions.items() if s not in versions}
+    manifeste["saisons"].update(versions)
+    os.makedirs(dossier, exist_ok=True)
+
+    for famille, entrees in artefacts.items():
+        os.makedirs(os.path.join(dossier, famille), exist_ok=True)
+        saisons = {}
+        for (saison, cle_artefact), (df, infos) in entrees.items():
+            saisons.setdefault(str(saison), []).append((cle_artefact, df, infos))
+
+        manifeste["familles"].setdefault(famille, {})
+        for saison, cles in saisons.items():
+            schemas, entrees_saison, morceaux = [], {}, []
+            for cle_artefact, df, infos in cles:
+                schema = {col: str(t) for col, t in df.dtypes.items()}
+                if schema not in schemas:
+                    schemas.append(schema)
+                # Index conservé seulement s'il n'est pas l'index par défaut
+                index = not df.index.equals(pd.RangeIndex(len(df)))
+                morceau = df.reset_index(names=COLONNE_INDEX) if index else df
+                morceaux.append(morceau.assign(**{COLONNE_CLE: cle_artefact}))
+                entrees_saison[cle_artefact] = {"schema": schemas.index(schema), "index": index, **infos}
+
+            # Fichier temporaire puis renommage, comme le manifeste : une page qui lit la partition
+            # pendant le précalcul trouve l'ancienne ou la nouvelle, jamais un parquet partiel
+            chemin = os.path.join(dossier, famille, _nom_partition(saison))
+            try:
+                pd.concat(morceaux, ignore_index=True).to_parquet(chemin + ".tmp", index=False)
+                os.replace(chemin + ".tmp", chemin)
+            except (ImportError, OSError, ValueError, TypeError):
+                return None
+            manifeste["familles"][famille][saison] = {"schemas": schemas, "cles": entrees_saison}
+
+    # Manifeste écrit en dernier : tant qu'il n'est pas remplacé, les pages servent l'ancienne version ou recalculent
+    chemin = os.path.join(dossier, FICHIER_MANIFESTE)
+    with open(chemin + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifeste, f, ensure_ascii=False)
+    os.replace(chemin + ".tmp", chemin)
+    return manifeste
+
+
+# ---------------- Lecture ---------------- #
+def _date_modification(chemin):
+    try:
+        return os.stat(chemin).st_mtime_ns
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=4)
+def _lire_manifeste(chemin, date_modification):
+    try:
+        with open(chemin, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@functools.lru_cache(maxsize=64)
+def _lire_partition(chemin, date_modification):
+    # Partagée entre les sessions : les pages n'en lisent que des sous-ensembles (copy-on-write)
+    try:
+        return pd.read_parquet(chemin)
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def manifeste(dossier=DOSSIER_PRECALCULS):
+    chemin = os.path.join(dossier, FICHIER_MANIFESTE)
+    date_modification = _date_modification(chemin)
+    return None if date_modification is None else _lire_manifeste(chemin, date_modification)
+
+
+def lire(version, famille, saison, cle_artefact, dossier=DOSSIER_PRECALCULS):
+    """Artefact (DataFrame, infos) calculé pour la version `version` des données de la saison, None s'il n'existe pas."""
+    man = manifeste(dossier)
+    if version is None or man is None or man.get("format") != FORMAT or man["saisons"].get(str(saison)) != version:
+        return None
+    partition = man["familles"].get(famille, {}).get(str(saison))
+    if partition is None or cle_artefact not in partition["cles"]:
+        return None
+
+    chemin = os.path.join(dossier, famille, _nom_partition(saison))
+    date_modification = _date_modification(chemin)
+    df = None if date_modification is None else _lire_partition(chemin, date_modification)
+    if df is None:
+        return None
+
+    infos = dict(partition["cles"][cle_artefact])
+    schema = partition["schemas"][infos.pop("schema")]
+    df = df[df[COLONNE_CLE] == cle_artefact]
+    if infos.pop("index"):
+        df = df.set_index(COLONNE_INDEX).rename_axis(None)
+    else:
+        df = df.reset_index(drop=True)
+    return df[list(schema)].astype(schema), infos
+
+
+# ---------------- Artefacts servis aux pages ---------------- #
+def resultats_expert(version, saison, championnat):
+    """(nombre de matchs, pronostics avec points, progression) d'une saison Expert Canapé."""
+    pronos = lire(version, "expert_pronostics", saison, cle(championnat))
+    progression = lire(version, "expert_progression", saison, cle(championnat))
+    if pronos is None or progression is None:
+        return None
+    (df, infos), (df_progress, _) = pronos, progression
+    return infos["nb_matchs"], df, df_progress
+
+
+def historique(versions, participant_id):
+    """Points par compétition, saison et journée d'un participant sur les saisons {saison: version}.
+
+    None si l'une des saisons n'est pas précalculée pour sa version.
+    """
+    morceaux = []
+    for saison, version in versions.items():
+        lu = lire(version, "historiques", saison, cle("Toutes"))
+        if lu is None:
+            return None
+        morceaux.append(lu[0][lu[0]["participant_id"] == participant_id])
+    if not morceaux:
+        return None
+    return pd.concat(morceaux, ignore_index=True)
+
+
+def classement(version, saison, competition, journee, pts_victoire):
+    """Classement d'un championnat après `journee` (None : saison complète), calculé avec le même barème."""
+    lu = lire(version, "classements", saison, cle(competition, "Toutes" if journee is None else journee))
+    if lu is None or lu[1]["pts_victoire"] != pts_victoire:
+        return None
+    return lu[0]
+
+
+def champions(version, competition, pts_victoire):
+    """Champions successifs d'un championnat (palmarès), toutes saisons calculées avec `pts_victoire`."""
+    lu = lire(version, "palmares", TOUTES_SAISONS, cle(competition, pts_victoire))
+    return None if lu is None else lu[0]["Equipe"].tolist()
+
+
+def classement_groupe(version, saison, competition, groupe):
+    lu = lire(version, "groupes", saison, cle(competition, groupe))
+    return None if lu is None else lu[0]
+
+
+def phase_ligue(version, saison, competition):
+    """(journées, classements par journée) de la phase de ligue, comme moteur.classements_par_journee."""
+    lu = lire(version, "phase_ligue", saison, cle(competition))
+    if lu is None:
+        return None
+    df = lu[0]
+    if df.empty:
+        return [], pd.DataFrame()
+    return sorted(df["Journée"].unique()), df
+
+
+def tableau_elimination(version, saison, competition, phase):
+    """Lignes (Domicile / Score / Extérieur) et vainqueurs d'une phase à élimination directe.
+
+    Renvoie un DataFrame avec la colonne `manche` (Aller, Retour, Finale ou Match) et la colonne
+    `Vainqueur` (qualifié de la confrontation, ou vainqueur du match ; vide pour un match nul).
+    """
+    lu = lire(version, "elimination", saison, cle(competition, phase))
+    return None if lu is None else lu[0]
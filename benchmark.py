@@ -0,0 +1,300 @@
+import argparse
+import os
+import subprocess
+import tempfile
+import tracemalloc
+import warnings
+import pandas as pd
+import streamlit as st
+import championnat
+import competitions_europeennes
+import donnees
+import expert_canape
+import graphiques
+import instrumentation
+import moteur
+import pronostics
+import synthetique
+
+# ---------------- Banc de mesure ---------------- #
+# Chronomètre les chemins chauds (calcul des points, bonus de journée, classements,
+# classements de groupe, tableaux à élimination directe, export Excel, figures) sur des données
+# synthétiques à plusieurs échelles. Chaque mesure est un span d'instrumentation, ajouté
+# au fichier JSON lines de résultats : deux exécutions du banc se comparent avec --comparer.
+
+FICHIER_RESULTATS = os.path.join("cache", "benchmarks.jsonl")
+
+CAS = {}
+
+
+def cas(nom, entrees=("matchs",)):
+    """Enregistre un cas de mesure : la fonction reçoit le contexte et renvoie le nombre de lignes traitées.
+
+    `entrees` : attributs du contexte préparés avant la mesure (hors chronomètre).
+    """
+    def decorateur(fonction):
+        CAS[nom] = (fonction, entrees)
+        return fonction
+    return decorateur
+
+
+class Contexte:
+    """Données d'une échelle : tables de l'application chargées depuis les CSV synthétiques.
+
+    Les entrées des cas (fusion pronostics × matchs, sous-ensembles par compétition) sont
+    préparées une seule fois, hors mesure, à leur premier usage.
+    """
+
+    def __init__(self, dossier):
+        self.dossier = dossier
+        self.tables = donnees.charger_tables(dossier)
+        for nom in ["all_matchs_football", "pronostics", "participants"]:
+            self.tables[nom]
+        self._cache = {}
+
+    def _memo(self, cle, construire):
+        if cle not in self._cache:
+            self._cache[cle] = construire()
+        return self._cache[cle]
+
+    @property
+    def matchs(self):
+        return self._memo("matchs", lambda: donnees.types_calcul(self.tables["all_matchs_football"]))
+
+    @property
+    def pronostics(self):
+        """Pronostics joints aux matchs, toutes saisons et compétitions confondues."""
+        def construire():
+            vue = pronostics.vue_pronostics(self.tables["pronostics"], self.tables["participants"])
+            return expert_canape.pronostics_matchs(vue, self.matchs)
+        return self._memo("pronostics", construire)
+
+    @property
+    def points(self):
+        return self._memo("points", lambda: self.pronostics.assign(points=moteur.points_pronostics(self.pronostics)))
+
+    def competitions(self, filtre):
+        """Sous-ensembles (saison, compétition) des matchs vérifiant `filtre`."""
+        matchs = self.matchs[filtre(self.matchs)]
+        return [d for _, d in matchs.groupby(["saison", "competition"], sort=True) if not d.empty]
+
+    @property
+    def championnats(self):
+        return self._memo("championnats", lambda: self.competitions(
+            lambda m: m["phase"].isna() & m["groupe"].isna() & ~m["competition"].isin(self.europe_noms)))
+
+    @property
+    def figure_evolution(self):
+        """Figure d'évolution de la plus longue saison de championnat (déjà construite)."""
+        return self._memo("figure_evolution", lambda: _figure_evolution(max(self.championnats, key=len)))
+
+    @property
+    def europe_noms(self):
+        return [nom for nom, _, _ in synthetique.EUROPE]
+
+    @property
+    def europe(self):
+        return self._memo("europe", lambda: self.competitions(lambda m: m["competition"].isin(self.europe_noms)))
+
+
+# ---------------- Cas mesurés ---------------- #
+@cas("chargement.tables", entrees=())
+def _chargement(contexte):
+    tables = donnees.charger_tables(contexte.dossier)
+    return len(tables["all_matchs_football"]) + len(tables["pronostics"]) + len(tables["participants"])
+
+
+@cas("pronostics.fusion")
+def _fusion(contexte):
+    vue = pronostics.vue_pronostics(contexte.tables["pronostics"], contexte.tables["participants"])
+    return len(expert_canape.pronostics_matchs(vue, contexte.matchs))
+
+
+@cas("pronostics.calcul_points", entrees=("pronostics",))
+def _calcul_points(contexte):
+    return len(moteur.points_pronostics(contexte.pronostics))
+
+
+@cas("pronostics.bonus_journee", entrees=("points",))
+def _bonus_journee(contexte):
+    # Comme la page : une progression par saison et par compétition
+    for _, df in contexte.points.groupby(["saison_match", "competition"], sort=False):
+        moteur.progression_journees(df)
+    return len(contexte.points)
+
+
+@cas("classement.championnat", entrees=("championnats",))
+def _classement(contexte):
+    for df in contexte.championnats:
+        pts = championnat.points_victoire(df["competition"].iloc[0], df["saison"].iloc[0])
+        moteur.classement(df, pts)
+    return sum(len(df) for df in contexte.championnats)
+
+
+@cas("classement.evolution", entrees=("championnats",))
+def _evolution(contexte):
+    # Évolution journée par journée d'une saison complète (graphique de la page Classements)
+    df = max(contexte.championnats, key=len)
+    for j in sorted(df["journee"].dropna().unique()):
+        moteur.classement(df[df["journee"] <= j])
+    return len(df)
+
+
+def _figure_evolution(df):
+    """Figure d'évolution du classement d'une saison, comme la page Classements."""
+    evolution = []
+    for j in sorted(df["journee"].dropna().unique()):
+        evolution.append(moteur.classement(df[df["journee"] <= j])[["Equipe", "Rang"]].assign(Journee=j))
+    fig = graphiques.figure_multi_series(pd.concat(evolution), "Journee", "Rang", "Equipe")
+    fig.update_layout(yaxis=dict(autorange="reversed", title="Rang"), xaxis=dict(title="Journée"), height=600)
+    return fig
+
+
+@cas("figures.sans_cache", entrees=("championnats",))
+def _figures_sans_cache(contexte):
+    # Rendu sans cache : figure construite puis sérialisée par st.plotly_chart à chaque rerun
+    df = max(contexte.championnats, key=len)
+    st.plotly_chart(_figure_evolution(df))
+    return len(df)
+
+
+@cas("figures.cache", entrees=("championnats", "figure_evolution"))
+def _figures_cache(contexte):
+    # Rerun sur une sélection déjà vue : la figure en cache est passée telle quelle à st.plotly_chart
+    graphiques.afficher_figure(("benchmark.evolution", contexte.dossier), lambda: contexte.figure_evolution)
+    return len(max(contexte.championnats, key=len))
+
+
+@cas("europe.groupes", entrees=("europe",))
+def _groupes(contexte):
+    lignes = 0
+    for df in contexte.europe:
+        for _, df_groupe in df[df["groupe"].notna()].groupby("groupe"):
+            moteur.classement(df_groupe)
+            moteur.matrice_confrontations(df_groupe)
+            lignes += len(df_groupe)
+    return lignes
+
+
+@cas("europe.phase_ligue", entrees=("europe",))
+def _phase_ligue(contexte):
+    lignes = 0
+    for df in contexte.europe:
+        df_ligue = df[df["phase"].str.contains("Ligue", case=False, na=False)]
+        if not df_ligue.empty:
+            moteur.classements_par_journee(df_ligue)
+            lignes += len(df_ligue)
+    return lignes
+
+
+@cas("europe.elimination", entrees=("europe",))
+def _elimination(contexte):
+    lignes = 0
+    for df in contexte.europe:
+        df = competitions_europeennes.preparer_elimination(df)
+        for phase, df_phase in df[df["aller_retour"].isin(["Aller", "Retour"]) | (df["phase"] == "Finale")].groupby("phase"):
+            if phase == "Finale":
+                competitions_europeennes.finale(df_phase)
+            else:
+                competitions_europeennes.tour_aller_retour(df_phase)
+            lignes += len(df_phase)
+    return lignes
+
+
+@cas("export.excel")
+def _export(contexte):
+    # Tous les matchs de la dernière saison complète, au format de l'onglet Export Excel
+    saisons = sorted(contexte.matchs["saison"].unique())
+    saison = saisons[-2] if len(saisons) > 1 else saisons[-1]
+    matchs = contexte.matchs[contexte.matchs["saison"] == saison]
+    df_export = matchs[["equipe_domicile_nom", "score_domicile", "score_exterieur", "equipe_exterieure_nom"]]
+    df_export.columns = ["Equipe domicile", "Score domicile", "Score extérieur", "Equipe extérieure"]
+    df_export = df_export.fillna("").astype(str)
+    expert_canape.ecrire_classeur(df_export, saison, "Toutes", "Toutes")
+    return len(df_export)
+
+
+# ---------------- Exécution ---------------- #
+def commit_courant():
+    resultat = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return resultat.stdout.strip() if resultat.returncode == 0 else None
+
+
+def mesurer(echelles, noms_cas=None, repetitions=3, graine=0, dossier=None):
+    """Mesure les cas à chaque échelle ; renvoie les spans de l'exécution du banc."""
+    noms_cas = noms_cas or list(CAS)
+    commit = commit_courant()
+    instrumentation.debut_execution("benchmark")
+    for echelle in echelles:
+        with tempfile.TemporaryDirectory() as temporaire:
+            dossier_echelle = os.path.join(dossier, f"echelle_{echelle:g}") if dossier else temporaire
+            with instrumentation.span("generation", echelle=echelle, graine=graine, commit=commit) as s:
+                tables = synthetique.generer_tables(echelle, graine)
+                synthetique.ecrire_csv(tables, dossier_echelle)
+                s["lignes"] = len(tables["all_matchs_football"]) + len(tables["all_pronostics"])
+            del tables
+
+            contexte = Contexte(dossier_echelle)
+            for nom in noms_cas:
+                fonction, entrees = CAS[nom]
+                for entree in entrees:
+                    getattr(contexte, entree)
+                for repetition in range(repetitions):
+                    with instrumentation.span(nom, echelle=echelle, repetition=repetition, commit=commit) as s:
+                        s["lignes"] = fonction(contexte)
+                print(f"échelle {echelle:g} – {nom} : {s['duree_ms']:.0f} ms", flush=True)
+    return instrumentation.fin_execution()
+
+
+def resume(spans):
+    """Médiane et minimum des répétitions par cas et par échelle."""
+    df = pd.DataFrame(spans)
+    df = df[df["nom"].isin(list(CAS)) & (df["profondeur"] == 0)]
+    return (
+        df.groupby(["execution", "commit", "echelle", "nom"], dropna=False, sort=False)
+        .agg(lignes=("lignes", "max"), mediane_ms=("duree_ms", "median"), min_ms=("duree_ms", "min"),
+             repetitions=("duree_ms", "size"))
+        .reset_index()
+    )
+
+
+def comparer(chemin=FICHIER_RESULTATS, avant=None, apres=None):
+    """Médianes de deux exécutions du banc (par défaut les deux dernières) et leur rapport."""
+    resultats = resume(instrumentation.lire_jsonl(chemin).to_dict("records"))
+    executions = list(dict.fromkeys(resultats["execution"]))
+    avant = avant or executions[-2]
+    apres = apres or executions[-1]
+    table = (
+        resultats[resultats["execution"].isin([avant, apres])]
+        .pivot_table(index=["echelle", "nom"], columns="execution", values="mediane_ms")
+        [[avant, apres]]
+    )
+    table["rapport"] = (table[apres] / table[avant]).round(2)
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc de mesure des calculs sur données synthétiques.")
+    parser.add_argument("--echelles", type=float, nargs="+", default=[1, 10],
+                        help="échelles mesurées (1 = volume actuel, 100 = cent fois plus)")
+    parser.add_argument("--cas", nargs="+", choices=list(CAS), help="cas mesurés (tous par défaut)")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--memoire", action="store_true", help="mesurer aussi les allocations (tracemalloc)")
+    parser.add_argument("--donnees", help="garder les CSV générés dans ce dossier")
+    parser.add_argument("--sortie", default=FICHIER_RESULTATS, help="fichier JSON lines des résultats")
+    parser.add_argument("--comparer", nargs="*", metavar="EXECUTION",
+                        help="compare deux exécutions du fichier de résultats (les deux dernières par défaut)")
+    args = parser.parse_args()
+    # Avertissements pandas des boucles de classement : une ligne par appel, illisible ici
+    warnings.simplefilter("ignore", FutureWarning)
+
+    if args.comparer is not None:
+        print(comparer(args.sortie, *args.comparer).to_string())
+    else:
+        if args.memoire:
+            tracemalloc.start()
+        spans = mesurer(args.echelles, args.cas, args.repetitions, args.graine, args.donnees)
+        os.makedirs(os.path.dirname(args.sortie) or ".", exist_ok=True)
+        instrumentation.exporter(spans, args.sortie)
+        print(resume(spans).to_string(index=False))
@@ -1,38 +1,153 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
+import artefacts
+import donnees
+import graphiques
+import instrumentation
+import moteur
+import tableaux
+import theme
+
+# Championnats proposés par la page (les autres compétitions sont des coupes)
+CHAMPIONNATS = [
+    'Ligue 1', 'Premier League', 'Serie A', 'Bundesliga', '2. Bundesliga',
+    'LaLiga2', 'Championship', 'League One', 'League Two', 'National League',
+    'Serie B', 'LaLiga', 'Ligue 2', 'Eredivisie', 'National',
+    'Jupiler League', 'Liga Portugal', 'Premiership'
+]
+
+
+# ---------------- Classements ---------------- #
+def points_victoire(championnat, saison):
+    """Points d'une victoire (2 avant l'adoption des 3 points par le championnat, 3 ensuite)."""
+    try:
+        annee = int(str(saison).split("-")[0])
+    except:
+        annee = int(saison)
+
+    barèmes_2pts = {
+        "Premier League": 1981,
+        "Championship": 1981,
+        "League One": 1981,
+        "League Two": 1981,
+        "National League": 1981,
+        "Ligue 1": 1994,
+        "Ligue 2": 1994,
+        "Serie A": 1994,
+        "Serie B": 1994,
+        "Jupiler League": 1995,
+        "Bundesliga": 1995,
+        "2. Bundesliga": 1995,
+        "Eredivisie": 1995,
+        "Liga Portugal": 1995,
+        "LaLiga": 1995,
+        "LaLiga2": 1995,
+        "Premiership": 1995
+    }
+
+    if championnat in barèmes_2pts and annee < barèmes_2pts[championnat]:
+        return 2
+    else:
+        return 3
+
+
+def calcul_classement(df, pts_victoire=3):
+    """Classement (Rang, Equipe, Pts, J, V, N, D, BP, BC, Diff) des matchs joués de `df`.
+
+    Version ligne à ligne, référence de moteur.classement (utilisé par la page).
+    """
+    equipes = pd.unique(df[['equipe_domicile_nom', 'equipe_exterieure_nom']].values.ravel('K'))
+    classement = pd.DataFrame(index=equipes, columns=['Pts','J','V','N','D','BP','BC','Diff'])
+    classement = classement.fillna(0)
+
+    for _, match in df.iterrows():
+        dom, ext = match['equipe_domicile_nom'], match['equipe_exterieure_nom']
+        sd, se = match['score_domicile'], match['score_exterieur']
+        if pd.isna(sd) or pd.isna(se):
+            continue
+
+        classement.at[dom,'J'] += 1
+        classement.at[ext,'J'] += 1
+        classement.at[dom,'BP'] += sd
+        classement.at[dom,'BC'] += se
+        classement.at[ext,'BP'] += se
+        classement.at[ext,'BC'] += sd
+
+        if sd > se:
+            classement.at[dom,'V'] += 1
+            classement.at[dom,'Pts'] += pts_victoire
+            classement.at[ext,'D'] += 1
+        elif sd < se:
+            classement.at[ext,'V'] += 1
+            classement.at[ext,'Pts'] += pts_victoire
+            classement.at[dom,'D'] += 1
+        else:
+            classement.at[dom,'N'] += 1
+            classement.at[ext,'N'] += 1
+            classement.at[dom,'Pts'] += 1
+            classement.at[ext,'Pts'] += 1
+
+    classement['Diff'] = classement['BP'] - classement['BC']
+    classement = classement.sort_values(by=['Pts','Diff','BP'], ascending=[False,False,False])
+    classement = classement.reset_index()
+    classement = classement.rename(columns={'index':'Equipe'})
+    classement.insert(0, 'Rang', range(1, len(classement) + 1))
+    return classement
+
+
+def classement_journee(tables, df_matchs, saison, championnat, journee, pts_victoire):
+    """Classement après `journee` (None : saison complète), lu dans les précalculs quand ils existent.
+
+    Sinon calculé par le stockage des tables (agrégats SQL) ou, en mémoire, sur `df_matchs`.
+    """
+    classement = artefacts.classement(tables.version_saison(saison), saison, championnat, journee, pts_victoire)
+    if classement is None:
+        classement = tables.classement("archives", pts_victoire, journee, saison=saison, competition=championnat)
+    if classement is None:
+        matchs = df_matchs if journee is None else df_matchs[df_matchs["journee"] <= journee]
+        classement = moteur.classement(matchs, pts_victoire)
+    return classement
+
+
+def matchs_championnat(df, championnat):
+    """Matchs de toutes les saisons d'un championnat (palmarès global), triés par saison."""
+    all_matches = donnees.types_calcul(df[
+        df["competition"] == championnat][["saison", "competition", "equipe_domicile_nom", "equipe_exterieure_nom", "score_domicile", "score_exterieur"]]).sort_values(by="saison")
+    return all_matches
+
+
+def champions(df_all, pts_victoire):
+    """Premier du classement de chaque saison de `df_all` (dans l'ordre des saisons)."""
+    champions = []
+    saisons_all = df_all["saison"].unique()
+    for s in saisons_all:
+        df_saison = df_all[df_all["saison"] == s]
+        classement_s = moteur.classement(df_saison, pts_victoire)
+        if not classement_s.empty:
+            champions.append(classement_s.iloc[0]["Equipe"])
+    return champions
+
 
 def show(tables):
     st.title("🏆 Classement d'un championnat")
+    # Styles des cartes KPI de la page, injectés en un seul bloc
+    theme.injecter_css("cartes", "championnat")
 
-    # --- Charger les données depuis le CSV --- #
-    df = tables["archives"]
-
-    # Normaliser les noms de colonnes si nécessaire
-    df.rename(columns={
-        'equipe_domicile': 'equipe_domicile_nom',
-        'equipe_exterieure': 'equipe_exterieure_nom',
-        'score_domicile_final': 'score_domicile',
-        'score_exterieur_final': 'score_exterieur'
-    }, inplace=True)
+    # --- Sous-ensembles des archives lus par requêtes filtrées (colonnes déjà normalisées au chargement) --- #
+    instrumentation.etape("chargement.tables")
 
     # --- Sélection saison / championnat / journée --- #
     col1, col2 = st.columns([1.1, 3])
 
     # 1️⃣ Sélection de la saison
     with col1:
-        saisons = sorted(df['saison'].dropna().unique(), reverse=True)
+        saisons = sorted(tables.valeurs("archives", "saison"), reverse=True)
         if not saisons:
             st.warning("Aucune saison disponible.")
             return
         saison_sel = st.selectbox("Sélectionner une saison :", saisons)
         
-    competitions_possibles = [
-        'Ligue 1', 'Premier League', 'Serie A', 'Bundesliga', '2. Bundesliga',
-        'LaLiga2', 'Championship', 'League One', 'League Two', 'National League',
-        'Serie B', 'LaLiga', 'Ligue 2', 'Eredivisie', 'National',
-        'Jupiler League', 'Liga Portugal', 'Premiership'
-    ]
+    competitions_possibles = CHAMPIONNATS
 
     with col2:
         competitions_sel = st.multiselect(
@@ -46,10 +161,8 @@ def show(tables):
             st.stop()
 
     # === Filtrage des données === #
-    df_saison = df[
-        (df["saison"] == saison_sel) &
-        (df["competition"].isin(competitions_sel))
-    ].copy()
+    instrumentation.etape("calcul.filtrage")
+    df_saison = donnees.types_calcul(tables.selection("archives", saison=saison_sel, competition=competitions_sel))
 
     # Conversion des scores en numérique (au cas où)
     df_saison["score_domicile"] = pd.to_numeric(df_saison["score_domicile"], errors="coerce")
@@ -61,6 +174,7 @@ def show(tables):
         st.stop()
 
     # === Calcul des stats globales === #
+    instrumentation.etape("calcul.stats_globales")
     stats = []
     for _, row in df_saison.iterrows():
         stats.append({
@@ -85,24 +199,11 @@ def show(tables):
     pire_defense = classement.loc[classement["buts_contre"].idxmax()]
 
     # === Affichage des KPI === #
+    instrumentation.etape("rendu.kpi")
     st.subheader("📊 Statistiques globales sur la saison")
 
     def kpi_card(title, value, subtitle, color, emoji):
-        st.markdown(f"""
-            <div style="
-                background: {color};
-                border-radius: 16px;
-                padding: 20px;
-                text-align: center;
-                box-shadow: 0 4px 10px rgba(0,0,0,0.1);
-                color: white;
-            ">
-                <div style="font-size: 32px;">{emoji}</div>
-                <div style="font-size: 20px; font-weight: bold; margin-top: 5px;">{title}</div>
-                <div style="font-size: 28px; font-weight: 800; margin-top: 10px;">{value}</div>
-                <div style="font-size: 16px; opacity: 0.9; margin-top: 5px;">{subtitle}</div>
-            </div>
-        """, unsafe_allow_html=True)
+        theme.carte(value, titre=title, sous_titre=subtitle, emoji=emoji, fond=color, classe="carte-stat")
 
     colA, colB, colC, colD = st.columns(4)
 
@@ -120,8 +221,7 @@ def show(tables):
     col1, col2, col3 = st.columns(3)
     with col1:
         championnats = sorted(
-            df[(df['saison'] == saison_sel) & (df['competition'].isin(competitions_possibles))]['competition']
-            .dropna().unique()
+            tables.valeurs("archives", "competition", saison=saison_sel, competition=competitions_possibles)
         )
 
         if not championnats:
@@ -134,7 +234,7 @@ def show(tables):
 
     with col2:
         # 3️⃣ Sélection de la journée
-        journees_res = sorted(df[(df['saison'] == saison_sel) & (df['competition'] == championnat_sel)]['journee'].dropna().unique())
+        journees_res = sorted(tables.valeurs("archives", "journee", saison=saison_sel, competition=championnat_sel))
         
         # --- Convertir les journées en entiers valides ---
         journees_entieres = sorted([int(j) for j in journees_res if pd.notna(j)])
@@ -152,14 +252,10 @@ def show(tables):
             index=default_index
         )
 
-        # --- Utilisation ---
-        if journee_sel == "Toutes":
-            df_filtre = df.copy()  # toutes les journées
-        else:
-            df_filtre = df[df["journee"] == int(journee_sel)]  # journée sélectionnée
-
     # --- Filtrer les matchs à afficher --- #
-    df_matchs = df[(df['saison'] == saison_sel) & (df['competition'] == championnat_sel)]
+    instrumentation.etape("calcul.classement")
+    df_selection = tables.selection("archives", saison=saison_sel, competition=championnat_sel)
+    df_matchs = donnees.types_calcul(df_selection)
 
     if df_matchs.empty:
         st.info("Aucun match pour ce championnat et cette saison.")
@@ -176,87 +272,16 @@ def show(tables):
         st.info("Aucun match pour ce championnat et cette saison / journée.")
         return
 
-    # --- Fonction de calcul du barème de points --- #
-    def points_victoire(championnat, saison):
-        try:
-            annee = int(str(saison).split("-")[0])
-        except:
-            annee = int(saison)
-
-        barèmes_2pts = {
-            "Premier League": 1981,
-            "Championship": 1981,
-            "League One": 1981,
-            "League Two": 1981,
-            "National League": 1981,
-            "Ligue 1": 1994,
-            "Ligue 2": 1994,
-            "Serie A": 1994,
-            "Serie B": 1994,
-            "Jupiler League": 1995,
-            "Bundesliga": 1995,
-            "2. Bundesliga": 1995,
-            "Eredivisie": 1995,
-            "Liga Portugal": 1995,
-            "LaLiga": 1995,
-            "LaLiga2": 1995,
-            "Premiership": 1995
-        }
-
-        if championnat in barèmes_2pts and annee < barèmes_2pts[championnat]:
-            return 2
-        else:
-            return 3
-
-    # --- Fonction calcul classement --- #
-    def calcul_classement(df):
-        pts_victoire = points_victoire(championnat_sel, saison_sel)
-        equipes = pd.unique(df[['equipe_domicile_nom', 'equipe_exterieure_nom']].values.ravel('K'))
-        classement = pd.DataFrame(index=equipes, columns=['Pts','J','V','N','D','BP','BC','Diff'])
-        classement.fillna(0, inplace=True)
-
-        for _, match in df.iterrows():
-            dom, ext = match['equipe_domicile_nom'], match['equipe_exterieure_nom']
-            sd, se = match['score_domicile'], match['score_exterieur']
-            if pd.isna(sd) or pd.isna(se):
-                continue
-
-            classement.at[dom,'J'] += 1
-            classement.at[ext,'J'] += 1
-            classement.at[dom,'BP'] += sd
-            classement.at[dom,'BC'] += se
-            classement.at[ext,'BP'] += se
-            classement.at[ext,'BC'] += sd
-
-            if sd > se:
-                classement.at[dom,'V'] += 1
-                classement.at[dom,'Pts'] += pts_victoire
-                classement.at[ext,'D'] += 1
-            elif sd < se:
-                classement.at[ext,'V'] += 1
-                classement.at[ext,'Pts'] += pts_victoire
-                classement.at[dom,'D'] += 1
-            else:
-                classement.at[dom,'N'] += 1
-                classement.at[ext,'N'] += 1
-                classement.at[dom,'Pts'] += 1
-                classement.at[ext,'Pts'] += 1
-
-        classement['Diff'] = classement['BP'] - classement['BC']
-        classement = classement.sort_values(by=['Pts','Diff','BP'], ascending=[False,False,False])
-        classement.reset_index(inplace=True)
-        classement.rename(columns={'index':'Equipe'}, inplace=True)
-        classement.insert(0, 'Rang', range(1, len(classement) + 1))
-        return classement
-
     # --- Calcul des classements --- #
-    classement_actuel = calcul_classement(df_matchs_journee)
-    classement_final = calcul_classement(df_matchs)
+    pts_victoire = points_victoire(championnat_sel, saison_sel)
+    # Lus dans les précalculs (precalculs.py) quand ils correspondent à la version des CSV
+    journee_classement = None if journee_sel == "Toutes" else journee_sel
+    classement_actuel = classement_journee(tables, df_matchs, saison_sel, championnat_sel, journee_classement, pts_victoire)
+    classement_final = classement_journee(tables, df_matchs, saison_sel, championnat_sel, None, pts_victoire)
 
     # --- Évolution du classement --- #
     if journee_sel != "Toutes" and journee_sel > min(journees_res):
-        df_matchs_prec = df_matchs[df_matchs["journee"] <= journee_sel - 1]
-        classement_prec = calcul_classement(df_matchs_prec)
+        classement_prec = classement_journee(tables, df_matchs, saison_sel, championnat_sel, journee_sel - 1, pts_victoire)
 
         def evolution(equipe):
             if equipe not in classement_prec["Equipe"].values:
@@ -274,39 +299,33 @@ def show(tables):
     else:
         classement_actuel["Évolution"] = "—"
 
-    # --- Style des tableaux --- #
-    def highlight_top_bottom(row, total_teams):
-        color = ''
-        if row.Rang <= 3:
-            color = 'background-color: #124D12FF; font-weight: bold;'
-        elif row.Rang > total_teams - 3:
-            color = 'background-color: #F75555FF; font-weight: bold;'
-        return [color]*len(row)
-
+    # --- Tableaux de classement (colonnes d'affichage précalculées, sans Styler) --- #
     def style_table(df):
-        total = len(df)
+        """(tableau affiché, configuration des colonnes) d'un classement."""
         colonnes = ['Rang','Equipe','Pts','J','V','N','D','BP','BC','Diff']
         if 'Évolution' in df.columns:
             colonnes.append('Évolution')
-        return (
-            df[colonnes]
-            .style
-            .apply(highlight_top_bottom, total_teams=total, axis=1)
-            .format({'Pts':'{:.0f}','Diff': '{:+d}'})
-            .background_gradient(subset=['Pts'], cmap='Greens', low=0.2, high=0.9)
-            .background_gradient(subset=['Diff'], cmap='RdYlGn', low=0.2, high=0.9)
-        )
+        df = df[colonnes]
+        total = len(df)
+
+        # Podium en vert, trois derniers en rouge : pastille devant le rang
+        rang = df["Rang"].to_numpy()
+        df = df.assign(Rang=tableaux.pastilles(rang, [rang <= 3, rang > total - 3], [tableaux.VERT, tableaux.ROUGE]))
+        return df, tableaux.config_classement(df)
 
     # --- Affichage --- #
+    instrumentation.etape("rendu.classement")
     st.subheader(f"🏁 Classements – {championnat_sel} – {saison_sel}")
     col_dyn, col_resultat = st.columns([1.7, 1.2])
 
     with col_dyn:
         st.markdown(f"**Classement après la journée {journee_sel}**")
-        styled_classement = style_table(classement_actuel).set_properties(
-            **{'text-align':'center','justify-content':'center','white-space':'nowrap','font-size':'14px','padding':'4px 8px'}
+        df_classement, config = style_table(classement_actuel)
+        st.dataframe(
+            df_classement,
+            column_config=config,
+            use_container_width=False, height=38*len(classement_actuel), hide_index=True
         )
-        st.dataframe(styled_classement, use_container_width=False, height=38*len(classement_actuel), hide_index=True)
 
     with col_resultat:
         st.subheader(f"⚽️ Résultats de la journée {journee_sel}")
@@ -327,27 +346,26 @@ def show(tables):
                 columns={"equipe_domicile_nom":"Équipe domicile","equipe_exterieure_nom":"Équipe extérieure"}
             )
             st.dataframe(
-                df_journee_display.style.set_properties(**{'text-align':'center','font-size':'14px','width':'auto','white-space':'nowrap'}),
+                df_journee_display,
+                column_config=tableaux.centrer(df_journee_display),
                 use_container_width=False,
                 height=390,
                 hide_index=True
             )
 
     st.subheader("📈 Évolution du classement par journée")
-    classement_evolution = []
-    for j in journees_res:
-        if j == "Toutes": 
-            st.text("Pas d'évolution à afficher")
-            continue
-        classement_j = calcul_classement(df_matchs[df_matchs["journee"] <= j])
-        classement_j["Journee"] = j
-        classement_evolution.append(classement_j[["Journee","Equipe","Rang"]])
-    if classement_evolution:
+    if "Toutes" in journees_res:
+        st.text("Pas d'évolution à afficher")
+    journees_evolution = [j for j in journees_res if j != "Toutes"]
+
+    def construire_evolution():
+        classement_evolution = []
+        for j in journees_evolution:
+            classement_j = classement_journee(tables, df_matchs, saison_sel, championnat_sel, j, pts_victoire)
+            classement_j["Journee"] = j
+            classement_evolution.append(classement_j[["Journee","Equipe","Rang"]])
         df_evolution = pd.concat(classement_evolution)
-        fig_evo = go.Figure()
-        for equipe in df_evolution["Equipe"].unique():
-            team_data = df_evolution[df_evolution["Equipe"] == equipe]
-            fig_evo.add_trace(go.Scatter(x=team_data["Journee"], y=team_data["Rang"], mode='lines+markers', name=equipe))
+        fig_evo = graphiques.figure_multi_series(df_evolution, "Journee", "Rang", "Equipe")
         fig_evo.update_layout(
             yaxis=dict(autorange="reversed", title="Rang"),
             xaxis=dict(title="Journée"),
@@ -357,34 +375,38 @@ def show(tables):
             font=dict(color="white"),
             legend=dict(orientation="h", y=-0.25)
         )
-        st.plotly_chart(fig_evo, use_container_width=True)
+        return fig_evo
+
+    # Classements journée par journée recalculés seulement si la figure n'est pas déjà en cache
+    if journees_evolution:
+        graphiques.afficher_figure(
+            graphiques.cle_figure("evolution_classement", saison_sel, championnat_sel, version=tables.version_saison(saison_sel)),
+            construire_evolution, use_container_width=True
+        )
             
     # ---------- 🌍 Statistiques globales ----------
-    all_matches = df[
-        df["competition"] == championnat_sel][["saison", "competition", "equipe_domicile_nom", "equipe_exterieure_nom", "score_domicile", "score_exterieur"]].sort_values(by="saison")
+    instrumentation.etape("rendu.stats_championnat")
+    all_matches = matchs_championnat(tables.selection("archives", competition=championnat_sel), championnat_sel)
 
     if all_matches.empty:
         st.info("ℹ️ Pas encore de données globales pour ce championnat.")
     else:
         df_all = pd.DataFrame(all_matches)
-        df_all.rename(columns={
+        df_all = df_all.rename(columns={
             "equipe_domicile": "equipe_domicile_nom",
             "equipe_exterieure": "equipe_exterieure_nom",
             "score_domicile_final": "score_domicile",
             "score_exterieur_final": "score_exterieur"
-        }, inplace=True)
+        })
 
-        champions = []
         saisons_all = df_all["saison"].unique()
-        for s in saisons_all:
-            df_saison = df_all[df_all["saison"] == s]
-            classement_s = calcul_classement(df_saison)
-            if not classement_s.empty:
-                champions.append(classement_s.iloc[0]["Equipe"])
+        champions_saisons = artefacts.champions(tables.version_saison(), championnat_sel, pts_victoire)
+        if champions_saisons is None:
+            champions_saisons = champions(df_all, pts_victoire)
 
-        if champions:
-            club_plus_titres = pd.Series(champions).value_counts().idxmax()
-            nb_titres = pd.Series(champions).value_counts().max()
+        if champions_saisons:
+            club_plus_titres = pd.Series(champions_saisons).value_counts().idxmax()
+            nb_titres = pd.Series(champions_saisons).value_counts().max()
         else:
             club_plus_titres, nb_titres = "—", 0
 
@@ -400,32 +422,6 @@ def show(tables):
         # --- Cartes KPI globales ---
         st.markdown("### 🏅 Palmarès global")
 
-        st.markdown("""
-        <style>
-        .kpi-card {
-            background: linear-gradient(135deg, #1E90FF, #0D47A1);
-            padding: 20px;
-            border-radius: 18px;
-            color: white;
-            text-align: center;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.2);
-            transition: 0.3s;
-        }
-        .kpi-card:hover {
-            transform: scale(1.03);
-        }
-        .kpi-value {
-            font-size: 26px;
-            font-weight: 700;
-            margin-top: 10px;
-        }
-        .kpi-label {
-            font-size: 16px;
-            opacity: 0.8;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-
         col1, col2 = st.columns(2)
         with col1:
             st.markdown(f"""
@@ -446,6 +442,7 @@ def show(tables):
             """, unsafe_allow_html=True)
 
     # ---------- 📆 Statistiques saisonnières ----------
+    instrumentation.etape("rendu.stats_saison")
     st.markdown("---")
 
     # ---------- Vérification des données ----------
@@ -463,7 +460,7 @@ def show(tables):
         total_buts = df_matchs["score_domicile"].sum() + df_matchs["score_exterieur"].sum()
 
         # Classement de la saison
-        stats_saison = calcul_classement(df_matchs)
+        stats_saison = classement_journee(tables, df_matchs, saison_sel, championnat_sel, None, pts_victoire)
 
         # Buts par journée
         if "journee" in df_matchs.columns and not df_matchs["journee"].isna().all():
@@ -496,35 +493,6 @@ def show(tables):
     # ---------- TITRE PRINCIPAL ----------
     st.markdown(f"### ⚽ Indicateurs de la saison **{saison_sel}**")
 
-    # ---------- STYLE KPI ----------
-    st.markdown("""
-    <style>
-    .kpi-card {
-        background: linear-gradient(135deg, #1E90FF, #0D47A1);
-        padding: 20px;
-        border-radius: 18px;
-        color: white;
-        text-align: center;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.2);
-        height: 200px;
-        transition: 0.3s;
-        margin-bottom: 12px;
-    }
-    .kpi-card:hover {
-        transform: scale(1.03);
-    }
-    .kpi-value {
-        font-size: 26px;
-    font-weight: 700;
-            margin-top: 10px;
-    }
-    .kpi-label {
-        font-size: 15px;
-        opacity: 0.85;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
     # ---------- LIGNE 1 ----------
     col1, col2, col3 = st.columns(3)
 
@@ -635,6 +603,7 @@ def show(tables):
     st.markdown("---")
             
         # ---------- ⚔️ Statistiques de jeu par équipe ---------- #
+    instrumentation.etape("rendu.stats_jeu")
     st.markdown(f"### ⚔️ Statistiques de jeu par équipe - {saison_sel}")
 
         # --- Agrégation des stats de jeu ---
@@ -685,7 +654,7 @@ def show(tables):
             "Cartons jaunes": "Jaunes",
             "Cartons rouges": "Rouges"
         }
-        df_stats_jeu.rename(columns=rename_map, inplace=True)
+        df_stats_jeu = df_stats_jeu.rename(columns=rename_map)
 
         # 🔄 Met à jour la liste après renommage
         renamed_cols = list(rename_map.values())
@@ -705,36 +674,20 @@ def show(tables):
             moyenne_row[f"{col} / match"] = round(moyenne[col] / df_stats_jeu["Matchs"].mean(), 2)
         df_stats_jeu = pd.concat([df_stats_jeu, moyenne_row], ignore_index=True)
 
-        # --- 💅 Style visuel amélioré ---
-        styled_df = df_stats_jeu.style
-
-        # Dégradés pour certaines colonnes
-        styled_df = (
-            styled_df
-            .background_gradient(subset=["Tirs totaux", "Tirs cadrés totaux"], cmap="Greens")
-            .background_gradient(subset=["Corners totaux"], cmap="Blues")
-            .background_gradient(subset=["Fautes totales"], cmap="Oranges")
-            .background_gradient(subset=["Jaunes"], cmap="YlOrBr")
-            .background_gradient(subset=["Rouges"], cmap="Reds")
-        )
-
+        # --- 💅 Style visuel : dégradés en barres, formats par colonne ---
         # Colonnes à 2 décimales : pourcentage et colonnes / match
         cols_2dec = [c for c in df_stats_jeu.columns if c.endswith("/ match") or c == "% tirs cadrés"]
 
         # Colonnes entières : toutes les autres colonnes numériques sauf celles à 2 décimales
         cols_int = [c for c in df_stats_jeu.select_dtypes(include=["number"]).columns if c not in cols_2dec]
 
-        # Formater les colonnes
-        styled_df = styled_df.format({
-            **{c: "{:.2f}" for c in cols_2dec},
-            **{c: "{:,.0f}" for c in cols_int}  # entier sans décimale
-        })
-
-        # Styles supplémentaires
-        styled_df = styled_df.set_table_styles([
-            {"selector": "thead th", "props": [("background-color", "#0D47A1"), ("color", "white"), ("font-weight", "bold")]},
-            {"selector": "tbody tr:hover", "props": [("background-color", "#e3f2fd !important")]}
-        ]).hide(axis="index")
+        config_stats = {
+            **{c: st.column_config.NumberColumn(format="%.2f") for c in cols_2dec},
+            **{c: st.column_config.NumberColumn(format="%d") for c in cols_int},  # entier sans décimale
+        }
+        for colonne, echelle in [("Tirs totaux", "Greens"), ("Tirs cadrés totaux", "Greens"), ("Corners totaux", "Blues"),
+                                 ("Fautes totales", "Oranges"), ("Jaunes", "YlOrBr"), ("Rouges", "Reds")]:
+            config_stats[colonne] = tableaux.barre(df_stats_jeu[colonne], echelle, "%d")
 
 
         # --- Affichage Streamlit ---
@@ -744,39 +697,14 @@ def show(tables):
         </div>
         """, unsafe_allow_html=True)
 
-        st.dataframe(styled_df, use_container_width=True, hide_index=True, height=620)
+        st.dataframe(df_stats_jeu, column_config=config_stats, use_container_width=True, hide_index=True, height=620)
 
         st.markdown("---")
 
     # ---------- 🏅 Meilleures équipes par catégorie ----------
+    instrumentation.etape("rendu.meilleures_equipes")
     st.markdown(f"#### 🏅 Meilleures équipes par catégorie – Saison {saison_sel}")
     
-    st.markdown("""
-        <style>
-        .kpi-card2 {
-            background: linear-gradient(135deg, #1E90FF, #0D47A1);
-            padding: 20px;
-            border-radius: 18px;
-            color: white;
-            text-align: center;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.2);
-            transition: 0.3s;
-        }
-        .kpi-card2:hover {
-            transform: scale(1.03);
-        }
-        .kpi-value2 {
-            font-size: 26px;
-            font-weight: 380;
-            margin-top: 20px;
-        }
-        .kpi-label2 {
-            font-size: 20px;
-            opacity: 0.8;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-
     def best(col, ascending=False):
         if col not in df_stats_jeu.columns:
             return "—", 0
@@ -853,6 +781,7 @@ def show(tables):
     st.markdown("---")
 
     # ---------- 🚨 Discipline globale sur la saison ----------
+    instrumentation.etape("rendu.discipline")
     st.markdown(f"#### 🚨 Discipline – Statistiques globales sur la saison – Saison {saison_sel}")
 
     total_cartons_jaunes = (
@@ -899,10 +828,11 @@ def show(tables):
     st.markdown("---")
 
     # ---------- 🏠 Classements domicile / extérieur ---------- #
+    instrumentation.etape("rendu.domicile_exterieur")
     st.markdown("### 🏠 Classements domicile / extérieur")
     
     # --- Filtrer sur la saison entière (et le championnat sélectionné) --- #
-    df_matchs_saison = df[(df['saison'] == saison_sel) & (df['competition'] == championnat_sel)].copy()
+    df_matchs_saison = donnees.types_calcul(df_selection)
 
     # Classement domicile
     df_dom = df_matchs_saison.copy()
@@ -917,7 +847,7 @@ def show(tables):
 
     def calcul_classement_domicile(df):
         classement = pd.DataFrame(index=df['Equipe'].unique(), columns=['Pts','J','V','N','D','BP','BC','Diff'])
-        classement.fillna(0, inplace=True)
+        classement = classement.fillna(0)
         
         for _, row in df.iterrows():
             equipe = row['Equipe']
@@ -938,8 +868,8 @@ def show(tables):
         
         classement['Diff'] = classement['BP'] - classement['BC']
         classement = classement.sort_values(by=['Pts','Diff','BP'], ascending=[False,False,False])
-        classement.reset_index(inplace=True)
-        classement.rename(columns={'index':'Equipe'}, inplace=True)
+        classement = classement.reset_index()
+        classement = classement.rename(columns={'index':'Equipe'})
         classement.insert(0, 'Rang', range(1, len(classement)+1))
         return classement
 
@@ -957,7 +887,7 @@ def show(tables):
 
     def calcul_classement_exterieur(df):
         classement = pd.DataFrame(index=df['Equipe'].unique(), columns=['Pts','J','V','N','D','BP','BC','Diff'])
-        classement.fillna(0, inplace=True)
+        classement = classement.fillna(0)
         
         for _, row in df.iterrows():
             equipe = row['Equipe']
@@ -978,8 +908,8 @@ def show(tables):
         
         classement['Diff'] = classement['BP'] - classement['BC']
         classement = classement.sort_values(by=['Pts','Diff','BP'], ascending=[False,False,False])
-        classement.reset_index(inplace=True)
-        classement.rename(columns={'index':'Equipe'}, inplace=True)
+        classement = classement.reset_index()
+        classement = classement.rename(columns={'index':'Equipe'})
         classement.insert(0, 'Rang', range(1, len(classement)+1))
         return classement
 
@@ -989,22 +919,27 @@ def show(tables):
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("#### 🏡 Domicile")
+        df_classement, config = style_table(classement_dom)
         st.dataframe(
-            style_table(classement_dom),
+            df_classement,
+            column_config=config,
             use_container_width=True,
             hide_index=True,
             height=35 * len(classement_dom)
         )
     with col2:
         st.markdown("#### 🚗 Extérieur")
+        df_classement, config = style_table(classement_ext)
         st.dataframe(
-            style_table(classement_ext),
+            df_classement,
+            column_config=config,
             use_container_width=True,
             hide_index=True,
             height=35 * len(classement_ext)
         )
 
     # --- Statistiques globales sur la saison --- #
+    instrumentation.etape("rendu.bilan_saison")
     st.markdown(f"#### 📊 Statistiques de la saison {saison_sel}")
 
     meilleure_dom = classement_dom.iloc[0]["Equipe"]
@@ -1018,7 +953,7 @@ def show(tables):
     pts_ext_min = classement_ext.iloc[-1]["Pts"]
 
     # Calcul du classement général sur la saison complète
-    classement_saison = calcul_classement(df_matchs_saison)
+    classement_saison = classement_journee(tables, df_matchs_saison, saison_sel, championnat_sel, None, pts_victoire)
 
     meilleure_attaque = classement_saison.loc[classement_saison['BP'].idxmax()]['Equipe']
     bp_max = classement_saison['BP'].max()
@@ -1057,6 +992,7 @@ def show(tables):
     st.markdown("---")
 
     # ---------- ⚔️ Confrontations entre deux clubs ---------- #
+    instrumentation.etape("rendu.confrontations")
     st.markdown(f"### ⚔️ Confrontations entre deux clubs – Saison {saison_sel}")
 
     # Filtrer les matchs pour la saison sélectionnée
@@ -1099,25 +1035,23 @@ def show(tables):
             col1, col2 = st.columns([2,1])
             with col1 :
                 st.dataframe(
-                    df_display.style.set_properties(**{
-                        'text-align': 'center',
-                        'font-size': '14px',
-                        'white-space': 'nowrap',
-                    }).set_table_styles([
-                        {"selector": "thead th", "props": [("background-color", "#0D47A1"), ("color", "white"), ("font-weight", "bold")]},
-                        {"selector": "tbody tr:hover", "props": [("background-color", "#e3f2fd !important")]}
-                    ]),
+                    df_display,
+                    column_config=tableaux.centrer(df_display),
                     use_container_width=True,
                     height=500,
                     hide_index=True
                 )
 
-            # Statistiques globales sur toutes les saisons
-            victoires_club1 = ((df_confrontations["equipe_domicile_nom"] == club1) & (df_confrontations["score_domicile"] > df_confrontations["score_exterieur"])).sum() + \
-                                ((df_confrontations["equipe_exterieure_nom"] == club1) & (df_confrontations["score_exterieur"] > df_confrontations["score_domicile"])).sum()
-            victoires_club2 = ((df_confrontations["equipe_domicile_nom"] == club2) & (df_confrontations["score_domicile"] > df_confrontations["score_exterieur"])).sum() + \
-                                ((df_confrontations["equipe_exterieure_nom"] == club2) & (df_confrontations["score_exterieur"] > df_confrontations["score_domicile"])).sum()
-            nuls = (df_confrontations["score_domicile"] == df_confrontations["score_exterieur"]).sum()
+            # Statistiques globales sur toutes les saisons (agrégées par le stockage SQL quand il les calcule)
+            bilan = tables.confrontations("archives", club1, club2, competition=championnat_sel)
+            if bilan is not None:
+                victoires_club1, nuls, victoires_club2 = bilan
+            else:
+                victoires_club1 = ((df_confrontations["equipe_domicile_nom"] == club1) & (df_confrontations["score_domicile"] > df_confrontations["score_exterieur"])).sum() + \
+                                    ((df_confrontations["equipe_exterieure_nom"] == club1) & (df_confrontations["score_exterieur"] > df_confrontations["score_domicile"])).sum()
+                victoires_club2 = ((df_confrontations["equipe_domicile_nom"] == club2) & (df_confrontations["score_domicile"] > df_confrontations["score_exterieur"])).sum() + \
+                                    ((df_confrontations["equipe_exterieure_nom"] == club2) & (df_confrontations["score_exterieur"] > df_confrontations["score_domicile"])).sum()
+                nuls = (df_confrontations["score_domicile"] == df_confrontations["score_exterieur"]).sum()
 
             with col2:
                 # Styles individuels pour chaque KPI
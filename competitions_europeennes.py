@@ -1,8 +1,18 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from graphviz import Digraph
 import unicodedata
+import artefacts
+import donnees
+import instrumentation
+import moteur
+import tableaux
+
+# Compétitions affichées par la page
+COMPETITIONS_EUROPE = ['Ligue des Champions', 'Europa League', 'Ligue Conference', 'Ligue Europa']
+PHASES_ELIMINATION = ["Seizièmes", "Huitièmes", "Quarts", "Demies", "Finale"]
+COLONNES_MATCH = ["Domicile", "Score", "Extérieur"]
+
 
 def normalize_str(s):
     """Supprime accents, met en minuscule et retire espaces."""
@@ -124,21 +134,318 @@ def draw_bracket(df_phase):
     )
     st.plotly_chart(fig, use_container_width=True)
 
-def show(tables):
-    st.title("🏆 Compétitions Européennes")
-    
-    # Lire le CSV complet des matchs
-    df = tables["all_matchs_football"]  # chemin vers ton CSV
+# ---------------- Classements de groupe ---------------- #
+def classement_groupe(df_groupe):
+    """Classement (Rang, Equipe, Pts, J, V, N, D, BP, BC, Diff) d'un groupe.
+
+    Version ligne à ligne, référence de moteur.classement (utilisé par la page).
+    """
+    equipes = pd.unique(df_groupe[['equipe_domicile_nom','equipe_exterieure_nom']].values.ravel('K'))
+    classement = pd.DataFrame(index=equipes, columns=['Pts','J','V','N','D','BP','BC','Diff'])
+    classement = classement.fillna(0)
+
+    for _, match in df_groupe.iterrows():
+        dom = match['equipe_domicile_nom']
+        ext = match['equipe_exterieure_nom']
+        score_dom = match['score_domicile']
+        score_ext = match['score_exterieur']
+        if pd.isna(score_dom) or pd.isna(score_ext):
+            continue
+        # Matches joués
+        classement.at[dom,'J'] += 1
+        classement.at[ext,'J'] += 1
+        # Buts
+        classement.at[dom,'BP'] += score_dom
+        classement.at[dom,'BC'] += score_ext
+        classement.at[ext,'BP'] += score_ext
+        classement.at[ext,'BC'] += score_dom
+        # Résultats
+        if score_dom > score_ext:
+            classement.at[dom,'V'] += 1
+            classement.at[dom,'Pts'] += 3
+            classement.at[ext,'D'] += 1
+        elif score_dom < score_ext:
+            classement.at[ext,'V'] += 1
+            classement.at[ext,'Pts'] += 3
+            classement.at[dom,'D'] += 1
+        else:
+            classement.at[dom,'N'] += 1
+            classement.at[ext,'N'] += 1
+            classement.at[dom,'Pts'] += 1
+            classement.at[ext,'Pts'] += 1
+        # Différence de buts
+        classement.at[dom,'Diff'] = classement.at[dom,'BP'] - classement.at[dom,'BC']
+        classement.at[ext,'Diff'] = classement.at[ext,'BP'] - classement.at[ext,'BC']
+
+    # Trier le classement
+    classement = classement.sort_values(by=['Pts','Diff','BP'], ascending=[False,False,False])
+    classement = classement.reset_index()
+    classement = classement.rename(columns={'index':'Equipe'})
+    classement.insert(0, 'Rang', range(1, len(classement)+1))
+    return classement
+
+
+def matrice_confrontations(df_groupe):
+    """Scores « d-e » (aller / retour) de chaque équipe en ligne contre chaque équipe en colonne.
+
+    Version ligne à ligne, référence de moteur.matrice_confrontations (utilisé par la page).
+    """
+    equipes = pd.unique(df_groupe[['equipe_domicile_nom','equipe_exterieure_nom']].values.ravel('K'))
+    matrice = pd.DataFrame(index=equipes, columns=equipes)
+
+    for _, match in df_groupe.iterrows():
+        dom = match['equipe_domicile_nom']
+        ext = match['equipe_exterieure_nom']
+        score_dom = match['score_domicile']
+        score_ext = match['score_exterieur']
+
+        if pd.isna(score_dom) or pd.isna(score_ext):
+            matrice.at[dom, ext] = ''
+            matrice.at[ext, dom] = ''
+        else:
+            # 🔹 Conversion en entier
+            score_dom = int(score_dom)
+            score_ext = int(score_ext)
+
+            # Initialiser si vide
+            if matrice.at[dom, ext] is None or matrice.at[dom, ext] == '' or pd.isna(matrice.at[dom, ext]):
+                matrice.at[dom, ext] = f"{score_dom}-{score_ext}"
+                matrice.at[ext, dom] = f"{score_ext}-{score_dom}"
+            else:
+                matrice.at[dom, ext] += f" / {score_dom}-{score_ext}"
+                matrice.at[ext, dom] += f" / {score_ext}-{score_dom}"
+
+    return matrice
+
+
+def classements_par_journee(df_groupe):
+    """Classement cumulé de la phase de ligue après chaque journée, avec l'évolution des rangs.
+
+    Renvoie les journées triées et un tableau long (une ligne par équipe et par journée).
+    Version ligne à ligne, référence de moteur.classements_par_journee (utilisé par la page).
+    """
+    journees = sorted(df_groupe['journee'].dropna().unique())
+
+    # DataFrame pour stocker le classement cumulatif par journée
+    classement_par_journee = pd.DataFrame()
+    rang_precedent = {}
+
+    for j in journees:
+        df_j = df_groupe[df_groupe['journee'] <= j].copy()
+        equipes = pd.unique(df_j[['equipe_domicile_nom','equipe_exterieure_nom']].values.ravel('K'))
+        classement = pd.DataFrame(index=equipes, columns=['Pts','J','V','N','D','BP','BC','Diff'])
+        classement = classement.fillna(0)
+
+        # Calcul des stats cumulées jusqu'à la journée j
+        for _, match in df_j.iterrows():
+            dom = match['equipe_domicile_nom']
+            ext = match['equipe_exterieure_nom']
+            score_dom = match['score_domicile']
+            score_ext = match['score_exterieur']
+            if pd.isna(score_dom) or pd.isna(score_ext):
+                continue
+
+            classement.at[dom,'J'] += 1
+            classement.at[ext,'J'] += 1
+            classement.at[dom,'BP'] += score_dom
+            classement.at[dom,'BC'] += score_ext
+            classement.at[ext,'BP'] += score_ext
+            classement.at[ext,'BC'] += score_dom
+
+            if score_dom > score_ext:
+                classement.at[dom,'V'] += 1
+                classement.at[dom,'Pts'] += 3
+                classement.at[ext,'D'] += 1
+            elif score_dom < score_ext:
+                classement.at[ext,'V'] += 1
+                classement.at[ext,'Pts'] += 3
+                classement.at[dom,'D'] += 1
+            else:
+                classement.at[dom,'N'] += 1
+                classement.at[ext,'N'] += 1
+                classement.at[dom,'Pts'] += 1
+                classement.at[ext,'Pts'] += 1
+
+            classement.at[dom,'Diff'] = classement.at[dom,'BP'] - classement.at[dom,'BC']
+            classement.at[ext,'Diff'] = classement.at[ext,'BP'] - classement.at[ext,'BC']
+
+        classement = classement.sort_values(by=['Pts','Diff','BP'], ascending=[False,False,False])
+        classement = classement.reset_index()
+        classement = classement.rename(columns={'index':'Equipe'})
+        classement.insert(0, 'Rang', range(1, len(classement)+1))
+
+        # Calcul de l'évolution avec nombre de places
+        evolution = []
+        for _, row in classement.iterrows():
+            equipe = row['Equipe']
+            rang_actuel = row['Rang']
+            if equipe in rang_precedent:
+                diff = rang_precedent[equipe] - rang_actuel
+                if diff > 0:
+                    evolution.append(f'▲{diff}')
+                elif diff < 0:
+                    evolution.append(f'▼{abs(diff)}')
+                else:
+                    evolution.append('—')
+            else:
+                evolution.append('—')  # première journée
+            rang_precedent[equipe] = rang_actuel
+        classement['Évolution'] = evolution
+
+        classement['Journée'] = j
+        classement_par_journee = pd.concat([classement_par_journee, classement], ignore_index=True)
+    return journees, classement_par_journee
+
+
+# ---------------- Élimination directe ---------------- #
+def preparer_elimination(df):
+    """Aller / retour normalisés et clé `match_pair` commune aux deux matchs d'une confrontation."""
+    # Normaliser aller/retour
+    aller_retour = df['aller_retour'].astype(str).str.strip().str.capitalize()
+    # Créer une clé pour associer Aller et Retour
+    match_pair = df.apply(lambda x: '-'.join(sorted([x['equipe_domicile_nom'], x['equipe_exterieure_nom']])), axis=1)
+    return df.assign(aller_retour=aller_retour, match_pair=match_pair)
+
+
+def tour_aller_retour(df_phase):
+    """Matchs aller, matchs retour (lignes Domicile / Score / Extérieur) et qualifiés d'un tour."""
+    rows_aller, rows_retour, qualifiés = [], [], []
+
+    for match_pair, g in df_phase.groupby('match_pair'):
+        df_aller = g[g['aller_retour'] == "Aller"]
+        df_retour = g[g['aller_retour'] == "Retour"]
+
+        if df_aller.empty or df_retour.empty:
+            continue
+
+        match_aller = df_aller.iloc[0]
+        match_retour = df_retour.iloc[0]
+
+        dom = match_aller['equipe_domicile_nom']
+        ext = match_aller['equipe_exterieure_nom']
+
+        # ---- SCORE ALLER ----
+        score_aller = f"{int(match_aller['score_domicile'])}-{int(match_aller['score_exterieur'])}"
+        if 'prolongation_score_domicile' in match_aller and pd.notna(match_aller['prolongation_score_domicile']):
+            score_aller += f" (Prol: {int(match_aller['prolongation_score_domicile'])}-{int(match_aller['prolongation_score_exterieur'])})"
+        if 'tab_score_domicile' in match_aller and pd.notna(match_aller['tab_score_domicile']):
+            score_aller += f" (TAB: {int(match_aller['tab_score_domicile'])}-{int(match_aller['tab_score_exterieur'])})"
+
+        # ---- SCORE RETOUR ----
+        score_retour = f"{int(match_retour['score_domicile'])}-{int(match_retour['score_exterieur'])}"
+        if 'prolongation_score_domicile' in match_retour and pd.notna(match_retour['prolongation_score_domicile']):
+            score_retour += f" (Prol: {int(match_retour['prolongation_score_domicile'])}-{int(match_retour['prolongation_score_exterieur'])})"
+        if 'tab_score_domicile' in match_retour and pd.notna(match_retour['tab_score_domicile']):
+            score_retour += f" (TAB: {int(match_retour['tab_score_domicile'])}-{int(match_retour['tab_score_exterieur'])})"
+
+        # Ajouter aux tableaux
+        rows_aller.append({"Domicile": dom, "Score": score_aller, "Extérieur": ext})
+        rows_retour.append({
+            "Domicile": match_retour['equipe_domicile_nom'],
+            "Score": score_retour,
+            "Extérieur": match_retour['equipe_exterieure_nom']
+        })
+
+        # ---- Calcul du vainqueur cumulatif ----
+        total_dom = match_aller['score_domicile'] + match_retour['score_exterieur']
+        total_ext = match_aller['score_exterieur'] + match_retour['score_domicile']
+
+        if 'prolongation_score_domicile' in df_aller.columns:
+            total_dom += match_aller.get('prolongation_score_domicile', 0) + match_retour.get('prolongation_score_exterieur', 0)
+            total_ext += match_aller.get('prolongation_score_exterieur', 0) + match_retour.get('prolongation_score_domicile', 0)
+
+        if total_dom > total_ext:
+            qualifiés.append(dom)
+        elif total_ext > total_dom:
+            qualifiés.append(ext)
+        else:
+            if 'tab_score_domicile' in df_aller.columns and pd.notna(match_aller.get('tab_score_domicile', None)):
+                tab_dom = match_aller.get('tab_score_domicile', 0) + match_retour.get('tab_score_exterieur', 0)
+                tab_ext = match_aller.get('tab_score_exterieur', 0) + match_retour.get('tab_score_domicile', 0)
+                qualifiés.append(dom if tab_dom > tab_ext else ext)
+            else:
+                qualifiés.append(dom)
+
+    return rows_aller, rows_retour, qualifiés
+
+
+def finale(df_phase):
+    """Ligne Domicile / Score / Extérieur de la finale et son vainqueur."""
+    match_finale = df_phase.iloc[0]
+    dom = match_finale['equipe_domicile_nom']
+    ext = match_finale['equipe_exterieure_nom']
+
+    total_dom = match_finale['score_domicile']
+    total_ext = match_finale['score_exterieur']
+
+    if pd.notna(match_finale.get('prolongation_score_domicile', None)):
+        total_dom += match_finale['prolongation_score_domicile']
+        total_ext += match_finale['prolongation_score_exterieur']
+
+    if total_dom > total_ext:
+        vainqueur = dom
+    elif total_ext > total_dom:
+        vainqueur = ext
+    else:
+        if pd.notna(match_finale.get('tab_score_domicile', None)):
+            tab_dom = match_finale['tab_score_domicile']
+            tab_ext = match_finale['tab_score_exterieur']
+            vainqueur = dom if tab_dom > tab_ext else ext
+        else:
+            vainqueur = dom
+
+    score = f"{int(match_finale['score_domicile'])}-{int(match_finale['score_exterieur'])}"
+    if 'prolongation_score_domicile' in match_finale and pd.notna(match_finale['prolongation_score_domicile']):
+        score += f" (Prol: {int(match_finale['prolongation_score_domicile'])}-{int(match_finale['prolongation_score_exterieur'])})"
+    if 'tab_score_domicile' in match_finale and pd.notna(match_finale['tab_score_domicile']):
+        score += f" (TAB: {int(match_finale['tab_score_domicile'])}-{int(match_finale['tab_score_exterieur'])})"
+
+    return {"Domicile": dom, "Score": score, "Extérieur": ext}, vainqueur
 
-    # Définir les compétitions européennes d'intérêt
-    competitions_europe = ['Ligue des Champions', 'Europa League', 'Ligue Conference', 'Ligue Europa']
 
-    # Filtrer le DataFrame pour ne garder que ces compétitions
-    df_europe = df[df['competition'].isin(competitions_europe)]
+def tableau_phase(df_phase, phase):
+    """Tableau d'une phase : une ligne par match (manche Aller, Retour ou Finale), qualifié sur la ligne aller.
 
+    Forme stockée par les précalculs ; la page en relit les lignes avec lignes_phase.
+    """
+    if phase == "Finale":
+        ligne_finale, vainqueur = finale(df_phase)
+        return pd.DataFrame([{"manche": "Finale", **ligne_finale, "Vainqueur": vainqueur}])
+
+    rows_aller, rows_retour, qualifiés = tour_aller_retour(df_phase)
+    aller = pd.DataFrame(rows_aller, columns=COLONNES_MATCH).assign(manche="Aller", Vainqueur=qualifiés)
+    retour = pd.DataFrame(rows_retour, columns=COLONNES_MATCH).assign(manche="Retour", Vainqueur=None)
+    return pd.concat([aller, retour], ignore_index=True)[["manche"] + COLONNES_MATCH + ["Vainqueur"]]
+
+
+def lignes_phase(tableau, manche):
+    """Lignes Domicile / Score / Extérieur d'une manche du tableau et vainqueurs correspondants."""
+    matchs = tableau[tableau["manche"] == manche]
+    return matchs[COLONNES_MATCH].to_dict("records"), matchs["Vainqueur"].tolist()
+
+
+def phase_de_ligue(saison):
+    """Format à phase de ligue unique (à partir de 2024-2025)."""
+    return int(saison.split("-")[0]) >= 2024
+
+
+def matchs_phase_ligue(df):
+    """Matchs de la phase de ligue, ou tous les matchs de la compétition si la phase n'est pas renseignée."""
+    df_groupe = df[df['phase'].str.contains("Ligue", case=False, na=False)].copy()
+    if df_groupe.empty:
+        df_groupe = df.copy()
+    return df_groupe
+
+
+def show(tables):
+    st.title("🏆 Compétitions Européennes")
     
-    # --- Sélection des saisons disponibles uniquement pour ces compétitions ---
-    saisons = sorted(df_europe['saison'].dropna().unique(), reverse=True)
+    # Sélecteurs et matchs lus par requêtes filtrées (stockage des tables)
+    instrumentation.etape("chargement.tables")
+
+    # --- Sélection des saisons disponibles uniquement pour les compétitions européennes ---
+    instrumentation.etape("calcul.filtrage")
+    saisons = sorted(tables.valeurs("all_matchs_football", "saison", competition=COMPETITIONS_EUROPE), reverse=True)
     if len(saisons) == 0:
         st.warning("Aucune saison disponible pour les compétitions européennes.")
         return
@@ -148,12 +455,10 @@ def show(tables):
         # Sélecteur de saison
         saison_sel = st.selectbox("Sélectionner une saison :", saisons)
 
-        # --- Filtrer le DataFrame pour la saison choisie ---
-        df_saison = df_europe[df_europe['saison'] == saison_sel]
-
     with col2:
         # Sélection des compétitions disponibles pour cette saison
-        competitions = sorted(df_saison['competition'].dropna().unique())
+        competitions = sorted(tables.valeurs("all_matchs_football", "competition",
+                                             saison=saison_sel, competition=COMPETITIONS_EUROPE))
         if len(competitions) == 0:
             st.warning("Aucune compétition européenne disponible pour cette saison.")
             return
@@ -163,7 +468,9 @@ def show(tables):
         competition_sel = st.selectbox("Sélectionner une compétition :", competitions, index=default_index)
 
         # --- Filtrer le DataFrame final pour la compétition choisie ---
-        df = df_saison[df_saison['competition'] == competition_sel]
+        df = donnees.types_calcul(
+            tables.selection("all_matchs_football", saison=saison_sel, competition=competition_sel)
+        )
         if df.empty:
             st.info("Aucun match enregistré pour cette compétition et cette saison.")
             return
@@ -172,93 +479,21 @@ def show(tables):
     tabs = st.tabs(["Groupes", "Élimination directe"])
 
     # --- Onglet Groupes ---
+    instrumentation.etape("rendu.groupes")
     with tabs[0]:
         groupes = df['groupe'].dropna().unique()
         
-        if int(saison_sel.split("-")[0]) >= 2024:
+        if phase_de_ligue(saison_sel):
             st.subheader("Phase de Ligue unique")
 
             # Filtrer les matchs pour la phase "Ligue" ou prendre tous si pas défini
-            df_groupe = df[df['phase'].str.contains("Ligue", case=False, na=False)].copy()
-            if df_groupe.empty:
-                df_groupe = df.copy()
-
-            # --- Calcul du classement général ---
-            equipes = pd.unique(df_groupe[['equipe_domicile_nom','equipe_exterieure_nom']].values.ravel('K'))
-            classement = pd.DataFrame(index=equipes, columns=['Pts','J','V','N','D','BP','BC','Diff'])
-            classement.fillna(0, inplace=True)
-
-            # --- Calcul du classement évolutif par journée ---
-            journees = sorted(df_groupe['journee'].dropna().unique())
-
-            # DataFrame pour stocker le classement cumulatif par journée
-            classement_par_journee = pd.DataFrame()
-            rang_precedent = {}
-
-            for j in journees:
-                df_j = df_groupe[df_groupe['journee'] <= j].copy()
-                equipes = pd.unique(df_j[['equipe_domicile_nom','equipe_exterieure_nom']].values.ravel('K'))
-                classement = pd.DataFrame(index=equipes, columns=['Pts','J','V','N','D','BP','BC','Diff'])
-                classement.fillna(0, inplace=True)
-
-                # Calcul des stats cumulées jusqu'à la journée j
-                for _, match in df_j.iterrows():
-                    dom = match['equipe_domicile_nom']
-                    ext = match['equipe_exterieure_nom']
-                    score_dom = match['score_domicile']
-                    score_ext = match['score_exterieur']
-                    if pd.isna(score_dom) or pd.isna(score_ext):
-                        continue
-
-                    classement.at[dom,'J'] += 1
-                    classement.at[ext,'J'] += 1
-                    classement.at[dom,'BP'] += score_dom
-                    classement.at[dom,'BC'] += score_ext
-                    classement.at[ext,'BP'] += score_ext
-                    classement.at[ext,'BC'] += score_dom
-
-                    if score_dom > score_ext:
-                        classement.at[dom,'V'] += 1
-                        classement.at[dom,'Pts'] += 3
-                        classement.at[ext,'D'] += 1
-                    elif score_dom < score_ext:
-                        classement.at[ext,'V'] += 1
-                        classement.at[ext,'Pts'] += 3
-                        classement.at[dom,'D'] += 1
-                    else:
-                        classement.at[dom,'N'] += 1
-                        classement.at[ext,'N'] += 1
-                        classement.at[dom,'Pts'] += 1
-                        classement.at[ext,'Pts'] += 1
-
-                    classement.at[dom,'Diff'] = classement.at[dom,'BP'] - classement.at[dom,'BC']
-                    classement.at[ext,'Diff'] = classement.at[ext,'BP'] - classement.at[ext,'BC']
-
-                classement = classement.sort_values(by=['Pts','Diff','BP'], ascending=[False,False,False])
-                classement.reset_index(inplace=True)
-                classement.rename(columns={'index':'Equipe'}, inplace=True)
-                classement.insert(0, 'Rang', range(1, len(classement)+1))
-
-                # Calcul de l'évolution avec nombre de places
-                evolution = []
-                for _, row in classement.iterrows():
-                    equipe = row['Equipe']
-                    rang_actuel = row['Rang']
-                    if equipe in rang_precedent:
-                        diff = rang_precedent[equipe] - rang_actuel
-                        if diff > 0:
-                            evolution.append(f'▲{diff}')
-                        elif diff < 0:
-                            evolution.append(f'▼{abs(diff)}')
-                        else:
-                            evolution.append('—')
-                    else:
-                        evolution.append('—')  # première journée
-                    rang_precedent[equipe] = rang_actuel
-                classement['Évolution'] = evolution
-
-                classement['Journée'] = j
-                classement_par_journee = pd.concat([classement_par_journee, classement], ignore_index=True)
+            df_groupe = matchs_phase_ligue(df)
+
+            # --- Classement cumulé et évolution, journée par journée (précalculés si disponibles) ---
+            phase_ligue = artefacts.phase_ligue(tables.version_saison(saison_sel), saison_sel, competition_sel)
+            if phase_ligue is None:
+                phase_ligue = moteur.classements_par_journee(df_groupe)
+            journees, classement_par_journee = phase_ligue
 
             # --- Sélecteur de journée ---
             journee_sel = st.selectbox("Sélectionner une journée :", journees, index=len(journees)-1)
@@ -270,28 +505,19 @@ def show(tables):
 
             with col1:
                 st.markdown(f"**Classement – Journée {journee_sel}**")
-                styled_classement = (
-                    df_classement_sel[['Rang','Évolution','Equipe','Pts','J','V','N','D','BP','BC','Diff']]
-                    .style
-                    .format({'Pts':'{:.0f}', 'Diff':'{:+d}'})
-                    .background_gradient(subset=['Pts'], cmap='Greens')
-                    .background_gradient(subset=['Diff'], cmap='RdYlGn')
-                    .applymap(
-                        lambda v: 'color: green;' if isinstance(v, str) and v.startswith('▲') 
-                                else ('color: red;' if isinstance(v, str) and v.startswith('▼') else ''),
-                        subset=['Évolution']
-                    )
-                    .set_properties(**{
-                        'text-align': 'center',
-                        'justify-content': 'center',
-                        'white-space': 'nowrap',
-                        'font-size': '14px',
-                        'padding': '4px 8px'
-                    })
-                    .set_properties(subset=['Equipe'], **{'text-align': 'left', 'font-weight':'bold'})
-                )
+                df_classement_aff = df_classement_sel[['Rang','Évolution','Equipe','Pts','J','V','N','D','BP','BC','Diff']]
+                # Montées en vert, descentes en rouge : pastille devant l'évolution
+                evolution = df_classement_aff['Évolution'].astype(str)
+                df_classement_aff = df_classement_aff.assign(Évolution=tableaux.pastilles(
+                    evolution, [evolution.str.startswith('▲'), evolution.str.startswith('▼')],
+                    [tableaux.VERT, tableaux.ROUGE]
+                ))
 
-                st.dataframe(styled_classement, use_container_width=True, height=36*len(df_classement_sel), hide_index=True)
+                st.dataframe(
+                    df_classement_aff,
+                    column_config=tableaux.config_classement(df_classement_aff),
+                    use_container_width=True, height=36*len(df_classement_sel), hide_index=True
+                )
 
             with col2:
                 st.markdown(f"**Résultats – Journée {journee_sel}**")
@@ -303,38 +529,20 @@ def show(tables):
                                     (str(int(row['score_exterieur'])) if pd.notna(row['score_exterieur']) else '-'),
                         axis=1
                     )
-                    df_resultats.rename(columns={
+                    df_resultats = df_resultats.rename(columns={
                         'equipe_domicile_nom': 'Domicile',
                         'equipe_exterieure_nom': 'Extérieur'
-                    }, inplace=True)
+                    })
                     df_resultats = df_resultats[['Domicile','Score','Extérieur']]
 
-                    # Coloration et centrage
-                    def color_score_row(row):
-                        try:
-                            d, e = row['Score'].split('-')
-                            d = int(d) if d != '-' else None
-                            e = int(e) if e != '-' else None
-                        except:
-                            d, e = None, None
-                        styles = []
-                        styles.append('background-color: #089173FF; font-weight: bold;' if d is not None and e is not None and d > e else '')
-                        styles.append('text-align: center; font-weight: bold;' if d is not None and e is not None else 'text-align: center;')
-                        styles.append('background-color: #089173FF; font-weight: bold;' if d is not None and e is not None and e > d else '')
-                        return styles
-
-                    styled_resultats = (
-                        df_resultats.style
-                        .apply(color_score_row, axis=1)
-                        .set_properties(**{
-                            'text-align': 'center',
-                            'justify-content': 'center',
-                            'white-space': 'nowrap',
-                            'font-size': '13px',
-                            'padding': '4px 6px'
-                        })
+                    # Vainqueur en vert : pastille devant son nom
+                    dom, ext = tableaux.scores(df_resultats['Score'])
+                    df_resultats = df_resultats.assign(
+                        Domicile=tableaux.pastilles(df_resultats['Domicile'], [dom > ext], [tableaux.VERT]),
+                        Extérieur=tableaux.pastilles(df_resultats['Extérieur'], [ext > dom], [tableaux.VERT]),
                     )
-                    st.dataframe(styled_resultats, use_container_width=True, height=37*len(df_resultats), hide_index=True)
+                    st.dataframe(df_resultats, column_config=tableaux.centrer(df_resultats),
+                                 use_container_width=True, height=37*len(df_resultats), hide_index=True)
                 else:
                     st.info("Aucun match enregistré pour cette journée.")
 
@@ -342,112 +550,32 @@ def show(tables):
             st.subheader(f"Groupe {g}")
             df_groupe = df[df['groupe']==g].copy()
 
-            # Calculer le classement du groupe
-            equipes = pd.unique(df_groupe[['equipe_domicile_nom','equipe_exterieure_nom']].values.ravel('K'))
-            classement = pd.DataFrame(index=equipes, columns=['Pts','J','V','N','D','BP','BC','Diff'])
-            classement.fillna(0, inplace=True)
-
-            for _, match in df_groupe.iterrows():
-                dom = match['equipe_domicile_nom']
-                ext = match['equipe_exterieure_nom']
-                score_dom = match['score_domicile']
-                score_ext = match['score_exterieur']
-                if pd.isna(score_dom) or pd.isna(score_ext):
-                    continue
-                # Matches joués
-                classement.at[dom,'J'] += 1
-                classement.at[ext,'J'] += 1
-                # Buts
-                classement.at[dom,'BP'] += score_dom
-                classement.at[dom,'BC'] += score_ext
-                classement.at[ext,'BP'] += score_ext
-                classement.at[ext,'BC'] += score_dom
-                # Résultats
-                if score_dom > score_ext:
-                    classement.at[dom,'V'] += 1
-                    classement.at[dom,'Pts'] += 3
-                    classement.at[ext,'D'] += 1
-                elif score_dom < score_ext:
-                    classement.at[ext,'V'] += 1
-                    classement.at[ext,'Pts'] += 3
-                    classement.at[dom,'D'] += 1
-                else:
-                    classement.at[dom,'N'] += 1
-                    classement.at[ext,'N'] += 1
-                    classement.at[dom,'Pts'] += 1
-                    classement.at[ext,'Pts'] += 1
-                # Différence de buts
-                classement.at[dom,'Diff'] = classement.at[dom,'BP'] - classement.at[dom,'BC']
-                classement.at[ext,'Diff'] = classement.at[ext,'BP'] - classement.at[ext,'BC']
-
-            # Trier le classement
-            classement = classement.sort_values(by=['Pts','Diff','BP'], ascending=[False,False,False])
-            classement.reset_index(inplace=True)
-            classement.rename(columns={'index':'Equipe'}, inplace=True)
-            classement.insert(0, 'Rang', range(1, len(classement)+1))
-
-            # Construire la matrice des matchs complète avec aller-retour
-            matrice = pd.DataFrame(index=equipes, columns=equipes)
-
-            for _, match in df_groupe.iterrows():
-                dom = match['equipe_domicile_nom']
-                ext = match['equipe_exterieure_nom']
-                score_dom = match['score_domicile']
-                score_ext = match['score_exterieur']
-
-                if pd.isna(score_dom) or pd.isna(score_ext):
-                    matrice.at[dom, ext] = ''
-                    matrice.at[ext, dom] = ''
-                else:
-                    # 🔹 Conversion en entier
-                    score_dom = int(score_dom)
-                    score_ext = int(score_ext)
-
-                    # Initialiser si vide
-                    if matrice.at[dom, ext] is None or matrice.at[dom, ext] == '' or pd.isna(matrice.at[dom, ext]):
-                        matrice.at[dom, ext] = f"{score_dom}-{score_ext}"
-                        matrice.at[ext, dom] = f"{score_ext}-{score_dom}"
-                    else:
-                        matrice.at[dom, ext] += f" / {score_dom}-{score_ext}"
-                        matrice.at[ext, dom] += f" / {score_ext}-{score_dom}"
-
-
-            # Fonction de coloration
-            def color_match(val):
-                if val == '':
-                    return ''
-                try:
-                    dom, ext = map(int, val.split('-'))
-                    if dom > ext:
-                        return 'background-color: #A8ABD5FF;'  # vert
-                    elif dom < ext:
-                        return 'background-color: #f7a8a8;'  # rouge
-                    else:
-                        return 'background-color: #f9f49c;'  # jaune
-                except:
-                    return ''
+            # Classement du groupe et matrice des confrontations
+            classement = artefacts.classement_groupe(tables.version_saison(saison_sel), saison_sel, competition_sel, g)
+            if classement is None:
+                classement = moteur.classement(df_groupe)
+            matrice = moteur.matrice_confrontations(df_groupe)
+            equipes = matrice.index
+
+            # Confrontations : victoire, défaite ou nul (lecture de l'équipe en ligne), pastille devant le score
+            def pastilles_matrice(matrice):
+                affichage = matrice.copy()
+                for col in matrice.columns:
+                    dom, ext = tableaux.scores(matrice[col])
+                    affichage[col] = tableaux.pastilles(
+                        matrice[col], [dom > ext, dom < ext, dom == ext],
+                        [tableaux.BLEU, tableaux.ROUGE, tableaux.JAUNE]
+                    ).to_numpy()
+                return affichage
 
             col1, col2 = st.columns([1.5, 1.5])
 
             with col1:
                 # Tableau classement
-                styled_classement = (
-                    classement[['Rang','Equipe','Pts','J','V','N','D','BP','BC','Diff']]
-                    .style.format({'Pts':'{:.0f}', 'Diff':'{:+d}'})
-                    .background_gradient(subset=['Pts'], cmap='Greens')
-                    .background_gradient(subset=['Diff'], cmap='RdYlGn')
-                    .set_properties(**{
-                        'text-align': 'center',
-                        'justify-content': 'center',
-                        'white-space': 'nowrap',
-                        'font-size': '14px',
-                        'padding': '4px 8px'
-                    })
-                    .set_properties(subset=['Equipe'], **{'text-align': 'left'})  # 👈 lisibilité améliorée pour les noms d'équipes
-                )   
-
+                df_classement_aff = classement[['Rang','Equipe','Pts','J','V','N','D','BP','BC','Diff']]
                 st.dataframe(
-                    styled_classement,
+                    df_classement_aff,
+                    column_config=tableaux.config_classement(df_classement_aff),
                     use_container_width=False,  # ✅ permet d’ajuster la largeur au texte
                     height=45 * len(classement),
                     hide_index=True
@@ -456,27 +584,16 @@ def show(tables):
             with col2:
                 st.markdown("**Résultats entre équipes (aller / retour)**")
                     
-                # Style de la matrice : couleurs + alignement
-                styled_matrice = (
-                    matrice.style
-                    .applymap(color_match)
-                    .set_properties(**{
-                        'text-align': 'center',
-                        'justify-content': 'center',
-                        'white-space': 'nowrap',
-                        'font-size': '13px',
-                        'padding': '4px 6px'
-                    })
-                )
-
                 st.dataframe(
-                    styled_matrice,
+                    pastilles_matrice(matrice),
+                    column_config=tableaux.centrer(matrice),
                     use_container_width=False,  # ✅ largeur adaptée au contenu
                     height=45 * len(equipes)
                 )
 
+    instrumentation.etape("rendu.elimination_directe")
     with tabs[1]:
-        phases = ["Seizièmes", "Huitièmes", "Quarts", "Demies", "Finale"]
+        phases = PHASES_ELIMINATION
 
         hauteur_phase = {
             "Seizièmes": 600,
@@ -487,53 +604,22 @@ def show(tables):
         }
 
         # Couleurs
-        win_color = "#07bb4f"
         header_color = "#f0f2f6"
         finale_color = "#FFD700"
 
-        # Normaliser aller/retour
-        df['aller_retour'] = df['aller_retour'].astype(str).str.strip().str.capitalize()
-
-        # Créer une clé pour associer Aller et Retour
-        df['match_pair'] = df.apply(lambda x: '-'.join(sorted([x['equipe_domicile_nom'], x['equipe_exterieure_nom']])), axis=1)
-
-        # ---- Fonction de coloration du vainqueur ----
-        def highlight_winner(row):
-            """
-            Applique un style vert au vainqueur du match dans la ligne.
-            """
-            if "Score" not in row or "-" not in row["Score"]:
-                return [""] * len(row)
-
-            try:
-                score_d, score_e = row["Score"].split("-")
-                score_d = int(score_d.split()[0])  # Retire les éventuelles mentions (Prol, TAB)
-                score_e = int(score_e.split()[0])
-            except:
-                return [""] * len(row)
-
-            styles = ["", "", ""]  # Domicile, Score, Extérieur
-            if score_d > score_e:
-                styles[0] = f"background-color: {win_color}; color: white; font-weight: bold;"
-            elif score_e > score_d:
-                styles[2] = f"background-color: {win_color}; color: white; font-weight: bold;"
-            return styles
-
-        # ---- Fonction coloration score individuel (optionnelle) ----
-        def color_score(val, col):
-            if val == "" or '-' not in val:
-                return ""
-            try:
-                d_str, e_str = val.split('-')
-                d = int(float(d_str))
-                e = int(float(e_str))
-            except:
-                return ""
-            if d > e and col == 'Domicile':
-                return f'background-color: {win_color}; font-weight: bold;'
-            elif e > d and col == 'Extérieur':
-                return f'background-color: {win_color}; font-weight: bold;'
-            return ''
+        # Aller / retour normalisés et clé commune aux deux matchs d'une confrontation
+        df = preparer_elimination(df)
+
+        # ---- Tableaux de phase : vainqueur du match en vert (pastille devant son nom) ----
+        def style_phase(df_disp):
+            if "Score" in df_disp.columns:
+                # Un score suivi d'une mention « (Prol: 3-2) » / « (TAB: 4-3) » n'est pas lu : pas de pastille
+                score_d, score_e = tableaux.scores(df_disp["Score"])
+                df_disp = df_disp.assign(
+                    Domicile=tableaux.pastilles(df_disp["Domicile"], [score_d > score_e], [tableaux.VERT]),
+                    Extérieur=tableaux.pastilles(df_disp["Extérieur"], [score_e > score_d], [tableaux.VERT]),
+                )
+            return df_disp
 
         # ---- Boucle sur les phases ----
         for phase in phases:
@@ -543,63 +629,14 @@ def show(tables):
 
             st.markdown(f"## {phase}")  # Titre de la phase
 
-            if phase != "Finale":
-                rows_aller, rows_retour, qualifiés = [], [], []
-
-                for match_pair, g in df_phase.groupby('match_pair'):
-                    df_aller = g[g['aller_retour'] == "Aller"]
-                    df_retour = g[g['aller_retour'] == "Retour"]
-
-                    if df_aller.empty or df_retour.empty:
-                        continue
-
-                    match_aller = df_aller.iloc[0]
-                    match_retour = df_retour.iloc[0]
-
-                    dom = match_aller['equipe_domicile_nom']
-                    ext = match_aller['equipe_exterieure_nom']
-
-                    # ---- SCORE ALLER ----
-                    score_aller = f"{int(match_aller['score_domicile'])}-{int(match_aller['score_exterieur'])}"
-                    if 'prolongation_score_domicile' in match_aller and pd.notna(match_aller['prolongation_score_domicile']):
-                        score_aller += f" (Prol: {int(match_aller['prolongation_score_domicile'])}-{int(match_aller['prolongation_score_exterieur'])})"
-                    if 'tab_score_domicile' in match_aller and pd.notna(match_aller['tab_score_domicile']):
-                        score_aller += f" (TAB: {int(match_aller['tab_score_domicile'])}-{int(match_aller['tab_score_exterieur'])})"
-
-                    # ---- SCORE RETOUR ----
-                    score_retour = f"{int(match_retour['score_domicile'])}-{int(match_retour['score_exterieur'])}"
-                    if 'prolongation_score_domicile' in match_retour and pd.notna(match_retour['prolongation_score_domicile']):
-                        score_retour += f" (Prol: {int(match_retour['prolongation_score_domicile'])}-{int(match_retour['prolongation_score_exterieur'])})"
-                    if 'tab_score_domicile' in match_retour and pd.notna(match_retour['tab_score_domicile']):
-                        score_retour += f" (TAB: {int(match_retour['tab_score_domicile'])}-{int(match_retour['tab_score_exterieur'])})"
-
-                    # Ajouter aux tableaux
-                    rows_aller.append({"Domicile": dom, "Score": score_aller, "Extérieur": ext})
-                    rows_retour.append({
-                        "Domicile": match_retour['equipe_domicile_nom'],
-                        "Score": score_retour,
-                        "Extérieur": match_retour['equipe_exterieure_nom']
-                    })
+            # Tableau de la phase : précalculé si disponible
+            tableau = artefacts.tableau_elimination(tables.version_saison(saison_sel), saison_sel, competition_sel, phase)
+            if tableau is None:
+                tableau = tableau_phase(df_phase, phase)
 
-                    # ---- Calcul du vainqueur cumulatif ----
-                    total_dom = match_aller['score_domicile'] + match_retour['score_exterieur']
-                    total_ext = match_aller['score_exterieur'] + match_retour['score_domicile']
-
-                    if 'prolongation_score_domicile' in df_aller.columns:
-                        total_dom += match_aller.get('prolongation_score_domicile', 0) + match_retour.get('prolongation_score_exterieur', 0)
-                        total_ext += match_aller.get('prolongation_score_exterieur', 0) + match_retour.get('prolongation_score_domicile', 0)
-
-                    if total_dom > total_ext:
-                        qualifiés.append(dom)
-                    elif total_ext > total_dom:
-                        qualifiés.append(ext)
-                    else:
-                        if 'tab_score_domicile' in df_aller.columns and pd.notna(match_aller.get('tab_score_domicile', None)):
-                            tab_dom = match_aller.get('tab_score_domicile', 0) + match_retour.get('tab_score_exterieur', 0)
-                            tab_ext = match_aller.get('tab_score_exterieur', 0) + match_retour.get('tab_score_domicile', 0)
-                            qualifiés.append(dom if tab_dom > tab_ext else ext)
-                        else:
-                            qualifiés.append(dom)
+            if phase != "Finale":
+                rows_aller, qualifiés = lignes_phase(tableau, "Aller")
+                rows_retour, _ = lignes_phase(tableau, "Retour")
 
                 # ---- Affichage DataFrames ----
                 df_aller_disp = pd.DataFrame(rows_aller)
@@ -609,13 +646,8 @@ def show(tables):
                 with col1:
                     st.markdown("### Matchs Aller")
                     st.dataframe(
-                        df_aller_disp.style
-                            .set_properties(**{
-                                'text-align': 'center',
-                                'font-size': '14px',
-                                'padding': '6px 8px'
-                            })
-                            .apply(highlight_winner, axis=1),
+                        style_phase(df_aller_disp),
+                        column_config=tableaux.centrer(df_aller_disp),
                         use_container_width=True,
                         height=hauteur_phase.get(phase),
                         hide_index=True
@@ -623,13 +655,8 @@ def show(tables):
                 with col2:
                     st.markdown("### Matchs Retour")
                     st.dataframe(
-                        df_retour_disp.style
-                            .set_properties(**{
-                                'text-align': 'center',
-                                'font-size': '14px',
-                                'padding': '6px 8px'
-                            })
-                            .apply(highlight_winner, axis=1),
+                        style_phase(df_retour_disp),
+                        column_config=tableaux.centrer(df_retour_disp),
                         use_container_width=True,
                         height=hauteur_phase.get(phase),
                         hide_index=True
@@ -646,46 +673,13 @@ def show(tables):
 
             else:
                 # ---- FINALE ----
-                match_finale = df_phase.iloc[0]
-                dom = match_finale['equipe_domicile_nom']
-                ext = match_finale['equipe_exterieure_nom']
-
-                total_dom = match_finale['score_domicile']
-                total_ext = match_finale['score_exterieur']
-
-                if pd.notna(match_finale.get('prolongation_score_domicile', None)):
-                    total_dom += match_finale['prolongation_score_domicile']
-                    total_ext += match_finale['prolongation_score_exterieur']
-
-                if total_dom > total_ext:
-                    vainqueur = dom
-                elif total_ext > total_dom:
-                    vainqueur = ext
-                else:
-                    if pd.notna(match_finale.get('tab_score_domicile', None)):
-                        tab_dom = match_finale['tab_score_domicile']
-                        tab_ext = match_finale['tab_score_exterieur']
-                        vainqueur = dom if tab_dom > tab_ext else ext
-                    else:
-                        vainqueur = dom
-
-                score = f"{int(match_finale['score_domicile'])}-{int(match_finale['score_exterieur'])}"
-                if 'prolongation_score_domicile' in match_finale and pd.notna(match_finale['prolongation_score_domicile']):
-                    score += f" (Prol: {int(match_finale['prolongation_score_domicile'])}-{int(match_finale['prolongation_score_exterieur'])})"
-                if 'tab_score_domicile' in match_finale and pd.notna(match_finale['tab_score_domicile']):
-                    score += f" (TAB: {int(match_finale['tab_score_domicile'])}-{int(match_finale['tab_score_exterieur'])})"
-
-                df_finale_disp = pd.DataFrame([{"Domicile": dom, "Score": score, "Extérieur": ext}])
+                (ligne_finale,), (vainqueur,) = lignes_phase(tableau, "Finale")
+                df_finale_disp = pd.DataFrame([ligne_finale])
 
                 st.markdown("### Finale")
                 st.dataframe(
-                    df_finale_disp.style
-                        .set_properties(**{
-                            'text-align': 'center',
-                            'font-size': '14px',
-                            'padding': '6px 8px'
-                        })
-                        .apply(highlight_winner, axis=1),
+                    style_phase(df_finale_disp),
+                    column_config=tableaux.centrer(df_finale_disp),
                     use_container_width=True,
                     height=hauteur_phase.get(phase),
                     hide_index=True
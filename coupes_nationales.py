@@ -1,23 +1,72 @@
 import streamlit as st
 import pandas as pd
+import artefacts
+import donnees
+import instrumentation
+import tableaux
+
+# Compétitions et phases affichées par la page
+COUPES_NATIONALES = [
+    'Coupe de France', 'Coupe de la Ligue', 'Community Shield',
+    "Supercoupe d'Allemagne", "Supercoupe d'Espagne", "Supercoupe d'Europe",
+    "Supercoupe d'Italie", 'Trophée des Champions'
+]
+PHASES = ["1/128 de finale", "1/64 de finale", "1/32 de finale", "Premier tour",
+          "Deuxième tour", "Seizièmes", "Huitièmes", "Quarts", "Demies", "Finale"]
+
+
+# Fonction pour sécuriser la conversion des NaN en entier
+def safe_int(val):
+    return int(val) if pd.notna(val) else 0
+
+
+def tableau_phase(df_phase):
+    """Une ligne par match de la phase (Domicile / Score / Extérieur) et son vainqueur au score régulier.
+
+    Vainqueur vide pour un match nul ; forme stockée par les précalculs (manche « Match »).
+    """
+    rows = []
+    for match_id, g in df_phase.groupby("match_id"):
+        match = g.iloc[0]
+        dom = match['equipe_domicile_nom']
+        ext = match['equipe_exterieure_nom']
+
+        # Score régulier
+        score_dom = safe_int(match['score_domicile'])
+        score_ext = safe_int(match['score_exterieur'])
+        score = f"{score_dom}-{score_ext}"
+
+        # Prolongation
+        if pd.notna(match.get('prolongation_score_domicile')):
+            score += f" (Prol: {safe_int(match['prolongation_score_domicile'])}-{safe_int(match['prolongation_score_exterieur'])})"
+
+        # Tirs au but
+        if pd.notna(match.get('tab_score_domicile')):
+            score += f" (TAB: {safe_int(match['tab_score_domicile'])}-{safe_int(match['tab_score_exterieur'])})"
+
+        # Détermination du vainqueur
+        if score_dom > score_ext:
+            vainqueur = dom
+        elif score_ext > score_dom:
+            vainqueur = ext
+        else:
+            vainqueur = None
+
+        rows.append({"manche": "Match", "Domicile": dom, "Score": score, "Extérieur": ext, "Vainqueur": vainqueur})
+    return pd.DataFrame(rows, columns=["manche", "Domicile", "Score", "Extérieur", "Vainqueur"])
+
 
 def show(tables):
     st.title("🏆 Coupes Nationales")
     
-    # Récupération du DataFrame correspondant
-    df_all = tables["all_matchs_football"]  
+    # Sélecteurs et matchs lus par requêtes filtrées (stockage des tables)
+    instrumentation.etape("chargement.tables")
 
     # ----- Colonne pour sélection de la saison -----
     col1, col2 = st.columns([1.1, 1.1])
 
     with col1:
-        saisons = df_all[
-            df_all["competition"].isin([
-                'Coupe de France', 'Coupe de la Ligue', 'Community Shield', 
-                "Supercoupe d'Allemagne", "Supercoupe d'Espagne", "Supercoupe d'Europe", 
-                "Supercoupe d'Italie", 'Trophée des Champions'
-            ])
-        ]["saison"].dropna().unique()
+        saisons = tables.valeurs("all_matchs_football", "saison", competition=COUPES_NATIONALES)
 
         saisons = sorted(saisons, reverse=True)
         if len(saisons) == 0:
@@ -28,14 +77,8 @@ def show(tables):
 
     # ----- Colonne pour sélection de la compétition -----
     with col2:
-        competitions = df_all[
-            (df_all["saison"] == saison_sel) &
-            (df_all["competition"].isin([
-                'Coupe de France', 'Coupe de la Ligue', 'Community Shield', 
-                "Supercoupe d'Allemagne", "Supercoupe d'Espagne", "Supercoupe d'Europe", 
-                "Supercoupe d'Italie", 'Trophée des Champions'
-            ]))
-        ]["competition"].dropna().unique()
+        competitions = tables.valeurs("all_matchs_football", "competition",
+                                      saison=saison_sel, competition=COUPES_NATIONALES)
 
         if len(competitions) == 0:
             st.warning("Aucune Coupe Nationale disponible pour cette saison.")
@@ -43,23 +86,19 @@ def show(tables):
 
         competition_sel = st.selectbox("Sélectionner une compétition :", competitions)
 
-    # Fonction pour sécuriser la conversion des NaN en entier
-    def safe_int(val):
-        return int(val) if pd.notna(val) else 0
-
     # ----- Filtrage des matchs -----
-    df = df_all[
-        (df_all["saison"] == saison_sel) & 
-        (df_all["competition"] == competition_sel)
-    ].copy()
+    instrumentation.etape("calcul.filtrage")
+    df = donnees.types_calcul(
+        tables.selection("all_matchs_football", saison=saison_sel, competition=competition_sel)
+    )
 
     if df.empty:
         st.info("Aucun match enregistré pour cette compétition et cette saison.")
         return
 
     # ----- Affichage par phases -----
-    phases = ["1/128 de finale", "1/64 de finale", "1/32 de finale", "Premier tour",
-                "Deuxième tour", "Seizièmes", "Huitièmes", "Quarts", "Demies", "Finale"]
+    instrumentation.etape("rendu.phases")
+    phases = PHASES
     hauteur_phase = {"1/128 de finale":1000, "1/64 de finale":600, "1/32 de finale":400,
                     "Premier tour":250, "Deuxième tour":250, "Seizièmes":600,
                     "Huitièmes":310, "Quarts":180, "Demies":120, "Finale":80}
@@ -70,63 +109,29 @@ def show(tables):
             continue
 
         st.subheader(f"{phase}")
-        rows = []
-        qualifiés = []
-
-        for match_id, g in df_phase.groupby("match_id"):
-            match = g.iloc[0]
-            dom = match['equipe_domicile_nom']
-            ext = match['equipe_exterieure_nom']
-
-            # Score régulier
-            score_dom = safe_int(match['score_domicile'])
-            score_ext = safe_int(match['score_exterieur'])
-            score = f"{score_dom}-{score_ext}"
-
-            # Prolongation
-            if pd.notna(match.get('prolongation_score_domicile')):
-                score += f" (Prol: {safe_int(match['prolongation_score_domicile'])}-{safe_int(match['prolongation_score_exterieur'])})"
-
-            # Tirs au but
-            if pd.notna(match.get('tab_score_domicile')):
-                score += f" (TAB: {safe_int(match['tab_score_domicile'])}-{safe_int(match['tab_score_exterieur'])})"
-
-            # Détermination du vainqueur
-            if score_dom > score_ext:
-                vainqueur = dom
-            elif score_ext > score_dom:
-                vainqueur = ext
-            else:
-                vainqueur = None
-
-            rows.append({"Domicile": dom, "Score": score, "Extérieur": ext})
-            if vainqueur:
-                qualifiés.append(vainqueur)
-
-        # ----- Style des vainqueurs -----
-        def highlight_winner(row):
-            styles = []
-            for col in row.index:
-                if col == 'Domicile' and row[col] in qualifiés:
-                    styles.append('background-color: #0EC557FF; font-weight:bold;')
-                elif col == 'Extérieur' and row[col] in qualifiés:
-                    styles.append('background-color: #0EC557FF; font-weight:bold;')
-                else:
-                    styles.append('')
-            return styles
-
+        # Tableau de la phase : précalculé si disponible
+        tableau = artefacts.tableau_elimination(tables.version_saison(saison_sel), saison_sel, competition_sel, phase)
+        if tableau is None:
+            tableau = tableau_phase(df_phase)
+        rows = tableau[["Domicile", "Score", "Extérieur"]].to_dict("records")
+        vainqueurs = tableau["Vainqueur"].tolist()
+        qualifiés = [v for v in vainqueurs if v]
+        # Dernier match de la phase (la finale n'en compte qu'un)
+        vainqueur, score = vainqueurs[-1], rows[-1]["Score"]
+
+        # ----- Vainqueurs en vert : pastille devant leur nom -----
         df_display = pd.DataFrame(rows)
-        styled_df = (
-            df_display.style
-            .apply(highlight_winner, axis=1)
-            .set_properties(**{'text-align': 'center', 'white-space':'nowrap', 'padding':'4px 6px', 'font-size':'14px'})
-        )
+        config = tableaux.centrer(df_display)
+        for col in ['Domicile', 'Extérieur']:
+            if col in df_display.columns:
+                df_display[col] = tableaux.pastilles(df_display[col], [df_display[col].isin(qualifiés)], [tableaux.VERT])
 
         col_match, col_qualifie = st.columns([2, 1.4])
 
         with col_match:
             st.dataframe(
-                styled_df,
+                df_display,
+                column_config=config,
                 use_container_width=True,
                 height=hauteur_phase.get(phase,150),
                 hide_index=True
@@ -0,0 +1,62 @@
+import importlib
+import subprocess
+import sys
+import time
+import pandas as pd
+
+# ---------------- Import différé des pages ---------------- #
+# Une page (et les bibliothèques lourdes qu'elle tire : plotly, xlsxwriter...) n'est
+# importée qu'à sa première ouverture dans le processus, puis reste en cache dans sys.modules.
+
+# Durée du premier import de chaque module de page dans ce processus (secondes)
+DUREES_IMPORT = {}
+
+
+def importer_page(nom_module):
+    """Importe un module de page en mesurant la durée de son premier import."""
+    if nom_module in sys.modules:
+        return sys.modules[nom_module]
+    debut = time.perf_counter()
+    module = importlib.import_module(nom_module)
+    DUREES_IMPORT[nom_module] = time.perf_counter() - debut
+    return module
+
+
+# ---------------- Rapport de démarrage ---------------- #
+MODULES_DEMARRAGE = ["streamlit", "donnees"]
+MODULES_PAGES = ["accueil", "expert_canape", "championnat", "competitions_europeennes", "coupes_nationales"]
+MODULES_LOURDS = ["plotly.graph_objects", "plotly.express", "xlsxwriter"]
+
+
+def _duree_import_a_froid(nom_module):
+    """Durée d'import d'un module dans un interpréteur neuf (pandas et streamlit déjà chargés)."""
+    prealables = "pandas" if nom_module == "streamlit" else "pandas, streamlit"
+    code = (
+        f"import time, importlib, {prealables}\n"
+        "t = time.perf_counter()\n"
+        f"importlib.import_module({nom_module!r})\n"
+        "print(time.perf_counter() - t)"
+    )
+    resultat = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if resultat.returncode != 0:
+        return None
+    return float(resultat.stdout.strip().splitlines()[-1])
+
+
+def rapport_demarrage():
+    """Temps d'import à froid de l'amorce de l'application, des pages et des bibliothèques lourdes."""
+    lignes = []
+    for categorie, modules in [("démarrage", MODULES_DEMARRAGE), ("page", MODULES_PAGES),
+                               ("bibliothèque", MODULES_LOURDS)]:
+        for nom_module in modules:
+            duree = _duree_import_a_froid(nom_module)
+            lignes.append({
+                "module": nom_module,
+                "categorie": categorie,
+                "import_ms": None if duree is None else round(duree * 1000, 1)
+            })
+    return pd.DataFrame(lignes)
+
+
+if __name__ == "__main__":
+    print(rapport_demarrage().to_string(index=False))
@@ -0,0 +1,362 @@
+import hashlib
+import os
+import threading
+import unicodedata
+from collections.abc import Mapping
+import pandas as pd
+import archives
+import ingestion
+import instrumentation
+import pronostics
+import stockage
+
+# ---------------- Types compacts des tables ---------------- #
+# Scores en Int8 nullable (un match non joué reste <NA> au lieu de passer en float64),
+# journée en Int16, noms / saisons / compétitions en category. Les cotes restent en float64
+# (quelques Ko) : les calculs les lisent telles quelles, sans conversion à chaque requête.
+
+COLONNES_SCORES = [
+    "score_domicile", "score_exterieur",
+    "prolongation_score_domicile", "prolongation_score_exterieur",
+    "tab_score_domicile", "tab_score_exterieur"
+]
+COLONNES_COTES = ["cote_domicile", "cote_nul", "cote_exterieur"]
+
+TYPES_TABLES = {
+    "all_matchs_football": {
+        "match_id": "int32",
+        "saison_id": "int16",
+        "equipe_domicile_id": "int32",
+        "equipe_exterieure_id": "int32",
+        "journee": "Int16",
+        **{col: "Int8" for col in COLONNES_SCORES},
+        **{col: "float64" for col in COLONNES_COTES},
+        **{col: "category" for col in [
+            "saison", "code_saison", "competition", "equipe_domicile_nom",
+            "equipe_exterieure_nom", "groupe", "phase", "aller_retour"
+        ]},
+    },
+    "archives": {
+        "match_id": "int32",
+        "equipe_domicile_id": "int32",
+        "equipe_exterieure_id": "int32",
+        "journee": "Int16",
+        "score_domicile": "Int8",
+        "score_exterieur": "Int8",
+        **{col: "Int16" for col in archives.COLONNES_STATS},
+        **{col: "category" for col in [
+            "saison", "code_saison", "competition", "equipe_domicile_nom", "equipe_exterieure_nom"
+        ]},
+    },
+}
+
+
+def _types_generiques(df):
+    """Entiers réduits au plus petit type, chaînes répétitives en category."""
+    types = {}
+    for col, serie in df.items():
+        if pd.api.types.is_integer_dtype(serie.dtype) and not pd.api.types.is_extension_array_dtype(serie.dtype):
+            types[col] = pd.to_numeric(serie, downcast="integer").dtype
+        elif pd.api.types.is_object_dtype(serie.dtype) or pd.api.types.is_string_dtype(serie.dtype):
+            if len(serie) and serie.nunique() / len(serie) < 0.5:
+                types[col] = "category"
+    return types
+
+
+def optimiser_types(df, nom_table):
+    """Convertit une table brute (lue depuis le CSV) vers sa représentation compacte."""
+    types = TYPES_TABLES.get(nom_table)
+    if types is None:
+        types = _types_generiques(df)
+    types = {col: t for col, t in types.items() if col in df.columns}
+
+    # Les scores sont lus en float64 à cause des NaN : on arrondit avant le passage en Int8
+    for col, t in types.items():
+        if t == "Int8" and pd.api.types.is_float_dtype(df[col].dtype):
+            df[col] = df[col].round()
+    return df.astype(types)
+
+
+def types_calcul(df):
+    """Repasse un sous-ensemble filtré aux types « de calcul » de l'ancien chargement CSV.
+
+    Les pages qui font de l'arithmétique ligne à ligne (calcul_points, scores aller/retour...)
+    travaillent ainsi avec exactement les mêmes valeurs qu'avant : scores en float64 (NaN),
+    noms en object.
+    """
+    conversions = {}
+    for col, serie in df.items():
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            conversions[col] = serie.astype(object)
+        elif col in COLONNES_SCORES:
+            conversions[col] = serie.astype("float64")
+        elif pd.api.types.is_extension_array_dtype(serie.dtype) and pd.api.types.is_integer_dtype(serie.dtype):
+            conversions[col] = serie.astype("float64") if serie.hasnans else serie.astype("int64")
+    if not conversions:
+        return df
+    return df.assign(**conversions)
+
+
+# ---------------- Normalisation (calculée une seule fois au chargement) ---------------- #
+# Anciens noms de colonnes (export SQL des archives) -> noms canoniques
+COLONNES_CANONIQUES = {
+    'equipe_domicile': 'equipe_domicile_nom',
+    'equipe_exterieure': 'equipe_exterieure_nom',
+    'score_domicile_final': 'score_domicile',
+    'score_exterieur_final': 'score_exterieur'
+}
+
+# Valeur de journee_int pour un match sans journée exploitable
+JOURNEE_INCONNUE = -1
+
+
+def normalize_text(s):
+    if not s or pd.isna(s):
+        return ""
+    s = str(s).lower()
+    s = ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+    return s.strip()
+
+
+def normaliser_table(df, nom_table):
+    """Colonnes canoniques et colonnes dérivées, calculées une fois pour toutes au chargement."""
+    if nom_table != "pronostics":
+        df = df.rename(columns={a: b for a, b in COLONNES_CANONIQUES.items() if a in df.columns and b not in df.columns})
+
+    derivees = {}
+    if "journee" in df.columns and "journee_int" not in df.columns:
+        journee = pd.to_numeric(df["journee"], errors="coerce")
+        derivees["journee_int"] = journee.fillna(JOURNEE_INCONNUE).astype("int16")
+
+    # Noms d'équipes canoniques (minuscules, sans accents) pour les rapprochements de noms
+    for col, col_canon in [("equipe_domicile_nom", "equipe_domicile_canon"),
+                           ("equipe_exterieure_nom", "equipe_exterieure_canon")]:
+        if col in df.columns and col_canon not in df.columns:
+            # Sur une colonne category, map n'évalue normalize_text qu'une fois par modalité
+            derivees[col_canon] = df[col].map(normalize_text).astype("category")
+
+    if derivees:
+        df = df.assign(**derivees)
+    return df
+
+
+class TablesLectureSeule(Mapping):
+    """Dictionnaire des tables en lecture seule, partagé entre les sessions.
+
+    Chaque table est chargée (typée + normalisée) la première fois qu'une page la
+    demande, puis gardée en mémoire : une page ne paie que les tables qu'elle lit.
+    Les pages en dérivent des sous-ensembles ; elles ne doivent ni les convertir
+    ni les modifier en place. `version` identifie le contenu des fichiers sources ;
+    version_saison(saison) ne change que si les CSV ou les données ingérées de cette
+    saison changent (clé des caches de résultats dérivés, comme les figures).
+
+    Les requêtes filtrées (selection, valeurs, compter, apercu, store_pronostics) sont
+    exécutées par le stockage (stockage.py) : masques pandas en mémoire, ou moteur SQL
+    sans charger la table entière. Le résultat est le même quel que soit le stockage.
+    """
+
+    def __init__(self, chargeurs, version=None, stockage_tables=None, versions_saisons=None, version_base=None):
+        self._chargeurs = dict(chargeurs)
+        self.version = version
+        # {saison: version} des saisons qui ont reçu des données ingérées (ingestion.py),
+        # version_base pour les autres (CSV seuls)
+        self._versions_saisons = dict(versions_saisons or {})
+        self._version_base = version_base or version
+        self._tables = {}
+        # RLock : le chargeur des archives lit lui-même all_matchs_football
+        self._verrou = threading.RLock()
+        self.stockage = stockage_tables or stockage.Memoire()
+        self.stockage.lier(self)
+
+    def __getitem__(self, nom):
+        if nom not in self._tables:
+            chargeur = self._chargeurs[nom]
+            with self._verrou:
+                if nom not in self._tables:
+                    with instrumentation.span(f"chargement.{nom}"):
+                        self._tables[nom] = chargeur()
+        return self._tables[nom]
+
+    def __contains__(self, nom):
+        # Sans cette surcharge, Mapping chargerait la table pour tester sa présence
+        return nom in self._chargeurs
+
+    def __iter__(self):
+        return iter(self._chargeurs)
+
+    def __len__(self):
+        return len(self._chargeurs)
+
+    def version_saison(self, saison=None):
+        """Version des données d'une saison ; None : de toutes les saisons (artefacts multi-saisons)."""
+        if self._version_base is None:
+            return None
+        if saison is None:
+            if not self._versions_saisons:
+                return self._version_base
+            empreinte = hashlib.sha1(repr(sorted(self._versions_saisons.items())).encode())
+            return f"{self._version_base}.{empreinte.hexdigest()[:8]}"
+        return self._versions_saisons.get(str(saison), self._version_base)
+
+    def tables_chargees(self):
+        """Noms des tables déjà chargées en mémoire."""
+        return list(self._tables)
+
+    def liberer(self):
+        """Oublie les tables chargées (elles seront rechargées à la demande)."""
+        with self._verrou:
+            self._tables.clear()
+
+    # --- Requêtes déléguées au stockage --- #
+    # filtres : {colonne: valeur} (égalité) ou {colonne: liste de valeurs} (appartenance)
+    def selection(self, nom, colonnes=None, **filtres):
+        """Lignes de `nom` vérifiant les filtres, dans l'ordre et avec l'index de la table."""
+        return self.stockage.selection(nom, colonnes, filtres)
+
+    def colonnes(self, nom):
+        return self.stockage.colonnes(nom)
+
+    def valeurs(self, nom, colonne, **filtres):
+        """Valeurs distinctes non vides de `colonne`, dans l'ordre d'apparition (Series.unique)."""
+        return self.stockage.valeurs(nom, colonne, filtres)
+
+    def compter(self, nom, **filtres):
+        return self.stockage.compter(nom, filtres)
+
+    def apercu(self, nom, n=10):
+        return self.stockage.apercu(nom, n)
+
+    # --- Agrégats calculés par les stockages SQL (None : à calculer par la page) --- #
+    def classement(self, nom, pts_victoire=3, journee_max=None, **filtres):
+        """Classement (comme moteur.classement) des matchs filtrés joués jusqu'à `journee_max`."""
+        return self.stockage.classement(nom, pts_victoire, journee_max, filtres)
+
+    def confrontations(self, nom, club1, club2, **filtres):
+        """(victoires de club1, nuls, victoires de club2) dans leurs confrontations directes."""
+        return self.stockage.confrontations(nom, club1, club2, filtres)
+
+    def pronostics_points(self, **filtres_matchs):
+        """Pronostics joints aux matchs filtrés, avec leurs points (_points, _avec_cotes)."""
+        return self.stockage.pronostics_points(filtres_matchs)
+
+    def pronostics_progression(self, **filtres_matchs):
+        """Points par participant et par journée des matchs filtrés (comme moteur.progression_journees)."""
+        return self.stockage.pronostics_progression(JOURNEE_INCONNUE, filtres_matchs)
+
+    def store_pronostics(self, participant_id=None, **filtres_matchs):
+        """Store des pronostics d'un participant et / ou des matchs vérifiant les filtres."""
+        return self.stockage.store_pronostics(participant_id, filtres_matchs)
+
+
+def _chargeur_csv(chemin, nom_table, dossier=None):
+    def charger():
+        df = pd.read_csv(chemin)
+        if nom_table == "all_matchs_football" and dossier is not None:
+            # Scores et cotes ingérés depuis (ingestion.py) appliqués par-dessus le CSV
+            df = ingestion.appliquer_resultats(df, dossier)
+        return normaliser_table(optimiser_types(df, nom_table), nom_table)
+    return charger
+
+
+def _chargeur_pronostics(chemin, dossier=None):
+    def charger():
+        store = pronostics.charger_pronostics(chemin)
+        if dossier is not None:
+            store = ingestion.appliquer_pronostics(store, dossier)
+        return normaliser_table(store, "pronostics")
+    return charger
+
+
+def _empreinte_fichiers(chemins):
+    """Empreinte courte de fichiers (nom, taille, date de modification)."""
+    empreinte = hashlib.sha1()
+    for chemin in chemins:
+        infos = os.stat(chemin)
+        empreinte.update(f"{os.path.basename(chemin)}:{infos.st_size}:{infos.st_mtime_ns};".encode())
+    return empreinte.hexdigest()[:12]
+
+
+def _fichiers_csv(folder):
+    return [os.path.join(folder, file) for file in sorted(os.listdir(folder)) if file.endswith(".csv")]
+
+
+def version_csv(folder="csv"):
+    """Empreinte des seuls CSV : version des saisons qui n'ont pas reçu de données ingérées."""
+    return _empreinte_fichiers(_fichiers_csv(folder))
+
+
+def version_fichiers(folder="csv"):
+    """Empreinte courte des CSV du dossier et des données ingérées (ingestion.py)."""
+    return _empreinte_fichiers(_fichiers_csv(folder) + ingestion.fichiers(folder))
+
+
+def versions_saisons(folder="csv"):
+    """{saison: version} des saisons qui ont reçu des données ingérées, les autres gardant version_csv."""
+    base = version_csv(folder)
+    return {saison: f"{base}.{sequence}" for saison, sequence in ingestion.lire_etat(folder)["saisons"].items()}
+
+
+def charger_tables(folder="csv", nom_stockage=None):
+    """Tables typées, normalisées, en lecture seule et chargées à la demande.
+
+    Les CSV sont la source ; le stockage (FOOTBALL_STOCKAGE par défaut) sert les tables
+    et les requêtes des pages, depuis la mémoire ou depuis une base SQL construite depuis les CSV.
+    """
+    chargeurs = {}
+    for file in os.listdir(folder):
+        chemin = os.path.join(folder, file)
+        if file == "all_pronostics.csv":
+            # Pronostics : store compact dédoublonné, les vues sont construites à la demande
+            chargeurs["pronostics"] = _chargeur_pronostics(chemin, folder)
+        elif file.endswith(".csv"):
+            nom_table = file.replace(".csv", "")
+            chargeurs[nom_table] = _chargeur_csv(chemin, nom_table, folder)
+
+    if "archives" not in chargeurs and "all_matchs_football" in chargeurs:
+        # Vue matérialisée à partir des matchs (cache parquet incrémental par saison) :
+        # ne charge all_matchs_football que si une page demande les archives
+        chargeurs["archives"] = lambda: normaliser_table(
+            optimiser_types(archives.materialiser_archives(sources["all_matchs_football"], folder), "archives"),
+            "archives"
+        )
+    # Versions lues avant le chargement : des données ingérées pendant celui-ci ne seront pas
+    # servies sous une version qui les ignore (au pire, recalcul inutile)
+    version = version_fichiers(folder)
+    saisons = versions_saisons(folder)
+    sources = TablesLectureSeule(chargeurs, version=version)
+    base = stockage.ouvrir(nom_stockage, version)
+    return TablesLectureSeule(base.chargeurs(sources), version, base, saisons, version_csv(folder))
+
+
+# ---------------- Rapport mémoire ---------------- #
+def rapport_memoire(tables):
+    """Mémoire occupée par chaque table (index compris, chaînes comptées en profondeur)."""
+    lignes = []
+    for nom, df in tables.items():
+        lignes.append({
+            "table": nom,
+            "lignes": len(df),
+            "colonnes": df.shape[1],
+            "memoire_ko": round(df.memory_usage(index=True, deep=True).sum() / 1024, 1)
+        })
+    rapport = pd.DataFrame(lignes).sort_values("memoire_ko", ascending=False).reset_index(drop=True)
+    total = pd.DataFrame([{
+        "table": "TOTAL",
+        "lignes": rapport["lignes"].sum(),
+        "colonnes": rapport["colonnes"].sum(),
+        "memoire_ko": round(rapport["memoire_ko"].sum(), 1)
+    }])
+    return pd.concat([rapport, total], ignore_index=True)
+
+
+if __name__ == "__main__":
+    # Comparaison chargement brut / chargement compact
+    bruts = {
+        f.replace(".csv", ""): pd.read_csv(os.path.join("csv", f))
+        for f in os.listdir("csv") if f.endswith(".csv")
+    }
+    print("=== Chargement brut ===")
+    print(rapport_memoire(bruts).to_string(index=False))
+    # Tables telles que servies aux pages (chargement typé et normalisé, vue des archives comprise)
+    print("\n=== Chargement optimisé ===")
+    print(rapport_memoire(charger_tables("csv", "memoire")).to_string(index=False))
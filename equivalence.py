@@ -0,0 +1,372 @@
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import warnings
+import numpy as np
+import pandas as pd
+import championnat
+import competitions_europeennes
+import donnees
+import expert_canape
+import pronostics
+import synthetique
+
+# ---------------- Équivalence des moteurs ---------------- #
+# Tout moteur de calcul optimisé (vectorisé, SQL...) doit reproduire les chiffres des
+# implémentations ligne à ligne d'origine : points des pronostics, bonus de journée
+# (1.33 / 1.66 / 2, rien sans cotes), gain d'une mise, classements de championnat et tables
+# des groupes européens. Ce banc exécute les deux versions sur les CSV réels, sur des données
+# synthétiques et sur des cas limites construits à la main, puis compare les résultats :
+# mêmes lignes, mêmes colonnes, mêmes types, valeurs numériques égales aux tolérances près.
+
+TOLERANCE_RELATIVE = 1e-9
+TOLERANCE_ABSOLUE = 1e-9
+
+JEUX = ["reel", "synthetique", "limites"]
+ENTREES = ["pronostics", "pronostics_points", "championnats", "groupes", "phases_ligue"]
+
+
+# ---------------- Implémentations de référence (ligne à ligne) ---------------- #
+def points_reference(df):
+    return df.apply(expert_canape.calcul_points, axis=1)
+
+
+def progression_reference(df):
+    df_progress_all = (
+        df.groupby(["participant_nom", "journee_match"])
+        .apply(expert_canape.calcul_points_journee)
+        .reset_index()
+        .sort_values(["participant_nom", "journee_match"])
+    )
+    df_progress_all["points_cumul"] = df_progress_all.groupby("participant_nom")["points"].cumsum()
+    return df_progress_all
+
+
+def gains_reference(df):
+    return df.apply(expert_canape.gain_match, axis=1)
+
+
+# Calcul -> (entrée, référence, nom de la fonction équivalente dans le moteur comparé)
+CALCULS = {
+    "points": ("pronostics", points_reference, "points_pronostics"),
+    "bonus_journee": ("pronostics_points", progression_reference, "progression_journees"),
+    "gain_match": ("pronostics", gains_reference, "gains_matchs"),
+    "classement": ("championnats", championnat.calcul_classement, "classement"),
+    "groupes.classement": ("groupes", competitions_europeennes.classement_groupe, "classement"),
+    "groupes.matrice": ("groupes", competitions_europeennes.matrice_confrontations, "matrice_confrontations"),
+    "phase_ligue": ("phases_ligue", competitions_europeennes.classements_par_journee, "classements_par_journee"),
+}
+
+
+# ---------------- Entrées ---------------- #
+def entrees_tables(tables):
+    """Entrées des calculs à partir des tables de l'application : {entrée: [(cas, arguments)]}."""
+    entrees = {nom: [] for nom in ENTREES}
+    matchs = donnees.types_calcul(tables["all_matchs_football"])
+    vue = pronostics.vue_pronostics(tables["pronostics"], tables["participants"])
+    europe = matchs["competition"].isin(competitions_europeennes.COMPETITIONS_EUROPE)
+
+    for saison, matchs_saison in matchs.groupby("saison", sort=True):
+        # --- Pronostics : toute la saison (championnat « Toutes »), puis compétition par compétition ---
+        df = expert_canape.pronostics_matchs(vue, matchs_saison)
+        if df is not None and not df.empty:
+            entrees["pronostics"].append((f"{saison} / Toutes", (df,)))
+            df = df.assign(points=points_reference(df))
+            entrees["pronostics_points"].append((f"{saison} / Toutes", (df,)))
+            for competition, df_competition in df.groupby("competition", sort=True):
+                entrees["pronostics_points"].append((f"{saison} / {competition}", (df_competition,)))
+
+        # --- Championnats : saison complète et quelques journées intermédiaires ---
+        ligues = matchs_saison[matchs_saison["phase"].isna() & ~europe[matchs_saison.index]]
+        for competition, df_ligue in ligues.groupby("competition", sort=True):
+            pts = championnat.points_victoire(competition, saison)
+            journees = sorted(df_ligue["journee"].dropna().unique())
+            for j in journees[9::10]:
+                entrees["championnats"].append((f"{saison} / {competition} / J{j:g}", (df_ligue[df_ligue["journee"] <= j], pts)))
+            entrees["championnats"].append((f"{saison} / {competition}", (df_ligue, pts)))
+
+        # --- Coupes d'Europe : groupes et phase de ligue ---
+        for competition, df_europe in matchs_saison[europe[matchs_saison.index]].groupby("competition", sort=True):
+            for groupe, df_groupe in df_europe[df_europe["groupe"].notna()].groupby("groupe", sort=True):
+                entrees["groupes"].append((f"{saison} / {competition} / {groupe}", (df_groupe,)))
+            if int(saison.split("-")[0]) >= 2024:
+                # Comme la page : matchs de la phase « Ligue », tous les matchs si la phase n'est pas renseignée
+                df_ligue = df_europe[df_europe["phase"].str.contains("Ligue", case=False, na=False)]
+                entrees["phases_ligue"].append((f"{saison} / {competition}", (df_europe if df_ligue.empty else df_ligue,)))
+    return entrees
+
+
+def jeu_reel(dossier="csv"):
+    return entrees_tables(donnees.charger_tables(dossier))
+
+
+def jeu_synthetique(echelle=1, graine=0):
+    with tempfile.TemporaryDirectory() as dossier:
+        synthetique.ecrire_csv(synthetique.generer_tables(echelle, graine), dossier)
+        # Tables chargées à la demande : toutes lues avant la suppression du dossier
+        return entrees_tables(donnees.charger_tables(dossier))
+
+
+# ---------------- Cas limites ---------------- #
+COTES = {"toutes": (2.1, 3.4, 3.2), "aucune": (np.nan, np.nan, np.nan)}
+
+# Pronostics construits à la main : (cas, journée, prono, score réel, cotes domicile / extérieur / nul)
+PRONOSTICS_LIMITES = [
+    ("sans cotes, score exact", 1, (2, 1), (2, 1), COTES["aucune"]),
+    ("sans cotes, bon résultat", 1, (1, 0), (3, 0), COTES["aucune"]),
+    ("sans cotes, mauvais résultat", 1, (0, 2), (1, 1), COTES["aucune"]),
+    ("sans cotes, match non joué", 1, (1, 1), (np.nan, np.nan), COTES["aucune"]),
+    ("nul exact", 2, (1, 1), (1, 1), COTES["toutes"]),
+    ("écart ignoré sur un nul", 2, (2, 2), (0, 0), COTES["toutes"]),
+    ("bon écart", 2, (3, 1), (2, 0), COTES["toutes"]),
+    ("prolifique des deux côtés", 2, (3, 2), (4, 1), COTES["toutes"]),
+    ("prolifique au prono seulement", 2, (2, 2), (1, 0), COTES["toutes"]),
+    ("mauvais résultat, cote domicile manquante", 3, (0, 1), (1, 0), (np.nan, 3.4, 3.2)),
+    ("mauvais résultat, cote extérieur manquante", 3, (0, 1), (1, 0), (2.1, np.nan, 1.9)),
+    ("bon résultat, cote du résultat manquante", 3, (1, 1), (2, 2), (2.1, 3.4, np.nan)),
+    ("match non joué dans une journée à cotes", 3, (2, 0), (np.nan, np.nan), COTES["toutes"]),
+    ("journée d'un match, bon prono", 4, (1, 0), (2, 0), COTES["toutes"]),
+    ("journée de deux matchs, aucun bon prono (n-2)", 5, (1, 0), (0, 1), COTES["toutes"]),
+    ("journée de deux matchs, aucun bon prono (n-2)", 5, (0, 0), (3, 1), COTES["toutes"]),
+    ("journée de trois matchs, deux bons pronos (n-1)", 6, (1, 0), (1, 0), COTES["toutes"]),
+    ("journée de trois matchs, deux bons pronos (n-1)", 6, (0, 0), (2, 2), COTES["toutes"]),
+    ("journée de trois matchs, deux bons pronos (n-1)", 6, (2, 1), (0, 1), COTES["toutes"]),
+]
+
+# Matchs construits à la main : (domicile, extérieur, score) ; égalités parfaites et match non joué
+MATCHS_LIMITES = [
+    ("Alpha", "Bravo", (1, 1)),
+    ("Charlie", "Delta", (1, 1)),
+    ("Echo", "Alpha", (0, 2)),
+    ("Bravo", "Charlie", (np.nan, np.nan)),
+    ("Delta", "Echo", (2, 0)),
+    ("Foxtrot", "Alpha", (np.nan, np.nan)),
+    ("Alpha", "Bravo", (np.nan, np.nan)),
+    ("Bravo", "Alpha", (3, 3)),
+]
+
+
+def _pronostics(lignes, participant="Cas limites"):
+    """Tableau au format de pronostics_matchs à partir de (cas, journée, prono, score réel, cotes)."""
+    return pd.DataFrame({
+        "participant_id": np.int16(1),
+        "participant_nom": participant,
+        "prono_dom": np.array([l[2][0] for l in lignes], dtype="int8"),
+        "prono_ext": np.array([l[2][1] for l in lignes], dtype="int8"),
+        "match_dom": np.array([l[3][0] for l in lignes], dtype="float64"),
+        "match_ext": np.array([l[3][1] for l in lignes], dtype="float64"),
+        "equipe_domicile_nom": [l[0] for l in lignes],
+        "equipe_exterieure_nom": "—",
+        "cote_domicile": np.array([l[4][0] for l in lignes], dtype="float64"),
+        "cote_exterieur": np.array([l[4][1] for l in lignes], dtype="float64"),
+        "cote_nul": np.array([l[4][2] for l in lignes], dtype="float64"),
+        "journee_match": np.array([l[1] for l in lignes], dtype="int16"),
+        "saison_match": "2000-2001",
+        "competition": "Cas limites",
+    })
+
+
+def _pronostics_aleatoires(rng, nb_participants=6, nb_journees=10):
+    """Journées de 1 à 12 matchs, avec toutes / aucune / une partie des cotes ; pronos souvent justes."""
+    lignes = {p: [] for p in range(nb_participants)}
+    for journee in range(1, nb_journees + 1):
+        nb_matchs = int(rng.integers(1, 13))
+        mode = rng.choice(["toutes", "aucune", "partielles"])
+        for m in range(nb_matchs):
+            score = (np.nan, np.nan) if rng.random() < 0.1 else tuple(rng.integers(0, 5, 2))
+            cotes = tuple(np.round(rng.uniform(1.1, 6.0, 3), 2))
+            if mode == "aucune":
+                cotes = COTES["aucune"]
+            elif mode == "partielles":
+                cotes = tuple(np.where(rng.random(3) < 0.3, np.nan, cotes))
+            for p in range(nb_participants):
+                juste = rng.random() < 0.5 and not np.isnan(score[0])
+                prono = score if juste else tuple(rng.integers(0, 5, 2))
+                lignes[p].append((f"Match {journee}.{m}", journee, prono, score, cotes))
+    df = pd.concat([_pronostics(l, f"Participant {p}") for p, l in lignes.items()], ignore_index=True)
+    # Ordre « base de données » : les participants mélangés au fil des journées
+    return df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+
+
+def _matchs(lignes, journees=None, groupe=None):
+    """Tableau de matchs (types de calcul) à partir de (domicile, extérieur, score)."""
+    return pd.DataFrame({
+        "equipe_domicile_nom": [l[0] for l in lignes],
+        "equipe_exterieure_nom": [l[1] for l in lignes],
+        "score_domicile": np.array([l[2][0] for l in lignes], dtype="float64"),
+        "score_exterieur": np.array([l[2][1] for l in lignes], dtype="float64"),
+        "journee": np.arange(1, len(lignes) + 1, dtype="float64") if journees is None else journees,
+        "groupe": groupe,
+        "phase": None if groupe else "Phase de Ligue",
+    })
+
+
+def _matchs_aleatoires(rng, nb_equipes, nb_matchs, taux_non_joues=0.15):
+    """Scores faibles (beaucoup d'égalités au classement), quelques matchs non joués."""
+    equipes = [f"Équipe {chr(65 + i)}" for i in range(nb_equipes)]
+    lignes = []
+    for _ in range(nb_matchs):
+        dom, ext = rng.choice(equipes, 2, replace=False)
+        score = (np.nan, np.nan) if rng.random() < taux_non_joues else tuple(rng.integers(0, 4, 2))
+        lignes.append((dom, ext, score))
+    journees = np.sort(rng.integers(1, max(2, nb_matchs // 3), nb_matchs)).astype("float64")
+    journees[rng.random(nb_matchs) < 0.05] = np.nan
+    return lignes, journees
+
+
+def jeu_limites(graine=0, tirages=20):
+    """Cas construits à la main, puis `tirages` jeux aléatoires de la même forme."""
+    rng = np.random.default_rng(graine)
+    entrees = {nom: [] for nom in ENTREES}
+
+    df = _pronostics(PRONOSTICS_LIMITES)
+    entrees["pronostics"].append(("pronostics construits", (df,)))
+    entrees["pronostics_points"].append(("pronostics construits", (df.assign(points=points_reference(df)),)))
+    matchs = _matchs(MATCHS_LIMITES)
+    for pts in (3, 2):
+        entrees["championnats"].append((f"égalités, victoire à {pts} points", (matchs, pts)))
+    entrees["championnats"].append(("aucun match joué", (matchs[matchs["score_domicile"].isna()], 3)))
+    entrees["championnats"].append(("un seul match", (matchs.iloc[:1], 3)))
+    entrees["groupes"].append(("match vidé puis rejoué", (_matchs(MATCHS_LIMITES, groupe="A"),)))
+    entrees["phases_ligue"].append(("égalités", (matchs,)))
+
+    for t in range(tirages):
+        df = _pronostics_aleatoires(rng)
+        entrees["pronostics"].append((f"tirage {t}", (df,)))
+        entrees["pronostics_points"].append((f"tirage {t}", (df.assign(points=points_reference(df)),)))
+        lignes, journees = _matchs_aleatoires(rng, int(rng.integers(2, 21)), int(rng.integers(1, 80)))
+        entrees["championnats"].append((f"tirage {t}", (_matchs(lignes, journees), int(rng.choice([2, 3])))))
+        entrees["groupes"].append((f"tirage {t}", (_matchs(lignes[:12], journees[:12], groupe="A"),)))
+        entrees["phases_ligue"].append((f"tirage {t}", (_matchs(lignes, journees),)))
+    return entrees
+
+
+# ---------------- Comparaison ---------------- #
+def _tableau(resultat):
+    if isinstance(resultat, pd.DataFrame):
+        return resultat
+    if isinstance(resultat, pd.Series):
+        return resultat.to_frame("valeur")
+    return pd.DataFrame({"valeur": np.asarray(resultat)})
+
+
+def ecarts(reference, candidat, rtol=TOLERANCE_RELATIVE, atol=TOLERANCE_ABSOLUE):
+    """Différences entre deux résultats (DataFrame, Series, liste ou tuple de ceux-ci).
+
+    Renvoie la liste des différences (vide si équivalents) et le plus grand écart numérique.
+    """
+    if isinstance(reference, tuple):
+        if not isinstance(candidat, tuple) or len(candidat) != len(reference):
+            return [f"tuple de {len(reference)} éléments attendu, obtenu {type(candidat).__name__}"], np.nan
+        differences, ecart_max = [], 0.0
+        for i, (r, c) in enumerate(zip(reference, candidat)):
+            d, e = ecarts(r, c, rtol, atol)
+            differences += [f"[{i}] {message}" for message in d]
+            ecart_max = max(ecart_max, e)
+        return differences, ecart_max
+
+    if type(reference) is not type(candidat) and not all(isinstance(r, (list, np.ndarray)) for r in (reference, candidat)):
+        return [f"type {type(reference).__name__} attendu, obtenu {type(candidat).__name__}"], np.nan
+    reference, candidat = _tableau(reference), _tableau(candidat)
+    if reference.shape != candidat.shape:
+        return [f"forme {reference.shape} attendue, obtenue {candidat.shape}"], np.nan
+    if list(reference.columns) != list(candidat.columns):
+        return [f"colonnes {list(reference.columns)} attendues, obtenues {list(candidat.columns)}"], np.nan
+    differences = []
+    if not reference.index.equals(candidat.index):
+        differences.append("index différent")
+
+    ecart_max = 0.0
+    for col in reference.columns:
+        r, c = reference[col], candidat[col]
+        if r.dtype != c.dtype:
+            differences.append(f"{col} : type {r.dtype} attendu, obtenu {c.dtype}")
+        r, c = r.to_numpy(), c.to_numpy()
+        if r.dtype.kind in "iuf" and c.dtype.kind in "iuf":
+            r, c = r.astype("float64"), c.astype("float64")
+            egaux = np.isclose(r, c, rtol=rtol, atol=atol, equal_nan=True)
+            ecarts_col = np.abs(r - c)[~(np.isnan(r) & np.isnan(c))]
+            if len(ecarts_col):
+                ecart_max = max(ecart_max, np.nanmax(np.where(np.isnan(ecarts_col), np.inf, ecarts_col)))
+        else:
+            egaux = np.array([
+                (a == b) or (pd.isna(a) and pd.isna(b)) if pd.api.types.is_scalar(a) else bool(np.all(a == b))
+                for a, b in zip(r, c)
+            ], dtype=bool)
+        if not egaux.all():
+            i = int(np.flatnonzero(~egaux)[0])
+            differences.append(
+                f"{col} : {int((~egaux).sum())} valeur(s) différente(s), "
+                f"ex. ligne {reference.index[i]!r} : {r[i]!r} attendu, obtenu {c[i]!r}"
+            )
+    return differences, ecart_max
+
+
+def verifier(jeux, moteur="moteur", calculs=None, rtol=TOLERANCE_RELATIVE, atol=TOLERANCE_ABSOLUE):
+    """Exécute référence et moteur sur chaque cas de chaque jeu ; une ligne de rapport par cas.
+
+    `jeux` : {nom du jeu: entrées (voir entrees_tables)} ; `moteur` : module dont les fonctions
+    (nommées dans CALCULS) remplacent les implémentations de référence.
+    """
+    module = importlib.import_module(moteur)
+    rapport = []
+    for nom_jeu, entrees in jeux.items():
+        for nom in calculs or list(CALCULS):
+            entree, reference, nom_fonction = CALCULS[nom]
+            candidat = getattr(module, nom_fonction)
+            for cas, arguments in entrees[entree]:
+                attendu = reference(*arguments)
+                try:
+                    obtenu = candidat(*arguments)
+                except Exception as erreur:
+                    differences, ecart_max = [f"exception {erreur!r}"], np.nan
+                else:
+                    differences, ecart_max = ecarts(attendu, obtenu, rtol, atol)
+                rapport.append({
+                    "jeu": nom_jeu, "calcul": nom, "cas": cas, "lignes": len(arguments[0]),
+                    "ecart_max": ecart_max, "ok": not differences, "differences": " | ".join(differences),
+                })
+    return pd.DataFrame(rapport)
+
+
+def resume(rapport):
+    """Par jeu et par calcul : nombre de cas, lignes traitées, cas en écart et plus grand écart numérique."""
+    return (
+        rapport.groupby(["jeu", "calcul"], sort=False)
+        .agg(cas=("cas", "size"), lignes=("lignes", "sum"), ecarts=("ok", lambda ok: int((~ok).sum())),
+             ecart_max=("ecart_max", "max"))
+        .reset_index()
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare les moteurs de calcul aux implémentations ligne à ligne.")
+    parser.add_argument("--jeux", nargs="+", choices=JEUX, default=JEUX)
+    parser.add_argument("--calculs", nargs="+", choices=list(CALCULS), help="calculs comparés (tous par défaut)")
+    parser.add_argument("--moteur", default="moteur", help="module du moteur comparé (moteur.py par défaut)")
+    parser.add_argument("--donnees", default="csv", help="dossier des CSV réels")
+    parser.add_argument("--echelle", type=float, default=1, help="échelle des données synthétiques")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--rtol", type=float, default=TOLERANCE_RELATIVE)
+    parser.add_argument("--atol", type=float, default=TOLERANCE_ABSOLUE)
+    args = parser.parse_args()
+    # Avertissements pandas des boucles de classement : une ligne par appel, illisible ici
+    warnings.simplefilter("ignore", FutureWarning)
+
+    constructeurs = {
+        "reel": lambda: jeu_reel(args.donnees),
+        "synthetique": lambda: jeu_synthetique(args.echelle, args.graine),
+        "limites": lambda: jeu_limites(args.graine),
+    }
+    rapport = pd.concat([
+        verifier({nom: constructeurs[nom]()}, args.moteur, args.calculs, args.rtol, args.atol)
+        for nom in args.jeux if nom != "reel" or os.path.isdir(args.donnees)
+    ], ignore_index=True)
+    print(resume(rapport).to_string(index=False))
+
+    en_ecart = rapport[~rapport["ok"]]
+    for _, ligne in en_ecart.head(20).iterrows():
+        print(f"\n✗ {ligne['jeu']} / {ligne['calcul']} / {ligne['cas']}\n  {ligne['differences']}")
+    sys.exit(1 if len(en_ecart) else 0)
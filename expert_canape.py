@@ -1,165 +1,36 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import unicodedata
-import matplotlib.pyplot as plt
+import numpy as np
+import plotly.colors as pcolors
 import plotly.graph_objects as go
-from datetime import date
-import xlsxwriter 
+import os
+import threading
 from io import BytesIO
-import plotly.io as pio
+import artefacts
+import pronostics
+import donnees
+import graphiques
+import instrumentation
+import moteur
+import tableaux
+import theme
 
 
 def afficher_classement_visuel(classement, saison_sel, championnat_sel=None):
     # Tri et rang
     classement = classement.sort_values(by="points", ascending=False).reset_index(drop=True)
     classement["Rang"] = classement.index + 1
-    max_points = classement["points"].max()
-
-    # === 🌈 CSS global podium + ranking homogène ===
-    st.markdown("""
-        <style>
-        .ranking-card, .podium-card {
-            background: linear-gradient(135deg, rgba(31,41,55,0.95), rgba(55,65,81,0.9));
-            border: 1px solid rgba(255,255,255,0.05);
-            border-radius: 14px;
-            padding: 10px 16px;
-            margin-bottom: 8px;
-            transition: all 0.25s ease-in-out;
-            width: 95%;
-            max-width: 400px;
-            text-align: left;
-            display: flex;
-            flex-direction: column;
-            gap: 6px;
-            color: white;
-        }
-        .ranking-card:hover, .podium-card:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 0 14px rgba(255,255,255,0.08);
-        }
-
-        .ranking-card h5 {
-            margin: 0;
-            font-size: 15px;
-            font-weight: 600;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-
-        .progress-bar {
-            height: 10px;
-            border-radius: 8px;
-            overflow: hidden;
-            background-color: rgba(255,255,255,0.08);
-            margin-top: 4px;
-        }
-        .progress-fill {
-            height: 100%;
-            border-radius: 8px;
-            transition: width 0.8s ease;
-        }
-
-        .podium-container {
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            gap: 10px;
-            margin: 20px 0 30px 0;
-        }
-
-        /* Couleurs des marches du podium */
-        .podium-1 { background: linear-gradient(135deg, #facc15 20%, #92400e 120%); }
-        .podium-2 { background: linear-gradient(135deg, #a1a1aa 20%, #52525b 120%); }
-        .podium-3 { background: linear-gradient(135deg, #f97316 20%, #78350f 120%); }
-
-        /* Tailles différentes selon le rang */
-        .podium-1 h4 { font-size: 20px; font-weight: 700; }
-        .podium-2 h4 { font-size: 18px; font-weight: 600; }
-        .podium-3 h4 { font-size: 16px; font-weight: 600; }
-        .podium-card div.emoji {
-            margin-right: 8px;
-        }
-        </style>
-    """, unsafe_allow_html=True)
-
-    # === 🥇 Podium vertical sobre + barre de progression ===
-    top3 = classement.head(3)
-    max_points = classement["points"].max() if not classement.empty else 1
-    podium = {1:"🥇", 2:"🥈", 3:"🥉"}
-
-    for i in [1,2,3]:
-        if len(top3) >= i:
-            row = top3.iloc[i-1]
-            progress = row["points"] / max_points if max_points else 0
-            st.markdown(f"""
-                <div class="podium-card podium-{i}">
-                    <div style="display:flex; align-items:center; justify-content:flex-start;">
-                        <div class="emoji">{podium[i]}</div>
-                        <h4>{row['participant_nom']} - {row['points']:.2f} pts</h4>
-                    </div>
-                    <div class="progress-bar">
-                        <div class="progress-fill" style="width:{progress*100:.1f}%;
-                            background: linear-gradient(90deg, #3b82f6, rgba(255,255,255,0.3));">
-                        </div>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
-
-    st.markdown('</div>', unsafe_allow_html=True)
-
-    others = classement.iloc[3:]
-    for i, row in others.iterrows():
-        rang = int(row["Rang"])
-        nom = row["participant_nom"]
-        pts = row["points"]
-        progress = pts / max_points if max_points else 0
-        color = "#3b82f6"
-
-        st.markdown(f"""
-            <div class="ranking-card">
-                <h5>⚽ {rang}. {nom} - {pts:.2f} pts</h5>
-                <div class="progress-bar">
-                    <div class="progress-fill" style="width:{progress*100:.1f}% ;
-                        background: linear-gradient(90deg, {color}, rgba(255,255,255,0.3));">
-                    </div>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-        
+
+    # Un seul bloc HTML (podium + cartes) : un seul message envoyé au navigateur
+    st.markdown(theme.podium_html(classement), unsafe_allow_html=True)
+
+
 def kpi_card(title, value, delta=None, color="#2563eb", width="100%", height="120px"):
-    st.markdown(f"""
-    <div style="
-        background: {color};
-        padding: 20px;
-        border-radius: 16px;
-        box-shadow: 0 4px 20px rgba(0,0,0,0.3);
-        text-align: center;
-        color: white;
-        width: {width};
-        height: {height};       /* Hauteur fixe */
-        display: flex;
-        flex-direction: column;
-        justify-content: center;
-        align-items: center;
-        transition: transform 0.2s;
-    " onmouseover="this.style.transform='scale(1.05)';" 
-        onmouseout="this.style.transform='scale(1)';">
-        <div style="font-size: 16px; font-weight: 500; margin-bottom: 5px;">{title}</div>
-        <div style="font-size: 28px; font-weight: bold;">{value}</div>
-        {"<div style='font-size:14px; opacity:0.8; margin-top:2px;'>{}</div>".format(delta) if delta else ""}
-    </div>
-    """, unsafe_allow_html=True)
-
-def normalize_text(s):
-            if not s or pd.isna(s):
-                return ""
-            s = str(s).lower()
-            s = ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
-            return s.strip()
-        
+    # Dimensions par défaut portées par la classe .carte-kpi du thème
+    style = ("" if width == "100%" else f"width: {width};") + ("" if height == "120px" else f"height: {height};")
+    theme.carte(value, titre=title, sous_titre=delta, fond=color, style=style)
+
+# Barèmes ligne à ligne : référence des versions vectorisées de moteur.py (vérifiées par equivalence.py)
 def calcul_points(r):
     if pd.isna(r.match_dom) or pd.isna(r.match_ext):
         return 0
@@ -332,557 +203,594 @@ def cote_prono_correct(r):
     else:
         return r.cote_nul
 
-def color_cells(val, row_name):
-    if row_name == "Classement":
-        # Vert si top 1, jaune si top 3, rouge sinon
-        if val == 1:
-            color = 'background-color: #b2f2bb'  # vert clair
-        elif val <= 3:
-            color = 'background-color: #fff3bf'  # jaune clair
-        else:
-            color = 'background-color: #ffa8a8'  # rouge clair
-    elif row_name == "Écart avec Leader":
-        # Dégradé vert-rouge selon l'écart
-        if val <= 1:
-            color = 'background-color: #b2f2bb'
-        elif val <= 3:
-            color = 'background-color: #fff3bf'
-        else:
-            color = 'background-color: #ffa8a8'
-    else:
-        color = ''
-    return color
-    
-def show(tables):
-    st.title("📊 Les Experts du Canapé")
-    tabs_1, tabs_2 = st.tabs(["Classement/Visualisation", "Export Excel"])
-    
-    # ---------------------- ONGLET 1 : PAR COMPÉTITION ----------------------
-    with tabs_1:
-        
-        # --- ⚡ CSS Glow Reactive Edition : Selectbox + Slider + Animation dynamique ---
-        st.markdown("""
-            <style>
-            /* === Animations === */
-            @keyframes fadeIn {
-                from { opacity: 0; transform: translateY(-8px); }
-                to { opacity: 1; transform: translateY(0); }
-            }
-            @keyframes glowPulse {
-                0%,100% { box-shadow: 0 0 0px var(--glow-color, transparent); }
-                50% { box-shadow: 0 0 16px var(--glow-color, transparent); }
-            }
-
-            /* === Icônes colorées avant les labels === */
-            label[data-testid="stWidgetLabel"] {
-                font-weight: 600;
-                font-size: 15px !important;
-                margin-bottom: 6px !important;
-                display: flex;
-                align-items: center;
-                gap: 6px;
-                color: #e5e7eb !important;
-            }
-
-            label[data-testid="stWidgetLabel"]:has(span:contains('Saison'))::before {
-                content: "📅"; color: #f59e0b;
-            }
-            label[data-testid="stWidgetLabel"]:has(span:contains('championnat'))::before {
-                content: "🏆"; color: #3b82f6;
-            }
-            label[data-testid="stWidgetLabel"]:has(span:contains('journée'))::before {
-                content: "📖"; color: #8b5cf6;
-            }
-            label[data-testid="stWidgetLabel"]:has(span:contains('participants'))::before {
-                content: "👑"; color: #facc15;
-            }
-
-            label[data-testid="stWidgetLabel"]::before {
-                font-size: 18px;
-                transition: transform 0.3s ease, filter 0.3s ease;
-            }
-            label[data-testid="stWidgetLabel"]:hover::before {
-                transform: scale(1.25) rotate(10deg);
-                filter: brightness(1.3);
-            }
-
-            /* === Selectbox base === */
-            div[data-baseweb="select"] > div {
-                background-color: #1f2937 !important;
-                border: 1px solid #374151 !important;
-                border-radius: 10px !important;
-                color: white !important;
-                height: 42px !important;
-                transition: all 0.25s ease-in-out;
-            }
-
-            /* === Hover (lueur douce) === */
-            div[data-baseweb="select"] > div:hover {
-                border-color: var(--glow-color, #3b82f6) !important;
-                box-shadow: 0 0 10px var(--glow-color, #3b82f688);
-            }
-
-            /* === Animation pulsante au focus === */
-            div[data-baseweb="select"]:focus-within > div {
-                animation: glowPulse 1s ease-in-out;
-                border-color: var(--glow-color, #3b82f6) !important;
-            }
-
-            /* === Couleurs personnalisées par type === */
-            div[data-testid="stSelectbox"]:has(label:has(span:contains('Saison'))) div[data-baseweb="select"] { --glow-color: #f59e0b; }
-            div[data-testid="stSelectbox"]:has(label:has(span:contains('championnat'))) div[data-baseweb="select"] { --glow-color: #3b82f6; }
-            div[data-testid="stSelectbox"]:has(label:has(span:contains('journée'))) div[data-baseweb="select"] { --glow-color: #8b5cf6; }
-            div[data-testid="stSelectbox"]:has(label:has(span:contains('participants'))) div[data-baseweb="select"] { --glow-color: #facc15; }
-
-            /* === Menu déroulant (fade-in + style propre) === */
-            ul[role="listbox"] {
-                background-color: #111827 !important;
-                border: 1px solid #374151 !important;
-                border-radius: 10px !important;
-                padding: 4px;
-                animation: fadeIn 0.3s ease-in-out;
-            }
-            li[role="option"] {
-                color: #f3f4f6 !important;
-                font-size: 14px;
-                padding: 8px 12px !important;
-                border-radius: 6px;
-                transition: background 0.15s, transform 0.1s;
-            }
-            li[role="option"]:hover {
-                background-color: #2563eb !important;
-                color: white !important;
-                transform: scale(1.02);
-            }
-
-            /* === Slider === */
-            div[data-baseweb="slider"] div[role="slider"] {
-                background-color: #facc15 !important;
-                box-shadow: 0 0 8px rgba(250,204,21,0.6);
-                transition: all 0.3s ease;
-            }
-            div[data-baseweb="slider"] div[role="slider"]:hover {
-                background-color: #fde047 !important;
-                box-shadow: 0 0 12px rgba(250,204,21,0.8);
-            }
-            </style>
-        """, unsafe_allow_html=True)
-
-        # --- Charger les CSV une seule fois --- #
-        df_matchs = tables["all_matchs_football"]
-        df_pronos = tables["all_pronostics"]
-
-
-        # --- Nettoyage rapide --- #
-        for col in ["saison", "competition", "journee"]:
-            if col in df_matchs.columns:
-                df_matchs[col] = df_matchs[col].astype(str)
+def pastilles_seuils(valeurs, textes, seuil_vert, seuil_jaune):
+    """Textes précédés d'une pastille : verte jusqu'au premier seuil, jaune jusqu'au second, rouge au-delà."""
+    valeurs = np.asarray(valeurs, dtype=float)
+    return tableaux.pastilles(
+        textes, [valeurs <= seuil_vert, valeurs <= seuil_jaune, ~np.isnan(valeurs)],
+        [tableaux.VERT, tableaux.JAUNE, tableaux.ROUGE]
+    ).to_numpy()
 
-        # --- ONGLET 1 --- #
-        with tabs_1:
+# ---------------- Export Excel ---------------- #
+COLONNES_EXPORT = ["Equipe domicile", "Score domicile", "Score extérieur", "Equipe extérieure"]
+# Classeurs de saison complète, écrits sur disque et servis tant que la version de la saison ne change pas
+DOSSIER_EXPORTS = os.path.join("cache", "exports")
 
-            # --- CSS (inchangé) --- #
-            st.markdown("""<style> ... ton style CSS complet ici ... </style>""", unsafe_allow_html=True)
 
-            # === 🎛️ Sélecteurs === #
-            col1, col2, col3, col4 = st.columns(4)
+def tableau_export(matchs):
+    """Matchs d'une journée dans les colonnes de la feuille exportée (textes, vides sans score)."""
+    df_export = matchs.sort_values(["equipe_domicile_nom", "equipe_exterieure_nom"])[[
+        "equipe_domicile_nom",
+        "score_domicile",
+        "score_exterieur",
+        "equipe_exterieure_nom"
+    ]]
+    df_export.columns = COLONNES_EXPORT
+    # Remplacer les NaN par des chaînes vides pour éviter les erreurs Excel
+    return df_export.fillna("").astype(str)
 
-            # --- Sélection de la saison --- #
-            with col1:
-                saisons = sorted(df_matchs["saison"].unique(), reverse=True)
-                saison_sel = st.selectbox("Sélectionner une saison", saisons)
 
-            # --- Sélection du championnat --- #
-            with col2:
-                championnats = df_matchs[df_matchs["saison"] == saison_sel]["competition"].dropna().unique().tolist()
-                championnats = ["Toutes"] + sorted(championnats)
-                default_champ = "Ligue 1" if "Ligue 1" in championnats else "Toutes"
-                championnat_sel = st.selectbox("Sélectionner un championnat", championnats, index=championnats.index(default_champ))
+@st.cache_data(show_spinner=False, max_entries=64)
+def classeur_export(df_export, saison_sel, competition_sel, journee_sel):
+    """Fichier xlsx d'une journée, généré au premier téléchargement puis mis en cache par sélection."""
+    return ecrire_classeur(df_export, saison_sel, competition_sel, journee_sel)
 
-            # --- Sélection de la journée --- #
-            with col3:
-                if championnat_sel == "Toutes":
-                    journees = df_matchs[df_matchs["saison"] == saison_sel]["journee"].dropna().unique()
-                else:
-                    journees = df_matchs[
-                        (df_matchs["saison"] == saison_sel) &
-                        (df_matchs["competition"] == championnat_sel)
-                    ]["journee"].dropna().unique()
 
-                # Convertir en int et trier
-                try:
-                    journees = sorted(map(int, journees))
-                except ValueError:
-                    journees = sorted(journees)  # Si ce sont des strings
-                journee_sel = st.selectbox("Sélectionner une journée", ["Toutes"] + [str(j) for j in journees])
+def ecrire_classeur(df_export, saison_sel, competition_sel, journee_sel, fichier=None):
+    """Contenu du fichier xlsx (titre, en-têtes, zébrage) des matchs de `df_export`.
 
-            with col4:
-                top_n = st.slider("Afficher les meilleurs participants", 1, 20, 10)
+    Écrit dans `fichier` (chemin) s'il est donné, sinon renvoie les octets du classeur.
+    """
+    return ecrire_journees([(journee_sel, df_export)], saison_sel, competition_sel, fichier)
 
-            st.markdown("---")
 
-            # --- 🔍 Filtrer la saison et le championnat, mais PAS la journée (pour permettre le cumul) --- #
-            df_filtre = df_matchs[df_matchs["saison"] == saison_sel].copy()
-            if championnat_sel != "Toutes":
-                df_filtre = df_filtre[df_filtre["competition"] == championnat_sel]
+def ecrire_journees(journees, saison_sel, competition_sel, fichier=None):
+    """Classeur xlsx d'une feuille par journée, pour des (journée, df_export) dans l'ordre des feuilles.
 
-            # --- Fusion avec les pronostics (on garde tous les matchs de la saison filtrée) --- #
-            if "match_id" not in df_filtre.columns or "match_id" not in df_pronos.columns:
-                st.warning("Impossible de faire le merge : la colonne 'match_id' est manquante")
-                return
+    Mode constant_memory de xlsxwriter : chaque ligne est écrite sur disque dès que la suivante
+    commence, la mémoire ne dépend pas du nombre de journées. Les formats sont créés une fois
+    pour le classeur ; les cellules sont lues colonne par colonne puis écrites ligne par ligne,
+    dans l'ordre qu'impose ce mode. Écrit dans `fichier` (chemin), sinon renvoie les octets.
+    """
+    # xlsxwriter n'est importé qu'ici, à la première génération d'export
+    import xlsxwriter
 
-            df_merge = df_pronos.merge(
-                df_filtre,
-                on="match_id",
-                suffixes=("_prono", "_match"),
-                how="inner"
-            )
+    output = fichier or BytesIO()
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
 
-            if df_merge.empty:
-                st.info("Aucun pronostic enregistré pour cette sélection.")
-                return
+    # === Styles ===
+    title_format = workbook.add_format({
+        "bold": True, "font_size": 14, "align": "center", "valign": "vcenter",
+        "bg_color": "#004c91", "font_color": "white"
+    })
+    header_format = workbook.add_format({
+        "bold": True, "bg_color": "#6fa8dc", "border": 1,
+        "align": "center", "valign": "vcenter"
+    })
+    # Alignement des colonnes (domicile à droite, scores centrés, extérieur à gauche), zébrage une ligne sur deux
+    alignements = ["right", "center", "center", "left"]
+    formats = [
+        [workbook.add_format({"align": a, "valign": "vcenter", "border": 1}) for a in alignements],
+        [workbook.add_format({"align": a, "valign": "vcenter", "border": 1, "bg_color": "#dce6f1"}) for a in alignements],
+    ]
 
-            # --- Préparation du DataFrame final --- #
-            df = df_merge[[
-                "participant_id", "participant_nom",
-                "score_domicile_prono", "score_exterieur_prono",
-                "score_domicile_match", "score_exterieur_match",
-                "equipe_domicile_nom", "equipe_exterieure_nom",
-                "cote_domicile", "cote_exterieur", "cote_nul",
-                "journee_match", "saison_match", "competition"
-            ]].rename(columns={
-                "score_domicile_prono": "prono_dom",
-                "score_exterieur_prono": "prono_ext",
-                "score_domicile_match": "match_dom",
-                "score_exterieur_match": "match_ext"
-            })
+    for journee_sel, df_export in journees:
+        worksheet = workbook.add_worksheet("Pronostics" if len(journees) == 1 else f"J{journee_sel}")
 
-            # Convertir les journées en int
-            df["journee_match"] = pd.to_numeric(df["journee_match"], errors="coerce")
-            df = df.dropna(subset=["journee_match"])
-            df["journee_match"] = df["journee_match"].astype(int)
+        # === Largeur automatique ===
+        for i, col in enumerate(df_export.columns):
+            max_len = max(df_export[col].str.len().max() if len(df_export) else 0, len(col)) + 2
+            worksheet.set_column(i, i, max_len)
 
-            # --- Calcul des points individuels --- #
-            df["points"] = df.apply(calcul_points, axis=1)
+        # === Titre fusionné ===
+        titre = f"{competition_sel} - Saison {saison_sel} - Journée {journee_sel}"
+        worksheet.merge_range("A1:D1", titre, title_format)
 
-            # --- Calcul des points par journée et cumul --- #
-            df_progress_all = (
-                df.groupby(["participant_nom", "journee_match"])
-                .apply(calcul_points_journee)
-                .reset_index()
-                .sort_values(["participant_nom", "journee_match"])
-            )
-            df_progress_all["points_cumul"] = df_progress_all.groupby("participant_nom")["points"].cumsum()
+        # === En-têtes ===
+        worksheet.write_row(2, 0, list(df_export.columns), header_format)
 
-            # --- 🧮 Filtrage jusqu’à la journée sélectionnée --- #
-            if journee_sel != "Toutes":
-                try:
-                    journee_num = int(journee_sel)
-                    df_progress_filtered = df_progress_all[df_progress_all["journee_match"] <= journee_num]
-                except ValueError:
-                    df_progress_filtered = df_progress_all.copy()
-            else:
-                df_progress_filtered = df_progress_all.copy()
+        # === Alignement + zébrage ===
+        colonnes = [df_export[col].tolist() for col in df_export.columns]
+        for row_num, ligne in enumerate(zip(*colonnes)):
+            fmts = formats[row_num % 2]
+            for col_num, valeur in enumerate(ligne):
+                worksheet.write(row_num + 3, col_num, valeur, fmts[col_num])
 
-            # --- 🏆 Classement cumulé jusqu’à la journée choisie --- #
-            classement = (
-                df_progress_filtered.groupby("participant_nom", as_index=False)["points_cumul"]
-                .max()  # le cumul max = total jusqu’à cette journée
-                .sort_values(by="points_cumul", ascending=False)
-                .reset_index(drop=True)
-            )
-            classement.rename(columns={"points_cumul": "points"}, inplace=True)
-            classement["Rang"] = classement.index + 1
+    workbook.close()
+    return None if fichier else output.getvalue()
 
-        # --- KPI ---
-        nb_matchs = df_filtre["match_id"].nunique()
-        nb_pronos = len(df)
-        nb_participants = df["participant_nom"].nunique()
-        total_points = df_progress_all["points"].sum()
-        moyenne_points_joueur = total_points / nb_participants if nb_participants else 0
 
-        kpi_cols = st.columns([1.2, 1, 1, 1])
-        with kpi_cols[0]: kpi_card("🏟️ Matchs", nb_matchs, color="#3b82f6")
-        with kpi_cols[1]: kpi_card("🧾 Pronostics", nb_pronos, color="#22c55e")
-        with kpi_cols[2]: kpi_card("👥 Participants", nb_participants, color="#f59e0b")
-        with kpi_cols[3]: kpi_card("🎯 Moy. pts/joueur", f"{moyenne_points_joueur:.2f}", color="#2563eb")
+def octets_export_saison(_tables, saison_sel, competition_sel, version=None):
+    """Octets du classeur de toutes les journées d'une compétition, écrit sur disque au premier téléchargement.
 
-        st.markdown("---")
+    Le fichier est relu tant que la version des données de la saison ne change pas. Les octets sont
+    lus ici, jamais par l'appelant : une autre session qui reconstruit la sélection et supprime
+    l'ancienne version ne peut pas retirer un fichier entre son choix et sa lecture.
+    """
+    nom = f"{competition_sel}_{saison_sel}".replace("/", "-").replace(" ", "_")
+    chemin = os.path.join(DOSSIER_EXPORTS, f"{nom}_{version}.xlsx")
+    if version is not None:
+        try:
+            # Fichier ouvert : sa suppression par une autre session n'interrompt pas la lecture
+            with open(chemin, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+
+    matchs = donnees.types_calcul(
+        _tables.selection("all_matchs_football", saison=saison_sel, competition=competition_sel)
+    )
+    journees = [(int(j), tableau_export(g)) for j, g in matchs.groupby("journee_int", sort=True)]
+    os.makedirs(DOSSIER_EXPORTS, exist_ok=True)
+    # Fichier temporaire puis renommage : un téléchargement concurrent ne lit jamais un classeur partiel
+    temporaire = f"{chemin}.{os.getpid()}.{threading.get_ident()}.tmp"
+    ecrire_journees(journees, saison_sel, competition_sel, temporaire)
+    with open(temporaire, "rb") as f:
+        octets = f.read()
+    os.replace(temporaire, chemin)
+    # Classeurs des versions précédentes de la même sélection (déjà supprimés par une autre
+    # session, ou encore ouverts sous Windows : laissés pour la prochaine reconstruction)
+    for ancien in os.listdir(DOSSIER_EXPORTS):
+        if ancien.startswith(f"{nom}_") and ancien.endswith(".xlsx") and ancien != os.path.basename(chemin):
+            try:
+                os.remove(os.path.join(DOSSIER_EXPORTS, ancien))
+            except OSError:
+                pass
+    return octets
+
+
+# ---------------- Points des pronostics ---------------- #
+def pronostics_matchs(df_pronos, df_matchs):
+    """Pronostics joints à leurs matchs (prono_dom / prono_ext, match_dom / match_ext, cotes), None sans pronostic."""
+    # --- Fusion avec les pronostics (on garde tous les matchs de la sélection) --- #
+    df_merge = df_pronos.merge(
+        df_matchs,
+        on="match_id",
+        suffixes=("_prono", "_match"),
+        how="inner"
+    )
 
-        # --- Affichage classement et progression ---
-        st.subheader(
-            f"Classement {'global' if journee_sel == 'Toutes' else f'jusqu’à la journée {journee_sel}'} – "
-            f"{'toutes compétitions' if championnat_sel == 'Toutes' else championnat_sel} – {saison_sel}"
-        )
+    if df_merge.empty:
+        return None
+    return colonnes_pronostics(df_merge)
+
+
+def colonnes_pronostics(df_merge):
+    """Colonnes de calcul des points d'une fusion pronostics × matchs ; journées inconnues écartées."""
+    # --- Préparation du DataFrame final --- #
+    df = df_merge[[
+        "participant_id", "participant_nom",
+        "score_domicile_prono", "score_exterieur_prono",
+        "score_domicile_match", "score_exterieur_match",
+        "equipe_domicile_nom", "equipe_exterieure_nom",
+        "cote_domicile", "cote_exterieur", "cote_nul",
+        "journee_int", "saison", "competition"
+    ]].rename(columns={
+        "score_domicile_prono": "prono_dom",
+        "score_exterieur_prono": "prono_ext",
+        "score_domicile_match": "match_dom",
+        "score_exterieur_match": "match_ext",
+        "journee_int": "journee_match",
+        "saison": "saison_match"
+    })
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            afficher_classement_visuel(classement, saison_sel, championnat_sel if championnat_sel != "Toutes" else None)
+    # Journées entières déjà calculées au chargement : on écarte seulement les inconnues
+    df = df[df["journee_match"] != donnees.JOURNEE_INCONNUE]
+    return df
 
-        with col2:
-            st.markdown('')
-            st.markdown('')
-            df_cumul = classement[["participant_nom", "Rang", "points"]].merge(
-                df_progress_all.groupby("participant_nom")["points_cumul"].apply(list).reset_index(),
-                on="participant_nom"
-            )
-            
-            # Conversion en int pour trier correctement
-            df_progress_all["journee_match"] = df_progress_all["journee_match"].astype(int)
 
-            # Tri par journée ascendant
-            df_progress_all = df_progress_all.sort_values(["journee_match", "participant_nom"]).reset_index(drop=True)
+# ---------------- Résultats de la saison (indépendants du participant) ---------------- #
+def calculer_resultats_saison(df_pronos, df_matchs, saison_sel, championnat_sel):
+    """(nombre de matchs, pronostics avec points, progression par journée) d'une saison et d'un championnat.
+
+    `df_pronos` : vue des pronostics (pronostics.vue_pronostics). Renvoie None sans pronostic.
+    """
+    # --- 🔍 Filtrer la saison et le championnat, mais PAS la journée (pour permettre le cumul) --- #
+    df_filtre = donnees.types_calcul(df_matchs[df_matchs["saison"] == saison_sel])
+    if championnat_sel != "Toutes":
+        df_filtre = df_filtre[df_filtre["competition"] == championnat_sel]
+
+    df = pronostics_matchs(df_pronos, df_filtre)
+    if df is None:
+        return None
+
+    # --- Calcul des points individuels, puis par journée et cumul --- #
+    df["points"] = moteur.points_pronostics(df)
+    df_progress_all = moteur.progression_journees(df)
+    return df_filtre["match_id"].nunique(), df, df_progress_all
+
+
+def resultats_points(df_points, df_progress_all, nb_matchs):
+    """Comme calculer_resultats_saison, à partir de la fusion notée et des cumuls calculés par le stockage SQL.
+
+    `df_points` : tables.pronostics_points (colonnes de la fusion, plus _points et _avec_cotes) ;
+    `df_progress_all` : tables.pronostics_progression (points par participant et par journée).
+    """
+    if df_points.empty:
+        return None
+    df = colonnes_pronostics(df_points)
+    # Points entiers quand aucun pronostic retenu n'a de cote (comme moteur.points_pronostics)
+    points = df_points.loc[df.index, "_points"]
+    df["points"] = points if df_points.loc[df.index, "_avec_cotes"].any() else points.astype("int64")
+    return nb_matchs, df, df_progress_all
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+@instrumentation.mesure("calcul.resultats_saison")
+def resultats_saison(_tables, saison_sel, championnat_sel, version=None):
+    """Points par pronostic, progression et classements par journée pour une saison et un championnat.
+
+    Mis en cache par (saison, championnat, version des données de la saison) : changer de participant ou de journée
+    ne refait ni la fusion ni le calcul des points. Lus dans les précalculs (precalculs.py) quand
+    ils existent pour cette version. Renvoie None sans pronostic.
+    """
+    resultats = artefacts.resultats_expert(version, saison_sel, championnat_sel)
+    if resultats is None:
+        # Seuls les matchs de la saison et leurs pronostics sont lus dans le stockage des tables
+        filtres = {"saison": saison_sel}
+        if championnat_sel != "Toutes":
+            filtres["competition"] = championnat_sel
+        df_points = _tables.pronostics_points(**filtres)
+        if df_points is not None:
+            # Fusion, points, bonus de journée et cumuls calculés par le moteur SQL
+            nb_matchs = len(_tables.valeurs("all_matchs_football", "match_id", **filtres))
+            resultats = resultats_points(df_points, _tables.pronostics_progression(**filtres), nb_matchs)
+        else:
+            df_pronos = pronostics.vue_pronostics(_tables.store_pronostics(**filtres), _tables["participants"])
+            df_matchs = _tables.selection("all_matchs_football", saison=saison_sel)
+            resultats = calculer_resultats_saison(df_pronos, df_matchs, saison_sel, championnat_sel)
+        if resultats is None:
+            return None
+    nb_matchs, df, df_progress_all = resultats
+
+    # --- Matrice participant × journée (rangs, cumuls, leader) partagée par les graphiques ---
+    matrice = moteur.matrice_classements(df_progress_all)
+
+    return nb_matchs, df, df_progress_all, matrice
+
+
+# ---------------- Historique d'un participant (toutes saisons) ---------------- #
+# Colonnes de regroupement des points de l'historique (Section 4)
+COLONNES_HISTORIQUE = ["participant_id", "competition", "saison_match", "journee_match"]
 
-            # Calcul de la moyenne cumulée
-            df_moyenne = (
-                df_progress_all.groupby("journee_match")["points"]
-                .mean()
-                .cumsum()
-                .reset_index()
-            )
-            df_moyenne = df_moyenne.rename(columns={"points": "points_cumul_moyenne"})
 
+def points_historique(df_pronos, df_matchs):
+    """Points des pronostics par participant, compétition, saison et journée (sans bonus de journée).
+
+    `df_pronos` : vue des pronostics (pronostics.vue_pronostics), joints à leurs matchs de `df_matchs`.
+    """
+    df = df_pronos.merge(df_matchs, on="match_id", suffixes=("_prono", "_match"))
+    df = donnees.types_calcul(df[[
+        "participant_id",
+        "score_domicile_prono",
+        "score_exterieur_prono",
+        "score_domicile_match",
+        "score_exterieur_match",
+        "cote_domicile",
+        "cote_exterieur",
+        "cote_nul",
+        "journee_int",
+        "saison",
+        "competition",
+    ]].rename(columns={
+        "score_domicile_prono": "prono_dom",
+        "score_exterieur_prono": "prono_ext",
+        "score_domicile_match": "match_dom",
+        "score_exterieur_match": "match_ext",
+        "journee_int": "journee_match",
+        "saison": "saison_match"
+    }))
+    df["points"] = moteur.points_pronostics(df)
+    return df.groupby(COLONNES_HISTORIQUE, sort=True, as_index=False)["points"].sum()
+
+
+@instrumentation.mesure("calcul.historique_participant")
+def historique_participant(tables, participant_id, championnat_sel):
+    """Points par saison et journée d'un participant, toutes saisons confondues.
+
+    Lus dans les précalculs (famille « historiques », une partition par saison) quand toutes les
+    saisons sont à jour ; sinon calculés depuis ses seuls pronostics et leurs matchs.
+    """
+    versions = {saison: tables.version_saison(saison) for saison in tables.valeurs("all_matchs_football", "saison")}
+    df = artefacts.historique(versions, participant_id)
+    if df is None:
+        store_participant = tables.store_pronostics(participant_id)
+        df = points_historique(
+            pronostics.vue_pronostics(store_participant, tables["participants"]),
+            tables.selection("all_matchs_football",
+                             match_id=pronostics.match_ids_pronostiques(store_participant).unique())
+        )
+    if championnat_sel != "Toutes":
+        df = df[df["competition"] == championnat_sel]
+    return df.sort_values(["saison_match", "journee_match"], kind="stable").reset_index(drop=True)
+
+
+@st.fragment
+@instrumentation.fragment("rendu.comparaison_saisons")
+def comparaison_saisons(df_historique, participant_sel, saison_sel, championnat_sel, version):
+    """Section 4 : le choix des saisons à comparer ne redessine que ce graphique."""
+    # --- Comparaison progression joueur par saison ---
+    st.markdown("### 📊 Comparaison des saisons du joueur")
+
+    saisons_disponibles = sorted(df_historique["saison_match"].unique(), reverse=True)
+    default_saisons = [saison_sel] if saison_sel in saisons_disponibles else []
+
+    saisons_sel = st.multiselect(
+        "Sélectionnez les saisons à comparer",
+        options=saisons_disponibles,
+        default=default_saisons,
+        key=f"saisons_compare_{participant_sel}"
+    )
+
+    if not saisons_sel:
+        st.warning("Veuillez sélectionner au moins une saison pour l'affichage.")
+    else:
+        def construire():
             fig = go.Figure()
-            colors = px.colors.qualitative.Safe
+            couleurs_prev = pcolors.qualitative.Pastel
+            idx_couleur = 0
 
-            for i, (_, row) in enumerate(df_cumul.head(top_n).iterrows()):
-                fig.add_trace(go.Scatter(
-                    x=list(range(1, len(row["points_cumul"])+1)),
-                    y=row["points_cumul"],
-                    mode='lines+markers',
-                    name=row["participant_nom"],
-                    line=dict(color=colors[i % len(colors)], width=3),
-                    marker=dict(size=8)
-                ))
-                
-            x_moy = [0] + df_moyenne["journee_match"].tolist()
-            y_moy = [0] + df_moyenne["points_cumul_moyenne"].tolist()
-            max_journee = max(df_moyenne["journee_match"]) + 1
+            for saison in saisons_sel:
+                df_saison = df_historique[df_historique["saison_match"] == saison].copy()
+                if df_saison.empty:
+                    continue
 
-            fig.add_trace(go.Scatter(
-                x=df_moyenne["journee_match"],
-                y=df_moyenne["points_cumul_moyenne"],
-                mode='lines+markers',
-                name="Moyenne championnat",
-                line=dict(color="dodgerblue", width=3, dash="dot"),
-                marker=dict(size=7)
-            ))
+                # Tri et conversion en int pour les journées
+                df_saison["journee_match"] = df_saison["journee_match"].astype(int)
+                df_saison = df_saison.sort_values("journee_match").reset_index(drop=True)
+
+                # --- Calcul cumulatif par journée ---
+                df_saison = df_saison.groupby("journee_match", as_index=False)["points"].sum()
+                df_saison["points_cumul"] = df_saison["points"].cumsum()
+
+                # Traces
+                if saison == saison_sel:
+                    fig.add_trace(go.Scatter(
+                        x=df_saison["journee_match"],
+                        y=df_saison["points_cumul"],
+                        mode="lines+markers",
+                        name=f"Saison {saison} (actuelle)",
+                        line=dict(color="limegreen", width=4),
+                        marker=dict(size=10, symbol="circle"),
+                        hovertemplate="Journée: %{x}<br>Points cumulés: %{y:.2f}<br>Points journée: %{customdata[0]:.2f}<extra></extra>",
+                        customdata=df_saison[["points"]].values
+                    ))
+                else:
+                    couleur = couleurs_prev[idx_couleur % len(couleurs_prev)]
+                    idx_couleur += 1
+                    fig.add_trace(go.Scatter(
+                        x=df_saison["journee_match"],
+                        y=df_saison["points_cumul"],
+                        mode="lines+markers",
+                        name=f"Saison {saison} (précédente)",
+                        line=dict(color=couleur, width=2, dash="dash"),
+                        marker=dict(size=7, symbol="circle"),
+                        opacity=0.6,
+                        hovertemplate="Journée: %{x}<br>Points cumulés: %{y:.2f}<br>Points journée: %{customdata[0]:.2f}<extra></extra>",
+                        customdata=df_saison[["points"]].values
+                    ))
 
             fig.update_layout(
-                xaxis=dict(title="Journée", tickmode="linear", range=[0, max_journee]),
-                yaxis=dict(title="Points cumulés"),
-                plot_bgcolor="black",
+                title=f"Progression cumulée de {participant_sel} par saison",
+                xaxis_title="Journée",
+                yaxis_title="Points cumulés",
+                xaxis=dict(range=[0, df_historique["journee_match"].max() + 1]),  # X commence à 0 et va jusqu'à max +1
                 hovermode="x unified",
+                template="plotly_white",
                 height=450,
-                margin=dict(l=40, r=40, t=50, b=40),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+                legend=dict(title="Saisons", x=0.01, y=0.99),
+                margin=dict(l=50, r=50, t=60, b=50)
             )
+            return fig
 
-            st.plotly_chart(fig, use_container_width=True)
+        graphiques.afficher_figure(
+            graphiques.cle_figure("comparaison_saisons", saison_sel, championnat_sel, None, participant_sel, version,
+                                  tuple(saisons_sel)),
+            construire, use_container_width=True
+        )
 
-        st.markdown("---")
-        
-        # === 📍 SECTION 2 ===        
-        col1, col2 = st.columns([1,3])
-        with col1:
-            # --- Sélection du participant ---
-            st.markdown("   ")
-            st.markdown("   ")
-            participants = classement["participant_nom"].tolist()
-            participant_sel = st.selectbox("Sélectionner un participant :", participants)
-
-            # --- Sélection de la journée via CSV / DataFrame ---
-            if championnat_sel == "Toutes":
-                journees = df_matchs[df_matchs["saison"] == saison_sel]["journee_match"].dropna().unique()
-            else:
-                journees = df_matchs[
-                    (df_matchs["saison"] == saison_sel) &
-                    (df_matchs["competition"] == championnat_sel)
-                ]["journee"].dropna().unique()
+@st.fragment
+@instrumentation.fragment("rendu.sections_participant")
+def sections_participant(df, df_progress_all, matrice, classement, tables,
+                         saison_sel, championnat_sel, journee_sel, version):
+    """Sections 2 à 7, propres au participant sélectionné.
 
-            # Tri croissant
-            journees = sorted([int(j) for j in journees])
-            
-            # Conversion en chaîne pour la selectbox
-            journee_filtre = st.selectbox("Filtrer par journée :", [str(j) for j in journees])
+    Fragment : changer de participant ou de journée filtrée ne relance que ces
+    sections, à partir des résultats de saison déjà calculés.
+    """
+    # === 📍 SECTION 2 ===        
+    instrumentation.etape("section_2")
+    col1, col2 = st.columns([1,3])
+    with col1:
+        # --- Sélection du participant ---
+        st.markdown("   ")
+        st.markdown("   ")
+        participants = classement["participant_nom"].tolist()
+        participant_sel = st.selectbox("Sélectionner un participant :", participants)
+
+        # --- Sélection de la journée via CSV / DataFrame ---
+        if championnat_sel == "Toutes":
+            journees = tables.valeurs("all_matchs_football", "journee_int", saison=saison_sel)
+        else:
+            journees = tables.valeurs("all_matchs_football", "journee_int", saison=saison_sel, competition=championnat_sel)
 
-            # --- Filtrer les données du joueur sélectionné ---
-        df_participant = df[df["participant_nom"] == participant_sel].copy()
+        # Tri croissant
+        journees = sorted(int(j) for j in journees if j != donnees.JOURNEE_INCONNUE)
 
-        if journee_filtre != "Toutes":
-            df_participant = df_participant[df_participant["journee_match"].astype(str) == journee_filtre]
+        # Conversion en chaîne pour la selectbox
+        journee_filtre = st.selectbox("Filtrer par journée :", [str(j) for j in journees])
 
-        if journee_sel != "Toutes":
-            df_participant = df_participant[df_participant["journee_match"] == int(journee_sel)]
+        # --- Filtrer les données du joueur sélectionné ---
+    df_participant = df[df["participant_nom"] == participant_sel].copy()
 
-        if df_participant.empty:
-            st.warning("Aucun pronostic trouvé pour ce joueur sur cette journée.")
-        else:
-            # --- Recalcul des points de chaque match ---
-            df["points"] = df.apply(calcul_points, axis=1)
+    if journee_filtre != "Toutes":
+        df_participant = df_participant[df_participant["journee_match"].astype(str) == journee_filtre]
 
-            journee_courante = df_participant["journee_match"].iloc[0]
-            df_journee = df[df["journee_match"] == journee_courante].copy()
+    if journee_sel != "Toutes":
+        df_participant = df_participant[df_participant["journee_match"] == int(journee_sel)]
 
-            # --- Points sans bonus (somme brute) ---
-            points_sans_bonus = (df_journee.groupby("participant_nom")["points"].sum().reset_index().rename(columns={"points": "points_bruts"}))
+    if df_participant.empty:
+        st.warning("Aucun pronostic trouvé pour ce joueur sur cette journée.")
+    else:
+        # --- Points de chaque match : déjà calculés avec les résultats de la saison ---
+        journee_courante = df_participant["journee_match"].iloc[0]
+        df_journee = df[df["journee_match"] == journee_courante].copy()
 
-            # --- Application du bonus avec calcul_points_journee ---
-            df_journee_bonus = (df_journee.groupby("participant_nom").apply(calcul_points_journee).reset_index())
-            df_journee_bonus = df_journee_bonus.rename(columns={"points": "points_bonus"})
+        # --- Points sans bonus (somme brute) ---
+        points_sans_bonus = (df_journee.groupby("participant_nom")["points"].sum().reset_index().rename(columns={"points": "points_bruts"}))
 
-            # --- Fusion des deux jeux de points ---
-            classement_journee = pd.merge(points_sans_bonus, df_journee_bonus, on="participant_nom", how="left")
+        # --- Application du bonus de journée (moteur.progression_journees) ---
+        df_journee_bonus = moteur.progression_journees(df_journee.assign(journee_match=journee_courante))
+        df_journee_bonus = df_journee_bonus.drop(columns=["journee_match", "points_cumul"]).rename(columns={"points": "points_bonus"})
 
-            # --- Tri et ajout du rang ---
-            classement_journee = classement_journee.sort_values(by="points_bonus", ascending=False).reset_index(drop=True)
-            classement_journee["Rang"] = classement_journee.index + 1
+        # --- Fusion des deux jeux de points ---
+        classement_journee = pd.merge(points_sans_bonus, df_journee_bonus, on="participant_nom", how="left")
 
-            # --- Calcul du ratio par rapport au meilleur joueur pour la barre de progression ---
-            max_points = classement_journee["points_bonus"].max()
-            classement_journee["Performance (%)"] = (classement_journee["points_bonus"] / max_points * 100).round(1)
+        # --- Tri et ajout du rang ---
+        classement_journee = classement_journee.sort_values(by="points_bonus", ascending=False).reset_index(drop=True)
+        classement_journee["Rang"] = classement_journee.index + 1
 
-            # --- Classement du joueur sélectionné ---
-            joueur_stats = classement_journee[classement_journee["participant_nom"] == participant_sel]
+        # --- Calcul du ratio par rapport au meilleur joueur pour la barre de progression ---
+        max_points = classement_journee["points_bonus"].max()
+        classement_journee["Performance (%)"] = (classement_journee["points_bonus"] / max_points * 100).round(1)
 
-            with col2:
-                st.markdown(f"### 🏅 Classement - Journée {journee_courante}")
-                st.dataframe(classement_journee[["Rang", "participant_nom", "points_bruts", "points_bonus", "bons_pronos", "multiplicateur", "Performance (%)"]], hide_index=True, use_container_width=True)
-
-            # --- Résumé personnel ---
-            if not joueur_stats.empty:
-                points_bruts = joueur_stats["points_bruts"].values[0]
-                points_bonus = joueur_stats["points_bonus"].values[0]
-                bons_pronos = joueur_stats["bons_pronos"].values[0]
-                multiplicateur = joueur_stats["multiplicateur"].values[0]
-                rang = joueur_stats["Rang"].values[0]
-                perf = joueur_stats["Performance (%)"].values[0]
-
-                st.markdown(f"### 👤 Statistiques de {participant_sel} - Journée {journee_courante}")
-
-                # Colonnes KPI améliorées
-                kpi_cols = st.columns([1, 1, 1, 1, 1])
-
-                with kpi_cols[0]: kpi_card("🏆 Rang", rang, color="#3b82f6")  # bleu pour le rang
-                with kpi_cols[1]: kpi_card("💯 Points bruts", f"{points_bruts:.2f}", color="#22c55e")  # vert pour points
-                with kpi_cols[2]: kpi_card("✨ Points avec bonus", f"{points_bonus:.2f}", color="#9333ea")  # violet pour bonus
-                with kpi_cols[3]: kpi_card("🎯 Bons pronos", f"{bons_pronos} / {len(df_participant)}", color="#f59e0b")  # orange pour ratio
-                with kpi_cols[4]: kpi_card("⚡ Multiplicateur", f"x{multiplicateur}", color="#2563eb")  # bleu foncé pour multiplicateur
-
-                # Sécuriser la valeur de la barre de progression
-                perf_safe = 0 if pd.isna(perf) else perf
-
-                # --- Barre de performance visuelle ---
-                st.progress(perf_safe / 100)
-                st.caption(f"Performance de {perf_safe:.1f}% par rapport au meilleur score de la journée.")
-        
-        st.markdown("---")
-        
-        # --- 🔍 Statistiques complémentaires ---
-        st.markdown("### 📊 Statistiques avancées")
+        # --- Classement du joueur sélectionné ---
+        joueur_stats = classement_journee[classement_journee["participant_nom"] == participant_sel]
 
-        # Filtrer les matchs du joueur sélectionné
-        df_joueur = df[df["participant_nom"] == participant_sel].copy()
-        df_joueur_participant = df_progress_all[df_progress_all["participant_nom"] == participant_sel].copy()
-
-        # --- Calculs de points par match avec bonus ---
-        df_joueur["points"] = df_joueur.apply(calcul_points, axis=1)
+        with col2:
+            st.markdown(f"### 🏅 Classement - Journée {journee_courante}")
+            st.dataframe(classement_journee[["Rang", "participant_nom", "points_bruts", "points_bonus", "bons_pronos", "multiplicateur", "Performance (%)"]], hide_index=True, use_container_width=True)
 
-        # --- Bons pronos ---
-        df_joueur["bon_prono"] = (
-            ((df_joueur["prono_dom"] > df_joueur["prono_ext"]) & (df_joueur["match_dom"] > df_joueur["match_ext"])) |
-            ((df_joueur["prono_dom"] < df_joueur["prono_ext"]) & (df_joueur["match_dom"] < df_joueur["match_ext"])) |
-            ((df_joueur["prono_dom"] == df_joueur["prono_ext"]) & (df_joueur["match_dom"] == df_joueur["match_ext"]))
-        )
+        # --- Résumé personnel ---
+        if not joueur_stats.empty:
+            points_bruts = joueur_stats["points_bruts"].values[0]
+            points_bonus = joueur_stats["points_bonus"].values[0]
+            bons_pronos = joueur_stats["bons_pronos"].values[0]
+            multiplicateur = joueur_stats["multiplicateur"].values[0]
+            rang = joueur_stats["Rang"].values[0]
+            perf = joueur_stats["Performance (%)"].values[0]
 
-        # --- Bonus multiplicateurs par match ---
-        df_joueur["bonus"] = df_joueur.apply(lambda r: float(calcul_points_journee(pd.DataFrame([r]))["multiplicateur"]), axis=1)
+            st.markdown(f"### 👤 Statistiques de {participant_sel} - Journée {journee_courante}")
 
-        # --- Stats globales ---
-        total_points = df_joueur["points"].sum().round(2)
-        moyenne_points = df_joueur["points"].mean().round(2)
-        max_points_match = df_joueur["points"].max().round(2)
-        min_points_match = df_joueur["points"].min().round(2)
-        
-        # Somme des points par journée
-        points_par_journee = df_joueur_participant.groupby("journee_match")["points"].sum()
-
-        # Meilleur score sur une journée
-        meilleur_score_journee = points_par_journee.max().round(2)
-        
-        nb_bons_pronos = df_joueur["bon_prono"].sum()
-        total_pronos = len(df_joueur)
-        pourcentage_bons_pronos = round(100 * nb_bons_pronos / total_pronos, 1) if total_pronos > 0 else 0
-
-        bonus_133 = (df_joueur_participant["multiplicateur"] == 1.33).sum() if "multiplicateur" in df_joueur_participant else 0
-        bonus_166 = (df_joueur_participant["multiplicateur"] == 1.66).sum() if "multiplicateur" in df_joueur_participant else 0
-        bonus_200 = (df_joueur_participant["multiplicateur"] == 2).sum() if "multiplicateur" in df_joueur_participant else 0
-
-        # --- Journées gagnées ---
-        df_points_journee = df.groupby(["journee_match","participant_nom"])["points"].sum().unstack(fill_value=0)
-        journees_gagnees = (df_points_journee.idxmax(axis=1) == participant_sel).sum()
-
-        # --- Sélection des bons pronostics ---
-        df_bons = df_joueur[df_joueur["bon_prono"]].copy()
-        # --- Appliquer la fonction ---
-        df_bons["cote_correcte"] = df_bons.apply(cote_prono_correct, axis=1)
-        # --- Moyenne des cotes exactes des pronos gagnés ---
-        cote_moyenne = df_bons["cote_correcte"].mean()
-
-        df_joueur["roi_match"] = df_joueur.apply(gain_match, axis=1)
-        roi_total = df_joueur["roi_match"].sum()
-        
-        # --- Affichage final ---
-        # --- Ligne 1 : Performances générales ---
-        kpi_cols = st.columns([1, 1, 1, 1, 1])
+            # Colonnes KPI améliorées
+            kpi_cols = st.columns([1, 1, 1, 1, 1])
 
-        with kpi_cols[0]: kpi_card("🎯 Bons pronos", f"{nb_bons_pronos}/{total_pronos}", f"{pourcentage_bons_pronos}%", color="#3b82f6")  # orange
-        with kpi_cols[1]: kpi_card("🏅 Journées gagnées", int(journees_gagnees), color="#12eccf")  # bleu
-        with kpi_cols[2]: kpi_card("Meilleur score / journée", round(meilleur_score_journee, 2), color="#22c55e")  # vert
-        with kpi_cols[3]: kpi_card("Moyenne points / match", round(moyenne_points, 2), color="#2563eb")  # bleu foncé
-        with kpi_cols[4]: kpi_card("💥 Max points / match", round(max_points_match, 2), color="#9333ea")  # violet
+            with kpi_cols[0]: kpi_card("🏆 Rang", rang, color="#3b82f6")  # bleu pour le rang
+            with kpi_cols[1]: kpi_card("💯 Points bruts", f"{points_bruts:.2f}", color="#22c55e")  # vert pour points
+            with kpi_cols[2]: kpi_card("✨ Points avec bonus", f"{points_bonus:.2f}", color="#9333ea")  # violet pour bonus
+            with kpi_cols[3]: kpi_card("🎯 Bons pronos", f"{bons_pronos} / {len(df_participant)}", color="#f59e0b")  # orange pour ratio
+            with kpi_cols[4]: kpi_card("⚡ Multiplicateur", f"x{multiplicateur}", color="#2563eb")  # bleu foncé pour multiplicateur
 
-        st.text("")
-        
-        # --- Ligne 2 : Bonus et scores spécifiques ---
-        kpi_cols2 = st.columns([1, 1, 1, 1, 1])
+            # Sécuriser la valeur de la barre de progression
+            perf_safe = 0 if pd.isna(perf) else perf
 
-        with kpi_cols2[0]: kpi_card("⭐ Bonus x1.33", int(bonus_133), color="#f59e0b")  # orange
-        with kpi_cols2[1]: kpi_card("🔥 Bonus x1.66", int(bonus_166), color="#f97316")  # orange foncé
-        with kpi_cols2[2]: kpi_card("💎 Bonus x2", int(bonus_200), color="#9333ea")  # violet
-        with kpi_cols2[3]: kpi_card("📈 Cote moyenne bons pronos", round(cote_moyenne, 2), color="#22c55e")  # vert
-        with kpi_cols2[4]: kpi_card("💰 ROI théorique", round(roi_total, 2), color="#3b82f6")  # bleu
+            # --- Barre de performance visuelle ---
+            st.progress(perf_safe / 100)
+            st.caption(f"Performance de {perf_safe:.1f}% par rapport au meilleur score de la journée.")
 
-        st.markdown("---")
-            
-        # === 📍 SECTION 3 ===       
-        col1, col2 = st.columns([1.3, 2])
-        with col1:
-            st.markdown("### 📝 Pronostics du joueur")
-            
-            table_display = df_participant.copy()    
-            # --- Créer colonne Match avec noms des équipes ---
-            table_display["Match"] = table_display["equipe_domicile_nom"] + " - " + table_display["equipe_exterieure_nom"]
+    st.markdown("---")
 
-            # --- Conversion en int et création des colonnes simplifiées ---
-            table_display["Prono"] = table_display["prono_dom"].fillna(0).astype(int).astype(str) + " - " + \
-                                    table_display["prono_ext"].fillna(0).astype(int).astype(str)
-            table_display["Score Réel"] = table_display["match_dom"].fillna(0).astype(int).astype(str) + " - " + \
-                                        table_display["match_ext"].fillna(0).astype(int).astype(str)
+    # --- 🔍 Statistiques complémentaires ---
+    st.markdown("### 📊 Statistiques avancées")
 
-            # --- Colonnes à afficher ---
-            table_display = table_display[["journee_match", "Match", "Prono", "Score Réel", "points"]]
-            table_display.columns = ["Journée_match", "Match", "Prono", "Score Réel", "Points"]
+    # Filtrer les matchs du joueur sélectionné
+    df_joueur = df[df["participant_nom"] == participant_sel].copy()
+    df_joueur_participant = df_progress_all[df_progress_all["participant_nom"] == participant_sel].copy()
 
-            # --- Affichage ---
-            st.dataframe(table_display, hide_index=True, use_container_width=True)
+    # --- Calculs de points par match avec bonus ---
+    df_joueur["points"] = moteur.points_pronostics(df_joueur)
 
-        with col2:
-            # --- Préparer les données ---
-            df["journee_match"] = df["journee_match"].astype(int)  # Conversion en entier
-            df_progress = df.groupby(["participant_nom", "journee_match"]).apply(calcul_points_journee).reset_index()
+    # --- Bons pronos ---
+    df_joueur["bon_prono"] = (
+        ((df_joueur["prono_dom"] > df_joueur["prono_ext"]) & (df_joueur["match_dom"] > df_joueur["match_ext"])) |
+        ((df_joueur["prono_dom"] < df_joueur["prono_ext"]) & (df_joueur["match_dom"] < df_joueur["match_ext"])) |
+        ((df_joueur["prono_dom"] == df_joueur["prono_ext"]) & (df_joueur["match_dom"] == df_joueur["match_ext"]))
+    )
 
-            df_joueur = df_progress[df_progress["participant_nom"] == participant_sel].copy()
+    # --- Stats globales ---
+    total_points = df_joueur["points"].sum().round(2)
+    moyenne_points = df_joueur["points"].mean().round(2)
+    max_points_match = df_joueur["points"].max().round(2)
+    min_points_match = df_joueur["points"].min().round(2)
+
+    # Somme des points par journée
+    points_par_journee = df_joueur_participant.groupby("journee_match")["points"].sum()
+
+    # Meilleur score sur une journée
+    meilleur_score_journee = points_par_journee.max().round(2)
+
+    nb_bons_pronos = df_joueur["bon_prono"].sum()
+    total_pronos = len(df_joueur)
+    pourcentage_bons_pronos = round(100 * nb_bons_pronos / total_pronos, 1) if total_pronos > 0 else 0
+
+    bonus_133 = (df_joueur_participant["multiplicateur"] == 1.33).sum() if "multiplicateur" in df_joueur_participant else 0
+    bonus_166 = (df_joueur_participant["multiplicateur"] == 1.66).sum() if "multiplicateur" in df_joueur_participant else 0
+    bonus_200 = (df_joueur_participant["multiplicateur"] == 2).sum() if "multiplicateur" in df_joueur_participant else 0
+
+    # --- Journées gagnées ---
+    df_points_journee = df.groupby(["journee_match","participant_nom"])["points"].sum().unstack(fill_value=0)
+    journees_gagnees = (df_points_journee.idxmax(axis=1) == participant_sel).sum()
+
+    # --- Sélection des bons pronostics ---
+    df_bons = df_joueur[df_joueur["bon_prono"]].copy()
+    # --- Appliquer la fonction ---
+    df_bons["cote_correcte"] = df_bons.apply(cote_prono_correct, axis=1)
+    # --- Moyenne des cotes exactes des pronos gagnés ---
+    cote_moyenne = df_bons["cote_correcte"].mean()
+
+    df_joueur["roi_match"] = moteur.gains_matchs(df_joueur)
+    roi_total = df_joueur["roi_match"].sum()
+
+    # --- Affichage final ---
+    # --- Ligne 1 : Performances générales ---
+    kpi_cols = st.columns([1, 1, 1, 1, 1])
+
+    with kpi_cols[0]: kpi_card("🎯 Bons pronos", f"{nb_bons_pronos}/{total_pronos}", f"{pourcentage_bons_pronos}%", color="#3b82f6")  # orange
+    with kpi_cols[1]: kpi_card("🏅 Journées gagnées", int(journees_gagnees), color="#12eccf")  # bleu
+    with kpi_cols[2]: kpi_card("Meilleur score / journée", round(meilleur_score_journee, 2), color="#22c55e")  # vert
+    with kpi_cols[3]: kpi_card("Moyenne points / match", round(moyenne_points, 2), color="#2563eb")  # bleu foncé
+    with kpi_cols[4]: kpi_card("💥 Max points / match", round(max_points_match, 2), color="#9333ea")  # violet
+
+    st.text("")
+
+    # --- Ligne 2 : Bonus et scores spécifiques ---
+    kpi_cols2 = st.columns([1, 1, 1, 1, 1])
+
+    with kpi_cols2[0]: kpi_card("⭐ Bonus x1.33", int(bonus_133), color="#f59e0b")  # orange
+    with kpi_cols2[1]: kpi_card("🔥 Bonus x1.66", int(bonus_166), color="#f97316")  # orange foncé
+    with kpi_cols2[2]: kpi_card("💎 Bonus x2", int(bonus_200), color="#9333ea")  # violet
+    with kpi_cols2[3]: kpi_card("📈 Cote moyenne bons pronos", round(cote_moyenne, 2), color="#22c55e")  # vert
+    with kpi_cols2[4]: kpi_card("💰 ROI théorique", round(roi_total, 2), color="#3b82f6")  # bleu
+
+    st.markdown("---")
+
+    # === 📍 SECTION 3 ===       
+    instrumentation.etape("section_3")
+    col1, col2 = st.columns([1.3, 2])
+    with col1:
+        st.markdown("### 📝 Pronostics du joueur")
+
+        table_display = df_participant.copy()    
+        # --- Créer colonne Match avec noms des équipes ---
+        table_display["Match"] = table_display["equipe_domicile_nom"] + " - " + table_display["equipe_exterieure_nom"]
+
+        # --- Conversion en int et création des colonnes simplifiées ---
+        table_display["Prono"] = table_display["prono_dom"].fillna(0).astype(int).astype(str) + " - " + \
+                                table_display["prono_ext"].fillna(0).astype(int).astype(str)
+        table_display["Score Réel"] = table_display["match_dom"].fillna(0).astype(int).astype(str) + " - " + \
+                                    table_display["match_ext"].fillna(0).astype(int).astype(str)
+
+        # --- Colonnes à afficher ---
+        table_display = table_display[["journee_match", "Match", "Prono", "Score Réel", "points"]]
+        table_display.columns = ["Journée_match", "Match", "Prono", "Score Réel", "Points"]
+
+        # --- Affichage ---
+        st.dataframe(table_display, hide_index=True, use_container_width=True)
+
+    with col2:
+        def construire_points():
+            # --- Préparer les données : points par journée déjà calculés pour la saison ---
+            df_joueur = df_progress_all[df_progress_all["participant_nom"] == participant_sel].copy()
 
             # Trier les journées de façon ascendante
             df_joueur = df_joueur.sort_values("journee_match").reset_index(drop=True)
@@ -947,160 +855,52 @@ def show(tables):
                 margin=dict(l=50, r=50, t=50, b=50),
                 hovermode="x unified"
             )
+            return fig
 
-            # --- Affichage dans Streamlit ---
-            st.plotly_chart(fig, use_container_width=True)
-
-        st.markdown("---")
-            
-        # === 📍 SECTION 4 ===
-        # --- Récupération de l'historique complet du joueur depuis les CSV ---
-        # Filtrage sur le participant
-        data_historique = df_pronos[df_pronos["participant_nom"] == participant_sel].merge(
-            df_matchs,
-            on="match_id",
-            suffixes=("_prono", "_match")
+        # --- Affichage dans Streamlit (figure mise en cache) ---
+        graphiques.afficher_figure(
+            graphiques.cle_figure("points_participant", saison_sel, championnat_sel, None, participant_sel, version),
+            construire_points, use_container_width=True
         )
 
-        # --- Filtrage selon la compétition sélectionnée ---
-        if championnat_sel != "Toutes":
-            data_historique = data_historique[data_historique["competition"] == championnat_sel]
-
-        # --- Sélection des colonnes et renommage pour correspondre à l'ancien SQL ---
-        data_historique = data_historique[[
-            "participant_id",
-            "participant_nom",
-            "score_domicile_prono", 
-            "score_exterieur_prono",
-            "score_domicile_match", 
-            "score_exterieur_match",
-            "equipe_domicile_nom",
-            "equipe_exterieure_nom",
-            "cote_domicile",
-            "cote_exterieur",
-            "cote_nul",
-            "journee_match",
-            "saison_match",
-            "competition",
-            "match_id"
-        ]].rename(columns={
-            "score_domicile_prono": "prono_dom",
-            "score_exterieur_prono": "prono_ext",
-            "score_domicile_match": "match_dom",
-            "score_exterieur_match": "match_ext"
-        })
-
-        # --- Suppression des doublons éventuels ---
-        df_historique = data_historique.drop_duplicates(subset=["participant_id", "match_id"], keep="last")
+    st.markdown("---")
 
-        # --- Préparer le DataFrame historique ---
-        df_historique["journee_match"] = df_historique["journee_match"].astype(int)
-        df_historique = df_historique.sort_values(by=["saison_match", "journee_match"]).reset_index(drop=True)
+    # === 📍 SECTION 4 ===
+    instrumentation.etape("section_4")
+    # --- Historique complet du joueur : points par saison et journée, toutes saisons ---
+    participant_id_sel = df.loc[df["participant_nom"] == participant_sel, "participant_id"].iloc[0]
+    df_historique = historique_participant(tables, participant_id_sel, championnat_sel)
 
-        # Vérification des résultats
-        if df_historique.empty:
-            st.info(f"Aucun pronostic historique trouvé pour {participant_sel}.")
-        else:
-            # Calcul des points pour toutes les saisons
-            df_historique["points"] = df_historique.apply(calcul_points, axis=1)
-            df_historique = df_historique.sort_values(["saison_match", "journee_match"]).reset_index(drop=True)
+    # Vérification des résultats
+    if df_historique.empty:
+        st.info(f"Aucun pronostic historique trouvé pour {participant_sel}.")
 
-        # --- Comparaison progression joueur par saison ---
-        st.markdown("### 📊 Comparaison des saisons du joueur")
+    comparaison_saisons(df_historique, participant_sel, saison_sel, championnat_sel, tables.version_saison())
 
-        saisons_disponibles = sorted(df_historique["saison_match"].unique(), reverse=True)
-        default_saisons = [saison_sel] if saison_sel in saisons_disponibles else []
+    st.markdown("---")          
 
-        saisons_sel = st.multiselect(
-            "Sélectionnez les saisons à comparer",
-            options=saisons_disponibles,
-            default=default_saisons,
-            key=f"saisons_compare_{participant_sel}"
-        )
+    # === 📍 SECTION 5 ===
+    instrumentation.etape("section_5")
+    # --- Comparaison progression joueur vs moyenne générale ---
+    col1, col2 = st.columns([2.2, 1])
+    with col1:
+        st.markdown("### 📊 Comparaison avec la moyenne du championnat")
 
-        if not saisons_sel:
-            st.warning("Veuillez sélectionner au moins une saison pour l'affichage.")
-        else:
-            fig = go.Figure()
-            couleurs_prev = px.colors.qualitative.Pastel
-            idx_couleur = 0
+        # Points cumulés du joueur sélectionné
+        df_joueur = df_progress_all[df_progress_all["participant_nom"] == participant_sel].copy()
+        df_joueur["points_cumul_joueur"] = df_joueur["points"].cumsum()
 
-            for saison in saisons_sel:
-                df_saison = df_historique[df_historique["saison_match"] == saison].copy()
-                if df_saison.empty:
-                    continue
+        # Moyenne des points cumulés
+        df_moyenne = df_progress_all.groupby("journee_match")["points"].mean().reset_index()
+        df_moyenne["points_cumul_moyenne"] = df_moyenne["points"].cumsum()
 
-                # Tri et conversion en int pour les journées
-                df_saison["journee_match"] = df_saison["journee_match"].astype(int)
-                df_saison = df_saison.sort_values("journee_match").reset_index(drop=True)
+        # Filtrer les journées où la moyenne a changé
+        df_moyenne = df_moyenne[df_moyenne["points_cumul_moyenne"].diff().fillna(df_moyenne["points_cumul_moyenne"]) != 0]
 
-                # --- Calcul cumulatif par journée ---
-                df_saison = df_saison.groupby("journee_match", as_index=False)["points"].sum()
-                df_saison["points_cumul"] = df_saison["points"].cumsum()
-
-                # Traces
-                if saison == saison_sel:
-                    fig.add_trace(go.Scatter(
-                        x=df_saison["journee_match"],
-                        y=df_saison["points_cumul"],
-                        mode="lines+markers",
-                        name=f"Saison {saison} (actuelle)",
-                        line=dict(color="limegreen", width=4),
-                        marker=dict(size=10, symbol="circle"),
-                        hovertemplate="Journée: %{x}<br>Points cumulés: %{y:.2f}<br>Points journée: %{customdata[0]:.2f}<extra></extra>",
-                        customdata=df_saison[["points"]].values
-                    ))
-                else:
-                    couleur = couleurs_prev[idx_couleur % len(couleurs_prev)]
-                    idx_couleur += 1
-                    fig.add_trace(go.Scatter(
-                        x=df_saison["journee_match"],
-                        y=df_saison["points_cumul"],
-                        mode="lines+markers",
-                        name=f"Saison {saison} (précédente)",
-                        line=dict(color=couleur, width=2, dash="dash"),
-                        marker=dict(size=7, symbol="circle"),
-                        opacity=0.6,
-                        hovertemplate="Journée: %{x}<br>Points cumulés: %{y:.2f}<br>Points journée: %{customdata[0]:.2f}<extra></extra>",
-                        customdata=df_saison[["points"]].values
-                    ))
-
-            fig.update_layout(
-                title=f"Progression cumulée de {participant_sel} par saison",
-                xaxis_title="Journée",
-                yaxis_title="Points cumulés",
-                xaxis=dict(range=[0, df_historique["journee_match"].max() + 1]),  # X commence à 0 et va jusqu'à max +1
-                hovermode="x unified",
-                template="plotly_white",
-                height=450,
-                legend=dict(title="Saisons", x=0.01, y=0.99),
-                margin=dict(l=50, r=50, t=60, b=50)
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
-
-        st.markdown("---")          
-        
-        # === 📍 SECTION 5 ===
-        # --- Comparaison progression joueur vs moyenne générale ---
-        col1, col2 = st.columns([2.2, 1])
-        with col1:
-            st.markdown("### 📊 Comparaison avec la moyenne du championnat")
-
-            # Points cumulés du joueur sélectionné
-            df_joueur = df_progress_all[df_progress_all["participant_nom"] == participant_sel].copy()
-            df_joueur["points_cumul_joueur"] = df_joueur["points"].cumsum()
-
-            # Moyenne des points cumulés
-            df_moyenne = df_progress_all.groupby("journee_match")["points"].mean().reset_index()
-            df_moyenne["points_cumul_moyenne"] = df_moyenne["points"].cumsum()
-
-            # Filtrer les journées où la moyenne a changé
-            df_moyenne = df_moyenne[df_moyenne["points_cumul_moyenne"].diff().fillna(df_moyenne["points_cumul_moyenne"]) != 0]
-
-            # Merge pour aligner les axes
-            df_comparatif = pd.merge(df_joueur, df_moyenne, on="journee_match", how="inner")  # on utilise inner pour ne garder que les journées jouées
+        # Merge pour aligner les axes
+        df_comparatif = pd.merge(df_joueur, df_moyenne, on="journee_match", how="inner")  # on utilise inner pour ne garder que les journées jouées
 
+        def construire_comparatif():
             # --- Graphique comparatif ---
             fig = go.Figure()
 
@@ -1158,265 +958,174 @@ def show(tables):
                 height=400,
                 margin=dict(l=50, r=50, t=60, b=80)  # plus de marge en bas pour la légende
             )
+            return fig
 
-            st.plotly_chart(fig, use_container_width=True)
+        graphiques.afficher_figure(
+            graphiques.cle_figure("comparaison_moyenne", saison_sel, championnat_sel, None, participant_sel, version),
+            construire_comparatif, use_container_width=True
+        )
 
-            # --- Statistiques comparatives ---
-            diff_points = df_comparatif["points_cumul_joueur"].iloc[-1] - df_comparatif["points_cumul_moyenne"].iloc[-1]
-            tendance = "au-dessus" if diff_points > 0 else "en dessous"
-            st.markdown(f"💡 **{participant_sel}** est actuellement **{abs(diff_points):.2f} points {tendance}** de la moyenne des participants.")
+        # --- Statistiques comparatives ---
+        diff_points = df_comparatif["points_cumul_joueur"].iloc[-1] - df_comparatif["points_cumul_moyenne"].iloc[-1]
+        tendance = "au-dessus" if diff_points > 0 else "en dessous"
+        st.markdown(f"💡 **{participant_sel}** est actuellement **{abs(diff_points):.2f} points {tendance}** de la moyenne des participants.")
 
-        with col2:
-            # --- Top 5 des meilleures journées du joueur ---
-            st.markdown("### 🏅 Top 5 des meilleures journées")
+    with col2:
+        # --- Top 5 des meilleures journées du joueur ---
+        st.markdown("### 🏅 Top 5 des meilleures journées")
 
-            # On récupère les scores du joueur par journée
-            df_joueur_journees = (df_progress_all[df_progress_all["participant_nom"] == participant_sel].sort_values(by="points", ascending=False).head(5))
+        # On récupère les scores du joueur par journée
+        df_joueur_journees = (df_progress_all[df_progress_all["participant_nom"] == participant_sel].sort_values(by="points", ascending=False).head(5))
 
-            if df_joueur_journees.empty:
-                st.info("Aucune journée jouée pour ce participant.")
-            else:
-                df_joueur_journees_display = df_joueur_journees[["journee_match", "points", "bons_pronos", "multiplicateur"]]
-                df_joueur_journees_display.rename(columns={
-                    "journee": "Journée",
-                    "points": "Points",
-                    "bons_pronos": "Bons pronostics",
-                    "multiplicateur": "Multiplicateur"
-                }, inplace=True)
-
-                # Formatage visuel
-                df_joueur_journees_display["Points"] = df_joueur_journees_display["Points"].round(2)
-                df_joueur_journees_display["Multiplicateur"] = df_joueur_journees_display["Multiplicateur"].round(2)
-
-                st.dataframe(df_joueur_journees_display, hide_index=True, use_container_width=True)
-
-            # --- Petit résumé dynamique ---
-            moyenne_points = df_joueur_journees["points"].mean() if not df_joueur_journees.empty else 0
-            max_points = df_joueur_journees["points"].max() if not df_joueur_journees.empty else 0
-            journee_max = (df_joueur_journees.loc[df_joueur_journees["points"].idxmax(), "journee_match"]
-                    if not df_joueur_journees.empty else None)
-
-            st.markdown("### 📋 Résumé des performances")
-            if journee_max:
-                st.markdown(
-                    f"🔥 **Meilleure journée :** journée **{journee_max}** avec **{max_points:.2f} pts** "
-                    f"(moyenne sur top 5 : {moyenne_points:.2f} pts)."
-                )
-            else:
-                st.markdown("Aucune performance enregistrée pour le moment.")
-        
-        st.markdown("---")
-            
-        # === 📍 SECTION 6 ===
-        # --- 📈 Évolution du classement du joueur par journée ---
-        st.markdown("### 📊 Évolution du classement par journée")
+        if df_joueur_journees.empty:
+            st.info("Aucune journée jouée pour ce participant.")
+        else:
+            df_joueur_journees_display = df_joueur_journees[["journee_match", "points", "bons_pronos", "multiplicateur"]]
+            df_joueur_journees_display = df_joueur_journees_display.rename(columns={
+                "journee": "Journée",
+                "points": "Points",
+                "bons_pronos": "Bons pronostics",
+                "multiplicateur": "Multiplicateur"
+            })
 
-        # On recalcule les classements par journée
-        classements_journees = (df_progress_all.groupby(["journee_match", "participant_nom"], as_index=False)["points"].sum())
+            # Formatage visuel
+            df_joueur_journees_display["Points"] = df_joueur_journees_display["Points"].round(2)
+            df_joueur_journees_display["Multiplicateur"] = df_joueur_journees_display["Multiplicateur"].round(2)
 
-        # Pour chaque journée, on classe les participants
-        classements_journees["Rang"] = classements_journees.groupby("journee_match")["points"] \
-                .rank(method="min", ascending=False).astype(int)
+            st.dataframe(df_joueur_journees_display, hide_index=True, use_container_width=True)
 
-        # Récupération du classement du joueur sélectionné
-        joueur_evolution = classements_journees[classements_journees["participant_nom"] == participant_sel].copy()
+        # --- Petit résumé dynamique ---
+        moyenne_points = df_joueur_journees["points"].mean() if not df_joueur_journees.empty else 0
+        max_points = df_joueur_journees["points"].max() if not df_joueur_journees.empty else 0
+        journee_max = (df_joueur_journees.loc[df_joueur_journees["points"].idxmax(), "journee_match"]
+                if not df_joueur_journees.empty else None)
 
-        # Récupération du leader de chaque journée pour comparaison
-        leaders = classements_journees.loc[classements_journees.groupby("journee_match")["points"].idxmax(), ["journee_match", "participant_nom", "points"]].rename(columns={"participant_nom": "leader", "points": "points_leader"})
+        st.markdown("### 📋 Résumé des performances")
+        if journee_max:
+            st.markdown(
+                f"🔥 **Meilleure journée :** journée **{journee_max}** avec **{max_points:.2f} pts** "
+                f"(moyenne sur top 5 : {moyenne_points:.2f} pts)."
+            )
+        else:
+            st.markdown("Aucune performance enregistrée pour le moment.")
 
-        joueur_evolution = joueur_evolution.merge(leaders, on="journee_match", how="left")
+    st.markdown("---")
 
-        # Calcul des écarts de points
-        joueur_evolution["écart_avec_leader"] = joueur_evolution["points_leader"] - joueur_evolution["points"]
+    # === 📍 SECTION 6 ===
+    instrumentation.etape("section_6")
+    # --- 📈 Évolution du classement du joueur par journée ---
+    st.markdown("### 📊 Évolution du classement par journée")
 
-        # Formatage visuel
-        joueur_evolution = joueur_evolution.sort_values("journee_match")
-        joueur_evolution_display = joueur_evolution[["journee_match", "points", "Rang", "écart_avec_leader", "leader"]]
-        joueur_evolution_display.rename(columns={
-                "journee_match": "Journée",
-                "points": "Points",
-                "Rang": "Classement",
-                "écart_avec_leader": "Écart avec Leader",
-                "leader": "Leader"
-        }, inplace=True)
-
-        joueur_evolution_display["Écart avec Leader"] = joueur_evolution_display["Écart avec Leader"].round(2)
-        joueur_evolution_display["Points"] = joueur_evolution_display["Points"].round(2)
-
-        # Transposition du tableau
-        joueur_evolution_transpose = joueur_evolution[["journee_match", "points", "Rang", "écart_avec_leader", "leader"]].copy()
-        joueur_evolution_transpose.set_index("journee_match", inplace=True)
-        joueur_evolution_transpose = joueur_evolution_transpose.T
-        joueur_evolution_transpose.index = ["Points", "Classement", "Écart avec Leader", "Leader"]
-
-        # Formater Points et Écart avec Leader avec 2 décimales (conversion en float d'abord)
-        joueur_evolution_transpose.loc["Points"] = joueur_evolution_transpose.loc["Points"].apply(lambda x: f"{x:.2f}")
-        joueur_evolution_transpose.loc["Écart avec Leader"] = joueur_evolution_transpose.loc["Écart avec Leader"].apply(lambda x: f"{x:.2f}")
-            
-        # Appliquer le style avec pandas
-        styled_table = joueur_evolution_transpose.style.applymap(lambda val: color_cells(val, joueur_evolution_transpose.index[joueur_evolution_transpose.index.get_loc(val.name)] if hasattr(val, 'name') else ""),)
+    # Classements par journée, cumulés, leader et écarts : lus dans la matrice participant × journée
+    joueur_evolution = moteur.evolution_participant(matrice, participant_sel)
 
-        # Affichage dans Streamlit
-        st.dataframe(styled_table, use_container_width=True)
-        
-        # Journées où au moins un participant a des points > 0
-        journees_jouees = df_progress_all.groupby("journee_match")["points"].sum()
-        journees_jouees = journees_jouees[journees_jouees > 0].index.tolist()
+    # Transposition du tableau
+    joueur_evolution_transpose = joueur_evolution.set_index("journee_match").T
+    joueur_evolution_transpose.index = ["Points", "Classement", "Écart avec Leader", "Leader"]
 
-        # Filtrage des données
-        classements_cumul = df_progress_all[df_progress_all["journee_match"].isin(journees_jouees)].copy()
+    # Formater Points et Écart avec Leader avec 2 décimales (conversion en float d'abord)
+    joueur_evolution_transpose.loc["Points"] = joueur_evolution_transpose.loc["Points"].apply(lambda x: f"{x:.2f}")
+    joueur_evolution_transpose.loc["Écart avec Leader"] = joueur_evolution_transpose.loc["Écart avec Leader"].apply(lambda x: f"{x:.2f}")
 
-        # Calcul cumulatif des points par participant
-        classements_cumul = (classements_cumul.groupby(["journee_match", "participant_nom"], as_index=False)["points"].sum().sort_values(["participant_nom", "journee_match"])
-        )
-        classements_cumul["points_cumulés"] = classements_cumul.groupby("participant_nom")["points"].cumsum()
+    # Texte partout : une colonne de journée mêle nombres et noms de leaders
+    joueur_evolution_transpose = joueur_evolution_transpose.astype(str)
 
-        # Classement général cumulatif par journée
-        classements_cumul["Rang"] = classements_cumul.groupby("journee_match")["points_cumulés"] \
-            .rank(method="min", ascending=False).astype(int)
+    # Pastilles du classement (1er / top 3 / au-delà) et de l'écart avec le leader, calculées par ligne
+    joueur_evolution_transpose.loc["Classement"] = pastilles_seuils(
+        joueur_evolution["Rang"], joueur_evolution_transpose.loc["Classement"], 1, 3)
+    joueur_evolution_transpose.loc["Écart avec Leader"] = pastilles_seuils(
+        joueur_evolution["écart_avec_leader"], joueur_evolution_transpose.loc["Écart avec Leader"], 1, 3)
 
-        # Palette de couleurs
-        colors = px.colors.qualitative.Set2
+    # Affichage dans Streamlit
+    st.dataframe(joueur_evolution_transpose, use_container_width=True)
 
-        # Figure
-        fig = go.Figure()
+    # Palette de couleurs
+    colors = pcolors.qualitative.Set2
 
-        for i, (nom, data_part) in enumerate(classements_cumul.groupby("participant_nom")):
+    # Les deux graphiques ne portent que sur les journées où des points ont été distribués
+    for rangs, titre_axe, titre, separateur in [
+        (matrice["rang_cumul"], "Classement général", "Évolution du classement général", ":"),
+        (matrice["rang_journee"], "Classement par journée", "Évolution du classement par journée", " :"),
+    ]:
+        def style_participant(nom, i):
             is_selected = nom == participant_sel
-            fig.add_trace(
-                go.Scatter(
-                    x=data_part["journee_match"],
-                    y=data_part["Rang"],
-                    mode="lines+markers",
-                    name=nom,
-                    line=dict(
-                        color=colors[i % len(colors)],
-                        width=4 if is_selected else 1.5
-                    ),
-                    marker=dict(size=6 if is_selected else 4),
-                    opacity=1.0 if is_selected else 0.3,
-                    hovertemplate="Journée %{x}<br>%{fullData.name}: %{y}ᵉ<extra></extra>"
-                )
+            return dict(
+                line=dict(color=colors[i % len(colors)], width=4 if is_selected else 1.5),
+                marker=dict(size=6 if is_selected else 4),
+                opacity=1.0 if is_selected else 0.3,
             )
 
-        # Layout
-        fig.update_layout(
-            xaxis=dict(title="Journée", tickfont=dict(size=10)),
-            yaxis=dict(title="Classement général", autorange="reversed", tickfont=dict(size=10)),
-            template="plotly_white",
-            height=500,
-            hovermode="x unified",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="center",
-                x=0.5
-            ),
-            title=f"📊 Évolution du classement général - {participant_sel}"
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
-            
-        # --- On récupère les journées effectivement jouées ---
-        journees_jouees = classements_journees.groupby("journee_match")["points"].sum()
-        journees_jouees = journees_jouees[journees_jouees > 0].index.tolist()
-
-        # Filtrer seulement les journées jouées
-        classements_effectifs = classements_journees[classements_journees["journee_match"].isin(journees_jouees)].copy()
-
-        # Palette de couleurs
-        colors = px.colors.qualitative.Set2
-
-        # Figure
-        fig = go.Figure()
+        def construire_rangs():
+            fig = graphiques.figure_multi_series(
+                moteur.rangs_long(matrice, rangs), "journee", "rang", "participant",
+                ordre=matrice["participants"],
+                styles=style_participant,
+                hovertemplate=f"Journée %{{x}}<br>%{{fullData.name}}{separateur} %{{y}}ᵉ<extra></extra>"
+            )
 
-        for i, (nom, data_part) in enumerate(classements_effectifs.groupby("participant_nom")):
-            is_selected = nom == participant_sel
-            fig.add_trace(
-                go.Scatter(
-                    x=data_part["journee_match"],
-                    y=data_part["Rang"],
-                    mode="lines+markers",
-                    name=nom,
-                    line=dict(
-                        color=colors[i % len(colors)],
-                        width=4 if is_selected else 1.5
-                    ),
-                    marker=dict(size=6 if is_selected else 4),
-                    opacity=1.0 if is_selected else 0.3,
-                    hovertemplate="Journée %{x}<br>%{fullData.name} : %{y}ᵉ<extra></extra>"
-                )
+            # Layout
+            fig.update_layout(
+                xaxis=dict(title="Journée", tickfont=dict(size=10)),
+                yaxis=dict(title=titre_axe, autorange="reversed", tickfont=dict(size=10)),
+                template="plotly_white",
+                height=500,
+                hovermode="x unified",
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="center",
+                    x=0.5
+                ),
+                title=f"📊 {titre} - {participant_sel}"
             )
+            return fig
 
-        # Layout
-        fig.update_layout(
-            xaxis=dict(title="Journée", tickfont=dict(size=10)),
-            yaxis=dict(title="Classement par journée", autorange="reversed", tickfont=dict(size=10)),
-            template="plotly_white",
-            height=500,
-            hovermode="x unified",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="center",
-                x=0.5
-            ),
-            title=f"📊 Évolution du classement par journée - {participant_sel}"
+        graphiques.afficher_figure(
+            graphiques.cle_figure("evolution_rangs", saison_sel, championnat_sel, None, participant_sel, version, titre),
+            construire_rangs, use_container_width=True
         )
 
-        st.plotly_chart(fig, use_container_width=True)
-            
-        st.markdown("---")
-            
-        # === 📍 SECTION 7 ===
-        # --- 📈 Comparaison des points cumulés avec le top 3 ---
-        st.markdown("### 🏆 Points cumulés du joueur vs Top 3")
+    st.markdown("---")
+
+    # === 📍 SECTION 7 ===
+    instrumentation.etape("section_7")
+    # --- 📈 Comparaison des points cumulés avec le top 3 ---
+    st.markdown("### 🏆 Points cumulés du joueur vs Top 3")
 
-        # Calcul des points cumulés par joueur et par journée
-        points_cumules = df_progress_all.groupby(["participant_nom", "journee_match"], as_index=False)["points"].sum()
-        points_cumules = points_cumules.sort_values(["participant_nom", "journee_match"])
-        points_cumules["points_cumulés"] = points_cumules.groupby("participant_nom")["points"].cumsum()
+    def construire_top3():
+        # Points cumulés par joueur et par journée (moteur.progression_journees : une ligne par
+        # joueur et par journée, cumul déjà calculé)
+        points_cumules = (df_progress_all[["participant_nom", "journee_match", "points", "points_cumul"]]
+                          .rename(columns={"points_cumul": "points_cumulés"})
+                          .sort_values(["participant_nom", "journee_match"]))
 
         # Retirer les journées où il n'y a pas eu de progression de points (match non joué)
-        points_cumules = points_cumules.groupby("participant_nom").apply(lambda df: df[df["points_cumulés"].diff().fillna(df["points_cumulés"]) != 0]).reset_index(drop=True)
+        progression = points_cumules.groupby("participant_nom")["points_cumulés"].diff().fillna(points_cumules["points_cumulés"])
+        points_cumules = points_cumules[progression != 0].reset_index(drop=True)
 
         # Identification du Top 3 global
         top3 = classement.head(3)["participant_nom"].tolist() if "participant_nom" in classement.columns else []
 
-        # Joueurs à afficher : joueur sélectionné + top3 (éviter doublons)
-        joueurs_affiches = list(set(top3 + [participant_sel]))
-        df_plot = points_cumules[points_cumules["participant_nom"].isin(joueurs_affiches)]
+        # Joueurs à afficher : top3 + joueur sélectionné (sans doublon, ordre stable d'un rerun à l'autre)
+        joueurs_affiches = list(dict.fromkeys(top3 + [participant_sel]))
 
         # Palette de couleurs Plotly pour les participants (sauf joueur sélectionné)
-        palette = px.colors.qualitative.Plotly
+        palette = pcolors.qualitative.Plotly
         autres_joueurs = [j for j in joueurs_affiches if j != participant_sel]
         couleurs = {j: palette[i % len(palette)] for i, j in enumerate(autres_joueurs)}
         couleurs[participant_sel] = "limegreen"  # joueur sélectionné
 
-        fig = go.Figure()
-
-        for joueur, data_joueur in df_plot.groupby("participant_nom"):
+        def style_joueur(joueur, i):
             if joueur == participant_sel:
-                fig.add_trace(go.Scatter(
-                    x=data_joueur["journee_match"],
-                    y=data_joueur["points_cumulés"],
-                    mode="lines+markers",
-                    name=joueur,
-                    line=dict(color=couleurs[joueur], width=3),
-                    marker=dict(size=8)
-                ))
-            else:
-                fig.add_trace(go.Scatter(
-                    x=data_joueur["journee_match"],
-                    y=data_joueur["points_cumulés"],
-                    mode="lines+markers",
-                    name=joueur,
-                    line=dict(color=couleurs[joueur], width=2, dash="dash"),
-                    marker=dict(size=6),
-                    opacity=0.9
-                ))
+                return dict(line=dict(color=couleurs[joueur], width=3), marker=dict(size=8))
+            return dict(line=dict(color=couleurs[joueur], width=2, dash="dash"), marker=dict(size=6), opacity=0.9)
+
+        fig = graphiques.figure_multi_series(
+            points_cumules, "journee_match", "points_cumulés", "participant_nom",
+            ordre=sorted(joueurs_affiches),
+            styles=style_joueur
+        )
 
         # Layout esthétique
         fig.update_layout(
@@ -1435,120 +1144,266 @@ def show(tables):
                 title="Participants"
             )
         )
+        return fig
 
-        st.plotly_chart(fig, use_container_width=True)
+    graphiques.afficher_figure(
+        graphiques.cle_figure("comparaison_top3", saison_sel, championnat_sel, journee_sel, participant_sel, version),
+        construire_top3, use_container_width=True
+    )
+
+    st.markdown("---")
+
+
+def show(tables):
+    st.title("📊 Les Experts du Canapé")
+    tabs_1, tabs_2 = st.tabs(["Classement/Visualisation", "Export Excel"])
+    
+    # ---------------------- ONGLET 1 : PAR COMPÉTITION ----------------------
+    with tabs_1:
         
+        # --- Styles de l'onglet : sélecteurs, podium et cartes KPI (un seul bloc) ---
+        theme.injecter_css("selecteurs", "classement", "cartes")
+
+        # --- Tables partagées (déjà normalisées au chargement : journee_int, noms canoniques) --- #
+        # Sélecteurs et sous-ensembles lus par requêtes filtrées (stockage des tables)
+        instrumentation.etape("chargement.tables")
+        colonnes_matchs = tables.colonnes("all_matchs_football")
+
+        # --- ONGLET 1 --- #
+        with tabs_1:
+
+            # === 🎛️ Sélecteurs === #
+            instrumentation.etape("rendu.selecteurs")
+            col1, col2, col3, col4 = st.columns(4)
+
+            # --- Sélection de la saison --- #
+            with col1:
+                saisons = sorted(tables.valeurs("all_matchs_football", "saison"), reverse=True)
+                saison_sel = st.selectbox("Sélectionner une saison", saisons)
+
+            # --- Sélection du championnat --- #
+            with col2:
+                championnats = tables.valeurs("all_matchs_football", "competition", saison=saison_sel).tolist()
+                championnats = ["Toutes"] + sorted(championnats)
+                default_champ = "Ligue 1" if "Ligue 1" in championnats else "Toutes"
+                championnat_sel = st.selectbox("Sélectionner un championnat", championnats, index=championnats.index(default_champ))
+
+            # --- Sélection de la journée --- #
+            with col3:
+                if championnat_sel == "Toutes":
+                    journees = tables.valeurs("all_matchs_football", "journee_int", saison=saison_sel)
+                else:
+                    journees = tables.valeurs("all_matchs_football", "journee_int",
+                                              saison=saison_sel, competition=championnat_sel)
+
+                # Tri des journées connues
+                journees = sorted(j for j in journees if j != donnees.JOURNEE_INCONNUE)
+                journee_sel = st.selectbox("Sélectionner une journée", ["Toutes"] + [str(j) for j in journees])
+
+            with col4:
+                top_n = st.slider("Afficher les meilleurs participants", 1, 20, 10)
+
+            st.markdown("---")
+
+            # --- 🔍 Résultats de la saison / du championnat (cache, PAS de filtre sur la journée pour permettre le cumul) --- #
+            instrumentation.etape("calcul.saison")
+            if "match_id" not in colonnes_matchs:
+                st.warning("Impossible de faire le merge : la colonne 'match_id' est manquante")
+                return
+
+            resultats = resultats_saison(tables, saison_sel, championnat_sel, tables.version_saison(saison_sel))
+            if resultats is None:
+                st.info("Aucun pronostic enregistré pour cette sélection.")
+                return
+            nb_matchs, df, df_progress_all, matrice = resultats
+
+            # --- 🧮 Filtrage jusqu’à la journée sélectionnée --- #
+            instrumentation.etape("calcul.classement")
+            if journee_sel != "Toutes":
+                try:
+                    journee_num = int(journee_sel)
+                    df_progress_filtered = df_progress_all[df_progress_all["journee_match"] <= journee_num]
+                except ValueError:
+                    df_progress_filtered = df_progress_all.copy()
+            else:
+                df_progress_filtered = df_progress_all.copy()
+
+            # --- 🏆 Classement cumulé jusqu’à la journée choisie --- #
+            classement = (
+                df_progress_filtered.groupby("participant_nom", as_index=False)["points_cumul"]
+                .max()  # le cumul max = total jusqu’à cette journée
+                .sort_values(by="points_cumul", ascending=False)
+                .reset_index(drop=True)
+            )
+            classement = classement.rename(columns={"points_cumul": "points"})
+            classement["Rang"] = classement.index + 1
+
+        # --- KPI ---
+        instrumentation.etape("rendu.kpi")
+        nb_pronos = len(df)
+        nb_participants = df["participant_nom"].nunique()
+        total_points = df_progress_all["points"].sum()
+        moyenne_points_joueur = total_points / nb_participants if nb_participants else 0
+
+        kpi_cols = st.columns([1.2, 1, 1, 1])
+        with kpi_cols[0]: kpi_card("🏟️ Matchs", nb_matchs, color="#3b82f6")
+        with kpi_cols[1]: kpi_card("🧾 Pronostics", nb_pronos, color="#22c55e")
+        with kpi_cols[2]: kpi_card("👥 Participants", nb_participants, color="#f59e0b")
+        with kpi_cols[3]: kpi_card("🎯 Moy. pts/joueur", f"{moyenne_points_joueur:.2f}", color="#2563eb")
+
         st.markdown("---")
+
+        # --- Affichage classement et progression ---
+        instrumentation.etape("rendu.classement")
+        st.subheader(
+            f"Classement {'global' if journee_sel == 'Toutes' else f'jusqu’à la journée {journee_sel}'} – "
+            f"{'toutes compétitions' if championnat_sel == 'Toutes' else championnat_sel} – {saison_sel}"
+        )
+
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            afficher_classement_visuel(classement, saison_sel, championnat_sel if championnat_sel != "Toutes" else None)
+
+        with col2:
+            st.markdown('')
+            st.markdown('')
+            # Participants du classement ayant une progression, dans l'ordre du classement
+            participants_top = classement.loc[
+                classement["participant_nom"].isin(df_progress_all["participant_nom"]), "participant_nom"
+            ].head(top_n)
+            
+            # Conversion en int pour trier correctement
+            df_progress_all["journee_match"] = df_progress_all["journee_match"].astype(int)
+
+            # Tri par journée ascendant
+            df_progress_all = df_progress_all.sort_values(["journee_match", "participant_nom"]).reset_index(drop=True)
+
+            def construire_cumul():
+                # Calcul de la moyenne cumulée
+                df_moyenne = (
+                    df_progress_all.groupby("journee_match")["points"]
+                    .mean()
+                    .cumsum()
+                    .reset_index()
+                )
+                df_moyenne = df_moyenne.rename(columns={"points": "points_cumul_moyenne"})
+
+                # Une courbe par participant du top, abscisse = rang de la journée dans sa progression
+                colors = pcolors.qualitative.Safe
+                df_top = df_progress_all.assign(
+                    position=df_progress_all.groupby("participant_nom").cumcount() + 1
+                )
+                fig = graphiques.figure_multi_series(
+                    df_top, "position", "points_cumul", "participant_nom",
+                    ordre=participants_top,
+                    styles=lambda nom, i: dict(line=dict(color=colors[i % len(colors)], width=3), marker=dict(size=8))
+                )
+
+                x_moy = [0] + df_moyenne["journee_match"].tolist()
+                y_moy = [0] + df_moyenne["points_cumul_moyenne"].tolist()
+                max_journee = max(df_moyenne["journee_match"]) + 1
+
+                fig.add_trace(go.Scatter(
+                    x=df_moyenne["journee_match"],
+                    y=df_moyenne["points_cumul_moyenne"],
+                    mode='lines+markers',
+                    name="Moyenne championnat",
+                    line=dict(color="dodgerblue", width=3, dash="dot"),
+                    marker=dict(size=7)
+                ))
+
+                fig.update_layout(
+                    xaxis=dict(title="Journée", tickmode="linear", range=[0, max_journee]),
+                    yaxis=dict(title="Points cumulés"),
+                    plot_bgcolor="black",
+                    hovermode="x unified",
+                    height=450,
+                    margin=dict(l=40, r=40, t=50, b=40),
+                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+                )
+                return fig
+
+            graphiques.afficher_figure(
+                graphiques.cle_figure("cumul_top", saison_sel, championnat_sel, journee_sel, None, tables.version_saison(saison_sel), top_n),
+                construire_cumul, use_container_width=True
+            )
+
+        st.markdown("---")
+        
+        # === 📍 SECTIONS 2 à 7 : participant sélectionné (fragment) ===
+        instrumentation.etape("rendu.participant")
+        sections_participant(
+            df, df_progress_all, matrice, classement, tables,
+            saison_sel, championnat_sel, journee_sel, tables.version_saison(saison_sel)
+        )
             
     # ---------------------- ONGLET 2 : Export Excel ----------------------
+    instrumentation.etape("rendu.export")
     with tabs_2:
         # --- 1️⃣ Sélection Saison / Compétition / Journée ---
+        mode_export = st.radio("Exporter :", ["Une journée", "Toutes les journées"], horizontal=True, key="export_mode")
         col1, col2, col3 = st.columns(3)
 
-        # Assurer que les colonnes sont bien au bon type
-        df_matchs["saison"] = df_matchs["saison"].astype(str)
-        df_matchs["journee"] = df_matchs["journee"].astype(int)
-        df_matchs["competition"] = df_matchs["competition"].astype(str)
-
         # Saison
         with col1:
-            saisons = sorted(df_matchs["saison"].unique(), reverse=True)  # tri descendant
+            saisons = sorted(tables.valeurs("all_matchs_football", "saison"), reverse=True)  # tri descendant
             saison_sel = st.selectbox("Saison :", saisons, key="export_saison")
 
         # Compétition
         with col2:
-            competitions = sorted(df_matchs[df_matchs["saison"] == saison_sel]["competition"].unique())
+            competitions = sorted(tables.valeurs("all_matchs_football", "competition", saison=saison_sel))
             competition_sel = st.selectbox("Compétition :", competitions, key=f"export_comp_{saison_sel}")
 
+        if mode_export == "Toutes les journées":
+            # Une feuille par journée, écrite sur disque en mémoire constante au premier téléchargement
+            journees = tables.selection("all_matchs_football", ["journee_int"],
+                                        saison=saison_sel, competition=competition_sel)
+            apercu = journees["journee_int"].value_counts().sort_index().rename_axis("Journée").reset_index(name="Matchs")
+
+            st.markdown("### Journées exportées")
+            st.dataframe(apercu, hide_index=True)
+
+            version = tables.version_saison(saison_sel)
+
+            def octets_saison():
+                # Généré seulement au clic, puis relu depuis le disque pour cette version de la saison
+                return octets_export_saison(tables, saison_sel, competition_sel, version)
+
+            st.download_button(
+                label="📥 Télécharger le fichier Excel",
+                data=octets_saison,
+                file_name=f"{competition_sel}_{saison_sel}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+            return
+
         # Journée
         with col3:
             journees = sorted(
-                df_matchs[
-                    (df_matchs["saison"] == saison_sel) & 
-                    (df_matchs["competition"] == competition_sel)
-                ]["journee"].unique()
+                tables.valeurs("all_matchs_football", "journee_int", saison=saison_sel, competition=competition_sel)
             )
             journee_sel = st.selectbox("Journée :", journees, key=f"export_journee_{saison_sel}_{competition_sel}")
 
         # --- 2️⃣ Récupérer les matchs ---
-        matchs = df_matchs[
-            (df_matchs["saison"] == saison_sel) &
-            (df_matchs["competition"] == competition_sel) &
-            (df_matchs["journee"] == journee_sel)
-        ].sort_values(["equipe_domicile_nom", "equipe_exterieure_nom"])
+        matchs = donnees.types_calcul(tables.selection(
+            "all_matchs_football", saison=saison_sel, competition=competition_sel, journee_int=journee_sel
+        ))
 
         if matchs.empty:
             st.warning("⚠️ Aucun match trouvé pour cette sélection.")
         else:
             # Préparer le DataFrame pour export
-            df_export = matchs[[
-                "equipe_domicile_nom",
-                "score_domicile",
-                "score_exterieur",
-                "equipe_exterieure_nom"
-            ]].copy()
-
-            df_export.columns = ["Equipe domicile", "Score domicile", "Score extérieur", "Equipe extérieure"]
-
-            # Remplacer les NaN par des chaînes vides pour éviter les erreurs Excel
-            df_export = df_export.fillna("").astype(str)
+            df_export = tableau_export(matchs)
 
             # --- Prévisualisation ---
             st.markdown("### Prévisualisation des matchs")
             st.dataframe(df_export, hide_index=True)
 
-            # --- Générer le fichier Excel en mémoire ---
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df_export.to_excel(writer, sheet_name="Pronostics", index=False, startrow=2)
-                workbook  = writer.book
-                worksheet = writer.sheets["Pronostics"]
-
-                # === Styles ===
-                title_format = workbook.add_format({
-                    "bold": True, "font_size": 14, "align": "center", "valign": "vcenter",
-                    "bg_color": "#004c91", "font_color": "white"
-                })
-                header_format = workbook.add_format({
-                    "bold": True, "bg_color": "#6fa8dc", "border": 1,
-                    "align": "center", "valign": "vcenter"
-                })
-                cell_center = workbook.add_format({"align": "center", "valign": "vcenter", "border": 1})
-                cell_left   = workbook.add_format({"align": "left",   "valign": "vcenter", "border": 1})
-                cell_right  = workbook.add_format({"align": "right",  "valign": "vcenter", "border": 1})
-                cell_center_alt = workbook.add_format({"align": "center", "valign": "vcenter", "border": 1, "bg_color": "#dce6f1"})
-                cell_left_alt   = workbook.add_format({"align": "left",   "valign": "vcenter", "border": 1, "bg_color": "#dce6f1"})
-                cell_right_alt  = workbook.add_format({"align": "right",  "valign": "vcenter", "border": 1, "bg_color": "#dce6f1"})
-
-                # === Titre fusionné ===
-                titre = f"{competition_sel} - Saison {saison_sel} - Journée {journee_sel}"
-                worksheet.merge_range("A1:D1", titre, title_format)
-
-                # === En-têtes ===
-                for col_num, col_name in enumerate(df_export.columns):
-                    worksheet.write(2, col_num, col_name, header_format)
-
-                # === Largeur automatique ===
-                for i, col in enumerate(df_export.columns):
-                    max_len = max(df_export[col].map(len).max(), len(col)) + 2
-                    worksheet.set_column(i, i, max_len)
-
-                # === Alignement + zébrage ===
-                for row_num in range(len(df_export)):
-                    alt = (row_num % 2 == 1)
-                    fmt_right  = cell_right_alt if alt else cell_right
-                    fmt_center = cell_center_alt if alt else cell_center
-                    fmt_left   = cell_left_alt if alt else cell_left
-
-                    worksheet.write(row_num + 3, 0, df_export.iloc[row_num, 0], fmt_right)
-                    worksheet.write(row_num + 3, 1, df_export.iloc[row_num, 1], fmt_center)
-                    worksheet.write(row_num + 3, 2, df_export.iloc[row_num, 2], fmt_center)
-                    worksheet.write(row_num + 3, 3, df_export.iloc[row_num, 3], fmt_left)
-
             # === Téléchargement ===
             st.download_button(
                 label="📥 Télécharger le fichier Excel",
-                data=output.getvalue(),
+                # Généré seulement au clic (dans un thread séparé), puis servi depuis le cache
+                data=lambda: classeur_export(df_export, saison_sel, competition_sel, journee_sel),
                 file_name=f"{competition_sel}_J{journee_sel}_{saison_sel}.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+import instrumentation
+
+# ---------------- Graphiques multi-séries ---------------- #
+# Évolutions de classement / de points : une courbe par équipe ou par participant,
+# construites en un seul appel à partir d'un tableau long (une ligne par point).
+
+# Au-delà de ce nombre de séries, les courbes sont rendues en WebGL (Scattergl)
+SEUIL_WEBGL = 15
+
+
+def traces_multi_series(df, x, y, serie, ordre=None, styles=None, mode="lines+markers", hovertemplate=None):
+    """Une trace par série du tableau long `df`.
+
+    Les lignes sont réparties entre les séries en une seule passe (tri stable puis découpage),
+    au lieu d'un filtrage booléen par série. `ordre` fixe l'ordre des séries (ordre d'apparition
+    par défaut), `styles(nom, i)` renvoie les options propres à la i-ème série tracée.
+    """
+    if ordre is None:
+        codes, noms = pd.factorize(df[serie], sort=False)
+    else:
+        noms = pd.Index(ordre)
+        codes = noms.get_indexer(df[serie])
+    noms = np.asarray(noms)
+
+    gardes = codes >= 0
+    codes = codes[gardes]
+    tri = np.argsort(codes, kind="stable")
+    xs = df[x].to_numpy()[gardes][tri]
+    ys = df[y].to_numpy()[gardes][tri]
+    bornes = np.searchsorted(codes[tri], np.arange(len(noms) + 1))
+
+    series = [(noms[k], bornes[k], bornes[k + 1]) for k in range(len(noms)) if bornes[k + 1] > bornes[k]]
+    classe_trace = go.Scattergl if len(series) > SEUIL_WEBGL else go.Scatter
+
+    traces = []
+    for i, (nom, debut, fin) in enumerate(series):
+        options = {"mode": mode, "name": nom}
+        if hovertemplate is not None:
+            options["hovertemplate"] = hovertemplate
+        if styles is not None:
+            options.update(styles(nom, i))
+        traces.append(classe_trace(x=xs[debut:fin], y=ys[debut:fin], **options))
+    return traces
+
+
+def figure_multi_series(df, x, y, serie, layout=None, **options):
+    """Figure complète construite en un seul appel (pas d'add_trace successifs)."""
+    return go.Figure(data=traces_multi_series(df, x, y, serie, **options), layout=layout)
+
+
+# ---------------- Cache des figures ---------------- #
+# Figures déjà construites et prêtes à l'affichage, partagées entre les sessions et bornées (LRU) :
+# revenir sur une sélection déjà vue ne reconstruit pas la figure, et st.plotly_chart n'a plus
+# qu'à sérialiser son dictionnaire, calculé une seule fois.
+
+TAILLE_CACHE_FIGURES = 256
+
+_figures = OrderedDict()
+_verrou_figures = threading.Lock()
+STATS_FIGURES = {"hits": 0, "misses": 0}
+
+
+def cle_figure(type_graphique, saison=None, competition=None, journee=None, participant=None, version=None, *precisions):
+    """Clé d'une figure : sélection affichée, version des données, puis options propres au graphique."""
+    return (type_graphique, saison, competition, journee, participant, version, *precisions)
+
+
+class _FigureFigee(go.Figure):
+    """Figure dont st.plotly_chart lit un dictionnaire calculé à la construction.
+
+    go.Figure.to_dict() recopie la figure et réencode ses tableaux numpy à chaque appel, soit
+    l'essentiel du coût d'un st.plotly_chart. Le dictionnaire figé n'est jamais modifié :
+    il est partagé entre les sessions.
+    """
+
+    def __init__(self, figure):
+        super().__init__()
+        self._figee = figure.to_dict()
+
+    def to_dict(self):
+        return self._figee
+
+
+def figure_figee(cle, construire):
+    """Figure `cle` prête à l'affichage, construite par `construire()` au premier appel seulement."""
+    with _verrou_figures:
+        if cle in _figures:
+            _figures.move_to_end(cle)
+            STATS_FIGURES["hits"] += 1
+            return _figures[cle]
+
+    with instrumentation.span(f"figure.{cle[0]}"):
+        fig = _FigureFigee(construire())
+    with _verrou_figures:
+        STATS_FIGURES["misses"] += 1
+        _figures[cle] = fig
+        while len(_figures) > TAILLE_CACHE_FIGURES:
+            _figures.popitem(last=False)
+    return fig
+
+
+def afficher_figure(cle, construire, **options):
+    """st.plotly_chart d'une figure mise en cache sous `cle`."""
+    st.plotly_chart(figure_figee(cle, construire), **options)
+
+
+def vider_cache_figures():
+    with _verrou_figures:
+        _figures.clear()
@@ -0,0 +1,193 @@
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import donnees
+import ingestion
+from donnees import normalize_text
+
+# ---------------- Import des feuilles de pronostics remplies ---------------- #
+# Relit les classeurs produits par l'onglet « Export Excel » de la page Expert Canapé, une fois
+# remplis par les participants : chaque feuille porte le titre « Compétition - Saison S - Journée J »
+# puis les colonnes Equipe domicile / Score domicile / Score extérieur / Equipe extérieure.
+# Les classeurs sont lus en parallèle (un processus par cœur), les équipes rapprochées des
+# matchs de la journée par leur nom canonique (normalize_text, clubs_correspondance.csv), puis
+# toutes les lignes sont écrites en un seul lot par l'API d'ingestion (ingestion.py).
+#
+# Le participant est reconnu dans le nom du fichier (« Adrien_Ligue 1_J12_2024-2025.xlsx »)
+# ou imposé par --participant (identifiant ou pseudo).
+#
+#   python importation.py classeurs/*.xlsx [--participant Adrien] [--matchs-joues] [--processus N]
+
+COLONNES = ["Equipe domicile", "Score domicile", "Score extérieur", "Equipe extérieure"]
+TITRE = re.compile(r"^(?P<competition>.+) - Saison (?P<saison>.+) - Journée (?P<journee>-?\d+)$")
+
+
+# ---------------- Lecture des classeurs ---------------- #
+def lire_classeur(chemin):
+    """Feuilles d'un classeur : {"feuille", "titre", "lignes": [(n° de ligne Excel, 4 cellules)]}.
+
+    Exécutée dans un processus de lecture ; renvoie {"erreur": motif} si le fichier est illisible.
+    """
+    # openpyxl n'est importé que pour l'import des classeurs
+    import openpyxl
+    try:
+        classeur = openpyxl.load_workbook(chemin, read_only=True, data_only=True)
+    except Exception as e:  # zip ou XML invalide : motif de rejet du fichier
+        return {"erreur": f"classeur illisible ({type(e).__name__})"}
+
+    feuilles = []
+    try:
+        for feuille in classeur.worksheets:
+            titre, colonnes, lignes = None, None, []
+            for n, cellules in enumerate(feuille.iter_rows(values_only=True), start=1):
+                cellules = list(cellules)
+                if titre is None and any(c is not None for c in cellules):
+                    titre = str(next(c for c in cellules if c is not None)).strip()
+                elif colonnes is None:
+                    en_tetes = [str(c).strip() if c is not None else "" for c in cellules]
+                    if all(col in en_tetes for col in COLONNES):
+                        colonnes = [en_tetes.index(col) for col in COLONNES]
+                elif any(c is not None for c in cellules):
+                    lignes.append((n, [cellules[i] if i < len(cellules) else None for i in colonnes]))
+            if colonnes is not None:
+                feuilles.append({"feuille": feuille.title, "titre": titre, "lignes": lignes})
+    finally:
+        classeur.close()
+    return {"feuilles": feuilles}
+
+
+def lire_classeurs(chemins, processus=None):
+    """{chemin: feuilles} des classeurs, lus sur `processus` processus (1 : sans pool)."""
+    processus = min(processus or os.cpu_count() or 1, len(chemins)) or 1
+    if processus == 1:
+        return {chemin: lire_classeur(chemin) for chemin in chemins}
+    with ProcessPoolExecutor(max_workers=processus) as pool:
+        return dict(zip(chemins, pool.map(lire_classeur, chemins)))
+
+
+# ---------------- Rapprochements ---------------- #
+def correspondances_clubs(dossier="csv"):
+    """{nom canonique saisi: nom canonique des matchs} d'après clubs_correspondance.csv."""
+    try:
+        df = pd.read_csv(os.path.join(dossier, "clubs_correspondance.csv"))
+    except OSError:
+        return {}
+    return {normalize_text(a): normalize_text(b) for a, b in zip(df["nom_csv"], df["nom_db"])}
+
+
+def participant_fichier(chemin, participants):
+    """Identifiant du seul participant dont le pseudo figure dans le nom du fichier, sinon le motif."""
+    nom = normalize_text(os.path.splitext(os.path.basename(chemin))[0])
+    trouves = [pid for pid, pseudo in participants.items()
+               if re.search(rf"(^|[^a-z0-9]){re.escape(pseudo)}($|[^a-z0-9])", nom)]
+    # « Alexandre K » l'emporte sur un éventuel « Alexandre » : on garde les pseudos les plus longs
+    if trouves:
+        plus_long = max(len(participants[pid]) for pid in trouves)
+        trouves = [pid for pid in trouves if len(participants[pid]) == plus_long]
+    if len(trouves) != 1:
+        return "participant introuvable dans le nom du fichier" if not trouves else "participant ambigu"
+    return trouves[0]
+
+
+def _index_matchs(df_matchs):
+    """{(compétition, saison, journée, domicile, extérieur canoniques): [(match_id, joué)]}."""
+    index = {}
+    colonnes = ["competition", "saison", "journee_int", "equipe_domicile_canon", "equipe_exterieure_canon",
+                "match_id", "score_domicile"]
+    for comp, saison, journee, dom, ext, match_id, score in df_matchs[colonnes].itertuples(index=False):
+        cle = (normalize_text(comp), str(saison), int(journee), dom, ext)
+        index.setdefault(cle, []).append((int(match_id), pd.notna(score)))
+    return index
+
+
+# ---------------- Import ---------------- #
+def _vide(cellule):
+    return cellule is None or str(cellule).strip() == ""
+
+
+def importer(chemins, dossier="csv", participant=None, matchs_joues=False, processus=None, tables=None):
+    """Importe les pronostics des classeurs `chemins` en un lot ; renvoie le rapport.
+
+    Rapport : celui d'ingestion.ingerer (acceptes, doublons, saisons), les lignes sans score
+    (« vides ») et les rejets [(fichier, feuille, ligne Excel, motif)], lecture et validation
+    confondues. Les pronostics de matchs déjà joués sont rejetés, sauf `matchs_joues`.
+    """
+    tables = tables or donnees.charger_tables(dossier, "memoire")
+    participants = {int(pid): normalize_text(pseudo)
+                    for pid, pseudo in zip(tables["participants"]["id"], tables["participants"]["pseudo"])}
+    if participant is not None:
+        cible = str(participant)
+        trouves = [pid for pid, pseudo in participants.items() if cible == str(pid) or normalize_text(cible) == pseudo]
+        if len(trouves) != 1:
+            raise ValueError(f"participant inconnu : {participant}")
+        participant = trouves[0]
+
+    correspondances = correspondances_clubs(dossier)
+    index = _index_matchs(tables["all_matchs_football"])
+
+    def canon(nom):
+        return correspondances.get(normalize_text(nom), normalize_text(nom))
+
+    entrees, origines, rejets, vides = [], [], [], 0
+    for chemin, lu in lire_classeurs(list(chemins), processus).items():
+        fichier = os.path.basename(chemin)
+        if "erreur" in lu:
+            rejets.append((fichier, None, None, lu["erreur"]))
+            continue
+        pid = participant if participant is not None else participant_fichier(chemin, participants)
+        if isinstance(pid, str):
+            rejets.append((fichier, None, None, pid))
+            continue
+        if not lu["feuilles"]:
+            rejets.append((fichier, None, None, "aucune feuille de pronostics"))
+
+        for feuille in lu["feuilles"]:
+            titre = TITRE.match(feuille["titre"] or "")
+            if titre is None:
+                rejets.append((fichier, feuille["feuille"], 1, f"titre illisible : {feuille['titre']!r}"))
+                continue
+            journee = (normalize_text(titre["competition"]), titre["saison"], int(titre["journee"]))
+
+            for n, (dom, score_dom, score_ext, ext) in feuille["lignes"]:
+                if _vide(score_dom) and _vide(score_ext):
+                    vides += 1
+                    continue
+                trouves = index.get((*journee, canon(dom), canon(ext)), [])
+                if len(trouves) != 1:
+                    motif = f"match introuvable : {dom} - {ext}" if not trouves else f"match ambigu : {dom} - {ext}"
+                    rejets.append((fichier, feuille["feuille"], n, motif))
+                    continue
+                match_id, joue = trouves[0]
+                if joue and not matchs_joues:
+                    rejets.append((fichier, feuille["feuille"], n, f"match déjà joué : {dom} - {ext}"))
+                    continue
+                entrees.append({"type": "pronostic", "participant_id": pid, "match_id": match_id,
+                                "score_domicile": score_dom, "score_exterieur": score_ext})
+                origines.append((fichier, feuille["feuille"], n))
+
+    # Un seul lot : validation des scores, dédoublonnage et écriture du journal par l'ingestion
+    rapport = ingestion.ingerer(dossier, entrees, tables)
+    rejets += [(*origines[numero], motif) for numero, motif in rapport["rejets"]]
+    rejets.sort(key=lambda r: (r[0], r[1] or "", r[2] or 0))
+    return {**rapport, "vides": vides, "rejets": rejets}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importe les pronostics des classeurs Excel remplis.")
+    parser.add_argument("classeurs", nargs="+", help="fichiers xlsx")
+    parser.add_argument("--donnees", default="csv", help="dossier des CSV")
+    parser.add_argument("--participant", help="participant (identifiant ou pseudo) de tous les classeurs")
+    parser.add_argument("--matchs-joues", action="store_true", help="accepte les pronostics de matchs déjà joués")
+    parser.add_argument("--processus", type=int, help="processus de lecture (un par cœur par défaut, 1 : sans pool)")
+    args = parser.parse_args()
+
+    rapport = importer(args.classeurs, args.donnees, args.participant, args.matchs_joues, args.processus)
+    print(f"{rapport['acceptes']} pronostics ajoutés, {rapport['doublons']} doublons, "
+          f"{rapport['vides']} lignes sans score, {len(rapport['rejets'])} rejetées")
+    for fichier, feuille, ligne, motif in rapport["rejets"]:
+        lieu = fichier if feuille is None else f"{fichier} [{feuille}]" + ("" if ligne is None else f" ligne {ligne}")
+        print(f"  {lieu} : {motif}")
+    if rapport["saisons"]:
+        print("Saisons touchées : " + ", ".join(rapport["saisons"]))
@@ -0,0 +1,379 @@
+import argparse
+import datetime
+import json
+import math
+import os
+import pandas as pd
+import pronostics
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus
+    fcntl = None
+
+# ---------------- Ingestion des pronostics et des résultats ---------------- #
+# Les nouveaux pronostics et résultats (scores, cotes) ne remplacent plus les CSV : ils sont
+# validés, dédoublonnés puis ajoutés à un journal (JSON lines, ajout seul) dans
+# <dossier des CSV>/ingestion/. Au chargement, les tables appliquent par-dessus les CSV les
+# données compactées (parquet) puis le journal, la dernière saisie l'emportant.
+#
+# Chaque ajout note sa saison : la version d'une saison (donnees.TablesLectureSeule.version_saison)
+# ne change que si elle a reçu des données, seuls ses artefacts et caches sont donc invalidés.
+# Le compactage (automatique au-delà de SEUIL_COMPACTAGE lignes) fusionne le journal dans le
+# parquet sans changer le contenu des tables ni la version des saisons.
+#
+#   python ingestion.py ajouter fichier.csv|fichier.jsonl [--type pronostic|resultat] [--recalculer]
+#   python ingestion.py compacter
+#   python ingestion.py etat
+
+DOSSIER_INGESTION = "ingestion"
+FICHIER_JOURNAL = "journal.jsonl"
+FICHIER_ETAT = "etat.json"
+FICHIER_VERROU = ".verrou"
+FICHIERS_COMPACTES = {"pronostic": "pronostics.parquet", "resultat": "resultats.parquet"}
+SEUIL_COMPACTAGE = 1000
+SCORE_MAX = 99
+
+# Champs de chaque type d'entrée ; les clés identifient la donnée remplacée par une nouvelle saisie
+CHAMPS = {
+    "pronostic": ["participant_id", "match_id", "score_domicile", "score_exterieur"],
+    "resultat": ["match_id", "score_domicile", "score_exterieur", "cote_domicile", "cote_nul", "cote_exterieur"],
+}
+CLES = {"pronostic": ["participant_id", "match_id"], "resultat": ["match_id"]}
+COTES = ["cote_domicile", "cote_nul", "cote_exterieur"]
+
+
+def _chemin(dossier, fichier):
+    return os.path.join(dossier, DOSSIER_INGESTION, fichier)
+
+
+def fichiers(dossier="csv"):
+    """Fichiers d'ingestion existants (journal et parquet compactés), pour l'empreinte des données."""
+    noms = [FICHIER_JOURNAL, *FICHIERS_COMPACTES.values()]
+    return [_chemin(dossier, nom) for nom in noms if os.path.exists(_chemin(dossier, nom))]
+
+
+class _Verrou:
+    """Verrou exclusif entre processus sur le dossier d'ingestion (ajouts et compactage)."""
+
+    def __init__(self, dossier):
+        os.makedirs(os.path.join(dossier, DOSSIER_INGESTION), exist_ok=True)
+        self._chemin = _chemin(dossier, FICHIER_VERROU)
+
+    def __enter__(self):
+        self._f = open(self._chemin, "a")
+        if fcntl is not None:
+            fcntl.flock(self._f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._f, fcntl.LOCK_UN)
+        self._f.close()
+
+
+def _ecrire_json(chemin, contenu):
+    with open(chemin + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(contenu, f, ensure_ascii=False)
+    os.replace(chemin + ".tmp", chemin)
+
+
+# ---------------- Lecture ---------------- #
+def lire_etat(dossier="csv"):
+    """{"sequence": dernier numéro attribué, "saisons": {saison: numéro de son dernier ajout}}."""
+    try:
+        with open(_chemin(dossier, FICHIER_ETAT), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"sequence": 0, "saisons": {}}
+
+
+def lire_journal(dossier="csv"):
+    """Entrées du journal dans l'ordre d'ajout ; une dernière ligne incomplète (écriture interrompue) est ignorée."""
+    entrees = []
+    try:
+        with open(_chemin(dossier, FICHIER_JOURNAL), encoding="utf-8") as f:
+            for ligne in f:
+                try:
+                    entrees.append(json.loads(ligne))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return entrees
+
+
+def ingeres(dossier="csv", type_entree="pronostic"):
+    """Données ingérées d'un type (compactées puis journal), dans l'ordre de saisie."""
+    morceaux = []
+    try:
+        morceaux.append(pd.read_parquet(_chemin(dossier, FICHIERS_COMPACTES[type_entree])))
+    except (ImportError, OSError, ValueError):
+        pass
+    journal = [e for e in lire_journal(dossier) if e.get("type") == type_entree]
+    if journal:
+        morceaux.append(pd.DataFrame.from_records(journal))
+    morceaux = [m.reindex(columns=CHAMPS[type_entree]) for m in morceaux if not m.empty]
+    if not morceaux:
+        return pd.DataFrame(columns=CHAMPS[type_entree])
+    return pd.concat(morceaux, ignore_index=True)
+
+
+def _resultats_effectifs(df):
+    """Dernière valeur renseignée de chaque champ, par match (une saisie peut ne donner que les cotes)."""
+    return df.astype({col: "float64" for col in CHAMPS["resultat"][1:]}).groupby("match_id").last()
+
+
+# ---------------- Application aux tables ---------------- #
+def appliquer_pronostics(store, dossier="csv"):
+    """Store des pronostics complété par les pronostics ingérés (la dernière saisie l'emporte)."""
+    ajouts = ingeres(dossier, "pronostic")
+    if ajouts.empty:
+        return store
+    base = store.reset_index().rename(columns={"score_dom": "score_domicile", "score_ext": "score_exterieur"})
+    return pronostics.construire_store(pd.concat([base, ajouts], ignore_index=True))
+
+
+def appliquer_resultats(df_matchs, dossier="csv"):
+    """Matchs bruts (CSV) dont les scores et cotes sont remplacés par les résultats ingérés."""
+    ajouts = ingeres(dossier, "resultat")
+    if ajouts.empty:
+        return df_matchs
+    resultats = _resultats_effectifs(ajouts)
+    df_matchs = df_matchs.copy()
+    for col in resultats.columns:
+        if col in df_matchs.columns:
+            df_matchs[col] = df_matchs["match_id"].map(resultats[col]).combine_first(df_matchs[col])
+    return df_matchs
+
+
+# ---------------- Validation ---------------- #
+def _entier(valeur):
+    """Entier d'une valeur saisie (int, float entier ou texte), None sinon."""
+    try:
+        nombre = float(valeur)
+    except (TypeError, ValueError):
+        return None
+    return int(nombre) if math.isfinite(nombre) and nombre.is_integer() else None
+
+
+def _vide(valeur):
+    return valeur is None or valeur == "" or (isinstance(valeur, float) and math.isnan(valeur))
+
+
+def _normaliser(entree, participants, matchs):
+    """(type, champs normalisés, saison) d'une entrée, ou le motif de son rejet (str)."""
+    type_entree = entree.get("type")
+    if type_entree not in CHAMPS:
+        return f"type inconnu : {type_entree!r}"
+
+    match_id = _entier(entree.get("match_id"))
+    if match_id is None or match_id not in matchs.index:
+        return f"match inconnu : {entree.get('match_id')!r}"
+    champs = {"match_id": match_id}
+
+    if type_entree == "pronostic":
+        participant_id = _entier(entree.get("participant_id"))
+        if participant_id is None or participant_id not in participants:
+            return f"participant inconnu : {entree.get('participant_id')!r}"
+        champs["participant_id"] = participant_id
+
+    # Un résultat peut ne donner que les cotes (match à venir), un pronostic jamais
+    scores = [entree.get("score_domicile"), entree.get("score_exterieur")]
+    if type_entree == "pronostic" or not all(_vide(s) for s in scores):
+        if any(_vide(s) for s in scores):
+            return "score incomplet"
+        scores = [_entier(s) for s in scores]
+        if any(s is None or not 0 <= s <= SCORE_MAX for s in scores):
+            return f"score invalide : {entree.get('score_domicile')!r}-{entree.get('score_exterieur')!r}"
+        champs["score_domicile"], champs["score_exterieur"] = scores
+
+    if type_entree == "resultat":
+        for col in COTES:
+            if _vide(entree.get(col)):
+                continue
+            try:
+                cote = float(entree[col])
+            except (TypeError, ValueError):
+                cote = math.nan
+            if not (math.isfinite(cote) and cote > 1):
+                return f"cote invalide ({col}) : {entree[col]!r}"
+            champs[col] = cote
+        if len(champs) == 1:
+            return "ni score ni cote"
+
+    return type_entree, champs, str(matchs.at[match_id, "saison"])
+
+
+def _valeurs_actuelles(tables, dossier):
+    """Valeurs en vigueur des clés ingérables, pour le dédoublonnage.
+
+    Pronostics des tables chargées, puis journal rejoué par-dessus : il a pu grandir depuis
+    le chargement (rejouer une entrée déjà appliquée ne change rien). Les résultats absents
+    sont lus dans les matchs (_resultat_actuel).
+    """
+    store = tables["pronostics"]
+    actuels = {
+        ("pronostic", pid, mid): (int(dom), int(ext))
+        for (pid, mid), dom, ext in zip(store.index, store["score_dom"], store["score_ext"])
+    }
+    for entree in lire_journal(dossier):
+        if entree.get("type") == "pronostic":
+            actuels[("pronostic", entree["participant_id"], entree["match_id"])] = (
+                entree["score_domicile"], entree["score_exterieur"])
+        elif entree.get("type") == "resultat":
+            for col in CHAMPS["resultat"][1:]:
+                if col in entree:
+                    actuels[("resultat", entree["match_id"], col)] = entree[col]
+    return actuels
+
+
+def _resultat_actuel(matchs, match_id, col):
+    valeur = matchs.at[match_id, col]
+    if pd.isna(valeur):
+        return None
+    return int(valeur) if col in ("score_domicile", "score_exterieur") else float(valeur)
+
+
+# ---------------- Écriture ---------------- #
+def ingerer(dossier="csv", entrees=(), tables=None, compacter_auto=True):
+    """Valide, dédoublonne et ajoute des entrées au journal ; renvoie le rapport d'ingestion.
+
+    Entrée : {"type": "pronostic", "participant_id", "match_id", "score_domicile", "score_exterieur"}
+    ou {"type": "resultat", "match_id", scores et / ou cotes}. Une entrée identique aux données en
+    vigueur (ou à une entrée précédente du lot) est un doublon, non écrit.
+    Rapport : {"acceptes", "doublons", "rejets": [(n° de l'entrée, motif)], "saisons"}.
+    """
+    if tables is None:
+        # Import local : donnees lit lui-même le journal au chargement des tables
+        import donnees
+        tables = donnees.charger_tables(dossier, "memoire")
+    matchs = (tables["all_matchs_football"][["match_id", "saison", *CHAMPS["resultat"][1:]]]
+              .drop_duplicates("match_id").set_index("match_id"))
+    participants = set(tables["participants"]["id"].astype(int))
+
+    rapport = {"acceptes": 0, "doublons": 0, "rejets": [], "saisons": []}
+    lignes = []
+    with _Verrou(dossier):
+        actuels = _valeurs_actuelles(tables, dossier)
+        etat = lire_etat(dossier)
+        horodatage = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+        for numero, entree in enumerate(entrees):
+            normalisee = _normaliser(entree, participants, matchs)
+            if isinstance(normalisee, str):
+                rapport["rejets"].append((numero, normalisee))
+                continue
+            type_entree, champs, saison = normalisee
+
+            if type_entree == "pronostic":
+                cle = ("pronostic", champs["participant_id"], champs["match_id"])
+                valeur = (champs["score_domicile"], champs["score_exterieur"])
+                nouveaux = {cle: valeur} if actuels.get(cle) != valeur else {}
+            else:
+                nouveaux = {}
+                for col, valeur in champs.items():
+                    cle = ("resultat", champs["match_id"], col)
+                    if col != "match_id" and actuels.get(cle, _resultat_actuel(matchs, champs["match_id"], col)) != valeur:
+                        nouveaux[cle] = valeur
+            if not nouveaux:
+                rapport["doublons"] += 1
+                continue
+
+            actuels.update(nouveaux)
+            etat["sequence"] += 1
+            etat["saisons"][saison] = etat["sequence"]
+            lignes.append(json.dumps({"sequence": etat["sequence"], "horodatage": horodatage,
+                                      "type": type_entree, "saison": saison, **champs}, ensure_ascii=False))
+            rapport["acceptes"] += 1
+            if saison not in rapport["saisons"]:
+                rapport["saisons"].append(saison)
+
+        if lignes:
+            # Journal d'abord (ajout seul, écrit sur disque), état ensuite : après une interruption
+            # entre les deux, les lignes sont servies et seule la version des saisons est en retard
+            with open(_chemin(dossier, FICHIER_JOURNAL), "a", encoding="utf-8") as f:
+                f.write("\n".join(lignes) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            _ecrire_json(_chemin(dossier, FICHIER_ETAT), etat)
+
+    if compacter_auto and len(lire_journal(dossier)) >= SEUIL_COMPACTAGE:
+        compacter(dossier)
+    return rapport
+
+
+def compacter(dossier="csv"):
+    """Fusionne le journal dans les parquet compactés (une ligne par clé) puis le vide.
+
+    Le contenu des tables et la version des saisons ne changent pas. Renvoie le nombre
+    d'entrées du journal compactées.
+    """
+    with _Verrou(dossier):
+        nb = len(lire_journal(dossier))
+        if nb == 0:
+            return 0
+        for type_entree, fichier in FICHIERS_COMPACTES.items():
+            df = ingeres(dossier, type_entree)
+            if df.empty:
+                continue
+            if type_entree == "pronostic":
+                df = df.drop_duplicates(CLES[type_entree], keep="last").astype("int64")
+            else:
+                df = _resultats_effectifs(df).reset_index()
+            chemin = _chemin(dossier, fichier)
+            df.to_parquet(chemin + ".tmp", index=False)
+            os.replace(chemin + ".tmp", chemin)
+        # Parquet remplacés avant de vider le journal : rejouer le journal par-dessus ne change rien
+        chemin = _chemin(dossier, FICHIER_JOURNAL)
+        open(chemin + ".tmp", "w").close()
+        os.replace(chemin + ".tmp", chemin)
+    return nb
+
+
+# ---------------- Lecture des fichiers d'entrées ---------------- #
+def lire_entrees(chemin, type_entree=None):
+    """Entrées d'un fichier CSV ou JSON lines ; `type_entree` complète celles qui n'en ont pas."""
+    if chemin.endswith(".jsonl") or chemin.endswith(".json"):
+        with open(chemin, encoding="utf-8") as f:
+            entrees = [json.loads(ligne) for ligne in f if ligne.strip()]
+    else:
+        entrees = pd.read_csv(chemin, dtype=str, keep_default_na=False).to_dict("records")
+    if type_entree:
+        for entree in entrees:
+            entree.setdefault("type", type_entree)
+    return entrees
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingestion des pronostics et résultats (journal en ajout seul).")
+    parser.add_argument("--donnees", default="csv", help="dossier des CSV")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+    ajout = commandes.add_parser("ajouter", help="valide et ajoute les entrées de fichiers CSV ou JSON lines")
+    ajout.add_argument("fichiers", nargs="+")
+    ajout.add_argument("--type", choices=list(CHAMPS), help="type des entrées sans colonne « type »")
+    ajout.add_argument("--recalculer", action="store_true",
+                       help="recalcule ensuite les artefacts des saisons touchées (precalculs.py)")
+    commandes.add_parser("compacter", help="fusionne le journal dans le stockage parquet")
+    commandes.add_parser("etat", help="taille du journal et version des saisons")
+    args = parser.parse_args()
+
+    if args.commande == "ajouter":
+        entrees = [e for chemin in args.fichiers for e in lire_entrees(chemin, args.type)]
+        rapport = ingerer(args.donnees, entrees)
+        print(f"{rapport['acceptes']} ajoutées, {rapport['doublons']} doublons, {len(rapport['rejets'])} rejetées")
+        for numero, motif in rapport["rejets"]:
+            print(f"  entrée {numero + 1} rejetée : {motif}")
+        if rapport["saisons"]:
+            print("Saisons touchées : " + ", ".join(rapport["saisons"]))
+            if args.recalculer:
+                # Import local : les précalculs importent les pages (Streamlit)
+                import precalculs
+                precalculs.precalculer(args.donnees)
+    elif args.commande == "compacter":
+        print(f"{compacter(args.donnees)} entrées compactées")
+    else:
+        etat = lire_etat(args.donnees)
+        print(f"{len(lire_journal(args.donnees))} entrées dans le journal, séquence {etat['sequence']}")
+        for saison, sequence in sorted(etat["saisons"].items()):
+            print(f"  {saison} : {sequence}")
@@ -0,0 +1,212 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+import pandas as pd
+
+# ---------------- Instrumentation ---------------- #
+# Mesures nommées (« spans ») autour des étapes de chargement, de calcul et de rendu des pages.
+# Chaque span enregistre sa durée et, quand le suivi mémoire est actif (tracemalloc), le pic
+# de mémoire atteint pendant l'étape au-dessus de la mémoire vivante à son début (pic_ko).
+# tracemalloc suit tout le processus : les allocations des autres sessions y sont comptées.
+# Les spans d'une exécution de script sont gardés pour le panneau de debug et peuvent être
+# exportés en JSON lines (un span par ligne).
+
+# Fichier JSON lines où chaque exécution est ajoutée (désactivé si la variable est vide)
+FICHIER_SPANS = os.environ.get("FOOTBALL_SPANS", "")
+# Suivi des allocations dès le démarrage
+if os.environ.get("FOOTBALL_TRACEMALLOC") == "1" and not tracemalloc.is_tracing():
+    tracemalloc.start()
+# Le panneau de debug ne peut démarrer ou arrêter le suivi (pour tout le processus) que si le
+# serveur l'autorise : ?debug=1 seul ne suffit pas
+TRACEMALLOC_MODIFIABLE = os.environ.get("FOOTBALL_TRACEMALLOC_PANNEAU") == "1"
+
+_local = threading.local()
+_verrou_fichier = threading.Lock()
+
+
+def _execution():
+    """Exécution en cours dans ce thread (une rerun complète ou un fragment)."""
+    execution = getattr(_local, "execution", None)
+    if execution is None:
+        execution = _local.execution = {"id": uuid.uuid4().hex[:8], "page": None, "spans": [], "pile": []}
+    return execution
+
+
+def debut_execution(page):
+    """Démarre l'enregistrement d'une nouvelle exécution de script pour `page`."""
+    _local.execution = {"id": uuid.uuid4().hex[:8], "page": page, "spans": [], "pile": []}
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+
+def _ouvrir(nom, etape=False, **attributs):
+    execution = _execution()
+    parent = execution["pile"][-1] if execution["pile"] else None
+    span = {
+        "execution": execution["id"],
+        "page": execution["page"],
+        "nom": nom,
+        "parent": parent["nom"] if parent else None,
+        "profondeur": len(execution["pile"]),
+        "debut": time.time(),
+        "duree_ms": None,
+        "pic_ko": None,
+        **attributs,
+        "_t0": time.perf_counter(),
+        "_m0": None,
+        "_etape": etape,
+    }
+    if tracemalloc.is_tracing():
+        # Le pic est remis à zéro pour mesurer ce span : celui atteint jusque-là est reporté au parent
+        courante, pic = tracemalloc.get_traced_memory()
+        if parent is not None and parent["_m0"] is not None:
+            parent["_pic"] = max(parent["_pic"], pic)
+        tracemalloc.reset_peak()
+        span["_m0"] = span["_pic"] = courante
+    execution["pile"].append(span)
+    execution["spans"].append(span)
+    return span
+
+
+def _fermer(span):
+    pile = _execution()["pile"]
+    if any(ouvert is span for ouvert in pile):
+        # Ferme d'abord les étapes restées ouvertes sous ce span
+        while pile[-1] is not span:
+            _fermer(pile[-1])
+        pile.pop()
+    if span["duree_ms"] is None:
+        span["duree_ms"] = round((time.perf_counter() - span["_t0"]) * 1000, 3)
+        if span["_m0"] is not None and tracemalloc.is_tracing():
+            pic = max(span["_pic"], tracemalloc.get_traced_memory()[1])
+            span["pic_ko"] = round((pic - span["_m0"]) / 1024, 1)
+            # Le pic du span compte aussi dans celui du span englobant
+            if pile and pile[-1]["_m0"] is not None:
+                pile[-1]["_pic"] = max(pile[-1]["_pic"], pic)
+
+
+@contextmanager
+def span(nom, **attributs):
+    """Mesure le bloc `with` sous le nom `nom`."""
+    ouvert = _ouvrir(nom, **attributs)
+    try:
+        yield ouvert
+    finally:
+        _fermer(ouvert)
+
+
+def etape(nom, **attributs):
+    """Passe à l'étape `nom` de la page : l'étape précédente du même niveau est fermée.
+
+    Permet de découper un show() en chargement / calcul / rendu sans réindenter son code ;
+    la dernière étape est fermée avec le span englobant (celui de la page).
+    """
+    execution = _execution()
+    if execution["pile"] and execution["pile"][-1]["_etape"]:
+        _fermer(execution["pile"][-1])
+    _ouvrir(nom, etape=True, **attributs)
+
+
+def mesure(nom):
+    """Décorateur : chaque appel de la fonction est un span `nom`."""
+    def decorateur(fonction):
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            with span(nom):
+                return fonction(*args, **kwargs)
+        return enveloppe
+    return decorateur
+
+
+def fragment(nom):
+    """Décorateur des fonctions st.fragment : un span `nom` dans la page, ou sa propre exécution.
+
+    Rejoué seul (interaction dans le fragment), le fragment ne passe pas par le script
+    principal : ses spans forment alors une exécution à part, exportée à la fin.
+    """
+    def decorateur(fonction):
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            execution = _execution()
+            if execution["pile"]:
+                with span(nom):
+                    return fonction(*args, **kwargs)
+            debut_execution(execution["page"])
+            try:
+                with span(nom, fragment=True):
+                    return fonction(*args, **kwargs)
+            finally:
+                fin_execution()
+        return enveloppe
+    return decorateur
+
+
+# ---------------- Export ---------------- #
+def spans_execution():
+    """Spans terminés de l'exécution en cours, sans les champs internes."""
+    return [
+        {cle: valeur for cle, valeur in s.items() if not cle.startswith("_")}
+        for s in _execution()["spans"] if s["duree_ms"] is not None
+    ]
+
+
+def jsonl(spans):
+    return "".join(json.dumps(s, ensure_ascii=False) + "\n" for s in spans)
+
+
+def exporter(spans, chemin=None):
+    """Ajoute les spans au fichier JSON lines `chemin` (FICHIER_SPANS par défaut)."""
+    chemin = chemin or FICHIER_SPANS
+    if not chemin or not spans:
+        return
+    with _verrou_fichier, open(chemin, "a", encoding="utf-8") as fichier:
+        fichier.write(jsonl(spans))
+
+
+def fin_execution():
+    """Termine l'exécution en cours : spans restés ouverts fermés, export JSON lines."""
+    pile = _execution()["pile"]
+    while pile:
+        _fermer(pile[0])
+    spans = spans_execution()
+    exporter(spans)
+    return spans
+
+
+def lire_jsonl(chemin):
+    """Relit un export JSON lines sous forme de DataFrame (comparaison entre versions)."""
+    return pd.read_json(chemin, lines=True)
+
+
+# ---------------- Panneau de debug ---------------- #
+def panneau(spans):
+    """Panneau latéral : durée et pic mémoire des spans de la dernière exécution."""
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ Instrumentation", expanded=True):
+        if TRACEMALLOC_MODIFIABLE:
+            suivi = st.checkbox("Suivre les allocations (tracemalloc)", value=tracemalloc.is_tracing(),
+                                key="instrumentation_tracemalloc")
+            if suivi and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            elif not suivi and tracemalloc.is_tracing():
+                tracemalloc.stop()
+        else:
+            st.caption("Suivi des allocations : " + ("actif" if tracemalloc.is_tracing() else "inactif")
+                       + " (FOOTBALL_TRACEMALLOC au démarrage du serveur)")
+
+        if not spans:
+            st.caption("Aucune mesure pour cette exécution.")
+            return
+        df = pd.DataFrame(spans)
+        df["span"] = ["  " * p + n for p, n in zip(df["profondeur"], df["nom"])]
+        st.dataframe(df[["span", "duree_ms", "pic_ko"]], hide_index=True, use_container_width=True)
+        st.download_button(
+            "Exporter (JSON lines)", jsonl(spans),
+            file_name=f"spans_{spans[0]['execution']}.jsonl", mime="application/x-ndjson"
+        )
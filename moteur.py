@@ -0,0 +1,361 @@
+import numpy as np
+import pandas as pd
+
+# ---------------- Matrice participant × journée ---------------- #
+# Toutes les évolutions de classement (rang par journée, cumul, leader, écart au leader)
+# sont calculées une seule fois en NumPy sur une matrice dense participants × journées.
+# Une case absente (participant sans pronostic sur la journée) vaut NaN.
+
+
+def _rangs(valeurs):
+    """Rang « min » décroissant par colonne (1 = meilleur), 0 pour une case absente.
+
+    Équivalent de groupby(journée).rank(method="min", ascending=False) : le rang d'une
+    case vaut 1 + le nombre de cases présentes strictement supérieures dans la colonne.
+    """
+    presents = ~np.isnan(valeurs)
+    superieurs = (valeurs[np.newaxis, :, :] > valeurs[:, np.newaxis, :]).sum(axis=1)
+    return np.where(presents, superieurs + 1, 0)
+
+
+def matrice_classements(df_progress):
+    """Classements par journée et cumulés à partir de la progression (participant_nom, journee_match, points).
+
+    Renvoie un dictionnaire de tableaux alignés sur `participants` (lignes) et `journees` (colonnes) :
+    points, rang_journee, leader / points_leader / ecart_leader par journée, et sur les seules
+    journées jouées (au moins un point distribué) points_cumul et rang_cumul.
+    """
+    points_par_case = df_progress.groupby(["participant_nom", "journee_match"])["points"].sum()
+    participants = points_par_case.index.get_level_values(0).unique().sort_values().to_numpy()
+    journees = np.sort(points_par_case.index.get_level_values(1).unique().to_numpy().astype("int64"))
+
+    lignes = pd.Index(participants).get_indexer(points_par_case.index.get_level_values(0))
+    colonnes = pd.Index(journees).get_indexer(points_par_case.index.get_level_values(1).astype("int64"))
+    points = np.full((len(participants), len(journees)), np.nan)
+    points[lignes, colonnes] = points_par_case.to_numpy(dtype="float64")
+    presents = ~np.isnan(points)
+
+    # --- Classement de chaque journée et leader (premier participant, par ordre alphabétique, au maximum) ---
+    rang_journee = _rangs(points)
+    if len(participants):
+        indices_leader = np.where(presents, points, -np.inf).argmax(axis=0)
+    else:
+        indices_leader = np.zeros(len(journees), dtype=int)
+    leader = participants[indices_leader] if len(participants) else np.array([], dtype=object)
+    points_leader = points[indices_leader, np.arange(len(journees))] if len(participants) else np.array([])
+    ecart_leader = np.where(presents, points_leader[np.newaxis, :] - points, np.nan)
+
+    # --- Classement général cumulé, sur les journées où des points ont été distribués ---
+    jouee = np.nansum(points, axis=0) > 0
+    cumul = np.cumsum(np.where(presents & jouee, points, 0.0), axis=1)
+    points_cumul = np.where(presents & jouee, cumul, np.nan)
+    rang_cumul = _rangs(points_cumul)
+
+    return {
+        "participants": participants,
+        "journees": journees,
+        "jouee": jouee,
+        "points": points,
+        "rang_journee": rang_journee,
+        "leader": leader,
+        "points_leader": points_leader,
+        "ecart_leader": ecart_leader,
+        "points_cumul": points_cumul,
+        "rang_cumul": rang_cumul,
+    }
+
+
+def evolution_participant(matrice, participant):
+    """Ligne d'un participant : journée, points, rang du jour, écart avec le leader et leader."""
+    lignes = np.flatnonzero(matrice["participants"] == participant)
+    if not len(lignes):
+        return pd.DataFrame(columns=["journee_match", "points", "Rang", "écart_avec_leader", "leader"])
+    i = lignes[0]
+    presents = ~np.isnan(matrice["points"][i])
+    return pd.DataFrame({
+        "journee_match": matrice["journees"][presents],
+        "points": matrice["points"][i, presents],
+        "Rang": matrice["rang_journee"][i, presents],
+        "écart_avec_leader": matrice["ecart_leader"][i, presents],
+        "leader": matrice["leader"][presents],
+    })
+
+
+def rangs_long(matrice, rangs):
+    """Tableau long (participant, journée, rang) des cases classées sur les journées jouées.
+
+    Les lignes suivent l'ordre alphabétique des participants puis les journées croissantes.
+    """
+    lignes, colonnes = np.nonzero((rangs > 0) & matrice["jouee"][np.newaxis, :])
+    return pd.DataFrame({
+        "participant": matrice["participants"][lignes],
+        "journee": matrice["journees"][colonnes],
+        "rang": rangs[lignes, colonnes],
+    })
+
+
+# ---------------- Points des pronostics (vectorisé) ---------------- #
+# Mêmes barèmes que les fonctions ligne à ligne d'expert_canape (calcul_points,
+# calcul_points_journee, gain_match), calculés colonne par colonne. Les résultats sont
+# identiques au bit près, types compris : equivalence.py compare les deux versions.
+
+COLONNES_COTES = ["cote_domicile", "cote_exterieur", "cote_nul"]
+
+
+def _scores(df):
+    """Pronostics, scores réels et cotes du tableau en float64 (NaN pour un match non joué)."""
+    return {col: df[col].to_numpy(dtype="float64") for col in [
+        "prono_dom", "prono_ext", "match_dom", "match_ext", *COLONNES_COTES
+    ]}
+
+
+def _resultat_correct(s):
+    """Même résultat (victoire, nul, défaite) pronostiqué et réel ; faux pour un match non joué."""
+    return (
+        ((s["prono_dom"] > s["prono_ext"]) & (s["match_dom"] > s["match_ext"])) |
+        ((s["prono_dom"] < s["prono_ext"]) & (s["match_dom"] < s["match_ext"])) |
+        ((s["prono_dom"] == s["prono_ext"]) & (s["match_dom"] == s["match_ext"]))
+    )
+
+
+def points_pronostics(df):
+    """Points de chaque pronostic (barème calcul_points), alignés sur l'index de `df`."""
+    s = _scores(df)
+    joue = ~(np.isnan(s["match_dom"]) | np.isnan(s["match_ext"]))
+    score_exact = (s["prono_dom"] == s["match_dom"]) & (s["prono_ext"] == s["match_ext"])
+    resultat_correct = _resultat_correct(s)
+    # -> L'écart n'est pas compté si le match réel est un nul
+    ecart_correct = (
+        (s["match_dom"] != s["match_ext"])
+        & ((s["prono_dom"] - s["prono_ext"]) == (s["match_dom"] - s["match_ext"]))
+        & ~score_exact
+    )
+
+    # --- Sans aucune cote : barème entier (+3 score exact, ±1 résultat) ---
+    cotes_absentes = np.isnan(s["cote_domicile"]) & np.isnan(s["cote_exterieur"]) & np.isnan(s["cote_nul"])
+    points_sans_cotes = 3 * score_exact + np.where(resultat_correct, 1, -1)
+
+    # --- Avec cotes : cote du résultat réel si correct, sinon la plus petite cote ---
+    prolifique_prono = (s["prono_dom"] + s["prono_ext"]) >= 4
+    prolifique_reel = (s["match_dom"] + s["match_ext"]) >= 4
+    cote_match = np.select(
+        [s["match_dom"] > s["match_ext"], s["match_dom"] < s["match_ext"]],
+        [s["cote_domicile"], s["cote_exterieur"]],
+        s["cote_nul"]
+    )
+    # min() de Python : NaN si la cote domicile manque, sinon les cotes manquantes sont ignorées
+    cote_min = np.where(
+        np.isnan(s["cote_domicile"]), np.nan,
+        np.fmin(np.fmin(s["cote_domicile"], s["cote_exterieur"]), s["cote_nul"])
+    )
+    cote_finale = np.where(resultat_correct, cote_match, cote_min)
+
+    # Additions dans le même ordre que calcul_points (ajouter 0.0 ne change aucun bit)
+    multiplicateur = np.zeros(len(df))
+    multiplicateur += np.where(resultat_correct, 3.0, 0.0)
+    multiplicateur += np.where(score_exact & resultat_correct, 2.0, 0.0)
+    multiplicateur += np.where(ecart_correct & resultat_correct, 1.33, 0.0)
+    multiplicateur += np.where(prolifique_prono & prolifique_reel, 1.25, 0.0)
+    multiplicateur -= np.where(prolifique_prono & ~prolifique_reel, 0.5, 0.0)
+
+    avec_cotes = joue & ~cotes_absentes
+    if not avec_cotes.any():
+        # Aucun point à cotes : entiers, comme le résultat de df.apply(calcul_points)
+        return pd.Series(np.where(joue, points_sans_cotes, 0).astype("int64"), index=df.index)
+    points = np.where(avec_cotes, cote_finale * multiplicateur, np.where(joue, points_sans_cotes, 0))
+    return pd.Series(points, index=df.index)
+
+
+def gains_matchs(df):
+    """Gain net d'une mise de 1 € sur chaque pronostic (barème gain_match), aligné sur l'index de `df`."""
+    s = _scores(df)
+    joue = ~(np.isnan(s["match_dom"]) | np.isnan(s["match_ext"]))
+    sens_prono = np.sign(s["prono_dom"] - s["prono_ext"])
+    sens_reel = np.sign(s["match_dom"] - s["match_ext"])
+    cote = np.select([sens_prono > 0, sens_prono < 0], [s["cote_domicile"], s["cote_exterieur"]], s["cote_nul"])
+
+    # Cote manquante : mise perdue
+    gains = np.where(~np.isnan(cote) & (sens_prono == sens_reel), cote - 1.0, -1.0)
+    return pd.Series(np.where(joue, gains, 0.0), index=df.index)
+
+
+def _sommes_tranches(valeurs, bornes):
+    """Somme de chaque tranche valeurs[bornes[k]:bornes[k + 1]], NaN ignorés, au bit près comme Series.sum.
+
+    NumPy additionne de gauche à droite les tableaux de moins de 8 valeurs (le cas de presque
+    toutes les journées) : ces tranches sont sommées ensemble, position par position ; les
+    tranches plus longues (sommation par blocs de NumPy) sont sommées une à une.
+    """
+    valeurs = np.where(np.isnan(valeurs), 0.0, valeurs)
+    debuts, tailles = bornes[:-1], np.diff(bornes)
+    sommes = np.zeros(len(tailles))
+    courtes = tailles < 8
+    for k in range(int(tailles[courtes].max()) if courtes.any() else 0):
+        actives = courtes & (tailles > k)
+        sommes[actives] += valeurs[debuts[actives] + k]
+    for g in np.flatnonzero(~courtes):
+        sommes[g] = valeurs[debuts[g]:bornes[g + 1]].sum()
+    return sommes
+
+
+def progression_journees(df):
+    """Points par participant et par journée (bonus de journée compris) et leur cumul.
+
+    Même tableau que groupby(participant, journée).apply(calcul_points_journee) : points,
+    bons_pronos, multiplicateur (1.33 / 1.66 / 2 à n-2 / n-1 / n bons pronostics quand la
+    journée a des cotes), cotes_presentes, puis points_cumul par participant.
+    """
+    cles = ["participant_nom", "journee_match"]
+    groupes = df.groupby(cles, sort=True).ngroup().to_numpy()
+    gardes = np.flatnonzero(groupes >= 0)
+    tri = gardes[np.argsort(groupes[gardes], kind="stable")]
+    groupes_tries = groupes[tri]
+    bornes = np.searchsorted(groupes_tries, np.arange(groupes_tries.max() + 2 if len(tri) else 1))
+    debuts, tailles = bornes[:-1], np.diff(bornes)
+
+    s = {col: valeurs[tri] for col, valeurs in _scores(df).items()}
+    bons_pronos = np.add.reduceat(_resultat_correct(s).astype("int64"), debuts) if len(tri) else np.zeros(0, "int64")
+    cote_connue = ~(np.isnan(s["cote_domicile"]) & np.isnan(s["cote_exterieur"]) & np.isnan(s["cote_nul"]))
+    cotes_presentes = np.logical_or.reduceat(cote_connue, debuts) if len(tri) else np.zeros(0, bool)
+
+    # --- Bonus appliqué uniquement si les cotes sont présentes ---
+    multiplicateur = np.select(
+        [cotes_presentes & (bons_pronos == tailles - 2),
+         cotes_presentes & (bons_pronos == tailles - 1),
+         cotes_presentes & (bons_pronos == tailles)],
+        [1.33, 1.66, 2.0],
+        1.0
+    )
+    # Multiplicateurs tous entiers (1 ou 2) : colonne entière, comme avec apply
+    entier = np.all(multiplicateur == np.round(multiplicateur))
+    if entier:
+        multiplicateur = multiplicateur.astype("int64")
+
+    points = df["points"].to_numpy()[tri]
+    if np.issubdtype(points.dtype, np.integer):
+        score_total = np.add.reduceat(points, debuts) if len(tri) else np.zeros(0, "int64")
+    else:
+        score_total = _sommes_tranches(points.astype("float64"), bornes)
+
+    df_progress_all = df[cles].iloc[tri[debuts]].reset_index(drop=True)
+    # Points entiers (saison sans cotes) et multiplicateurs entiers : les points restent entiers
+    df_progress_all["points"] = score_total * multiplicateur
+    df_progress_all["bons_pronos"] = bons_pronos.astype("int64")
+    df_progress_all["multiplicateur"] = multiplicateur
+    df_progress_all["cotes_presentes"] = cotes_presentes.astype(bool)
+    df_progress_all["points_cumul"] = df_progress_all.groupby("participant_nom")["points"].cumsum()
+    return df_progress_all
+
+
+# ---------------- Classements (vectorisé) ---------------- #
+# Classement d'un ensemble de matchs (championnat, groupe européen, phase de ligue) sans
+# boucle sur les matchs : chaque colonne est un comptage par équipe (np.bincount).
+
+COLONNES_CLASSEMENT = ['Pts', 'J', 'V', 'N', 'D', 'BP', 'BC', 'Diff']
+
+
+def _equipes(df):
+    """Équipes dans l'ordre de première apparition : toutes les équipes à domicile, puis à l'extérieur."""
+    return pd.unique(np.concatenate([
+        df['equipe_domicile_nom'].to_numpy(dtype=object), df['equipe_exterieure_nom'].to_numpy(dtype=object)
+    ]))
+
+
+def classement(df, pts_victoire=3):
+    """Classement (Rang, Equipe, Pts, J, V, N, D, BP, BC, Diff) des matchs joués de `df`.
+
+    Départage par points, différence de buts puis buts marqués ; à égalité complète,
+    les équipes gardent leur ordre de première apparition (tri stable).
+    """
+    equipes = _equipes(df)
+    index = pd.Index(equipes)
+    dom = index.get_indexer(df['equipe_domicile_nom'])
+    ext = index.get_indexer(df['equipe_exterieure_nom'])
+    sd = df['score_domicile'].to_numpy(dtype="float64")
+    se = df['score_exterieur'].to_numpy(dtype="float64")
+
+    joue = ~(np.isnan(sd) | np.isnan(se))
+    dom, ext, sd, se = dom[joue], ext[joue], sd[joue], se[joue]
+    n = len(equipes)
+
+    def par_equipe(masque_dom, masque_ext, poids_dom=None, poids_ext=None):
+        return (
+            np.bincount(dom[masque_dom], None if poids_dom is None else poids_dom[masque_dom], minlength=n)
+            + np.bincount(ext[masque_ext], None if poids_ext is None else poids_ext[masque_ext], minlength=n)
+        )
+
+    tous = np.ones(len(dom), dtype=bool)
+    victoires = par_equipe(sd > se, sd < se)
+    nuls = par_equipe(sd == se, sd == se)
+    buts_pour = par_equipe(tous, tous, sd, se)
+    buts_contre = par_equipe(tous, tous, se, sd)
+    # Scores entiers (toujours le cas) : buts en int64, comme dans le classement ligne à ligne
+    if np.all(buts_pour == np.round(buts_pour)) and np.all(buts_contre == np.round(buts_contre)):
+        buts_pour, buts_contre = buts_pour.astype("int64"), buts_contre.astype("int64")
+
+    colonnes = {
+        'Pts': pts_victoire * victoires + nuls,
+        'J': par_equipe(tous, tous),
+        'V': victoires,
+        'N': nuls,
+        'D': par_equipe(sd < se, sd > se),
+        'BP': buts_pour,
+        'BC': buts_contre,
+        'Diff': buts_pour - buts_contre,
+    }
+    colonnes = {col: valeurs.astype("int64") if valeurs.dtype.kind in "iu" else valeurs
+                for col, valeurs in colonnes.items()}
+    ordre = np.lexsort((-colonnes['BP'], -colonnes['Diff'], -colonnes['Pts']))
+
+    resultat = pd.DataFrame({'Equipe': equipes[ordre], **{col: colonnes[col][ordre] for col in COLONNES_CLASSEMENT}})
+    resultat.insert(0, 'Rang', range(1, n + 1))
+    return resultat
+
+
+def matrice_confrontations(df):
+    """Scores « d-e » (aller / retour) de chaque équipe en ligne contre chaque équipe en colonne.
+
+    Un match non joué vide la case (et la case symétrique) ; les matchs joués suivants s'y
+    ajoutent, séparés par « / ». Une seule passe sur les matchs, sans .at ni iterrows.
+    """
+    equipes = _equipes(df)
+    index = pd.Index(equipes)
+    cases = np.full((len(equipes), len(equipes)), np.nan, dtype=object)
+    for d, e, sd, se in zip(
+        index.get_indexer(df['equipe_domicile_nom']), index.get_indexer(df['equipe_exterieure_nom']),
+        df['score_domicile'].to_numpy(dtype="float64"), df['score_exterieur'].to_numpy(dtype="float64")
+    ):
+        if np.isnan(sd) or np.isnan(se):
+            cases[d, e] = cases[e, d] = ''
+        elif isinstance(cases[d, e], str) and cases[d, e]:
+            cases[d, e] += f" / {int(sd)}-{int(se)}"
+            cases[e, d] += f" / {int(se)}-{int(sd)}"
+        else:
+            cases[d, e] = f"{int(sd)}-{int(se)}"
+            cases[e, d] = f"{int(se)}-{int(sd)}"
+    return pd.DataFrame(cases, index=equipes, columns=equipes)
+
+
+def classements_par_journee(df):
+    """Classement cumulé après chaque journée, avec l'évolution des rangs (▲ / ▼ / —).
+
+    Renvoie les journées triées et un tableau long (une ligne par équipe et par journée).
+    """
+    journees = sorted(df['journee'].dropna().unique())
+
+    classements = []
+    rang_precedent = {}
+    for j in journees:
+        classement_j = classement(df[df['journee'] <= j])
+
+        # Évolution en nombre de places depuis la journée précédente
+        ecart = classement_j['Equipe'].map(rang_precedent) - classement_j['Rang']
+        places = ecart.abs().fillna(0).astype("int64").astype(str)
+        classement_j['Évolution'] = np.select([ecart > 0, ecart < 0], ['▲' + places, '▼' + places], '—')
+        rang_precedent.update(zip(classement_j['Equipe'], classement_j['Rang']))
+
+        classement_j['Journée'] = j
+        classements.append(classement_j)
+    if not classements:
+        return journees, pd.DataFrame()
+    return journees, pd.concat(classements, ignore_index=True)
@@ -0,0 +1,279 @@
+import argparse
+import multiprocessing
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import artefacts
+import championnat
+import competitions_europeennes
+import coupes_nationales
+import donnees
+import expert_canape
+import moteur
+import pronostics
+
+# ---------------- Précalculs hors ligne ---------------- #
+# Charge les CSV une seule fois, calcule tout ce que les pages servent ensuite par simple
+# lecture (classements Expert Canapé de chaque saison et championnat, historiques des
+# participants saison par saison, classements de championnat après chaque journée et
+# palmarès, groupes et phase de ligue européens, tableaux à élimination directe) et l'écrit
+# dans le cache colonne (artefacts.py).
+# À relancer après chaque mise à jour des CSV ou ingestion (ingestion.py) : sans précalcul pour
+# la version courante d'une saison, les pages recalculent elles-mêmes. Seules les saisons dont
+# la version a changé depuis le dernier précalcul sont recalculées (--complet : toutes). Les
+# partitions (saison × compétition) sont calculées en parallèle sur un pool de processus.
+#
+#   python precalculs.py [--donnees csv] [--sortie cache/precalculs] [--processus N] [--complet]
+
+
+# ---------------- Entrées partagées ---------------- #
+# Tables et vue des pronostics, préparées une seule fois puis lues (jamais modifiées) par tous
+# les calculs. Les processus de calcul en héritent sans copie (fork) ou, quand le système ne
+# le permet pas, les rechargent une fois chacun depuis les CSV (spawn).
+_partage = {}
+
+
+def preparer(dossier="csv", tables=None):
+    """Charge les tables lues par les précalculs."""
+    tables = tables or donnees.charger_tables(dossier)
+    return {
+        "matchs": tables["all_matchs_football"],
+        "archives": tables["archives"],
+        "pronos": pronostics.vue_pronostics(tables["pronostics"], tables["participants"]),
+    }
+
+
+def _initialiser(dossier):
+    """Initialisation d'un processus de calcul : entrées héritées du parent, sinon rechargées."""
+    if not _partage:
+        _partage.update(preparer(dossier))
+
+
+def _matchs(df, saison, competition):
+    """Matchs typés d'une saison et d'une compétition, filtrés comme dans les pages."""
+    return donnees.types_calcul(df[(df["saison"] == saison) & (df["competition"] == competition)])
+
+
+def _saisons_competitions(df, competitions):
+    """Couples (saison, compétition) présents dans `df` pour les compétitions données."""
+    df = df[df["competition"].isin(competitions)]
+    return list(df.groupby(["saison", "competition"], observed=True, sort=True).groups)
+
+
+# ---------------- Familles d'artefacts ---------------- #
+# Chaque étape découpe le travail en partitions indépendantes (le plus souvent une saison et
+# une compétition) et calcule les artefacts d'une partition : {famille: {(saison, clé): (df, infos)}}.
+def partitions_expert():
+    df_matchs = _partage["matchs"]
+    partitions = []
+    for saison in sorted(df_matchs["saison"].dropna().unique()):
+        championnats = df_matchs[df_matchs["saison"] == saison]["competition"].dropna().unique().tolist()
+        partitions += [(saison, championnat_sel) for championnat_sel in ["Toutes"] + sorted(championnats)]
+    return partitions
+
+
+def calculer_expert(saison, championnat_sel):
+    """Résultats Expert Canapé d'une saison, pour un championnat ou toutes compétitions confondues."""
+    resultats = expert_canape.calculer_resultats_saison(_partage["pronos"], _partage["matchs"], saison, championnat_sel)
+    if resultats is None:
+        return {}
+    nb_matchs, df, df_progress_all = resultats
+    cle = (saison, artefacts.cle(championnat_sel))
+    return {
+        "expert_pronostics": {cle: (df, {"nb_matchs": int(nb_matchs)})},
+        "expert_progression": {cle: (df_progress_all, {})},
+    }
+
+
+def partitions_historiques():
+    return [(saison,) for saison in sorted(_partage["matchs"]["saison"].dropna().unique())]
+
+
+def calculer_historique(saison):
+    """Points de chaque participant par compétition et journée de la saison (historique Expert Canapé).
+
+    Écrit même sans pronostic : la page sait alors que la saison n'a rien à ajouter à l'historique.
+    """
+    df_matchs = _partage["matchs"]
+    historique = expert_canape.points_historique(_partage["pronos"], df_matchs[df_matchs["saison"] == saison])
+    return {"historiques": {(saison, artefacts.cle("Toutes")): (historique, {})}}
+
+
+def partitions_championnats():
+    return _saisons_competitions(_partage["archives"], championnat.CHAMPIONNATS)
+
+
+def calculer_championnat(saison, competition):
+    """Classement après chaque journée et de la saison complète."""
+    df_matchs = _matchs(_partage["archives"], saison, competition)
+    pts_victoire = championnat.points_victoire(competition, saison)
+    infos = {"pts_victoire": pts_victoire}
+    classements = {}
+    for j in sorted(df_matchs["journee"].dropna().unique()):
+        classement = moteur.classement(df_matchs[df_matchs["journee"] <= j], pts_victoire)
+        classements[(saison, artefacts.cle(competition, j))] = (classement, infos)
+    classements[(saison, artefacts.cle(competition, "Toutes"))] = (moteur.classement(df_matchs, pts_victoire), infos)
+    return {"classements": classements}
+
+
+def partitions_palmares():
+    competitions = _partage["archives"]["competition"].dropna().unique()
+    return [(competition,) for competition in championnat.CHAMPIONNATS if competition in competitions]
+
+
+def calculer_palmares(competition):
+    """Champions de chaque saison ; la page classe toutes les saisons avec le barème de la saison affichée."""
+    df_all = championnat.matchs_championnat(_partage["archives"], competition)
+    palmares = {}
+    for pts_victoire in sorted({championnat.points_victoire(competition, s) for s in df_all["saison"].unique()}):
+        champions = pd.DataFrame({"Equipe": championnat.champions(df_all, pts_victoire)}, dtype=object)
+        palmares[(artefacts.TOUTES_SAISONS, artefacts.cle(competition, pts_victoire))] = (champions, {})
+    return {"palmares": palmares}
+
+
+def partitions_europe():
+    return _saisons_competitions(_partage["matchs"], competitions_europeennes.COMPETITIONS_EUROPE)
+
+
+def calculer_europe(saison, competition):
+    """Classements de groupe, phase de ligue et tableaux à élimination directe d'une coupe d'Europe."""
+    df = _matchs(_partage["matchs"], saison, competition)
+    groupes, phase_ligue, elimination = {}, {}, {}
+    for g in df["groupe"].dropna().unique():
+        groupes[(saison, artefacts.cle(competition, g))] = (moteur.classement(df[df["groupe"] == g].copy()), {})
+
+    if competitions_europeennes.phase_de_ligue(saison):
+        _, classements = moteur.classements_par_journee(competitions_europeennes.matchs_phase_ligue(df))
+        phase_ligue[(saison, artefacts.cle(competition))] = (classements, {})
+
+    df_elimination = competitions_europeennes.preparer_elimination(df)
+    for phase in competitions_europeennes.PHASES_ELIMINATION:
+        df_phase = df_elimination[df_elimination["phase"] == phase]
+        if df_phase.empty:
+            continue
+        try:
+            tableau = competitions_europeennes.tableau_phase(df_phase, phase)
+        except (ValueError, TypeError, KeyError):
+            # Tour incomplet (score manquant) : non précalculé, la page le traite elle-même
+            continue
+        elimination[(saison, artefacts.cle(competition, phase))] = (tableau, {})
+    return {"groupes": groupes, "phase_ligue": phase_ligue, "elimination": elimination}
+
+
+def partitions_coupes():
+    return _saisons_competitions(_partage["matchs"], coupes_nationales.COUPES_NATIONALES)
+
+
+def calculer_coupe(saison, competition):
+    """Tableaux d'une coupe nationale, phase par phase."""
+    df = _matchs(_partage["matchs"], saison, competition)
+    elimination = {}
+    for phase in coupes_nationales.PHASES:
+        df_phase = df[df["phase"] == phase]
+        if not df_phase.empty:
+            elimination[(saison, artefacts.cle(competition, phase))] = (coupes_nationales.tableau_phase(df_phase), {})
+    return {"elimination": elimination}
+
+
+def saison_partition(etape, partition):
+    """Saison dont dépendent les artefacts d'une partition (palmarès : toutes les saisons)."""
+    return artefacts.TOUTES_SAISONS if etape == "palmares" else partition[0]
+
+
+# Étape : (partitions, calcul d'une partition)
+ETAPES = {
+    "expert": (partitions_expert, calculer_expert),
+    "historiques": (partitions_historiques, calculer_historique),
+    "championnats": (partitions_championnats, calculer_championnat),
+    "palmares": (partitions_palmares, calculer_palmares),
+    "europe": (partitions_europe, calculer_europe),
+    "coupes": (partitions_coupes, calculer_coupe),
+}
+
+
+def calculer_partition(etape, partition):
+    """Artefacts d'une partition et durée du calcul (ms) ; exécuté dans un processus de calcul."""
+    debut = time.perf_counter()
+    familles = ETAPES[etape][1](*partition)
+    return familles, (time.perf_counter() - debut) * 1000
+
+
+# ---------------- Exécution ---------------- #
+def _pool(processus, dossier):
+    """Pool de processus de calcul : fork quand il est disponible (entrées partagées sans copie)."""
+    if "fork" in multiprocessing.get_all_start_methods():
+        contexte = multiprocessing.get_context("fork")
+    else:
+        contexte = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=processus, mp_context=contexte,
+                               initializer=_initialiser, initargs=(dossier,))
+
+
+def precalculer(dossier="csv", sortie=artefacts.DOSSIER_PRECALCULS, processus=None, complet=False):
+    """Calcule et écrit les artefacts des données de `dossier` ; renvoie le manifeste écrit.
+
+    Seules les saisons dont la version diffère du manifeste existant sont recalculées, les
+    autres sont reprises telles quelles (`complet` : toutes recalculées).
+    Les partitions sont réparties sur `processus` processus (un par cœur par défaut, 1 : sans pool)
+    puis fusionnées dans l'ordre des partitions : le résultat ne dépend pas du parallélisme.
+    """
+    processus = processus or os.cpu_count() or 1
+    # Versions lues avant le chargement : des données modifiées pendant le calcul ne seront pas servies
+    tables = donnees.charger_tables(dossier)
+    _partage.clear()
+    _partage.update(preparer(dossier, tables))
+
+    precedent = None if complet else artefacts.manifeste(sortie)
+    if precedent is not None and precedent.get("format") != artefacts.FORMAT:
+        precedent = None
+    deja_calculees = precedent["saisons"] if precedent else {}
+    versions, taches = {}, []
+    for etape, (partitions, _) in ETAPES.items():
+        for partition in partitions():
+            saison = saison_partition(etape, partition)
+            version = tables.version_saison(None if saison == artefacts.TOUTES_SAISONS else saison)
+            if deja_calculees.get(str(saison)) != version:
+                versions[saison] = version
+                taches.append((etape, partition))
+    if not taches:
+        print("Artefacts à jour : aucune saison à recalculer")
+        return precedent
+
+    debut = time.perf_counter()
+    if processus == 1 or len(taches) == 1:
+        resultats = [calculer_partition(etape, partition) for etape, partition in taches]
+    else:
+        with _pool(processus, dossier) as pool:
+            resultats = list(pool.map(calculer_partition, *zip(*taches)))
+
+    # Fusion : les coupes d'Europe et nationales partagent la famille « elimination » (clés compétition | phase)
+    calcules, bilan = {}, {}
+    for (etape, _), (familles, duree_ms) in zip(taches, resultats):
+        for famille, entrees in familles.items():
+            calcules.setdefault(famille, {}).update(entrees)
+        nb, total_ms = bilan.get(etape, (0, 0.0))
+        bilan[etape] = (nb + sum(len(entrees) for entrees in familles.values()), total_ms + duree_ms)
+    for etape, (nb, total_ms) in bilan.items():
+        print(f"{etape} : {nb} artefacts, {total_ms:.0f} ms de calcul", flush=True)
+    print(f"{len(taches)} partitions ({len(versions)} saisons) sur {processus} processus "
+          f"en {(time.perf_counter() - debut) * 1000:.0f} ms")
+
+    return artefacts.ecrire(calcules, versions, sortie, precedent)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Précalcule les classements et tableaux servis par les pages.")
+    parser.add_argument("--donnees", default="csv", help="dossier des CSV")
+    parser.add_argument("--sortie", default=artefacts.DOSSIER_PRECALCULS, help="dossier des artefacts")
+    parser.add_argument("--processus", type=int, help="processus de calcul (un par cœur par défaut, 1 : sans pool)")
+    parser.add_argument("--complet", action="store_true", help="recalcule toutes les saisons, même à jour")
+    args = parser.parse_args()
+    # Avertissements pandas des boucles de classement : une ligne par appel, illisible ici
+    warnings.simplefilter("ignore", FutureWarning)
+
+    manifeste = precalculer(args.donnees, args.sortie, args.processus, args.complet)
+    if manifeste is None:
+        raise SystemExit("Écriture impossible (parquet indisponible) : les pages recalculeront.")
+    print(f"Artefacts de {len(manifeste['saisons'])} saisons à jour dans {args.sortie}")
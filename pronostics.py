@@ -0,0 +1,83 @@
+import pandas as pd
+
+# ---------------- Store compact des pronostics ---------------- #
+# Une ligne = (participant_id, match_id, score_dom, score_ext).
+# Tout le reste (nom du participant, équipes, journée, saison...) se déduit
+# de match_id / participant_id et n'est reconstruit qu'à la demande.
+
+COLONNES_CSV = ["id", "participant_id", "match_id", "score_domicile", "score_exterieur"]
+INDEX_STORE = ["participant_id", "match_id"]
+
+
+def construire_store(df):
+    """Construit le store compact à partir de pronostics bruts (colonnes du CSV).
+
+    Les doublons (participant_id, match_id) sont supprimés à l'ingestion en gardant
+    la dernière saisie, et le résultat est indexé et trié sur (participant_id, match_id).
+    """
+    if "id" in df.columns:
+        df = df.sort_values("id", kind="stable")
+
+    # Un pronostic sans score n'a pas de sens : on l'écarte dès l'ingestion
+    df = df.dropna(subset=["participant_id", "match_id", "score_domicile", "score_exterieur"])
+    df = df.drop_duplicates(subset=INDEX_STORE, keep="last")
+
+    store = pd.DataFrame({
+        "participant_id": df["participant_id"].astype("int16"),
+        "match_id": df["match_id"].astype("int32"),
+        "score_dom": df["score_domicile"].astype("int8"),
+        "score_ext": df["score_exterieur"].astype("int8"),
+    })
+    store = store.set_index(INDEX_STORE, verify_integrity=True).sort_index()
+    return store
+
+
+def charger_pronostics(chemin="csv/all_pronostics.csv"):
+    """Lit le CSV des pronostics en ne gardant que les colonnes nécessaires au store."""
+    df = pd.read_csv(chemin, usecols=lambda c: c in COLONNES_CSV)
+    return construire_store(df)
+
+
+def vue_pronostics(store, df_participants, participant_id=None):
+    """Vue à la demande : pronostics + nom du participant.
+
+    Les colonnes reprennent les noms du CSV (score_domicile / score_exterieur) pour
+    pouvoir fusionner directement avec all_matchs_football sur match_id.
+    """
+    if participant_id is not None:
+        try:
+            sous_store = store.loc[[participant_id]]
+        except KeyError:
+            sous_store = store.iloc[0:0]
+    else:
+        sous_store = store
+
+    vue = sous_store.reset_index().rename(columns={
+        "score_dom": "score_domicile",
+        "score_ext": "score_exterieur"
+    })
+    noms = df_participants.set_index("id")["pseudo"]
+    vue.insert(1, "participant_nom", vue["participant_id"].map(noms))
+    return vue
+
+
+def vue_complete(store, df_participants, df_matchs):
+    """Vue dénormalisée équivalente à l'ancien all_pronostics.csv (hors colonne id)."""
+    vue = vue_pronostics(store, df_participants)
+    infos_match = df_matchs[[
+        "match_id", "equipe_domicile_nom", "equipe_exterieure_nom",
+        "journee", "saison", "code_saison"
+    ]].rename(columns={
+        "equipe_domicile_nom": "equipe_domicile",
+        "equipe_exterieure_nom": "equipe_exterieure"
+    })
+    vue = vue.merge(infos_match, on="match_id", how="left")
+    return vue[[
+        "participant_id", "participant_nom", "equipe_domicile", "equipe_exterieure",
+        "score_domicile", "score_exterieur", "match_id", "journee", "saison", "code_saison"
+    ]]
+
+
+def match_ids_pronostiques(store):
+    """Identifiants des matchs ayant au moins un pronostic."""
+    return store.index.get_level_values("match_id")
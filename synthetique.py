@@ -0,0 +1,426 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+# ---------------- Données synthétiques ---------------- #
+# Jeu de données réaliste au format des CSV de l'application (all_matchs_football,
+# all_pronostics, participants...) pour mesurer les performances à grande échelle.
+# À l'échelle 1 on retrouve l'ordre de grandeur actuel (~10k matchs, ~50k pronostics) ;
+# l'échelle multiplie le nombre de championnats, de coupes et de participants.
+# Même graine -> mêmes tables : deux mesures portent exactement sur les mêmes données.
+
+# Championnats nommés d'abord, puis « Championnat N »
+CHAMPIONNATS = [
+    ("Ligue 1", "L1", "France"),
+    ("Premier League", "PL", "Angleterre"),
+    ("Liga", "LIG", "Espagne"),
+    ("Serie A", "SA", "Italie"),
+    ("Bundesliga", "BUN", "Allemagne"),
+    ("Ligue 2", "L2", "France"),
+    ("National", "NAT", "France"),
+]
+COUPES = [("Coupe de France", "CDF", "France"), ("Coupe de la Ligue", "CDL", "France")]
+EUROPE = [("Ligue des Champions", "LDC", "Europe"), ("Europa League", "EL", "Europe")]
+
+EQUIPES_PAR_CHAMPIONNAT = 18
+EQUIPES_PAR_COUPE = 64
+# Première saison (année de début) au format « phase de ligue » des coupes d'Europe
+ANNEE_PHASE_LIGUE = 2024
+# Part des pronostics ressaisis (doublons participant × match, la dernière saisie l'emporte)
+TAUX_RESSAISIE = 0.01
+
+PREFIXES = ["FC", "AS", "SC", "US", "Olympique", "Racing", "Stade", "Sporting", "Athletic", "Real", "Dynamo", "Union"]
+VILLES = [
+    "Ajaccio", "Amiens", "Angers", "Bastia", "Béziers", "Brest", "Caen", "Châteauroux", "Dijon", "Évian",
+    "Grenoble", "Guingamp", "Le Havre", "Lens", "Lorient", "Metz", "Montpellier", "Nancy", "Nîmes", "Niort",
+    "Orléans", "Pau", "Quevilly", "Reims", "Rodez", "Saint-Étienne", "Sochaux", "Troyes", "Valenciennes",
+    "Sevilla", "Málaga", "Córdoba", "Köln", "München", "Düsseldorf", "Torino", "Genova", "Leeds", "Porto",
+    "Braga", "Liège", "Zürich", "Malmö", "Praha", "Kraków",
+]
+PRENOMS = [
+    "Adrien", "Alexandre", "Antoine", "Benoît", "Camille", "Céline", "Dimitri", "Élodie", "Florian", "Gaëlle",
+    "Hugo", "Inès", "Jérôme", "Kévin", "Laure", "Matthieu", "Nadia", "Océane", "Pierre", "Quentin", "Romain",
+    "Sophie", "Thibault", "Valérie", "Yann",
+]
+
+
+def echelle_par_defaut(echelle):
+    """Nombre de championnats, de coupes et de participants pour une échelle donnée."""
+    return {
+        # Les coupes d'Europe ne grandissent pas avec l'échelle : un championnat de moins pour les compenser
+        "nb_championnats": max(1, round(3 * echelle) - 1),
+        "nb_coupes": max(1, round(echelle)),
+        "nb_participants": max(5, round(25 * np.sqrt(echelle))),
+    }
+
+
+def _noms(base, nombre):
+    """`nombre` noms distincts tirés de `base`, suffixés au-delà d'un premier passage."""
+    return [base[i % len(base)] if i < len(base) else f"{base[i % len(base)]} {i // len(base) + 1}"
+            for i in range(nombre)]
+
+
+def _noms_clubs(nombre):
+    # Ordre mélangé (toujours le même) : des villes différentes dès les premiers clubs
+    combinaisons = [f"{p} {v}" for v in VILLES for p in PREFIXES]
+    ordre = np.random.default_rng(0).permutation(len(combinaisons))
+    return _noms([combinaisons[i] for i in ordre], nombre)
+
+
+def _competitions(nb_championnats, nb_coupes):
+    """(nom, abréviation, pays, type) de chaque compétition générée."""
+    championnats = [
+        CHAMPIONNATS[i] if i < len(CHAMPIONNATS) else (f"Championnat {i + 1}", f"CH{i + 1}", f"Pays {i + 1}")
+        for i in range(nb_championnats)
+    ]
+    coupes = [
+        COUPES[i] if i < len(COUPES) else (f"Coupe nationale {i + 1}", f"CN{i + 1}", f"Pays {i + 1}")
+        for i in range(nb_coupes)
+    ]
+    return ([(*c, "championnat") for c in championnats] + [(*c, "coupe") for c in coupes]
+            + [(*c, "europe") for c in EUROPE])
+
+
+# ---------------- Calendriers ---------------- #
+def aller_simple(nb_equipes):
+    """Calendrier d'un tour (méthode du cercle) : indices (journée, domicile, extérieur), journées à partir de 0."""
+    equipes = np.arange(nb_equipes)
+    journees, dom, ext = [], [], []
+    for j in range(nb_equipes - 1):
+        for k in range(nb_equipes // 2):
+            a, b = equipes[k], equipes[nb_equipes - 1 - k]
+            # Alternance domicile / extérieur d'une journée à l'autre
+            if (j + k) % 2:
+                a, b = b, a
+            journees.append(j)
+            dom.append(a)
+            ext.append(b)
+        equipes = np.concatenate([equipes[:1], equipes[-1:], equipes[1:-1]])
+    return np.array(journees), np.array(dom), np.array(ext)
+
+
+def aller_retour(nb_equipes):
+    """Calendrier complet d'un championnat : phase aller puis phase retour inversée."""
+    j, d, e = aller_simple(nb_equipes)
+    return np.concatenate([j, j + nb_equipes - 1]), np.concatenate([d, e]), np.concatenate([e, d])
+
+
+# ---------------- Scores et cotes ---------------- #
+def _scores(rng, force_dom, force_ext):
+    """Buts (loi de Poisson) selon l'écart de niveau, avantage au club qui reçoit."""
+    ecart = force_dom - force_ext
+    return rng.poisson(1.45 * np.exp(ecart / 2)), rng.poisson(1.15 * np.exp(-ecart / 2))
+
+
+def _cotes(force_dom, force_ext):
+    """Cotes 1 / N / 2 (marge du bookmaker comprise) déduites de l'écart de niveau."""
+    ecart = force_dom - force_ext + 0.15
+    p_nul = 0.28 * np.exp(-ecart ** 2)
+    p_dom = (1 - p_nul) / (1 + np.exp(-2.2 * ecart))
+    p_ext = 1 - p_nul - p_dom
+    cote = lambda p: np.maximum(np.round(1 / (p * 1.07), 2), 1.01)
+    return cote(p_dom), cote(p_nul), cote(p_ext)
+
+
+def _departage(rng, dom, ext, egalite):
+    """Prolongation (buts marqués pendant la prolongation) puis tirs au but pour les égalités."""
+    n = len(dom)
+    prol_dom = np.full(n, np.nan)
+    prol_ext = np.full(n, np.nan)
+    tab_dom = np.full(n, np.nan)
+    tab_ext = np.full(n, np.nan)
+    prol_dom[egalite] = rng.poisson(0.35, egalite.sum())
+    prol_ext[egalite] = rng.poisson(0.3, egalite.sum())
+
+    encore = egalite & (prol_dom == prol_ext)
+    tirs = rng.integers(3, 6, encore.sum())
+    gagne_dom = rng.random(encore.sum()) < 0.5
+    tab_dom[encore] = np.where(gagne_dom, tirs, tirs - 1)
+    tab_ext[encore] = np.where(gagne_dom, tirs - 1, tirs)
+    return prol_dom, prol_ext, tab_dom, tab_ext
+
+
+def _vainqueurs(dom, ext, buts_dom, buts_ext, prol_dom, prol_ext, tab_dom, tab_ext):
+    """Vainqueur de chaque match (ou confrontation cumulée) après prolongation et tirs au but."""
+    total_dom = buts_dom + np.nan_to_num(prol_dom)
+    total_ext = buts_ext + np.nan_to_num(prol_ext)
+    gagne_dom = (total_dom > total_ext) | ((total_dom == total_ext) & (np.nan_to_num(tab_dom) > np.nan_to_num(tab_ext)))
+    return np.where(gagne_dom, dom, ext)
+
+
+class _Generateur:
+    """Accumule les matchs générés, compétition par compétition."""
+
+    def __init__(self, rng, forces):
+        self.rng = rng
+        self.forces = forces
+        self.blocs = []
+
+    def ajouter(self, infos, journee, dom, ext, buts=None, phase=None, groupe=None,
+                aller_retour=None, departage=None):
+        n = len(dom)
+        if buts is None:
+            buts = _scores(self.rng, self.forces[dom], self.forces[ext])
+        cotes = _cotes(self.forces[dom], self.forces[ext])
+        bloc = {
+            **{cle: np.repeat(valeur, n) for cle, valeur in infos.items()},
+            "journee": journee, "dom": dom, "ext": ext,
+            "score_domicile": buts[0].astype(float), "score_exterieur": buts[1].astype(float),
+            "cote_domicile": cotes[0], "cote_nul": cotes[1], "cote_exterieur": cotes[2],
+            "groupe": groupe if groupe is not None else np.repeat(None, n),
+            "phase": np.repeat(phase, n) if phase is None or isinstance(phase, str) else phase,
+            "aller_retour": aller_retour if aller_retour is not None else np.repeat(None, n),
+        }
+        if departage is None:
+            departage = [np.full(n, np.nan)] * 4
+        for cle, valeur in zip(["prolongation_score_domicile", "prolongation_score_exterieur",
+                                "tab_score_domicile", "tab_score_exterieur"], departage):
+            bloc[cle] = valeur
+        self.blocs.append(bloc)
+
+    def championnat(self, infos, equipes):
+        journee, d, e = aller_retour(len(equipes))
+        self.ajouter(infos, journee + 1, equipes[d], equipes[e])
+
+    def elimination(self, infos, equipes, phases, journee, aller_retour_phases=True):
+        """Tableau à élimination directe à partir de `equipes` (puissance de 2), finale sur un match."""
+        rng = self.rng
+        for phase in phases:
+            paires = rng.permutation(equipes).reshape(-1, 2)
+            a, b = paires[:, 0], paires[:, 1]
+            if phase != "Finale" and aller_retour_phases:
+                buts_a = _scores(rng, self.forces[a], self.forces[b])
+                buts_r = _scores(rng, self.forces[b], self.forces[a])
+                cumul_a = buts_a[0] + buts_r[1]
+                cumul_b = buts_a[1] + buts_r[0]
+                # Départage au match retour (b reçoit)
+                departage = _departage(rng, b, a, cumul_a == cumul_b)
+                n = len(a)
+                self.ajouter(infos, np.repeat(journee, n), a, b, buts=buts_a, phase=phase,
+                             aller_retour=np.repeat("Aller", n))
+                self.ajouter(infos, np.repeat(journee + 1, n), b, a, buts=buts_r, phase=phase,
+                             aller_retour=np.repeat("Retour", n), departage=departage)
+                equipes = _vainqueurs(b, a, buts_r[0] + buts_a[1], buts_r[1] + buts_a[0], *departage)
+                journee += 2
+            else:
+                buts = _scores(rng, self.forces[a], self.forces[b])
+                departage = _departage(rng, a, b, buts[0] == buts[1])
+                self.ajouter(infos, np.repeat(journee, len(a)), a, b, buts=buts, phase=phase, departage=departage)
+                equipes = _vainqueurs(a, b, *buts, *departage)
+                journee += 1
+
+    def coupe_europe(self, infos, equipes, annee):
+        rng = self.rng
+        if annee >= ANNEE_PHASE_LIGUE:
+            # Phase de ligue : 36 équipes, 8 adversaires chacune
+            equipes = equipes[:36]
+            journee, d, e = aller_simple(len(equipes))
+            garde = journee < 8
+            dom, ext = equipes[d[garde]], equipes[e[garde]]
+            buts = _scores(rng, self.forces[dom], self.forces[ext])
+            self.ajouter(infos, journee[garde] + 1, dom, ext, buts=buts, phase="Ligue")
+            classement = _classement(equipes, dom, ext, buts)
+            self.elimination(infos, classement[:16], ["Huitièmes", "Quarts", "Demies", "Finale"], 9)
+            return
+
+        # Phase de groupes : 8 groupes de 4, deux premiers qualifiés
+        qualifies = []
+        for g, groupe in enumerate(equipes[:32].reshape(8, 4)):
+            journee, d, e = aller_retour(4)
+            dom, ext = groupe[d], groupe[e]
+            buts = _scores(rng, self.forces[dom], self.forces[ext])
+            self.ajouter(infos, journee + 1, dom, ext, buts=buts, phase="Groupe",
+                         groupe=np.repeat(chr(ord("A") + g), len(dom)))
+            qualifies.extend(_classement(groupe, dom, ext, buts)[:2])
+        self.elimination(infos, np.array(qualifies), ["Huitièmes", "Quarts", "Demies", "Finale"], 7)
+
+    def matchs(self):
+        colonnes = {cle: np.concatenate([b[cle] for b in self.blocs]) for cle in self.blocs[0]}
+        matchs = pd.DataFrame(colonnes)
+        # Textes répétés en category : quelques Mo au lieu de plusieurs Go à grande échelle
+        textes = ["saison", "code_saison", "competition", "groupe", "phase", "aller_retour"]
+        return matchs.astype({col: "category" for col in textes})
+
+
+def _classement(equipes, dom, ext, buts):
+    """Équipes triées par points puis différence de buts (pour désigner les qualifiés)."""
+    index = pd.Index(equipes)
+    i_dom, i_ext = index.get_indexer(dom), index.get_indexer(ext)
+    points = (np.bincount(i_dom, 3 * (buts[0] > buts[1]) + (buts[0] == buts[1]), len(equipes))
+              + np.bincount(i_ext, 3 * (buts[1] > buts[0]) + (buts[0] == buts[1]), len(equipes)))
+    diff = (np.bincount(i_dom, buts[0] - buts[1], len(equipes))
+            + np.bincount(i_ext, buts[1] - buts[0], len(equipes)))
+    return np.asarray(equipes)[np.lexsort((-diff, -points))]
+
+
+# ---------------- Tables ---------------- #
+def generer_tables(echelle=1, graine=0, nb_saisons=10, nb_championnats=None, nb_coupes=None, nb_participants=None):
+    """Tables synthétiques au format des CSV (mêmes noms de tables et de colonnes).
+
+    La dernière saison est en cours : ses dernières journées ne sont pas encore jouées
+    (scores vides) mais ont déjà leurs cotes et leurs pronostics.
+    """
+    rng = np.random.default_rng(graine)
+    tailles = echelle_par_defaut(echelle)
+    nb_championnats = nb_championnats or tailles["nb_championnats"]
+    nb_coupes = nb_coupes or tailles["nb_coupes"]
+    nb_participants = nb_participants or tailles["nb_participants"]
+
+    competitions = _competitions(nb_championnats, nb_coupes)
+    annees = np.arange(2025 - nb_saisons + 1, 2026)
+
+    # Clubs : un vivier par championnat (promotions / relégations d'une saison à l'autre)
+    vivier = EQUIPES_PAR_CHAMPIONNAT + 4
+    nb_clubs = nb_championnats * vivier
+    noms_clubs = np.array(_noms_clubs(nb_clubs), dtype=object)
+    forces = rng.normal(0, 0.45, nb_clubs)
+    generateur = _Generateur(rng, forces)
+
+    saisons = []
+    for annee in annees:
+        saison = f"{annee}-{annee + 1}"
+        for id_comp, (nom, abbr, pays, type_comp) in enumerate(competitions, start=1):
+            saison_id = len(saisons) + 1
+            code = f"{abbr}_{annee % 100:02d}-{(annee + 1) % 100:02d}"
+            saisons.append({"id": saison_id, "competition_id": id_comp, "annee_debut": annee,
+                            "annee_fin": annee + 1, "code": code, "saison": saison, "competition": nom})
+            infos = {"saison_id": saison_id, "saison": saison, "code_saison": code, "competition": nom}
+
+            if type_comp == "championnat":
+                k = id_comp - 1
+                equipes = rng.choice(np.arange(k * vivier, (k + 1) * vivier), EQUIPES_PAR_CHAMPIONNAT, replace=False)
+                generateur.championnat(infos, equipes)
+            elif type_comp == "coupe":
+                nb_tours = int(np.log2(min(EQUIPES_PAR_COUPE, nb_clubs)))
+                equipes = rng.choice(nb_clubs, 2 ** nb_tours, replace=False)
+                phases = ["1/32 de finale", "Seizièmes", "Huitièmes", "Quarts", "Demies", "Finale"][-nb_tours:]
+                generateur.elimination(infos, equipes, phases, 1, aller_retour_phases=False)
+            else:
+                # Les clubs les plus forts disputent la Ligue des Champions, les suivants l'Europa League
+                rang = EUROPE.index((nom, abbr, pays))
+                meilleurs = np.argsort(-forces)
+                equipes = rng.permutation(meilleurs[rang * 36:(rang + 1) * 36]) if nb_clubs >= 72 else \
+                    rng.choice(nb_clubs, 36, replace=nb_clubs < 36)
+                generateur.coupe_europe(infos, equipes, annee)
+
+    matchs = generateur.matchs()
+    n = len(matchs)
+    matchs.insert(0, "match_id", np.arange(1, n + 1))
+
+    # Dates : une journée par semaine à partir du 1er août
+    debut = pd.to_datetime(matchs["saison"].str[:4] + "-08-01")
+    matchs["date"] = (debut + pd.to_timedelta((matchs["journee"] - 1) * 7, unit="D")).dt.strftime("%Y-%m-%d")
+
+    # Saison en cours : les 40 % dernières journées de chaque compétition ne sont pas jouées
+    derniere = matchs["saison"] == f"{annees[-1]}-{annees[-1] + 1}"
+    max_journee = matchs.groupby("saison_id")["journee"].transform("max")
+    a_jouer = derniere & (matchs["journee"] > (max_journee * 0.6).round())
+    for col in ["score_domicile", "score_exterieur", "prolongation_score_domicile",
+                "prolongation_score_exterieur", "tab_score_domicile", "tab_score_exterieur"]:
+        matchs.loc[a_jouer, col] = np.nan
+    # Tours à élimination directe pas encore tirés au sort : absents de la base
+    tirage = matchs["phase"].notna() & ~matchs["phase"].isin(["Groupe", "Ligue"])
+    matchs = matchs[~(a_jouer & tirage)].reset_index(drop=True)
+
+    # Cotes disponibles depuis la quatrième saison seulement (comme dans l'historique réel)
+    sans_cotes = matchs["saison"].str[:4].astype(int) < annees[min(3, len(annees) - 1)]
+    matchs.loc[sans_cotes, ["cote_domicile", "cote_nul", "cote_exterieur"]] = np.nan
+
+    matchs["equipe_domicile_id"] = matchs["dom"] + 1
+    matchs["equipe_domicile_nom"] = pd.Categorical.from_codes(matchs["dom"], noms_clubs)
+    matchs["equipe_exterieure_id"] = matchs["ext"] + 1
+    matchs["equipe_exterieure_nom"] = pd.Categorical.from_codes(matchs["ext"], noms_clubs)
+    matchs = matchs[[
+        "match_id", "saison_id", "saison", "code_saison", "competition", "date", "journee",
+        "equipe_domicile_id", "equipe_domicile_nom", "equipe_exterieure_id", "equipe_exterieure_nom",
+        "score_domicile", "score_exterieur", "cote_domicile", "cote_nul", "cote_exterieur",
+        "groupe", "phase", "aller_retour", "prolongation_score_domicile", "prolongation_score_exterieur",
+        "tab_score_domicile", "tab_score_exterieur"
+    ]]
+
+    participants = pd.DataFrame({"id": np.arange(1, nb_participants + 1),
+                                 "pseudo": _noms(PRENOMS, nb_participants)})
+    pronos = _pronostics(rng, matchs, participants)
+
+    clubs = pd.DataFrame({"id": np.arange(1, nb_clubs + 1), "nom": noms_clubs,
+                          "pays": [competitions[i // vivier][2] for i in range(nb_clubs)]})
+    return {
+        "all_matchs_football": matchs,
+        "all_pronostics": pronos,
+        "participants": participants,
+        "clubs": clubs,
+        "competitions": pd.DataFrame(
+            [{"id": i, "nom": nom, "type": type_comp, "pays": pays, "abbreviation": abbr}
+             for i, (nom, abbr, pays, type_comp) in enumerate(competitions, start=1)]
+        ),
+        "saisons": pd.DataFrame(saisons),
+    }
+
+
+def _pronostics(rng, matchs, participants, pronos_par_match=5.4, assiduite=0.9):
+    """Pronostics : chaque participant suit quelques compétitions par saison et en pronostique la plupart des matchs."""
+    nb_participants = len(participants)
+    cles = matchs[["saison_id"]].drop_duplicates()["saison_id"].to_numpy()
+    taux_suivi = min(1.0, pronos_par_match / (assiduite * nb_participants))
+
+    # Participants qui suivent chaque (saison, compétition), puis un tirage par match suivi
+    i_cle, participants_idx = np.nonzero(rng.random((len(cles), nb_participants)) < taux_suivi)
+    suivis = pd.DataFrame({"saison_id": cles[i_cle], "participant": participants_idx})
+    paires = matchs[["saison_id"]].reset_index().merge(suivis, on="saison_id").sort_values(["index", "participant"])
+    paires = paires[rng.random(len(paires)) < assiduite]
+    lignes, participants_idx = paires["index"].to_numpy(), paires["participant"].to_numpy()
+
+    m = matchs.iloc[lignes]
+    n = len(m)
+    # Score pronostiqué : proche du score réel une fois sur cinq, sinon tiré selon les cotes
+    reel_dom = m["score_domicile"].fillna(1).to_numpy()
+    reel_ext = m["score_exterieur"].fillna(1).to_numpy()
+    proche = rng.random(n) < 0.2
+    favori_dom = m["cote_domicile"].fillna(2.5).to_numpy() < m["cote_exterieur"].fillna(2.5).to_numpy()
+    dom = np.where(proche, reel_dom, rng.poisson(np.where(favori_dom, 1.7, 1.0)))
+    ext = np.where(proche, reel_ext, rng.poisson(np.where(favori_dom, 0.9, 1.5)))
+
+    pronos = pd.DataFrame({
+        "participant_id": participants["id"].to_numpy()[participants_idx],
+        "participant_nom": pd.Categorical.from_codes(participants_idx, participants["pseudo"]),
+        "equipe_domicile": m["equipe_domicile_nom"].array,
+        "equipe_exterieure": m["equipe_exterieure_nom"].array,
+        "score_domicile": np.minimum(dom, 9).astype(int),
+        "score_exterieur": np.minimum(ext, 9).astype(int),
+        "match_id": m["match_id"].to_numpy(),
+        "journee": m["journee"].to_numpy(),
+        "saison": m["saison"].array,
+        "code_saison": m["code_saison"].array,
+    })
+
+    # Ressaisies : quelques pronostics saisis une seconde fois avec un autre score
+    ressaisies = pronos.sample(frac=TAUX_RESSAISIE, random_state=rng.integers(2 ** 31)).copy()
+    ressaisies["score_domicile"] = rng.integers(0, 4, len(ressaisies))
+    pronos = pd.concat([pronos, ressaisies], ignore_index=True)
+    pronos.insert(0, "id", np.arange(1, len(pronos) + 1))
+    return pronos
+
+
+def ecrire_csv(tables, dossier):
+    """Écrit les tables dans `dossier` (un CSV par table, comme le dossier csv/)."""
+    os.makedirs(dossier, exist_ok=True)
+    for nom, df in tables.items():
+        df.to_csv(os.path.join(dossier, f"{nom}.csv"), index=False)
+
+
+def resume(tables):
+    return pd.DataFrame([{"table": nom, "lignes": len(df)} for nom, df in tables.items()])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère un jeu de données synthétique au format des CSV.")
+    parser.add_argument("dossier", help="dossier de sortie des CSV")
+    parser.add_argument("--echelle", type=float, default=1, help="1 = volume actuel (~10k matchs)")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--saisons", type=int, default=10)
+    args = parser.parse_args()
+
+    tables = generer_tables(args.echelle, args.graine, args.saisons)
+    ecrire_csv(tables, args.dossier)
+    print(resume(tables).to_string(index=False))
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import plotly.colors as pcolors
+import streamlit as st
+
+# ---------------- Tableaux sans Styler ---------------- #
+# Les tableaux sont passés à st.dataframe tels quels, sans pandas Styler : aucune feuille de
+# style n'est calculée puis sérialisée cellule par cellule à chaque rerun. Les règles de
+# couleur deviennent des colonnes d'affichage précalculées en NumPy (pastille 🟩 / 🟨 / 🟥
+# devant la valeur, comme la colonne « Évolution » des classements) ou des barres natives
+# (ProgressColumn) à la place des dégradés de fond ; alignements et formats passent par la
+# configuration des colonnes (column_config).
+
+# Échelles ColorBrewer des anciens dégradés : couleur des barres qui les remplacent
+ECHELLES = {
+    "Greens": pcolors.sequential.Greens,
+    "Blues": pcolors.sequential.Blues,
+    "Oranges": pcolors.sequential.Oranges,
+    "YlOrBr": pcolors.sequential.YlOrBr,
+    "Reds": pcolors.sequential.Reds,
+    "RdYlGn": pcolors.diverging.RdYlGn,
+}
+# Position dans l'échelle de la couleur des barres (teinte soutenue, lisible sur fond clair ou sombre)
+POSITION_BARRE = 0.75
+# Pastilles des colonnes d'affichage
+VERT, JAUNE, ROUGE, BLEU = "🟩", "🟨", "🟥", "🟦"
+
+
+def pastilles(valeurs, conditions, marques):
+    """Textes des valeurs précédés de la pastille de la première condition vraie (sinon inchangés)."""
+    valeurs = pd.Series(valeurs)
+    textes = valeurs.astype(object).where(valeurs.notna(), "").astype(str).to_numpy(dtype=object)
+    marque = np.select(conditions, marques, default="").astype(object)
+    return pd.Series(np.where(marque == "", textes, marque + " " + textes), index=valeurs.index, dtype=object)
+
+
+def barre(valeurs, echelle, format=None):
+    """Colonne en barres entre le minimum et le maximum des valeurs (remplace un dégradé de fond)."""
+    x = pd.to_numeric(pd.Series(valeurs), errors="coerce")
+    vmin, vmax = (0.0, 1.0) if x.isna().all() else (float(x.min()), float(x.max()))
+    points = ECHELLES[echelle]
+    return st.column_config.ProgressColumn(
+        format=format, min_value=vmin, max_value=vmax if vmax > vmin else vmin + 1,
+        color=points[round(POSITION_BARRE * (len(points) - 1))]
+    )
+
+
+def centrer(df, alignement="center"):
+    """Configuration des colonnes de `df` : toutes alignées (centrées par défaut)."""
+    return {col: st.column_config.Column(alignment=alignement) for col in df.columns}
+
+
+def config_classement(df):
+    """Colonnes d'un classement : Pts et Diff en barres (anciens dégradés vert / rouge-vert), le reste centré."""
+    return {
+        **centrer(df),
+        "Equipe": st.column_config.Column(alignment="left"),
+        "Pts": barre(df["Pts"], "Greens", "%.0f"),
+        "Diff": barre(df["Diff"], "RdYlGn", "%+d"),
+    }
+
+
+# ---------------- Lecture des scores affichés ---------------- #
+def entiers(textes):
+    """Entiers écrits dans une colonne de textes, NaN si le texte n'est pas un entier."""
+    textes = pd.Series(textes, dtype=object).astype(str).str.strip()
+    return pd.to_numeric(textes.where(textes.str.fullmatch(r"[+-]?\d+")), errors="coerce")
+
+
+def scores(textes):
+    """Buts (domicile, extérieur) d'une colonne « d-e » ; NaN si le texte n'est pas un score simple.
+
+    Seul le premier mot de chaque côté est lu : « 2-1 (TAB) » donne (2, 1).
+    """
+    parties = pd.Series(textes, dtype=object).astype(str).str.split("-")
+    simples = parties.str.len() == 2
+    dom = entiers(parties.str[0].where(simples).str.split().str[0])
+    ext = entiers(parties.str[1].where(simples).str.split().str[0])
+    return dom, ext
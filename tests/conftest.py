@@ -0,0 +1,32 @@
+import os
+import shutil
+import sys
+import pytest
+
+# Les modules de l'application sont à la racine du dépôt (structure à plat)
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+
+@pytest.fixture(autouse=True)
+def racine(monkeypatch):
+    """Exécute chaque test depuis la racine du dépôt (chemins relatifs csv/ et cache/)."""
+    monkeypatch.chdir(RACINE)
+    return RACINE
+
+
+@pytest.fixture
+def dossier_csv(tmp_path, racine, monkeypatch):
+    """Copie des CSV du dépôt (sans données ingérées) dans un dossier temporaire.
+
+    Le test s'exécute depuis ce dossier, sans cache/ : les caches relatifs (archives, précalculs,
+    bases SQL) partent vides et ceux du dépôt ne sont ni lus ni réécrits avec des données modifiées.
+    """
+    copie = tmp_path / "csv"
+    copie.mkdir()
+    for fichier in os.listdir(os.path.join(racine, "csv")):
+        if fichier.endswith(".csv"):
+            shutil.copy2(os.path.join(racine, "csv", fichier), copie / fichier)
+    monkeypatch.chdir(tmp_path)
+    return str(copie)
@@ -0,0 +1,28 @@
+import os
+import pandas as pd
+import archives
+import donnees
+
+# ---------------- Archives (vue matérialisée) ---------------- #
+# Statistiques lues et cache écrit pour le dossier de données chargé, jamais pour csv/ du dépôt.
+
+
+def test_stats_et_cache_du_dossier(dossier_csv):
+    matchs = pd.read_csv(os.path.join(dossier_csv, "all_matchs_football.csv"))
+    match_id = int(matchs["match_id"].iloc[0])
+    os.makedirs(os.path.join(dossier_csv, archives.DOSSIER_STATS))
+    pd.DataFrame({"match_id": [match_id], "tirs_domicile": [17]}).to_csv(
+        os.path.join(dossier_csv, archives.DOSSIER_STATS, "stats.csv"), index=False)
+
+    table = donnees.charger_tables(dossier_csv, "memoire")["archives"]
+    assert table.set_index("match_id").at[match_id, "tirs_domicile"] == 17
+
+    cache = archives.dossier_cache(dossier_csv)
+    assert cache != archives.dossier_cache(os.path.join(os.path.dirname(dossier_csv), "autre", "csv"))
+    fichiers = os.listdir(cache)
+    assert archives.FICHIER_MANIFESTE in fichiers and not any(f.endswith(".tmp") for f in fichiers)
+    assert len(fichiers) == matchs["saison"].nunique() + 1
+
+    # Relu depuis le cache : mêmes matchs et mêmes statistiques
+    colonnes = ["match_id", *archives.COLONNES_STATS]
+    pd.testing.assert_frame_equal(donnees.charger_tables(dossier_csv, "memoire")["archives"][colonnes], table[colonnes])
@@ -0,0 +1,28 @@
+import os
+import warnings
+import pytest
+import equivalence
+
+# ---------------- Équivalence des moteurs ---------------- #
+# Les moteurs vectorisés (moteur.py) reproduisent les implémentations ligne à ligne,
+# au sens d'equivalence.verifier : aucun cas en écart sur les cas limites et sur les CSV réels.
+
+
+@pytest.fixture(params=["limites", "reel"])
+def jeu(request, racine):
+    if request.param == "reel":
+        if not os.path.isdir(os.path.join(racine, "csv")):
+            pytest.skip("CSV réels absents")
+        return request.param, equivalence.jeu_reel(os.path.join(racine, "csv"))
+    return request.param, equivalence.jeu_limites()
+
+
+def test_aucun_ecart(jeu):
+    nom, entrees = jeu
+    with warnings.catch_warnings():
+        # Avertissements pandas des implémentations de référence (apply ligne à ligne)
+        warnings.simplefilter("ignore", FutureWarning)
+        rapport = equivalence.verifier({nom: entrees})
+    assert set(rapport["calcul"]) == set(equivalence.CALCULS)
+    en_ecart = rapport[~rapport["ok"]]
+    assert en_ecart.empty, "\n".join(f"{l.calcul} / {l.cas} : {l.differences}" for l in en_ecart.itertuples())
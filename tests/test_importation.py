@@ -0,0 +1,135 @@
+import os
+import openpyxl
+import pandas as pd
+import pytest
+import donnees
+import expert_canape
+import importation
+import ingestion
+
+# ---------------- Import des classeurs remplis ---------------- #
+# Aller-retour sur une copie des CSV : classeurs écrits par l'export Excel (ecrire_journees),
+# scores saisis avec openpyxl, puis importés en un seul lot par l'API d'ingestion.
+
+SAISON, COMPETITION = "2025-2026", "Ligue 1"
+# Journée pas encore jouée et journée déjà jouée de la saison
+A_VENIR, JOUEE = 12, 1
+
+
+def _journee(tables, journee):
+    matchs = donnees.types_calcul(tables.selection(
+        "all_matchs_football", saison=SAISON, competition=COMPETITION, journee_int=journee))
+    return expert_canape.tableau_export(matchs).reset_index(drop=True)
+
+
+def _remplir(chemin, scores, noms=None):
+    """Saisit des scores {(feuille, ligne du tableau): (dom, ext)} et renomme des équipes à domicile."""
+    classeur = openpyxl.load_workbook(chemin)
+    for (feuille, ligne), (dom, ext) in scores.items():
+        classeur[feuille].cell(row=ligne + 4, column=2, value=dom)
+        classeur[feuille].cell(row=ligne + 4, column=3, value=ext)
+    for (feuille, ligne), nom in (noms or {}).items():
+        classeur[feuille].cell(row=ligne + 4, column=1, value=nom)
+    classeur.save(chemin)
+
+
+@pytest.fixture
+def dossier(dossier_csv):
+    """Copie des CSV avec un participant « Alexandre » (règle du pseudo le plus long) et un match
+    en double dans la journée à venir (rapprochement ambigu)."""
+    participants = os.path.join(dossier_csv, "participants.csv")
+    pd.concat([pd.read_csv(participants), pd.DataFrame({"id": [99], "pseudo": ["Alexandre"]})]).to_csv(
+        participants, index=False)
+
+    chemin = os.path.join(dossier_csv, "all_matchs_football.csv")
+    matchs = pd.read_csv(chemin)
+    journee = matchs[(matchs["saison"] == SAISON) & (matchs["competition"] == COMPETITION)
+                     & (matchs["journee"] == A_VENIR)]
+    doublon = journee.sort_values(["equipe_domicile_nom", "equipe_exterieure_nom"]).iloc[[-1]]
+    pd.concat([matchs, doublon.assign(match_id=matchs["match_id"].max() + 1)]).to_csv(chemin, index=False)
+    return dossier_csv
+
+
+@pytest.fixture
+def tables(dossier):
+    return donnees.charger_tables(dossier, "memoire")
+
+
+def test_participant_fichier():
+    participants = {1: "alexandre", 2: "alexandre k", 3: "adrien", 4: "marie", 5: "mario"}
+    assert importation.participant_fichier("Alexandre K_Ligue 1_J12.xlsx", participants) == 2
+    assert importation.participant_fichier("pronos alexandre.xlsx", participants) == 1
+    assert importation.participant_fichier("Adrien-J12.xlsx", participants) == 3
+    # Pseudo collé à d'autres lettres : non reconnu
+    assert importation.participant_fichier("adrienne.xlsx", participants).startswith("participant introuvable")
+    # Pseudos de même longueur : ambigu
+    assert importation.participant_fichier("marie_mario.xlsx", participants) == "participant ambigu"
+
+
+def test_aller_retour(dossier, tables, tmp_path, monkeypatch):
+    a_venir, jouee = _journee(tables, A_VENIR), _journee(tables, JOUEE)
+    correspondances = pd.read_csv(os.path.join(dossier, "clubs_correspondance.csv"))
+    alias = dict(zip(correspondances["nom_db"], correspondances["nom_csv"]))
+    dernier = len(a_venir) - 1
+    # Équipe à domicile saisie sous son nom alternatif (hors des lignes déjà utilisées)
+    ligne_alias = next(i for i in range(5, dernier)
+                       if alias.get(a_venir["Equipe domicile"][i], a_venir["Equipe domicile"][i]) != a_venir["Equipe domicile"][i])
+
+    # Une feuille par journée, comme l'export de saison
+    chemin = str(tmp_path / "Alexandre K_Ligue 1_2025-2026.xlsx")
+    expert_canape.ecrire_journees([(A_VENIR, a_venir), (JOUEE, jouee)], SAISON, COMPETITION, chemin)
+    feuille = f"J{A_VENIR}"
+    _remplir(chemin, {
+        (feuille, 0): (2, 1),
+        (feuille, 1): ("3", "0"),
+        (feuille, ligne_alias): (1, 1),
+        (feuille, 3): (1.5, 0),            # score invalide, rejeté par l'ingestion
+        (feuille, 4): (1, 0),              # équipe inconnue
+        (feuille, dernier): (0, 0),        # match en double dans la journée
+    }, noms={(feuille, ligne_alias): alias[a_venir["Equipe domicile"][ligne_alias]].upper(),
+             (feuille, 4): "Inconnu FC"})
+    illisible = tmp_path / "Adrien_casse.xlsx"
+    illisible.write_bytes(b"pas un classeur")
+    anonyme = str(tmp_path / "sans_nom.xlsx")
+    expert_canape.ecrire_journees([(A_VENIR, a_venir)], SAISON, COMPETITION, anonyme)
+
+    # Un seul lot transmis à l'ingestion
+    appels = []
+    ingerer = ingestion.ingerer
+    monkeypatch.setattr(ingestion, "ingerer", lambda *a, **k: appels.append(a) or ingerer(*a, **k))
+
+    rapport = importation.importer([chemin, str(illisible), anonyme], dossier, processus=1, tables=tables)
+    assert len(appels) == 1 and len(appels[0][1]) == 4
+    assert (rapport["acceptes"], rapport["doublons"]) == (3, 0)
+    assert rapport["saisons"] == [SAISON]
+    # Lignes sans score : celles de la journée à venir laissées vides
+    assert rapport["vides"] == len(a_venir) - 6
+
+    motifs = {(fichier, ligne): motif for fichier, _, ligne, motif in rapport["rejets"]}
+    fichier = os.path.basename(chemin)
+    assert motifs[(fichier, 7)].startswith("score invalide")
+    assert motifs[(fichier, 8)] == f"match introuvable : Inconnu FC - {a_venir['Equipe extérieure'][4]}"
+    assert motifs[(fichier, dernier + 4)].startswith("match ambigu")
+    assert motifs[("Adrien_casse.xlsx", None)].startswith("classeur illisible")
+    assert motifs[("sans_nom.xlsx", None)].startswith("participant introuvable")
+    # La journée jouée est exportée avec ses scores : toutes ses lignes sont rejetées
+    joues = [r for r in rapport["rejets"] if r[1] == f"J{JOUEE}"]
+    assert len(joues) == len(jouee) and all(r[3].startswith("match déjà joué") for r in joues)
+    assert len(rapport["rejets"]) == 5 + len(jouee)
+
+    # Pronostics servis pour « Alexandre K » (et non « Alexandre »), équipe rapprochée par son alias
+    store = donnees.charger_tables(dossier, "memoire")["pronostics"]
+    pid = int(tables["participants"].set_index("pseudo").at["Alexandre K", "id"])
+    matchs = tables["all_matchs_football"]
+    match_id = lambda ligne: int(matchs[(matchs["saison"] == SAISON) & (matchs["journee"] == A_VENIR)
+                                        & (matchs["equipe_domicile_nom"] == a_venir["Equipe domicile"][ligne])
+                                        ]["match_id"].iloc[0])
+    assert store.loc[(pid, match_id(0))].tolist() == [2, 1]
+    assert store.loc[(pid, match_id(ligne_alias))].tolist() == [1, 1]
+    assert 99 not in store.index.get_level_values("participant_id")
+
+    # Réimport : que des doublons ; matchs joués acceptés sur demande
+    rapport = importation.importer([chemin], dossier, processus=1)
+    assert (rapport["acceptes"], rapport["doublons"]) == (0, 3)
+    rapport = importation.importer([chemin], dossier, participant="Adrien", matchs_joues=True, processus=1)
+    assert (rapport["acceptes"], len(rapport["rejets"])) == (3 + len(jouee), 3)
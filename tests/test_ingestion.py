@@ -0,0 +1,147 @@
+import os
+import threading
+import pandas as pd
+import pytest
+import donnees
+import ingestion
+
+# ---------------- Ingestion (journal en ajout seul) ---------------- #
+# Sur une copie des CSV : validation et dédoublonnage des lots, version des seules saisons
+# touchées, données servies par charger_tables avant et après compactage.
+
+
+@pytest.fixture
+def tables(dossier_csv):
+    return donnees.charger_tables(dossier_csv, "memoire")
+
+
+def _match(tables, saison, rang=0):
+    matchs = tables["all_matchs_football"]
+    return int(matchs[matchs["saison"] == saison]["match_id"].iloc[rang])
+
+
+def _lot(tables):
+    """Lot mêlant ajouts, doublons et entrées invalides, sur deux saisons."""
+    store = tables["pronostics"]
+    pid, mid = store.index[0]
+    (pid_existant, mid_existant), existant = store.index[1], store.iloc[1]
+    saison = str(tables["all_matchs_football"].set_index("match_id").at[mid, "saison"])
+    autre = "2016-2017" if saison != "2016-2017" else "2015-2016"
+    match_autre = _match(tables, autre, 3)
+    return saison, autre, [
+        # Identique au CSV : doublon
+        {"type": "pronostic", "participant_id": int(pid_existant), "match_id": int(mid_existant),
+         "score_domicile": int(existant["score_dom"]), "score_exterieur": int(existant["score_ext"])},
+        # Nouvelle saisie du même pronostic (textes et flottants entiers acceptés)
+        {"type": "pronostic", "participant_id": str(pid), "match_id": int(mid),
+         "score_domicile": "7", "score_exterieur": 7.0},
+        # Répétée dans le lot : doublon
+        {"type": "pronostic", "participant_id": int(pid), "match_id": int(mid),
+         "score_domicile": 7, "score_exterieur": 7},
+        {"type": "resultat", "match_id": match_autre, "score_domicile": 9, "score_exterieur": 8, "cote_nul": 3.2},
+        {"type": "pronostic", "participant_id": 9999, "match_id": int(mid), "score_domicile": 1, "score_exterieur": 0},
+        {"type": "pronostic", "participant_id": int(pid), "match_id": 10**8, "score_domicile": 1, "score_exterieur": 0},
+        {"type": "pronostic", "participant_id": int(pid), "match_id": int(mid), "score_domicile": 1.5, "score_exterieur": 0},
+        {"type": "pronostic", "participant_id": int(pid), "match_id": int(mid), "score_domicile": 1},
+        {"type": "resultat", "match_id": match_autre, "cote_domicile": 0.5},
+        {"type": "inconnu", "match_id": int(mid)},
+    ]
+
+
+def test_rapport_et_dedoublonnage(dossier_csv, tables):
+    saison, autre, lot = _lot(tables)
+    rapport = ingestion.ingerer(dossier_csv, lot, tables)
+    assert (rapport["acceptes"], rapport["doublons"]) == (2, 2)
+    assert [numero for numero, _ in rapport["rejets"]] == [4, 5, 6, 7, 8, 9]
+    motifs = [motif for _, motif in rapport["rejets"]]
+    assert motifs[0].startswith("participant inconnu") and motifs[1].startswith("match inconnu")
+    assert motifs[2].startswith("score invalide") and motifs[3] == "score incomplet"
+    assert motifs[4].startswith("cote invalide") and motifs[5].startswith("type inconnu")
+    assert sorted(rapport["saisons"]) == sorted([saison, autre])
+    assert len(ingestion.lire_journal(dossier_csv)) == 2
+
+    # Le même lot rejoué : plus rien de nouveau, mêmes rejets
+    rapport = ingestion.ingerer(dossier_csv, lot, donnees.charger_tables(dossier_csv, "memoire"))
+    assert (rapport["acceptes"], rapport["doublons"], len(rapport["rejets"])) == (0, 4, 6)
+    assert rapport["saisons"] == []
+    assert len(ingestion.lire_journal(dossier_csv)) == 2
+
+
+def test_donnees_servies(dossier_csv, tables):
+    _, autre, lot = _lot(tables)
+    ingestion.ingerer(dossier_csv, lot, tables)
+    apres = donnees.charger_tables(dossier_csv, "memoire")
+    pid, mid = tables["pronostics"].index[0]
+    assert apres["pronostics"].loc[(pid, mid)].tolist() == [7, 7]
+    assert len(apres["pronostics"]) == len(tables["pronostics"])
+
+    match = apres["all_matchs_football"].set_index("match_id").loc[lot[3]["match_id"]]
+    assert (match["score_domicile"], match["score_exterieur"]) == (9, 8)
+    assert match["cote_nul"] == pytest.approx(3.2)
+    archive = apres["archives"].set_index("match_id").loc[lot[3]["match_id"]]
+    assert (archive["score_domicile"], archive["score_exterieur"]) == (9, 8)
+
+
+def test_versions_des_seules_saisons_touchees(dossier_csv, tables):
+    saisons = [str(s) for s in tables["all_matchs_football"]["saison"].unique()]
+    avant = {s: tables.version_saison(s) for s in saisons}
+    saison, autre, lot = _lot(tables)
+    ingestion.ingerer(dossier_csv, lot, tables)
+
+    apres = donnees.charger_tables(dossier_csv, "memoire")
+    changees = {s for s in saisons if apres.version_saison(s) != avant[s]}
+    assert changees == {saison, autre}
+    assert apres.version_saison() != tables.version_saison()
+    assert apres.version != tables.version
+
+    # Nouvel ajout sur une seule saison : seule sa version change encore
+    ingestion.ingerer(dossier_csv, [{"type": "resultat", "match_id": lot[3]["match_id"], "cote_nul": 4.5}], apres)
+    encore = donnees.charger_tables(dossier_csv, "memoire")
+    assert {s for s in saisons if encore.version_saison(s) != apres.version_saison(s)} == {autre}
+
+
+def test_compactage(dossier_csv, tables):
+    _, _, lot = _lot(tables)
+    ingestion.ingerer(dossier_csv, lot, tables)
+    avant = donnees.charger_tables(dossier_csv, "memoire")
+    versions = {s: avant.version_saison(s) for s in ["2015-2016", "2016-2017", "2024-2025"]}
+
+    assert ingestion.compacter(dossier_csv) == 2
+    assert ingestion.lire_journal(dossier_csv) == []
+    assert all(os.path.exists(ingestion._chemin(dossier_csv, f)) for f in ingestion.FICHIERS_COMPACTES.values())
+    assert ingestion.compacter(dossier_csv) == 0
+
+    apres = donnees.charger_tables(dossier_csv, "memoire")
+    for nom in ["pronostics", "all_matchs_football", "archives"]:
+        pd.testing.assert_frame_equal(apres[nom], avant[nom])
+    assert {s: apres.version_saison(s) for s in versions} == versions
+
+    # Journal et parquet compacté cumulés : la dernière saisie l'emporte toujours
+    pid, mid = tables["pronostics"].index[0]
+    ingestion.ingerer(dossier_csv, [{"type": "pronostic", "participant_id": int(pid), "match_id": int(mid),
+                                 "score_domicile": 2, "score_exterieur": 0}], apres)
+    assert donnees.charger_tables(dossier_csv, "memoire")["pronostics"].loc[(pid, mid)].tolist() == [2, 0]
+
+
+def test_ajouts_concurrents(dossier_csv, tables):
+    """Deux lots écrits en même temps : le verrou sérialise les ajouts, aucune ligne perdue."""
+    participants = tables["participants"]["id"].astype(int).tolist()[:2]
+    matchs = [_match(tables, "2024-2025", rang) for rang in range(20)]
+    lots = [[{"type": "pronostic", "participant_id": pid, "match_id": mid, "score_domicile": 4, "score_exterieur": 4}
+             for mid in matchs] for pid in participants]
+    rapports = [None, None]
+
+    def ecrire(i):
+        rapports[i] = ingestion.ingerer(dossier_csv, lots[i], tables)
+
+    fils = [threading.Thread(target=ecrire, args=(i,)) for i in range(2)]
+    for fil in fils:
+        fil.start()
+    for fil in fils:
+        fil.join()
+
+    journal = ingestion.lire_journal(dossier_csv)
+    acceptes = sum(r["acceptes"] for r in rapports)
+    assert len(journal) == acceptes > 0
+    assert sorted(e["sequence"] for e in journal) == list(range(1, acceptes + 1))
+    assert ingestion.lire_etat(dossier_csv)["sequence"] == acceptes
@@ -0,0 +1,212 @@
+import os
+import time
+import tracemalloc
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+import graphiques
+import instrumentation
+
+# ---------------- Latence et mémoire des pages ---------------- #
+# Pilote app.py sans navigateur (AppTest) : ouvre chaque page puis change de saison, de
+# championnat, de journée ou de participant. Chaque réexécution est mesurée (durée totale,
+# durée du script de la page d'après le span « page » de l'instrumentation, pic mémoire
+# tracemalloc) et comparée à des seuils fixes.
+#
+# Seuils à froid : chaque test s'exécute depuis une copie temporaire des CSV (fixture
+# dossier_csv) sans dossier cache/ (ni archives matérialisées, ni précalculs, ni base SQL),
+# et les caches Streamlit et des figures sont vidés. Le démarrage et le premier affichage
+# d'une page calculent donc tout ; les changements de sélection suivants profitent des
+# caches remplis pendant le test, comme pour un utilisateur.
+#
+#   python -m pytest tests/ -q
+#   FOOTBALL_FACTEUR_SEUILS=2      seuils multipliés (machine plus lente)
+#   FOOTBALL_LATENCES=fichier      mesures ajoutées en JSON lines
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+FACTEUR_SEUILS = float(os.environ.get("FOOTBALL_FACTEUR_SEUILS", "1"))
+FICHIER_LATENCES = os.environ.get("FOOTBALL_LATENCES", "")
+
+# Durée maximale d'une réexécution (ms) : (premier affichage de la page, changements de sélection).
+# Environ trois fois les durées mesurées à froid sur les CSV actuels : un retour aux calculs
+# ligne à ligne ou un cache perdu les dépasse largement.
+SEUILS_MS = {
+    "Accueil": (4000, 1500),
+    "Expert Canapé": (2000, 1500),
+    "Championnat": (2000, 1500),
+    "Compétitions Européennes": (1000, 1000),
+    "Coupes Nationales": (1000, 800),
+}
+# Pic mémoire d'une réexécution (Mo, allocations suivies par tracemalloc) ; le démarrage
+# (chargement des tables lues par l'accueil) a son propre seuil
+SEUIL_DEMARRAGE_MO = 40
+SEUILS_MO = {
+    "Accueil": 40,
+    "Expert Canapé": 25,
+    "Championnat": 20,
+    "Compétitions Européennes": 10,
+    "Coupes Nationales": 10,
+}
+# Budget du script de la page Expert Canapé (span « page », ms) : (ouverture, changement de sélection).
+# C'est la page que les utilisateurs attendent : budget serré (environ 1,5 fois les durées mesurées),
+# qu'un changement de saison avec les calculs de points ligne à ligne dépasse déjà.
+BUDGET_EXPERT_MS = (1000, 1200)
+
+BOUTONS = {
+    "Accueil": "Accueil",
+    "Expert Canapé": "Experts du Canapé",
+    "Championnat": "Classements Nationaux",
+    "Compétitions Européennes": "Compétitions Européennes",
+    "Coupes Nationales": "Coupes Nationales",
+}
+
+# Choix d'une option : indice, valeur exacte, ou AUTRE (première option différente de la valeur affichée)
+AUTRE = None
+
+# Changements de sélection joués après l'ouverture de chaque page : (libellé du selectbox, choix)
+SCENARIOS = {
+    "Accueil": [],
+    "Expert Canapé": [
+        ("Sélectionner un participant", AUTRE),
+        ("Sélectionner une journée", "5"),
+        ("Sélectionner un championnat", "Toutes"),
+        ("Sélectionner une saison", 1),
+        ("Sélectionner une saison", 0),
+    ],
+    "Championnat": [
+        # Saison à plusieurs championnats (les saisons récentes n'ont que la Ligue 1)
+        ("Sélectionner une saison", "2016-2017"),
+        ("Sélectionner un championnat", AUTRE),
+        ("Sélectionner la journée à afficher", "10"),
+        ("Choisir le premier club", AUTRE),
+    ],
+    "Compétitions Européennes": [
+        ("Sélectionner une saison", 1),
+        ("Sélectionner une compétition", AUTRE),
+    ],
+    "Coupes Nationales": [
+        ("Sélectionner une saison", AUTRE),
+        ("Sélectionner une compétition", AUTRE),
+    ],
+}
+
+
+def _selectbox(at, libelle):
+    return next((s for s in at.selectbox if libelle in s.label), None)
+
+
+def _option(selectbox, choix):
+    """Option désignée par `choix`, None si elle n'existe pas pour les données chargées."""
+    options = list(selectbox.options)
+    if choix is AUTRE:
+        return next((o for o in options if o != str(selectbox.value)), None)
+    if isinstance(choix, int):
+        return options[choix] if choix < len(options) else None
+    return choix if choix in options else None
+
+
+@pytest.fixture
+def spans_pages(monkeypatch):
+    """Spans exportés par app.py à la fin de chaque exécution de script (au lieu du fichier FOOTBALL_SPANS)."""
+    spans = []
+    monkeypatch.setattr(instrumentation, "exporter", lambda s, chemin=None: spans.extend(s))
+    return spans
+
+
+@pytest.fixture
+def caches_vides(dossier_csv, monkeypatch):
+    """Données du dépôt sans aucun cache : copie des CSV, cache/ absent, caches en mémoire vidés."""
+    # Base SQL (FOOTBALL_STOCKAGE) construite dans le dossier temporaire, jamais relue ailleurs
+    monkeypatch.delenv("FOOTBALL_BASE", raising=False)
+    assert not os.path.exists("cache")
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    graphiques.vider_cache_figures()
+
+
+def parcourir(page, spans_pages, memoire=False):
+    """Ouvre `page` puis joue son scénario ; une mesure par réexécution du script."""
+    at = AppTest.from_file(APP, default_timeout=120)
+    mesures = []
+
+    # Suivi mémoire déjà actif (FOOTBALL_TRACEMALLOC=1) : il est laissé actif après les mesures
+    deja_suivi = tracemalloc.is_tracing()
+
+    def mesurer(etape, action):
+        if memoire:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+        debut = len(spans_pages)
+        t0 = time.perf_counter()
+        action()
+        duree_ms = (time.perf_counter() - t0) * 1000
+        pic_mo = tracemalloc.get_traced_memory()[1] / 2**20 if memoire else None
+        if memoire and not deja_suivi:
+            tracemalloc.stop()
+        assert not at.exception, f"{page} / {etape} : {at.exception[0].value}"
+        script = [s for s in spans_pages[debut:] if s["nom"] == "page"]
+        mesures.append({
+            "page": page, "etape": etape, "duree_ms": round(duree_ms, 1),
+            "script_ms": script[-1]["duree_ms"] if script else None,
+            "pic_mo": None if pic_mo is None else round(pic_mo, 1),
+        })
+
+    mesurer("demarrage", at.run)
+    if page != "Accueil":
+        bouton = next(b for b in at.sidebar.button if BOUTONS[page] in b.label)
+        mesurer("ouverture", lambda: bouton.click().run())
+
+    for libelle, choix in SCENARIOS[page]:
+        selectbox = _selectbox(at, libelle)
+        option = _option(selectbox, choix) if selectbox is not None else None
+        # Une étape introuvable ferait passer le test sans la mesurer : le scénario doit être rejoué en entier
+        assert selectbox is not None and option is not None, f"{page} / {libelle} : {choix} introuvable"
+        mesurer(f"{libelle} = {option}", lambda: selectbox.set_value(option).run())
+
+    if FICHIER_LATENCES:
+        with open(FICHIER_LATENCES, "a", encoding="utf-8") as fichier:
+            fichier.write(instrumentation.jsonl(mesures))
+    return mesures
+
+
+def _depassements(mesures, seuil, cle):
+    return [f"{m['etape']} : {m[cle]} > {seuil(m):.0f}" for m in mesures if m[cle] is not None and m[cle] > seuil(m)]
+
+
+# ---------------- Tests ---------------- #
+@pytest.mark.parametrize("page", list(SCENARIOS))
+def test_latence(page, spans_pages, caches_vides):
+    mesures = parcourir(page, spans_pages)
+    premier, suivants = SEUILS_MS[page]
+
+    def seuil(m):
+        # Le démarrage affiche l'accueil ; l'ouverture, le premier affichage de la page testée
+        if m["etape"] == "demarrage":
+            return FACTEUR_SEUILS * SEUILS_MS["Accueil"][0]
+        return FACTEUR_SEUILS * (premier if m["etape"] == "ouverture" else suivants)
+
+    depassements = _depassements(mesures, seuil, "duree_ms")
+    assert not depassements, f"{page} trop lente :\n" + "\n".join(depassements)
+
+
+@pytest.mark.parametrize("page", list(SCENARIOS))
+def test_memoire(page, spans_pages, caches_vides):
+    mesures = parcourir(page, spans_pages, memoire=True)
+
+    def seuil(m):
+        return FACTEUR_SEUILS * (SEUIL_DEMARRAGE_MO if m["etape"] == "demarrage" else SEUILS_MO[page])
+
+    depassements = _depassements(mesures, seuil, "pic_mo")
+    assert not depassements, f"{page} : pic mémoire trop élevé (Mo) :\n" + "\n".join(depassements)
+
+
+def test_budget_expert_canape(spans_pages, caches_vides):
+    mesures = [m for m in parcourir("Expert Canapé", spans_pages) if m["etape"] != "demarrage"]
+    assert all(m["script_ms"] is not None for m in mesures), "span « page » absent : instrumentation désactivée ?"
+    ouverture, selection = BUDGET_EXPERT_MS
+
+    def seuil(m):
+        return FACTEUR_SEUILS * (ouverture if m["etape"] == "ouverture" else selection)
+
+    depassements = _depassements(mesures, seuil, "script_ms")
+    assert not depassements, "Script Expert Canapé hors budget (ms) :\n" + "\n".join(depassements)
@@ -0,0 +1,182 @@
+import os
+import re
+import pandas as pd
+import pytest
+import donnees
+import expert_canape
+import pronostics
+import stockage
+
+# ---------------- Stockages SQL ---------------- #
+# Les requêtes des pages rendent les mêmes DataFrames (lignes, ordre, types, index) depuis la
+# mémoire et depuis une base SQL construite dans un dossier temporaire.
+
+CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "csv")
+MATCHS, ARCHIVES = "all_matchs_football", "archives"
+
+
+@pytest.fixture(scope="module")
+def memoire():
+    return donnees.charger_tables(CSV, "memoire")
+
+
+@pytest.fixture(scope="module", params=["sqlite", "duckdb"])
+def sql(request, tmp_path_factory):
+    # duckdb : dépendance de développement (requirements-dev.txt), jamais ignorée
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("FOOTBALL_BASE", str(tmp_path_factory.mktemp("stockage") / f"football.{request.param}"))
+        return donnees.charger_tables(CSV, request.param)
+
+
+@pytest.mark.parametrize("nom, colonnes, filtres", [
+    (MATCHS, None, {}),
+    (MATCHS, None, {"saison": "2024-2025"}),
+    (MATCHS, ["match_id", "journee", "score_domicile"], {"saison": "2016-2017", "competition": "Ligue 1"}),
+    (MATCHS, None, {"saison": ["2015-2016", "2025-2026"], "journee": 12}),
+    (MATCHS, ["match_id"], {"saison": "1900-1901"}),
+    (MATCHS, None, {"match_id": []}),
+    (ARCHIVES, None, {"competition": "Premier League"}),
+    ("participants", None, {}),
+    ("pronostics", None, {}),
+])
+def test_selection(memoire, sql, nom, colonnes, filtres):
+    pd.testing.assert_frame_equal(sql.selection(nom, colonnes, **filtres),
+                                  memoire.selection(nom, colonnes, **filtres), check_exact=True)
+
+
+@pytest.mark.parametrize("nom, colonne, filtres", [
+    (MATCHS, "saison", {}),
+    (MATCHS, "competition", {"saison": "2016-2017"}),
+    (MATCHS, "journee", {"saison": "2024-2025", "competition": "Ligue 1"}),
+    (MATCHS, "score_domicile", {"saison": "2025-2026"}),
+    (ARCHIVES, "equipe_domicile_nom", {"competition": "Ligue 1", "saison": ["2015-2016", "2016-2017"]}),
+])
+def test_valeurs(memoire, sql, nom, colonne, filtres):
+    # Valeurs dans l'ordre d'apparition, avec leur type (catégories comprises)
+    attendu = pd.DataFrame({colonne: memoire.valeurs(nom, colonne, **filtres)})
+    pd.testing.assert_frame_equal(pd.DataFrame({colonne: sql.valeurs(nom, colonne, **filtres)}), attendu)
+
+
+def _bilan(df, club1, club2):
+    """Bilan des confrontations directes calculé comme la page Championnat (stockage en mémoire)."""
+    df = df[((df["equipe_domicile_nom"] == club1) & (df["equipe_exterieure_nom"] == club2))
+            | ((df["equipe_domicile_nom"] == club2) & (df["equipe_exterieure_nom"] == club1))]
+    victoires = [((df["equipe_domicile_nom"] == club) & (df["score_domicile"] > df["score_exterieur"])).sum()
+                 + ((df["equipe_exterieure_nom"] == club) & (df["score_exterieur"] > df["score_domicile"])).sum()
+                 for club in (club1, club2)]
+    return victoires[0], (df["score_domicile"] == df["score_exterieur"]).sum(), victoires[1]
+
+
+@pytest.mark.parametrize("competition, club1, club2", [
+    ("Ligue 1", "Olympique de Marseille", "Paris Saint Germain"),
+    ("Ligue 1", "AS Monaco", "Olympique Lyonnais"),
+    ("Premier League", "Arsenal FC", "Chelsea FC"),
+    # Clubs jamais opposés dans la compétition : (0, 0, 0)
+    ("Ligue 1", "Olympique de Marseille", "Arsenal FC"),
+])
+def test_confrontations(memoire, sql, competition, club1, club2):
+    # Le stockage en mémoire laisse l'agrégat à la page
+    assert memoire.confrontations(ARCHIVES, club1, club2, competition=competition) is None
+    colonnes = ["victoires_club1", "nuls", "victoires_club2"]
+    attendu = _bilan(donnees.types_calcul(memoire.selection(ARCHIVES, competition=competition)), club1, club2)
+    resultat = sql.confrontations(ARCHIVES, club1, club2, competition=competition)
+    pd.testing.assert_frame_equal(pd.DataFrame([resultat], columns=colonnes).astype("int64"),
+                                  pd.DataFrame([attendu], columns=colonnes).astype("int64"))
+
+
+@pytest.mark.parametrize("saison, competition", [
+    ("2015-2016", "Toutes"),
+    ("2016-2017", "Ligue 1"),
+    ("2022-2023", "Toutes"),
+    ("2025-2026", "Ligue des Champions"),
+    ("1900-1901", "Toutes"),
+])
+def test_pronostics_progression(memoire, sql, saison, competition):
+    # Points par journée (bonus compris) et cumuls : GROUP BY SQL contre moteur.progression_journees
+    filtres = {"saison": saison} if competition == "Toutes" else {"saison": saison, "competition": competition}
+    assert memoire.pronostics_progression(**filtres) is None
+    resultats = expert_canape.calculer_resultats_saison(
+        pronostics.vue_pronostics(memoire.store_pronostics(**filtres), memoire["participants"]),
+        memoire.selection(MATCHS, saison=saison), saison, competition)
+    resultat = sql.pronostics_progression(**filtres)
+    if resultats is None:
+        assert resultat.empty
+        return
+    # Sommes flottantes faites par le moteur SQL : égales à l'arrondi près
+    pd.testing.assert_frame_equal(resultat, resultats[2], rtol=1e-12)
+
+
+def test_stockage_incomplet():
+    # Un moteur sans ses méthodes de connexion est refusé dès son instanciation
+    class Incomplet(stockage.BaseFichier):
+        def _connecter(self):
+            return None
+
+    with pytest.raises(TypeError, match="_connecter_fichier"):
+        Incomplet("base", "v1")
+
+
+# ---------------- Construction d'une base MySQL ---------------- #
+# Sans serveur : instructions SQL produites par la construction, enregistrées par une connexion factice.
+
+class _Connexion:
+    """Connexion DB-API qui enregistre les instructions ; SHOW TABLES rend les tables `existantes`."""
+
+    def __init__(self, existantes=()):
+        self.instructions, self.existantes = [], list(existantes)
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        self.instructions.append(sql)
+
+    def executemany(self, sql, lignes):
+        self.instructions.append(sql)
+
+    def fetchall(self):
+        return [(nom.encode(),) for nom in self.existantes]
+
+    def close(self):
+        pass
+
+
+def _construire(existantes):
+    base = stockage.MySQL("mysql://football@localhost:3306/football", "v2")
+    connexion = _Connexion(existantes)
+    base._ouvrir_construction = lambda: connexion
+    base._terminer_construction = lambda connexion: None
+    base._lire_schemas = lambda: None
+    base.construire({
+        "all_matchs_football": pd.DataFrame({"match_id": [1, 2], "saison": ["2024-2025"] * 2,
+                                             "competition": ["Ligue 1"] * 2, "journee": [1, 2]}),
+        "participants": pd.DataFrame({"id": [1], "pseudo": ["Adrien"]}),
+    })
+    return connexion.instructions
+
+
+@pytest.mark.parametrize("existantes", [[], ["all_matchs_football", "participants", "_meta"]])
+def test_construction_mysql(existantes):
+    instructions = _construire(existantes)
+    bascule = next(i for i, sql in enumerate(instructions) if sql.startswith("RENAME TABLE"))
+
+    # Avant la bascule, seules les tables temporaires sont créées, remplies ou supprimées
+    for sql in instructions[:bascule - 1]:
+        assert all(nom.endswith("__construction`") for nom in re.findall(r"`[^`]+`", sql.split("(")[0])
+                   if not nom.startswith("`idx_")), sql
+    assert instructions[bascule - 1] == ("DROP TABLE IF EXISTS `all_matchs_football__ancien`, "
+                                         "`participants__ancien`, `_meta__ancien`")
+    assert any(sql.startswith("CREATE INDEX `idx_all_matchs_football_saison_competition_journee` "
+                              "ON `all_matchs_football__construction`") for sql in instructions[:bascule])
+
+    # Un seul RENAME TABLE (atomique) : anciennes tables écartées, nouvelles mises en place
+    nouvelles = ("`all_matchs_football__construction` TO `all_matchs_football`, "
+                 "`participants__construction` TO `participants`, `_meta__construction` TO `_meta`")
+    if existantes:
+        assert instructions[bascule:] == [
+            "RENAME TABLE `all_matchs_football` TO `all_matchs_football__ancien`, "
+            "`participants` TO `participants__ancien`, `_meta` TO `_meta__ancien`, " + nouvelles,
+            "DROP TABLE `all_matchs_football__ancien`, `participants__ancien`, `_meta__ancien`",
+        ]
+    else:
+        assert instructions[bascule:] == ["RENAME TABLE " + nouvelles]
@@ -0,0 +1,357 @@
+import html
+import re
+from functools import lru_cache
+import pandas as pd
+import streamlit as st
+
+# ---------------- Feuilles de style ---------------- #
+# Toutes les règles CSS de l'application, regroupées par usage. Une page injecte en un
+# seul bloc (minifié une fois par processus) les feuilles dont elle a besoin ; les
+# composants ci-dessous n'émettent plus que des classes, sans style en ligne.
+
+# === Cartes KPI (Accueil, Expert Canapé, Classements) ===
+CSS_CARTES = """
+.carte {
+    padding: 20px;
+    border-radius: 16px;
+    text-align: center;
+    color: white;
+}
+.carte-kpi {
+    box-shadow: 0 4px 20px rgba(0,0,0,0.3);
+    width: 100%;
+    height: 120px;
+    display: flex;
+    flex-direction: column;
+    justify-content: center;
+    align-items: center;
+    transition: transform 0.2s;
+}
+.carte-kpi:hover { transform: scale(1.05); }
+.carte-kpi .carte-titre { font-size: 16px; font-weight: 500; margin-bottom: 5px; }
+.carte-kpi .carte-valeur { font-size: 28px; font-weight: bold; }
+.carte-kpi .carte-sous-titre { font-size: 14px; opacity: 0.8; margin-top: 2px; }
+
+.carte-accueil {
+    box-shadow: 0 4px 20px rgba(0,0,0,0.15);
+    transition: transform 0.2s, box-shadow 0.2s;
+}
+.carte-accueil:hover {
+    transform: scale(1.05);
+    box-shadow: 0 8px 25px rgba(0,0,0,0.25);
+}
+.carte-accueil .carte-titre { font-size: 18px; font-weight: 500; margin-bottom: 5px; }
+.carte-accueil .carte-valeur { font-size: 32px; font-weight: bold; }
+
+.carte-stat { box-shadow: 0 4px 10px rgba(0,0,0,0.1); }
+.carte-stat .carte-emoji { font-size: 32px; }
+.carte-stat .carte-titre { font-size: 20px; font-weight: bold; margin-top: 5px; }
+.carte-stat .carte-valeur { font-size: 28px; font-weight: 800; margin-top: 10px; }
+.carte-stat .carte-sous-titre { font-size: 16px; opacity: 0.9; margin-top: 5px; }
+"""
+
+# === Cartes du palmarès et des statistiques de saison (Classements) ===
+CSS_CHAMPIONNAT = """
+.kpi-card {
+    background: linear-gradient(135deg, #1E90FF, #0D47A1);
+    padding: 20px;
+    border-radius: 18px;
+    color: white;
+    text-align: center;
+    box-shadow: 0 4px 12px rgba(0,0,0,0.2);
+    height: 200px;
+    transition: 0.3s;
+    margin-bottom: 12px;
+}
+.kpi-card:hover {
+    transform: scale(1.03);
+}
+.kpi-value {
+    font-size: 26px;
+    font-weight: 700;
+    margin-top: 10px;
+}
+.kpi-label {
+    font-size: 15px;
+    opacity: 0.85;
+}
+.kpi-card2 {
+    background: linear-gradient(135deg, #1E90FF, #0D47A1);
+    padding: 20px;
+    border-radius: 18px;
+    color: white;
+    text-align: center;
+    box-shadow: 0 4px 12px rgba(0,0,0,0.2);
+    transition: 0.3s;
+}
+.kpi-card2:hover {
+    transform: scale(1.03);
+}
+.kpi-value2 {
+    font-size: 26px;
+    font-weight: 380;
+    margin-top: 20px;
+}
+.kpi-label2 {
+    font-size: 20px;
+    opacity: 0.8;
+}
+"""
+
+# === 🌈 Podium + ranking homogène (Expert Canapé) ===
+CSS_CLASSEMENT = """
+.ranking-card, .podium-card {
+    background: linear-gradient(135deg, rgba(31,41,55,0.95), rgba(55,65,81,0.9));
+    border: 1px solid rgba(255,255,255,0.05);
+    border-radius: 14px;
+    padding: 10px 16px;
+    margin-bottom: 8px;
+    transition: all 0.25s ease-in-out;
+    width: 95%;
+    max-width: 400px;
+    text-align: left;
+    display: flex;
+    flex-direction: column;
+    gap: 6px;
+    color: white;
+}
+.ranking-card:hover, .podium-card:hover {
+    transform: translateY(-3px);
+    box-shadow: 0 0 14px rgba(255,255,255,0.08);
+}
+
+.ranking-card h5 {
+    margin: 0;
+    font-size: 15px;
+    font-weight: 600;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+}
+
+.progress-bar {
+    height: 10px;
+    border-radius: 8px;
+    overflow: hidden;
+    background-color: rgba(255,255,255,0.08);
+    margin-top: 4px;
+}
+.progress-fill {
+    height: 100%;
+    border-radius: 8px;
+    transition: width 0.8s ease;
+}
+
+.podium-container {
+    display: flex;
+    flex-direction: column;
+    align-items: center;
+    justify-content: center;
+    gap: 10px;
+    margin: 20px 0 30px 0;
+}
+
+/* Couleurs des marches du podium */
+.podium-1 { background: linear-gradient(135deg, #facc15 20%, #92400e 120%); }
+.podium-2 { background: linear-gradient(135deg, #a1a1aa 20%, #52525b 120%); }
+.podium-3 { background: linear-gradient(135deg, #f97316 20%, #78350f 120%); }
+
+/* Tailles différentes selon le rang */
+.podium-1 h4 { font-size: 20px; font-weight: 700; }
+.podium-2 h4 { font-size: 18px; font-weight: 600; }
+.podium-3 h4 { font-size: 16px; font-weight: 600; }
+.podium-card div.emoji {
+    margin-right: 8px;
+}
+"""
+
+# === ⚡ Glow Reactive Edition : Selectbox + Slider + Animation dynamique (Expert Canapé) ===
+CSS_SELECTEURS = """
+/* === Animations === */
+@keyframes fadeIn {
+    from { opacity: 0; transform: translateY(-8px); }
+    to { opacity: 1; transform: translateY(0); }
+}
+@keyframes glowPulse {
+    0%,100% { box-shadow: 0 0 0px var(--glow-color, transparent); }
+    50% { box-shadow: 0 0 16px var(--glow-color, transparent); }
+}
+
+/* === Icônes colorées avant les labels === */
+label[data-testid="stWidgetLabel"] {
+    font-weight: 600;
+    font-size: 15px !important;
+    margin-bottom: 6px !important;
+    display: flex;
+    align-items: center;
+    gap: 6px;
+    color: #e5e7eb !important;
+}
+
+label[data-testid="stWidgetLabel"]:has(span:contains('Saison'))::before {
+    content: "📅"; color: #f59e0b;
+}
+label[data-testid="stWidgetLabel"]:has(span:contains('championnat'))::before {
+    content: "🏆"; color: #3b82f6;
+}
+label[data-testid="stWidgetLabel"]:has(span:contains('journée'))::before {
+    content: "📖"; color: #8b5cf6;
+}
+label[data-testid="stWidgetLabel"]:has(span:contains('participants'))::before {
+    content: "👑"; color: #facc15;
+}
+
+label[data-testid="stWidgetLabel"]::before {
+    font-size: 18px;
+    transition: transform 0.3s ease, filter 0.3s ease;
+}
+label[data-testid="stWidgetLabel"]:hover::before {
+    transform: scale(1.25) rotate(10deg);
+    filter: brightness(1.3);
+}
+
+/* === Selectbox base === */
+div[data-baseweb="select"] > div {
+    background-color: #1f2937 !important;
+    border: 1px solid #374151 !important;
+    border-radius: 10px !important;
+    color: white !important;
+    height: 42px !important;
+    transition: all 0.25s ease-in-out;
+}
+
+/* === Hover (lueur douce) === */
+div[data-baseweb="select"] > div:hover {
+    border-color: var(--glow-color, #3b82f6) !important;
+    box-shadow: 0 0 10px var(--glow-color, #3b82f688);
+}
+
+/* === Animation pulsante au focus === */
+div[data-baseweb="select"]:focus-within > div {
+    animation: glowPulse 1s ease-in-out;
+    border-color: var(--glow-color, #3b82f6) !important;
+}
+
+/* === Couleurs personnalisées par type === */
+div[data-testid="stSelectbox"]:has(label:has(span:contains('Saison'))) div[data-baseweb="select"] { --glow-color: #f59e0b; }
+div[data-testid="stSelectbox"]:has(label:has(span:contains('championnat'))) div[data-baseweb="select"] { --glow-color: #3b82f6; }
+div[data-testid="stSelectbox"]:has(label:has(span:contains('journée'))) div[data-baseweb="select"] { --glow-color: #8b5cf6; }
+div[data-testid="stSelectbox"]:has(label:has(span:contains('participants'))) div[data-baseweb="select"] { --glow-color: #facc15; }
+
+/* === Menu déroulant (fade-in + style propre) === */
+ul[role="listbox"] {
+    background-color: #111827 !important;
+    border: 1px solid #374151 !important;
+    border-radius: 10px !important;
+    padding: 4px;
+    animation: fadeIn 0.3s ease-in-out;
+}
+li[role="option"] {
+    color: #f3f4f6 !important;
+    font-size: 14px;
+    padding: 8px 12px !important;
+    border-radius: 6px;
+    transition: background 0.15s, transform 0.1s;
+}
+li[role="option"]:hover {
+    background-color: #2563eb !important;
+    color: white !important;
+    transform: scale(1.02);
+}
+
+/* === Slider === */
+div[data-baseweb="slider"] div[role="slider"] {
+    background-color: #facc15 !important;
+    box-shadow: 0 0 8px rgba(250,204,21,0.6);
+    transition: all 0.3s ease;
+}
+div[data-baseweb="slider"] div[role="slider"]:hover {
+    background-color: #fde047 !important;
+    box-shadow: 0 0 12px rgba(250,204,21,0.8);
+}
+"""
+
+FEUILLES = {
+    "cartes": CSS_CARTES,
+    "championnat": CSS_CHAMPIONNAT,
+    "classement": CSS_CLASSEMENT,
+    "selecteurs": CSS_SELECTEURS,
+}
+
+
+@lru_cache(maxsize=None)
+def css_minifie(*noms):
+    """Feuilles demandées concaténées, sans commentaires ni espaces superflus."""
+    css = "".join(FEUILLES[nom] for nom in noms)
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.strip()
+
+
+def injecter_css(*noms):
+    """Injecte en un seul bloc les feuilles de style d'une page.
+
+    Streamlit retire à chaque exécution les éléments qui ne sont pas réémis : le bloc
+    est donc réémis à chaque rerun, mais une seule fois et sous forme minifiée.
+    """
+    st.markdown(f"<style>{css_minifie(*noms)}</style>", unsafe_allow_html=True)
+
+
+# ---------------- Composants ---------------- #
+def carte_html(valeur, titre=None, sous_titre=None, emoji=None, fond=None, classe="carte-kpi", style=""):
+    """Carte KPI : seules la couleur de fond et les dimensions particulières restent en ligne."""
+    style = (f"background: {fond};" if fond else "") + style
+    parties = [f'<div class="carte {classe}"' + (f' style="{style}">' if style else ">")]
+    if emoji is not None:
+        parties.append(f'<div class="carte-emoji">{emoji}</div>')
+    if titre is not None:
+        parties.append(f'<div class="carte-titre">{titre}</div>')
+    parties.append(f'<div class="carte-valeur">{valeur}</div>')
+    if sous_titre:
+        parties.append(f'<div class="carte-sous-titre">{sous_titre}</div>')
+    parties.append("</div>")
+    return "".join(parties)
+
+
+def carte(valeur, **options):
+    st.markdown(carte_html(valeur, **options), unsafe_allow_html=True)
+
+
+PODIUM_EMOJIS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+
+def podium_html(classement):
+    """HTML du podium (3 premiers) et des cartes suivantes, construit colonne par colonne."""
+    if classement.empty:
+        return ""
+    noms = classement["participant_nom"].astype(str).map(html.escape)
+    points = classement["points"].map("{:.2f}".format)
+    max_points = classement["points"].max()
+    if max_points:
+        largeurs = (classement["points"] / max_points * 100).map("{:.1f}".format)
+    else:
+        largeurs = pd.Series("0.0", index=classement.index)
+    rangs = classement["Rang"].astype(int).astype(str)
+
+    barres = (
+        '<div class="progress-bar"><div class="progress-fill" style="width:' + largeurs +
+        '%; background: linear-gradient(90deg, #3b82f6, rgba(255,255,255,0.3));"></div></div>'
+    )
+
+    # === 🥇 Podium vertical sobre + barre de progression ===
+    podium = classement["Rang"].head(3).astype(int)
+    cartes_podium = (
+        '<div class="podium-card podium-' + rangs.head(3) + '">'
+        '<div style="display:flex; align-items:center; justify-content:flex-start;">'
+        '<div class="emoji">' + podium.map(PODIUM_EMOJIS) + '</div>'
+        '<h4>' + noms.head(3) + ' - ' + points.head(3) + ' pts</h4></div>' +
+        barres.head(3) + '</div>'
+    )
+
+    # === ⚽ Cartes des participants suivants ===
+    cartes_suivantes = (
+        '<div class="ranking-card"><h5>⚽ ' + rangs.iloc[3:] + '. ' + noms.iloc[3:] + ' - ' +
+        points.iloc[3:] + ' pts</h5>' + barres.iloc[3:] + '</div>'
+    )
+    return "".join(cartes_podium.tolist() + cartes_suivantes.tolist())